@@ -58,7 +58,9 @@ INSTALLED_APPS = [
     'apps.Staff',
     'apps.review',
     'apps.login_registration',
-    'apps.admin_panel'
+    'apps.admin_panel',
+    'apps.jobs',
+    'apps.archive',
 ]
 
 if DEBUG:
@@ -69,10 +71,12 @@ if DEBUG:
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.VersionedETagMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -80,10 +84,20 @@ MIDDLEWARE = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.login_registration.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # orjson when installed, stdlib json otherwise (apps/core/fastjson.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.fastjson.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.fastjson.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -124,9 +138,16 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # archived orders (apps/archive); create with `python manage.py migrate --database=archive`
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'archive.sqlite3',
+    },
 }
 
+DATABASE_ROUTERS = ['apps.archive.router.ArchiveRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -163,8 +184,31 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# `collectstatic` bundles, minifies, hashes and precompresses (apps/core/assets.py);
+# ECAG_site/wsgi.py serves the result with far-future cache headers.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'apps.core.assets.CompressedManifestStaticFilesStorage'},
+}
+
+# One bundle per page: the scripts/styles it loads, in order ({% bundle "menu.js" %}).
+STATIC_PIPELINE = {
+    'BUNDLES': {
+        'menu.js': ['js/cart_sync.js', 'js/sidebar.js'],
+        'menu_mobile.js': ['js/cart_sync.js', 'js/menu_mobile.js'],
+        'menu_mobile.css': ['css/menu_mobile.css'],
+        'reservations.js': ['reservation/js/progress.js', 'reservation/js/table-select.js'],
+    },
+    'COMPRESS_MIN_SIZE': 512,
+    'MAX_AGE': 365 * 24 * 3600,
+}
 
 
+# where @login_required and the password reset pages send people to log in
+LOGIN_URL = 'login_registration:login'
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
@@ -173,6 +217,16 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# One cache for every process (runserver, run_jobs, the management commands): the token lookups
+# and the staff credentials flash are read by whichever process serves the next request, so a
+# per-process LocMemCache won't do. Create the table once with `python manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    },
+}
+
 
 
 LOGGING = {
@@ -189,7 +243,50 @@ LOGGING = {
     },
 }
 
+# Background jobs (emails, image processing, rollups) run via `python manage.py run_jobs`.
+JOB_QUEUE = {
+    'EAGER': False,
+    'CONCURRENCY': {'default': 4, 'email': 2, 'images': 1},
+    'BACKOFF_BASE': 10,
+    'BACKOFF_MAX': 3600,
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 EMAIL_HOST_USER = 'info@escalecuisine.com'
 DEFAULT_FROM_EMAIL = 'noreply@escalecuisine.com'
   # For testing
+
+# Token -> user lookups for the API are cached (apps/login_registration/authentication.py),
+# in-process for LOCAL_TTL seconds and in CACHES[CACHE_ALIAS] for SHARED_TTL.
+AUTH_TOKEN_CACHE = {
+    'LOCAL_TTL': 5,
+    'SHARED_TTL': 300,
+    'CACHE_ALIAS': 'default',
+}
+
+# Signed API tokens for the mobile apps (apps/login_registration/tokens.py).
+AUTH_TOKENS = {
+    'ACCESS_TTL': 24 * 3600,
+    'REFRESH_TTL': 30 * 24 * 3600,
+}
+
+# JSON API responses (apps/core/middleware.py): compression above COMPRESS_MIN_SIZE bytes and
+# ETags from data versions (apps/core/versions.py, counters in the core_dataversion table).
+API_RESPONSES = {
+    'COMPRESS_MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'RELEASE': '',
+}
+
+# Order archiving (apps/archive/router.py): `python manage.py archive_orders` (nightly, from cron) moves
+# completed orders older than HORIZON_DAYS to DATABASES[DATABASE] and leaves daily rollups behind.
+ORDER_ARCHIVE = {
+    'HORIZON_DAYS': 365,
+    'DATABASE': 'archive',
+    'BATCH_SIZE': 500,
+}
+
+# Web sessions live in a signed cookie: no session table read/write per request and nothing
+# to share between workers. Data is signed, not encrypted, so keep secrets out of the session.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ECAG_site.settings')
 
 application = get_wsgi_application()
+
+# Serve collected static files (precompressed, cached for a year when hashed)
+# without a separate web server; everything else goes to Django.
+from apps.core.assets import StaticFilesApplication  # noqa: E402
+
+application = StaticFilesApplication(application)
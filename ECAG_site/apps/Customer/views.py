@@ -47,7 +47,8 @@ def overview(request):
 @login_required
 def my_orders(request):
     customer = get_current_user(request)
-    orders = Order.objects.filter(user=customer).select_related('delivery', 'takeout').order_by('-order_date')
+    orders = (Order.objects.filter(user=customer).select_related('delivery', 'takeout')
+              .prefetch_related('items__item', 'items__topping_links__topping').order_by('-order_date'))
     context = {'orders': orders, 'active_page': 'my_orders'}
     return render(request, 'customer/my_orders.html', context)
 
@@ -1,18 +1,75 @@
+from django import forms
 from django.contrib import admin
-from .models import Reservation, Table
+from .models import RELEASED_STATUSES, BlackoutDate, CoversForecast, DwellTime, OpeningHours, Reservation, Table
+from . import booking
+
+
+class ReservationAdminForm(forms.ModelForm):
+	class Meta:
+		model = Reservation
+		fields = '__all__'
+
+	def clean(self):
+		cleaned = super().clean()
+		table, date, time = cleaned.get('table_id'), cleaned.get('date'), cleaned.get('time')
+		joined = list(cleaned.get('joined_tables') or ())
+		if table and table in joined:
+			self.add_error('joined_tables', 'The main table cannot also be a joined table.')
+			return cleaned
+		if table and date and time and cleaned.get('status') not in RELEASED_STATUSES:
+			existing = self.instance if self.instance.pk else None
+			if not booking.are_tables_free([table, *joined], date, time, cleaned.get('guest_count') or 1, exclude_reservation=existing):
+				raise forms.ValidationError('Table is not available for the requested slot.')
+		return cleaned
 
 
 @admin.register(Reservation)
 class ReservationAdmin(admin.ModelAdmin):
+	form = ReservationAdminForm
 	list_display = ('reservation_id', 'date', 'time', 'guest_count', 'table_id', 'full_name', 'phone', 'email', 'status', 'created_at')
 	list_filter = ('status', 'date', 'table_id')
 	search_fields = ('full_name', 'phone', 'email', 'reservation_id')
 	ordering = ('-date', '-time')
 	readonly_fields = ('created_at',)
 
+	def save_related(self, request, form, formsets, change):
+		# claim the slots once joined_tables is written; the admin view's transaction covers both saves
+		super().save_related(request, form, formsets, change)
+		booking.reschedule(form.instance)
+
 
 @admin.register(Table)
 class TableAdmin(admin.ModelAdmin):
 	list_display = ('table_id', 'table_number', 'seats', 'x_position', 'y_position')
 	ordering = ('table_number',)
 
+
+@admin.register(OpeningHours)
+class OpeningHoursAdmin(admin.ModelAdmin):
+	list_display = ('weekday', 'opens_at', 'last_start', 'closed', 'max_covers_per_slot')
+	list_editable = ('opens_at', 'last_start', 'closed', 'max_covers_per_slot')
+	ordering = ('weekday',)
+
+
+@admin.register(DwellTime)
+class DwellTimeAdmin(admin.ModelAdmin):
+	list_display = ('min_party', 'max_party', 'minutes')
+	ordering = ('min_party',)
+
+
+@admin.register(BlackoutDate)
+class BlackoutDateAdmin(admin.ModelAdmin):
+	list_display = ('date', 'reason')
+	ordering = ('date',)
+
+
+@admin.register(CoversForecast)
+class CoversForecastAdmin(admin.ModelAdmin):
+	list_display = ('date', 'slot', 'booked', 'reserved', 'walk_in', 'in_house', 'generated_at')
+	list_filter = ('date',)
+	ordering = ('date', 'slot')
+	readonly_fields = ('date', 'slot', 'booked', 'reserved', 'walk_in', 'in_house', 'generated_at')
+
+	def has_add_permission(self, request):
+		# rows come from `manage.py forecast_covers`
+		return False
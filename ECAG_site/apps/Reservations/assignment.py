@@ -0,0 +1,261 @@
+"""Table assignment: which table(s) to give a party, and when.
+
+The floor is turned into a list of candidate "combos": every single table plus
+every group of up to `RESERVATION_MAX_JOINED_TABLES` tables that sit next to
+each other on the floor plan (centres within `RESERVATION_JOIN_DISTANCE` of a
+neighbour, using `Table.x_position`/`y_position`). A day's claims
+(`ReservationSlot`) are loaded in one query into one bitmask per table, so
+"is this combo free for this sitting" is a couple of integer ANDs.
+
+Options are ranked to keep as many covers sellable as possible:
+
+* empty seats (a couple on a 4-top blocks two covers for the whole sitting),
+* joining tables only when needed,
+* turn times: a booking that leaves a gap on a table too short for another
+  sitting (the shortest dwell in the schedule) wastes that time, so snug
+  placements win.
+
+Opening hours, dwell per party size and the arrivals cap per slot come from
+the compiled `schedule`. When nothing fits at the requested time, nearby start
+times that do fit are offered instead. A full floor is evaluated in a few
+milliseconds (see `manage.py bench_table_assignment`).
+"""
+from dataclasses import dataclass, field
+from datetime import time, timedelta
+
+from django.conf import settings
+from django.db.models import Sum
+
+from .models import RELEASED_STATUSES, Reservation, ReservationSlot, Table
+from .schedule import BLOCKS_PER_DAY, block_index, block_time, get_schedule
+
+# ranking weights (lower score is better)
+EMPTY_SEAT_COST = 4
+JOIN_COST = 3
+DEAD_BLOCK_COST = 1
+
+
+def join_distance():
+    return getattr(settings, 'RESERVATION_JOIN_DISTANCE', 100)
+
+
+def max_joined_tables():
+    return getattr(settings, 'RESERVATION_MAX_JOINED_TABLES', 3)
+
+
+@dataclass
+class Option:
+    tables: tuple          # table ids, primary (lowest table number) first
+    numbers: tuple         # matching table numbers
+    seats: int
+    start: time
+    score: int = 0
+
+    @property
+    def table_id(self):
+        return self.tables[0]
+
+    @property
+    def joined(self):
+        return list(self.tables[1:])
+
+    @property
+    def label(self):
+        return '+'.join(f"T{n}" for n in self.numbers)
+
+    def as_dict(self):
+        return {
+            'table_id': self.table_id,
+            'table_number': self.numbers[0],
+            'joined_with': self.joined,
+            'table_ids': list(self.tables),
+            'label': self.label,
+            'seats': self.seats,
+            'time': self.start.strftime('%H:%M'),
+            'score': self.score,
+        }
+
+
+@dataclass
+class Floor:
+    tables: dict                       # table_id -> (table_number, seats, x, y)
+    combos: list = field(default_factory=list)   # (ids, numbers, seats)
+
+    @property
+    def max_party(self):
+        return max((seats for _, _, seats in self.combos), default=0)
+
+    def combo_for(self, table_ids):
+        key = frozenset(table_ids)
+        for combo in self.combos:
+            if frozenset(combo[0]) == key:
+                return combo
+        return None
+
+
+_floor_cache = {}
+
+
+def _neighbours(tables, limit):
+    pairs = {tid: set() for tid in tables}
+    items = list(tables.items())
+    for i, (a, (_, _, ax, ay)) in enumerate(items):
+        for b, (_, _, bx, by) in items[i + 1:]:
+            if (ax - bx) ** 2 + (ay - by) ** 2 <= limit ** 2:
+                pairs[a].add(b)
+                pairs[b].add(a)
+    return pairs
+
+
+def build_floor(rows, distance=None, max_join=None):
+    """Build a `Floor` from (table_id, table_number, seats, x, y) rows."""
+    distance = join_distance() if distance is None else distance
+    max_join = max_joined_tables() if max_join is None else max_join
+    tables = {row[0]: tuple(row[1:]) for row in rows}
+    neighbours = _neighbours(tables, distance)
+
+    # grow connected groups one neighbour at a time; frozensets dedupe orderings
+    groups = {frozenset([tid]) for tid in tables}
+    frontier = set(groups)
+    for _ in range(max_join - 1):
+        grown = set()
+        for group in frontier:
+            for tid in group:
+                for other in neighbours[tid] - group:
+                    grown.add(group | {other})
+        grown -= groups
+        groups |= grown
+        frontier = grown
+
+    combos = []
+    for group in groups:
+        ids = tuple(sorted(group, key=lambda tid: tables[tid][0]))
+        combos.append((ids, tuple(tables[tid][0] for tid in ids), sum(tables[tid][1] for tid in ids)))
+    combos.sort(key=lambda combo: (len(combo[0]), combo[2], combo[1]))
+    return Floor(tables=tables, combos=combos)
+
+
+def get_floor():
+    """The current floor, rebuilt only when the table layout changes."""
+    rows = tuple(Table.objects.order_by('table_id').values_list('table_id', 'table_number', 'seats', 'x_position', 'y_position'))
+    key = (rows, join_distance(), max_joined_tables())
+    floor = _floor_cache.get(key)
+    if floor is None:
+        _floor_cache.clear()
+        floor = _floor_cache[key] = build_floor(rows)
+    return floor
+
+
+def day_occupancy(date, exclude_reservation=None):
+    """{table_id: bitmask of claimed 15-minute blocks} for `date` (+ the early hours of the next day)."""
+    qs = ReservationSlot.objects.filter(date__in=[date, date + timedelta(days=1)])
+    if exclude_reservation is not None:
+        qs = qs.exclude(reservation=exclude_reservation)
+    busy = {}
+    for table_id, slot_date, slot in qs.values_list('table_id', 'date', 'slot'):
+        index = block_index(slot) + (BLOCKS_PER_DAY if slot_date != date else 0)
+        busy[table_id] = busy.get(table_id, 0) | (1 << index)
+    return busy
+
+
+def day_arrivals(date, exclude_reservation=None):
+    """{start block index: guests arriving} for `date`, for the covers cap."""
+    qs = Reservation.objects.filter(date=date).exclude(status__in=RELEASED_STATUSES)
+    if exclude_reservation is not None:
+        qs = qs.exclude(pk=exclude_reservation.pk)
+    return {block_index(t): total for t, total in qs.values_list('time').annotate(total=Sum('guest_count'))}
+
+
+def _free_run(mask, start, step, stop):
+    """Free blocks from `start` walking by `step` until a claim or `stop`."""
+    run = 0
+    index = start
+    while index != stop and not (mask >> index) & 1:
+        run += 1
+        index += step
+    return run
+
+
+def _dead_blocks(mask, start, end, day_start, day_end, shortest):
+    # gaps left on either side that are too short to sell as another sitting
+    dead = 0
+    for gap in (_free_run(mask, start - 1, -1, day_start - 1), _free_run(mask, end, 1, day_end)):
+        if 0 < gap < shortest:
+            dead += gap
+    return dead
+
+
+def options_at(floor, busy, party_size, start_index, hours, schedule):
+    """All combos that seat `party_size` and are free for a sitting at `start_index`, best first."""
+    sitting = schedule.dwell_blocks_for(party_size)
+    shortest = schedule.min_dwell_blocks
+    window = ((1 << sitting) - 1) << start_index
+    day_start = hours.first_index
+    day_end = hours.last_index + shortest
+    options = []
+    for ids, numbers, seats in floor.combos:
+        if seats < party_size:
+            continue
+        if any(busy.get(tid, 0) & window for tid in ids):
+            continue
+        dead = sum(
+            _dead_blocks(busy.get(tid, 0), start_index, start_index + sitting, day_start, max(day_end, start_index + sitting), shortest)
+            for tid in ids
+        )
+        score = (seats - party_size) * EMPTY_SEAT_COST + (len(ids) - 1) * JOIN_COST + dead * DEAD_BLOCK_COST
+        options.append(Option(ids, numbers, seats, block_time(start_index), score))
+    options.sort(key=lambda option: (option.score, option.numbers))
+    return options
+
+
+def suggest(date, start, party_size, *, exclude_reservation=None, alternatives=3, floor=None, busy=None, arrivals=None):
+    """Rank assignments for a party.
+
+    Returns ``{'options': [Option, ...], 'alternatives': [Option, ...]}``:
+    every way to seat the party at `start` (best first) and, when there is none,
+    the best option at up to `alternatives` nearby start times. Closed days
+    and blackout dates have neither.
+    """
+    schedule = get_schedule()
+    hours = schedule.hours_for(date)
+    if hours is None:
+        return {'options': [], 'alternatives': []}
+    floor = floor or get_floor()
+    if busy is None:
+        busy = day_occupancy(date, exclude_reservation)
+    if arrivals is None:
+        arrivals = day_arrivals(date, exclude_reservation) if hours.max_covers else {}
+
+    def _fits(index):
+        if hours.max_covers and arrivals.get(index, 0) + party_size > hours.max_covers:
+            return []
+        return options_at(floor, busy, party_size, index, hours, schedule)
+
+    requested = block_index(start)
+    options = _fits(requested) if schedule.check(date, start) is None else []
+
+    nearby = []
+    if not options and party_size <= floor.max_party:
+        candidates = sorted(
+            (index for index in range(hours.first_index, hours.last_index + 1) if index != requested),
+            key=lambda index: (abs(index - requested), index),
+        )
+        for index in candidates:
+            found = _fits(index)
+            if found:
+                nearby.append(found[0])
+                if len(nearby) >= alternatives:
+                    break
+        nearby.sort(key=lambda option: option.start)
+    return {'options': options, 'alternatives': nearby}
+
+
+def validate_combination(table_ids, party_size, floor=None):
+    """Return an error message if these tables can't seat the party together, else None."""
+    floor = floor or get_floor()
+    combo = floor.combo_for(table_ids)
+    if combo is None:
+        return 'Selected tables are not next to each other'
+    if combo[2] < party_size:
+        return 'Selected table cannot accommodate the party size'
+    return None
@@ -0,0 +1,246 @@
+"""Race-free reservation booking.
+
+Every reservation claims the 15-minute blocks it occupies on its table as rows
+in `ReservationSlot`. The table has a unique constraint on (table, date, slot),
+so when two customers race for the same table the second insert fails inside
+its transaction and nothing is saved for it. Availability checks are reads of
+that same table, so what the customer is shown and what the database enforces
+can never disagree.
+
+All entry points (web steps, DRF, the mobile app through DRF, staff status
+changes) go through `book`, `reschedule`, `change_status` and
+`bulk_change_status` here.
+"""
+import time as time_module
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q, Sum
+
+from apps.core import versions
+
+from .models import RELEASED_STATUSES, Reservation, ReservationSlot
+from .schedule import SLOT_MINUTES, get_schedule
+
+# SQLite reports a busy writer as "database is locked"; retry those briefly.
+LOCK_RETRIES = 5
+LOCK_BACKOFF = 0.05
+
+# staff bulk changes may only move a finished booking to another finished status
+FINAL_STATUSES = ('completed', 'cancelled')
+
+
+class BookingConflict(Exception):
+    """The requested table is already claimed for part of the requested slot."""
+
+    def __init__(self, message="Table is not available for the requested slot."):
+        super().__init__(message)
+
+
+def slot_blocks(date, time, dwell):
+    """Return the (date, time) pairs of every 15-minute block a booking covers."""
+    start = datetime.combine(date, time)
+    blocks = []
+    current = start
+    while current < start + dwell:
+        blocks.append((current.date(), current.time()))
+        current += timedelta(minutes=SLOT_MINUTES)
+    return blocks
+
+
+def _claims(reservation, tables, blocks):
+    return [
+        ReservationSlot(reservation=reservation, table=table, date=block_date, slot=block_time)
+        for table in tables
+        for block_date, block_time in blocks
+    ]
+
+
+def _claim(reservation, tables):
+    schedule = get_schedule()
+    blocks = slot_blocks(reservation.date, reservation.time, schedule.dwell(reservation.guest_count))
+    try:
+        # savepoint, so the caller's transaction is still usable for the rollback
+        with transaction.atomic():
+            ReservationSlot.objects.bulk_create(_claims(reservation, tables, blocks))
+    except IntegrityError:
+        raise BookingConflict()
+
+    # Arrivals cap for the start slot. Checked after our own insert, so on
+    # SQLite we already hold the write lock and the count can't go stale.
+    hours = schedule.hours_for(reservation.date)
+    if hours and hours.max_covers:
+        arriving = (
+            Reservation.objects.filter(date=reservation.date, time=reservation.time)
+            .exclude(status__in=RELEASED_STATUSES)
+            .aggregate(total=Sum('guest_count'))['total'] or 0
+        )
+        if arriving > hours.max_covers:
+            raise BookingConflict("That time is fully booked. Please choose another time.")
+
+
+def _with_lock_retry(fn):
+    for attempt in range(LOCK_RETRIES):
+        try:
+            return fn()
+        except OperationalError as exc:
+            if 'locked' not in str(exc).lower() or attempt == LOCK_RETRIES - 1:
+                raise
+            time_module.sleep(LOCK_BACKOFF * (2 ** attempt))
+
+
+def _group_blocks(blocks):
+    grouped = {}
+    for block_date, block_time in blocks:
+        grouped.setdefault(block_date, []).append(block_time)
+    return grouped
+
+
+def claimed_table_ids(date, time, guest_count, table_ids=None, exclude_reservation=None):
+    """Ids of tables with at least one block claimed during the requested slot."""
+    window = Q()
+    blocks = slot_blocks(date, time, get_schedule().dwell(guest_count))
+    for block_date, block_times in _group_blocks(blocks).items():
+        window |= Q(date=block_date, slot__in=block_times)
+    qs = ReservationSlot.objects.filter(window)
+    if table_ids is not None:
+        qs = qs.filter(table_id__in=table_ids)
+    if exclude_reservation is not None:
+        qs = qs.exclude(reservation=exclude_reservation)
+    return set(qs.values_list('table_id', flat=True).distinct())
+
+
+def is_table_free(table, date, time, guest_count, exclude_reservation=None):
+    return table.pk not in claimed_table_ids(date, time, guest_count, [table.pk], exclude_reservation)
+
+
+def are_tables_free(tables, date, time, guest_count, exclude_reservation=None):
+    return not claimed_table_ids(date, time, guest_count, [t.pk for t in tables], exclude_reservation)
+
+
+def book(*, user, table, date, time, guest_count, status='confirmed', joined_tables=(), **details):
+    """Create a reservation and claim its slot atomically.
+
+    `joined_tables` are extra tables pushed together with `table` for a larger
+    party; all of them are claimed or none are. Raises `BookingConflict` (and
+    saves nothing) if any block is already taken.
+    """
+    def _attempt():
+        with transaction.atomic():
+            reservation = Reservation.objects.create(
+                user_id=user,
+                table_id=table,
+                date=date,
+                time=time,
+                guest_count=guest_count,
+                status=status,
+                **details,
+            )
+            if joined_tables:
+                reservation.joined_tables.set(joined_tables)
+            if status not in RELEASED_STATUSES:
+                _claim(reservation, [table, *joined_tables])
+            return reservation
+
+    return _with_lock_retry(_attempt)
+
+
+def reschedule(reservation, *, table=None, date=None, time=None, joined_tables=None, **fields):
+    """Move a reservation (and its claims) to a new table/date/time atomically."""
+    def _attempt():
+        with transaction.atomic():
+            if table is not None:
+                reservation.table_id = table
+            if date is not None:
+                reservation.date = date
+            if time is not None:
+                reservation.time = time
+            for attr, value in fields.items():
+                setattr(reservation, attr, value)
+            reservation.save()
+            if joined_tables is not None:
+                reservation.joined_tables.set(joined_tables)
+            ReservationSlot.objects.filter(reservation=reservation).delete()
+            if reservation.status not in RELEASED_STATUSES:
+                _claim(reservation, reservation.all_tables())
+            return reservation
+
+    try:
+        return _with_lock_retry(_attempt)
+    except BookingConflict:
+        reservation.refresh_from_db()
+        raise
+
+
+def change_status(reservation, new_status):
+    """Set a status, releasing or re-claiming the table as needed.
+
+    Re-activating a cancelled booking raises `BookingConflict` if the table has
+    been given to someone else in the meantime.
+    """
+    was_released = reservation.status in RELEASED_STATUSES
+    now_released = new_status in RELEASED_STATUSES
+
+    def _attempt():
+        with transaction.atomic():
+            reservation.status = new_status
+            reservation.save(update_fields=['status'])
+            if was_released and not now_released:
+                ReservationSlot.objects.filter(reservation=reservation).delete()
+                _claim(reservation, reservation.all_tables())
+            return reservation
+
+    try:
+        return _with_lock_retry(_attempt)
+    except BookingConflict:
+        reservation.refresh_from_db()
+        raise
+
+
+def bulk_change_status(reservation_ids, new_status, final_statuses=()):
+    """Set `new_status` on many reservations in one transaction; one result per id.
+
+    Plain status changes are written with a single `bulk_update`, and any
+    bookings that now give their table back lose their slots in one delete.
+    Re-activating a released booking has to win its table back, so those go
+    through `change_status` one by one and may fail with a conflict on their
+    own. Reservations in `final_statuses` may only move to another of them.
+    """
+    valid = [value for value, _ in Reservation.STATUS_CHOICES]
+    if new_status not in valid:
+        raise ValueError(f"Invalid status: {new_status}")
+
+    results = []
+    with transaction.atomic():
+        reservations = Reservation.objects.select_for_update().in_bulk(reservation_ids)
+        changed = []
+        for pk in reservation_ids:
+            reservation = reservations.get(pk)
+            if reservation is None:
+                results.append({'id': pk, 'ok': False, 'error': "Reservation not found"})
+                continue
+            if reservation.status in final_statuses and new_status not in final_statuses:
+                results.append({'id': pk, 'ok': False, 'error': "Reservation is already finalized"})
+                continue
+            if reservation.status in RELEASED_STATUSES and new_status not in RELEASED_STATUSES:
+                try:
+                    change_status(reservation, new_status)
+                except BookingConflict as exc:
+                    results.append({'id': pk, 'ok': False, 'error': str(exc)})
+                    continue
+            elif reservation.status != new_status:
+                reservation.status = new_status
+                changed.append(reservation)
+            results.append({'id': pk, 'ok': True, 'status': new_status})
+
+        Reservation.objects.bulk_update(changed, ['status'])
+        if changed:
+            # bulk_update skips the post_save receivers that normally do this
+            versions.bump("reservations")
+        if new_status in RELEASED_STATUSES and changed:
+            ReservationSlot.objects.filter(reservation__in=changed).delete()
+    return results
+
+
+def release(reservation):
+    return ReservationSlot.objects.filter(reservation=reservation).delete()[0]
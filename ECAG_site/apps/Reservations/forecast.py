@@ -0,0 +1,252 @@
+"""Covers forecast: how many guests to expect per 15-minute slot over the coming days.
+
+`build_history` turns the last `HISTORY_DAYS` into two arrays of shape
+``(days, BLOCKS_PER_DAY)``, covers arriving per slot:
+
+* reserved: each reservation's ``guest_count`` at its start slot (cancelled
+  bookings and no-shows left out);
+* walk-in: dine-in orders placed by someone without a reservation that day.
+  Orders carry no guest count, so each stands for a party of the average
+  reserved party size.
+
+`fit` reduces each array to one profile per weekday: the exponentially
+weighted mean of that weekday's past days, the most recent weighing most
+(`ALPHA`). Days without any covers (closed, or before the site had data) are
+left out rather than averaged in as zeros. Everything is a NumPy matrix
+product; a year of history fits in milliseconds.
+
+`predict` then gives, for each coming day:
+
+* ``booked``: covers already on the books;
+* ``reserved``: booked plus the bookings still expected, i.e. the weekday's
+  reserved profile beyond what is booked, spread like the profile;
+* ``walk_in``: the weekday's walk-in profile;
+* ``in_house``: covers seated in each slot, arrivals held for the dwell time
+  of an average party.
+
+Closed days and blackout dates forecast nothing. `run` writes the result to
+`CoversForecast`, which the admin dashboards read (`daily_totals`,
+`slot_rows`); ``manage.py forecast_covers`` runs it nightly. Reading stored
+forecasts needs nothing beyond Django; building them needs NumPy.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, Exists, OuterRef
+from django.db.models.functions import ExtractHour, ExtractMinute, TruncDate
+from django.utils import timezone
+
+from apps.core import versions
+from apps.menu.models import Order
+
+from .models import CoversForecast, Reservation
+from .schedule import BLOCKS_PER_DAY, SLOT_MINUTES, block_index, block_time, get_schedule
+
+try:
+    import numpy as np
+except ImportError:     # optional: only building forecasts needs it
+    np = None
+
+HISTORY_DAYS = 84
+FORECAST_DAYS = 14
+ALPHA = 0.3
+DEFAULT_PARTY = 2.0
+
+# bookings that brought no one
+NO_COVERS = ('cancelled', 'no-show')
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Building the covers forecast needs NumPy (pip install numpy).")
+
+
+@dataclass
+class History:
+    start: object           # first day (a date)
+    reserved: object        # (days, BLOCKS_PER_DAY) covers arriving with a booking
+    walk_in: object         # (days, BLOCKS_PER_DAY) covers arriving without one
+    party_size: float       # mean reserved party, also used for walk-in parties
+
+    @property
+    def weekdays(self):
+        return (self.start.weekday() + np.arange(self.reserved.shape[0])) % 7
+
+
+def _bookings(start, end):
+    return Reservation.objects.filter(date__gte=start, date__lt=end).exclude(status__in=NO_COVERS)
+
+
+def reserved_covers(start, end):
+    """(days, BLOCKS_PER_DAY): guests booked to arrive in each slot of the days in [start, end)."""
+    _require_numpy()
+    covers = np.zeros(((end - start).days, BLOCKS_PER_DAY))
+    rows = list(_bookings(start, end).values_list('date', 'time', 'guest_count'))
+    if rows:
+        day_index = np.array([(d - start).days for d, _, _ in rows])
+        slot_index = np.array([block_index(t) for _, t, _ in rows])
+        np.add.at(covers, (day_index, slot_index), np.array([guests for _, _, guests in rows], dtype=float))
+    return covers
+
+
+def build_history(start, end):
+    """Covers per slot for the days in [start, end), from reservations and dine-in orders."""
+    reserved = reserved_covers(start, end)
+    walk_in = np.zeros_like(reserved)
+    party_size = _bookings(start, end).aggregate(avg=Avg('guest_count'))['avg'] or DEFAULT_PARTY
+
+    had_booking = Reservation.objects.filter(
+        user_id=OuterRef('user_id'), date=OuterRef('day'),
+    ).exclude(status__in=NO_COVERS)
+    orders = (
+        Order.objects.filter(order_type=Order.Ordertype.DINE_IN, order_date__date__gte=start, order_date__date__lt=end)
+        .exclude(status='cancelled')
+        .annotate(day=TruncDate('order_date'), hour=ExtractHour('order_date'), minute=ExtractMinute('order_date'))
+        .exclude(Exists(had_booking))
+        .values('day', 'hour', 'minute')
+        .annotate(n=Count('id'))
+        .values_list('day', 'hour', 'minute', 'n')
+    )
+    rows = [row for row in orders if start <= row[0] < end]
+    if rows:
+        day_index = np.array([(d - start).days for d, _, _, _ in rows])
+        slot_index = np.array([(h * 60 + m) // SLOT_MINUTES for _, h, m, _ in rows])
+        np.add.at(walk_in, (day_index, slot_index), np.array([n for _, _, _, n in rows], dtype=float) * party_size)
+
+    return History(start, reserved, walk_in, float(party_size))
+
+
+def _profiles(series, weekdays, alpha):
+    """(7, BLOCKS_PER_DAY): per weekday, the exponentially weighted mean of its open days."""
+    profiles = np.zeros((7, series.shape[1]))
+    for weekday in range(7):
+        days = series[weekdays == weekday]              # oldest first
+        if not len(days):
+            continue
+        weights = (1 - alpha) ** np.arange(len(days) - 1, -1, -1)
+        profiles[weekday] = weights @ days / weights.sum()
+    return profiles
+
+
+@dataclass
+class Model:
+    reserved: object        # (7, BLOCKS_PER_DAY) profile per weekday, Monday first
+    walk_in: object
+    party_size: float
+
+
+def fit(history, alpha=ALPHA):
+    _require_numpy()
+    open_days = (history.reserved.sum(axis=1) + history.walk_in.sum(axis=1)) > 0
+    weekdays = history.weekdays[open_days]
+    return Model(
+        reserved=_profiles(history.reserved[open_days], weekdays, alpha),
+        walk_in=_profiles(history.walk_in[open_days], weekdays, alpha),
+        party_size=history.party_size,
+    )
+
+
+@dataclass
+class Forecast:
+    start: object
+    booked: object          # (days, BLOCKS_PER_DAY) each
+    reserved: object
+    walk_in: object
+    in_house: object
+
+    @property
+    def dates(self):
+        return [self.start + timedelta(days=offset) for offset in range(self.booked.shape[0])]
+
+
+def predict(model, start, days, booked=None):
+    """Forecast the `days` days from `start`; `booked` defaults to the current reservations."""
+    _require_numpy()
+    schedule = get_schedule()
+    booked = reserved_covers(start, start + timedelta(days=days)) if booked is None else booked
+    weekdays = (start.weekday() + np.arange(days)) % 7
+
+    profile = model.reserved[weekdays]
+    expected = profile.sum(axis=1, keepdims=True)
+    # bookings still to come: what the profile expects beyond the book, spread like the profile
+    pickup = np.clip(expected - booked.sum(axis=1, keepdims=True), 0, None)
+    shape = np.divide(profile, expected, out=np.zeros_like(profile), where=expected > 0)
+    reserved = booked + pickup * shape
+    walk_in = model.walk_in[weekdays].copy()
+
+    closed = np.array([schedule.hours_for(start + timedelta(days=offset)) is None for offset in range(days)])
+    reserved[closed] = booked[closed]
+    walk_in[closed] = 0
+
+    # seated = arrivals over the last `dwell` slots (running sum via cumsum)
+    dwell = schedule.dwell_blocks_for(round(model.party_size))
+    arrivals = np.cumsum(reserved + walk_in, axis=1)
+    in_house = arrivals.copy()
+    in_house[:, dwell:] -= arrivals[:, :-dwell]
+    return Forecast(start, booked, reserved, walk_in, in_house)
+
+
+def run(days=FORECAST_DAYS, history_days=HISTORY_DAYS, alpha=ALPHA, today=None):
+    """Fit on the last `history_days` and store the next `days` in `CoversForecast`.
+
+    Returns the `Forecast`. Replaces the stored rows of those days and drops
+    rows older than the history window.
+    """
+    today = today or timezone.localdate()
+    model = fit(build_history(today - timedelta(days=history_days), today), alpha)
+    forecast = predict(model, today, days)
+
+    generated_at = timezone.now()
+    rows = []
+    for offset, day in enumerate(forecast.dates):
+        values = np.stack([
+            forecast.booked[offset], forecast.reserved[offset],
+            forecast.walk_in[offset], forecast.in_house[offset],
+        ]).round(2)
+        for index in np.flatnonzero(values.any(axis=0)):
+            booked, reserved, walk_in, in_house = values[:, index].tolist()
+            rows.append(CoversForecast(
+                date=day, slot=block_time(int(index)), booked=int(booked),
+                reserved=reserved, walk_in=walk_in, in_house=in_house, generated_at=generated_at,
+            ))
+    with transaction.atomic():
+        CoversForecast.objects.filter(date__gte=today, date__lt=today + timedelta(days=days)).delete()
+        CoversForecast.objects.filter(date__lt=today - timedelta(days=history_days)).delete()
+        CoversForecast.objects.bulk_create(rows, batch_size=500)
+        versions.bump("reservations")
+    return forecast
+
+
+def daily_totals(start, days=7):
+    """Stored forecast per day from `start`: covers and the busiest slot, for the dashboards."""
+    totals = {
+        start + timedelta(days=offset): {
+            'date': start + timedelta(days=offset), 'booked': 0, 'reserved': 0.0, 'walk_in': 0.0,
+            'total': 0.0, 'peak_slot': None, 'peak_in_house': 0.0,
+        }
+        for offset in range(days)
+    }
+    rows = CoversForecast.objects.filter(date__gte=start, date__lt=start + timedelta(days=days))
+    for row in rows.values('date', 'slot', 'booked', 'reserved', 'walk_in', 'in_house'):
+        day = totals[row['date']]
+        day['booked'] += row['booked']
+        day['reserved'] += row['reserved']
+        day['walk_in'] += row['walk_in']
+        day['total'] += row['reserved'] + row['walk_in']
+        if row['in_house'] > day['peak_in_house']:
+            day['peak_in_house'] = row['in_house']
+            day['peak_slot'] = row['slot']
+    for day in totals.values():
+        day['pickup'] = max(day['reserved'] - day['booked'], 0.0)   # bookings still expected
+        for key in ('reserved', 'pickup', 'walk_in', 'total', 'peak_in_house'):
+            day[key] = round(day[key], 1)
+    return list(totals.values())
+
+
+def slot_rows(day):
+    """Stored forecast of `day`, one dict per slot that expects anyone."""
+    return list(
+        CoversForecast.objects.filter(date=day)
+        .values('slot', 'booked', 'reserved', 'walk_in', 'in_house', 'generated_at')
+    )
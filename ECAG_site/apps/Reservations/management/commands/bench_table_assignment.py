@@ -0,0 +1,68 @@
+import random
+import statistics
+import time as clock
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservations import assignment
+from apps.reservations.schedule import get_schedule
+
+
+class Command(BaseCommand):
+    help = "Time the table-assignment engine on a busy evening for every party size and start time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fill", type=float, default=0.6, help="Share of each table's evening already booked.")
+        parser.add_argument("--budget-ms", type=float, default=50.0)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        floor = assignment.get_floor()
+        if not floor.tables:
+            raise CommandError("No tables defined.")
+
+        # synthetic bookings: random sittings per table until the fill ratio is reached
+        schedule = get_schedule()
+        day = date.today() + timedelta(days=1)
+        while schedule.hours_for(day) is None:
+            day += timedelta(days=1)
+        hours = schedule.hours_for(day)
+        sitting = schedule.dwell_blocks_for(2)
+        open_index, last_index = hours.first_index, hours.last_index
+        evening = last_index + sitting - open_index
+        busy = {}
+        for table_id in floor.tables:
+            mask = 0
+            for _ in range(50):
+                if bin(mask).count("1") >= evening * options["fill"]:
+                    break
+                start = rng.randint(open_index, last_index)
+                window = ((1 << sitting) - 1) << start
+                if not mask & window:
+                    mask |= window
+            busy[table_id] = mask
+
+        timings = []
+        for party in range(1, floor.max_party + 1):
+            for start in schedule.start_times(day):
+                began = clock.perf_counter()
+                assignment.suggest(day, start, party, floor=floor, busy=busy, arrivals={})
+                timings.append((clock.perf_counter() - began) * 1000)
+
+        # one end-to-end call including the floor and claims queries
+        began = clock.perf_counter()
+        assignment.suggest(day, hours.last_start, 2)
+        full_ms = (clock.perf_counter() - began) * 1000
+
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{len(floor.tables)} tables, {len(floor.combos)} combos, {len(timings)} requests: "
+            f"median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms, max {timings[-1]:.2f} ms; "
+            f"with DB queries {full_ms:.2f} ms"
+        )
+        if timings[-1] > options["budget_ms"]:
+            raise CommandError(f"Slowest request took {timings[-1]:.2f} ms (budget {options['budget_ms']} ms)")
+        self.stdout.write(self.style.SUCCESS("Within budget."))
@@ -0,0 +1,35 @@
+import time as clock
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.reservations import forecast
+
+
+class Command(BaseCommand):
+    help = (
+        "Forecast covers per 15-minute slot for the coming days and store them for the admin dashboards. "
+        "Run nightly, e.g. cron: 30 3 * * * python manage.py forecast_covers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=forecast.FORECAST_DAYS, help="Days ahead to forecast.")
+        parser.add_argument("--history", type=int, default=forecast.HISTORY_DAYS, help="Days of history to fit on.")
+        parser.add_argument("--alpha", type=float, default=forecast.ALPHA,
+                            help="Smoothing factor: weight of the most recent week, 0..1.")
+
+    def handle(self, *args, **options):
+        if not 0 < options["alpha"] <= 1:
+            raise CommandError("--alpha must be in (0, 1].")
+        days, history = max(options["days"], 1), max(options["history"], 7)
+        started = clock.perf_counter()
+        try:
+            result = forecast.run(days=days, history_days=history, alpha=options["alpha"])
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        elapsed = (clock.perf_counter() - started) * 1000
+
+        for day, reserved, walk_in in zip(result.dates, result.reserved.sum(axis=1), result.walk_in.sum(axis=1)):
+            self.stdout.write(f"{day:%a %d %b}: {reserved + walk_in:6.1f} covers ({reserved:.1f} reserved, {walk_in:.1f} walk-in)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecast {days} day(s) from {history} day(s) of history in {elapsed:.0f} ms."
+        ))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:57
+
+from datetime import datetime, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def claim_existing_reservations(apps, schema_editor):
+    """Give every active reservation its 15-minute slot claims (2h dwell)."""
+    Reservation = apps.get_model('reservations', 'Reservation')
+    ReservationSlot = apps.get_model('reservations', 'ReservationSlot')
+    claims = []
+    for res in Reservation.objects.exclude(status='cancelled').iterator():
+        start = datetime.combine(res.date, res.time)
+        for step in range(8):
+            block = start + timedelta(minutes=15 * step)
+            claims.append(ReservationSlot(reservation_id=res.pk, table_id=res.table_id_id, date=block.date(), slot=block.time()))
+    # historic data may already contain overlaps; the first booking keeps the slot
+    ReservationSlot.objects.bulk_create(claims, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_add_contact_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot', models.TimeField()),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='reservations.reservation')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_claims', to='reservations.table')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'slot'], name='reservation_slot_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('table', 'date', 'slot'), name='unique_table_slot_claim')],
+            },
+        ),
+        migrations.RunPython(claim_existing_reservations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_reservationslot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='joined_tables',
+            field=models.ManyToManyField(blank=True, related_name='joined_reservations', to='reservations.table'),
+        ),
+    ]
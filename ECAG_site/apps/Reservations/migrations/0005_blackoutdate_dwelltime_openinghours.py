@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:03
+
+import datetime
+
+from django.db import migrations, models
+
+
+def seed_current_rules(apps, schema_editor):
+    """Start from the rules that used to be hard-coded: 15:00-22:00 daily, 2h dwell."""
+    OpeningHours = apps.get_model('reservations', 'OpeningHours')
+    DwellTime = apps.get_model('reservations', 'DwellTime')
+    for weekday in range(7):
+        OpeningHours.objects.get_or_create(
+            weekday=weekday,
+            defaults={'opens_at': datetime.time(15, 0), 'last_start': datetime.time(22, 0)},
+        )
+    if not DwellTime.objects.exists():
+        DwellTime.objects.create(min_party=1, max_party=20, minutes=120)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_reservation_joined_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlackoutDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DwellTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_party', models.PositiveSmallIntegerField()),
+                ('max_party', models.PositiveSmallIntegerField()),
+                ('minutes', models.PositiveIntegerField(help_text='Rounded up to whole 15-minute slots.')),
+            ],
+            options={
+                'ordering': ['min_party'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OpeningHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')], unique=True)),
+                ('opens_at', models.TimeField(help_text='Earliest booking start.')),
+                ('last_start', models.TimeField(help_text='Latest booking start.')),
+                ('closed', models.BooleanField(default=False)),
+                ('max_covers_per_slot', models.PositiveIntegerField(blank=True, help_text='Most guests that may arrive in one 15-minute slot. Blank = no limit.', null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'opening hours',
+                'ordering': ['weekday'],
+            },
+        ),
+        migrations.RunPython(seed_current_rules, migrations.RunPython.noop),
+    ]
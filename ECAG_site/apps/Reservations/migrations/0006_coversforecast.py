@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0005_blackoutdate_dwelltime_openinghours'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoversForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slot', models.TimeField()),
+                ('booked', models.PositiveIntegerField(default=0, help_text='Covers already reserved when the forecast ran.')),
+                ('reserved', models.FloatField(default=0, help_text='Expected reserved covers arriving: booked plus later bookings.')),
+                ('walk_in', models.FloatField(default=0, help_text='Expected walk-in covers arriving.')),
+                ('in_house', models.FloatField(default=0, help_text='Expected covers seated during the slot.')),
+                ('generated_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['date', 'slot'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'slot'), name='unique_covers_forecast_slot')],
+            },
+        ),
+    ]
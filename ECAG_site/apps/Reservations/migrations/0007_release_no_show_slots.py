@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:02
+
+from django.db import migrations
+
+
+def release_no_show_slots(apps, schema_editor):
+    """No-shows now give their table back, like cancellations."""
+    ReservationSlot = apps.get_model('reservations', 'ReservationSlot')
+    ReservationSlot.objects.filter(reservation__status='no-show').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_coversforecast'),
+    ]
+
+    operations = [
+        migrations.RunPython(release_no_show_slots, migrations.RunPython.noop),
+    ]
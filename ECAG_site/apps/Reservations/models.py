@@ -45,6 +45,8 @@ class Reservation(models.Model):
     reservation_id = models.AutoField(primary_key=True)
     user_id =  models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='reservations')
     table_id = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='reservations')
+    # Extra tables pushed together with `table_id` for larger parties
+    joined_tables = models.ManyToManyField(Table, blank=True, related_name='joined_reservations')
     date = models.DateField()
     time = models.TimeField()
     guest_count = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(20)])
@@ -84,5 +86,137 @@ class Reservation(models.Model):
             self.guest_count = guest_count
         self.save()
 
+    def all_tables(self):
+        return [self.table_id, *self.joined_tables.all()]
+
     def __str__(self):
         return f"Reservation {self.reservation_id} for User {self.user_id} on {self.date} at {self.time}"
+
+
+# Statuses that give the table back to other bookings. A no-show frees the rest
+# of its slot for walk-ins and later bookings, like a cancellation.
+RELEASED_STATUSES = ('cancelled', 'no-show')
+
+
+class ReservationSlot(models.Model):
+    """One 15-minute block of one table held by a reservation.
+
+    The unique constraint is the lock: two bookings racing for the same table
+    and block cannot both commit. See `booking.py`.
+    """
+    reservation = models.ForeignKey(Reservation, on_delete=models.CASCADE, related_name='slots')
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='slot_claims')
+    date = models.DateField()
+    slot = models.TimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'date', 'slot'], name='unique_table_slot_claim'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'slot'], name='reservation_slot_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Table {self.table_id} {self.date} {self.slot:%H:%M} -> reservation {self.reservation_id}"
+
+
+class OpeningHours(models.Model):
+    """Booking window for one weekday. Compiled into `schedule.Schedule`."""
+    WEEKDAYS = [
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday'),
+    ]
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS, unique=True)
+    opens_at = models.TimeField(help_text="Earliest booking start.")
+    last_start = models.TimeField(help_text="Latest booking start.")
+    closed = models.BooleanField(default=False)
+    max_covers_per_slot = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text="Most guests that may arrive in one 15-minute slot. Blank = no limit.",
+    )
+
+    class Meta:
+        ordering = ['weekday']
+        verbose_name_plural = 'opening hours'
+
+    def __str__(self):
+        if self.closed:
+            return f"{self.get_weekday_display()}: closed"
+        return f"{self.get_weekday_display()}: {self.opens_at:%H:%M}-{self.last_start:%H:%M}"
+
+
+class DwellTime(models.Model):
+    """How long a party of a given size keeps its table."""
+    min_party = models.PositiveSmallIntegerField()
+    max_party = models.PositiveSmallIntegerField()
+    minutes = models.PositiveIntegerField(help_text="Rounded up to whole 15-minute slots.")
+
+    class Meta:
+        ordering = ['min_party']
+
+    def __str__(self):
+        return f"{self.min_party}-{self.max_party} guests: {self.minutes} min"
+
+
+class BlackoutDate(models.Model):
+    """A day with no bookings at all (private event, holiday...)."""
+    date = models.DateField(unique=True)
+    reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} ({self.reason})" if self.reason else str(self.date)
+
+
+class CoversForecast(models.Model):
+    """Expected covers in one 15-minute slot of a coming day. Written by `forecast.py`."""
+    date = models.DateField()
+    slot = models.TimeField()
+    booked = models.PositiveIntegerField(default=0, help_text="Covers already reserved when the forecast ran.")
+    reserved = models.FloatField(default=0, help_text="Expected reserved covers arriving: booked plus later bookings.")
+    walk_in = models.FloatField(default=0, help_text="Expected walk-in covers arriving.")
+    in_house = models.FloatField(default=0, help_text="Expected covers seated during the slot.")
+    generated_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['date', 'slot']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'slot'], name='unique_covers_forecast_slot'),
+        ]
+
+    @property
+    def total(self):
+        return self.reserved + self.walk_in
+
+    def __str__(self):
+        return f"{self.date} {self.slot:%H:%M}: {self.total:.1f} covers"
+
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core import versions
+
+@receiver(post_save, sender=Reservation)
+def release_cancelled_reservation_slots(sender, instance, **kwargs):
+    # However a booking gets cancelled or marked a no-show (admin, staff, API, model helper), give the table back.
+    if instance.status in RELEASED_STATUSES:
+        ReservationSlot.objects.filter(reservation=instance).delete()
+
+
+@receiver([post_save, post_delete], sender=OpeningHours)
+@receiver([post_save, post_delete], sender=DwellTime)
+@receiver([post_save, post_delete], sender=BlackoutDate)
+def reset_booking_schedule(sender, **kwargs):
+    from .schedule import invalidate
+    invalidate()
+
+
+@receiver([post_save, post_delete], sender=Table)
+@receiver([post_save, post_delete], sender=Reservation)
+def bump_reservations_version(sender, **kwargs):
+    # data versions behind the API ETags (apps/core/versions.py)
+    versions.bump("reservations")
@@ -0,0 +1,139 @@
+"""Booking schedule compiled from the capacity tables.
+
+`OpeningHours`, `DwellTime` and `BlackoutDate` are read once and turned into a
+`Schedule` of plain tuples and dicts, so every availability check is a couple
+of index lookups instead of a query:
+
+* ``schedule.check(date, time)``  -> error message or None
+* ``schedule.dwell(party_size)``  -> how long the table is held
+* ``schedule.hours_for(date)``    -> that day's `DayHours` (None when closed)
+
+The compiled schedule is kept per process for `CACHE_SECONDS` and dropped as
+soon as one of the tables is saved (see the receivers in models.py). Weekdays
+without an `OpeningHours` row and party sizes without a `DwellTime` row fall
+back to the original 15:00-22:00 / two-hour rules.
+"""
+import time as clock
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+
+SLOT_MINUTES = 15
+BLOCKS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MAX_PARTY = 20
+
+DEFAULT_OPENS_AT = time(15, 0)
+DEFAULT_LAST_START = time(22, 0)
+DEFAULT_DWELL_MINUTES = 120
+
+CACHE_SECONDS = 60
+
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def block_index(value):
+    return (value.hour * 60 + value.minute) // SLOT_MINUTES
+
+
+def block_time(index):
+    minutes = (index % BLOCKS_PER_DAY) * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def _blocks(minutes):
+    return max(1, -(-int(minutes) // SLOT_MINUTES))
+
+
+@dataclass(frozen=True)
+class DayHours:
+    opens_at: time
+    last_start: time
+    first_index: int
+    last_index: int
+    max_covers: int | None = None
+
+
+class Schedule:
+    def __init__(self, days, dwell_blocks, blackouts):
+        self.days = days                    # 7 entries, Monday first; None = closed
+        self.dwell_blocks = dwell_blocks    # index = party size
+        self.blackouts = blackouts          # date -> reason
+        self.min_dwell_blocks = min(dwell_blocks[1:])
+
+    def hours_for(self, day):
+        if day in self.blackouts:
+            return None
+        return self.days[day.weekday()]
+
+    def check(self, day, start):
+        """Why `start` on `day` can't be booked, or None if it can."""
+        if day in self.blackouts:
+            reason = self.blackouts[day]
+            return f"We are not taking bookings on {day:%d %b %Y}" + (f" ({reason})." if reason else ".")
+        hours = self.days[day.weekday()]
+        if hours is None:
+            return f"We are closed on {WEEKDAY_NAMES[day.weekday()]}s."
+        if start.minute % SLOT_MINUTES or start.second:
+            return f"Please select a time in {SLOT_MINUTES}-minute increments."
+        if not hours.first_index <= block_index(start) <= hours.last_index:
+            return f"Bookings start between {hours.opens_at:%H:%M} and {hours.last_start:%H:%M} on {WEEKDAY_NAMES[day.weekday()]}s."
+        return None
+
+    def dwell_blocks_for(self, party_size):
+        return self.dwell_blocks[min(max(int(party_size), 1), MAX_PARTY)]
+
+    def dwell(self, party_size):
+        return timedelta(minutes=self.dwell_blocks_for(party_size) * SLOT_MINUTES)
+
+    def start_times(self, day):
+        hours = self.hours_for(day)
+        if hours is None:
+            return []
+        return [block_time(index) for index in range(hours.first_index, hours.last_index + 1)]
+
+    def as_dict(self, day):
+        hours = self.hours_for(day)
+        return {
+            'date': day.isoformat(),
+            'open': hours is not None,
+            'closed_reason': self.check(day, hours.opens_at) if hours else self.check(day, DEFAULT_OPENS_AT),
+            'slot_minutes': SLOT_MINUTES,
+            'times': [t.strftime('%H:%M') for t in self.start_times(day)],
+            'dwell_minutes': {size: self.dwell_blocks[size] * SLOT_MINUTES for size in range(1, MAX_PARTY + 1)},
+            'max_covers_per_slot': hours.max_covers if hours else None,
+        }
+
+
+def _day_hours(opens_at, last_start, max_covers=None):
+    return DayHours(opens_at, last_start, block_index(opens_at), block_index(last_start), max_covers)
+
+
+def compile_schedule():
+    from .models import BlackoutDate, DwellTime, OpeningHours
+
+    days = [_day_hours(DEFAULT_OPENS_AT, DEFAULT_LAST_START)] * 7
+    for row in OpeningHours.objects.all():
+        days[row.weekday] = None if row.closed else _day_hours(row.opens_at, row.last_start, row.max_covers_per_slot)
+
+    dwell_blocks = [_blocks(DEFAULT_DWELL_MINUTES)] * (MAX_PARTY + 1)
+    for row in DwellTime.objects.order_by('min_party', 'max_party'):
+        for size in range(max(row.min_party, 1), min(row.max_party, MAX_PARTY) + 1):
+            dwell_blocks[size] = _blocks(row.minutes)
+
+    yesterday = datetime.now().date() - timedelta(days=1)
+    blackouts = dict(BlackoutDate.objects.filter(date__gte=yesterday).values_list('date', 'reason'))
+    return Schedule(tuple(days), tuple(dwell_blocks), blackouts)
+
+
+_compiled = {'schedule': None, 'expires': 0.0}
+
+
+def get_schedule():
+    now = clock.monotonic()
+    if _compiled['schedule'] is None or now >= _compiled['expires']:
+        _compiled['schedule'] = compile_schedule()
+        _compiled['expires'] = now + CACHE_SECONDS
+    return _compiled['schedule']
+
+
+def invalidate():
+    _compiled['schedule'] = None
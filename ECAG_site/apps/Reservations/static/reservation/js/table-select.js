@@ -13,6 +13,8 @@
   }
 
   const csrftoken = getCookie('csrftoken');
+  // last /available/ answer keyed by SVG id ("T3"); entries may carry joined_with tables
+  let availableByTable = {};
 
   function clearSelection() {
     $('.table-group.selected').removeClass('selected');
@@ -28,17 +30,24 @@
     $group.addClass('selected');
 
     const tableId = $group.attr('data-table') || groupEl.id || '';
+    const entry = availableByTable[tableId];
+    // larger parties get neighbouring tables pushed together: highlight them all
+    if (entry && entry.label) {
+      $.each(entry.label.split('+'), function (_, svgId) {
+        $('svg .table-group[data-table="' + svgId + '"]').addClass('selected');
+      });
+    }
     $('#selected_table_input').val(tableId);
-    $('#selected-table-display').text(tableId || 'None');
+    $('#selected-table-display').text((entry && entry.label) || tableId || 'None');
 
     $(window).trigger('table:selected', [{ tableId: tableId }]);
   }
 
-  function allowedSeatsForParty(partySize) {
-    const size = parseInt(partySize || '0', 10);
-    if (size <= 2 && size >= 1) return 2;
-    if (size >= 3) return 4;
-    return 0;
+  // Widest booking window of the week, rendered from the capacity model into
+  // the time input; per-day hours and blackout dates are checked server-side.
+  function bookingWindow() {
+    const $input = $('#reservation-time');
+    return { min: $input.attr('min') || '15:00', max: $input.attr('max') || '22:00' };
   }
 
   function validateTime(timeStr) {
@@ -49,7 +58,9 @@
     const hh = parseInt(parts[0], 10);
     const mm = parseInt(parts[1], 10);
     if (Number.isNaN(hh) || Number.isNaN(mm)) return { ok: false, message: 'Invalid time.' };
-    if (hh < 15 || hh > 22) return { ok: false, message: 'Please choose an hour between 15:00 and 22:00.' };
+    const win = bookingWindow();
+    const value = (hh < 10 ? '0' + hh : '' + hh) + ':' + (mm < 10 ? '0' + mm : '' + mm);
+    if (value < win.min || value > win.max) return { ok: false, message: 'Please choose a time between ' + win.min + ' and ' + win.max + '.' };
     if (mm % 15 !== 0) return { ok: false, message: 'Please choose minutes in 15-minute increments (00, 15, 30, 45).' };
 
     return { ok: true };
@@ -97,7 +108,10 @@
     });
 
     const minutes = [0, 15, 30, 45];
-    for (let h = 15; h <= 22; h++) {
+    const win = bookingWindow();
+    const firstHour = parseInt(win.min.split(':')[0], 10);
+    const lastHour = parseInt(win.max.split(':')[0], 10);
+    for (let h = firstHour; h <= lastHour; h++) {
       const $hourRow = $('<div>').css({
         display: 'flex',
         gap: '6px',
@@ -115,10 +129,10 @@
         })
         .appendTo($hourRow);
 
-      const minList = h === 22 ? [0] : minutes;
-      $.each(minList, function (_, m) {
+      $.each(minutes, function (_, m) {
         const mm = m < 10 ? '0' + m : '' + m;
         const val = hh + ':' + mm;
+        if (val < win.min || val > win.max) return;
 
         $('<button>', {
           type: 'button',
@@ -190,14 +204,17 @@
     const $groups = $('svg .table-group');
 
     if (availableList === null || availableList === undefined) {
+      availableByTable = {};
       $groups.removeClass('disabled').attr('aria-disabled', 'false').attr('tabindex', '0');
       return;
     }
 
     const availableSet = new Set();
+    availableByTable = {};
     $.each(availableList || [], function (_, t) {
       const tid = t.table_id || t.id || t.table || '';
       const tnum = t.table_number || t.number || '';
+      if (tnum) availableByTable['T' + String(tnum)] = t;
 
       if (tid !== undefined && tid !== null && String(tid).length) availableSet.add(String(tid));
       if (tnum !== undefined && tnum !== null && String(tnum).length) {
@@ -267,6 +284,11 @@
       .done(function (data) {
         const available = data.available || data.available_tables || data.tables || [];
         markTables(available);
+        if (!available.length) {
+          const times = $.map(data.alternatives || [], function (alt) { return alt.time; });
+          const msg = data.error || ('No table is free at ' + time + '.');
+          alert(times.length ? msg + ' Available nearby: ' + times.join(', ') + '.' : msg);
+        }
       })
       .fail(function (xhr) {
         if (xhr.status === 403) {
@@ -313,7 +335,7 @@
 
     const parts = [];
     if (partyVal) parts.push(partyVal + (partyVal === '1' ? ' Person' : ' Persons'));
-    if (tableVal) parts.push('Table ' + tableVal);
+    if (tableVal) parts.push('Table ' + ((availableByTable[tableVal] || {}).label || tableVal));
 
     if (parts.length === 0) $detailsEl.text('No party size or table selected');
     else $detailsEl.text(parts.join(' · '));
@@ -340,6 +362,8 @@
 
     if (!date || !time) return alert('Please choose date and time.');
     if (!table_id) return alert('Please select a table.');
+    const entry = availableByTable[rawTableId] || {};
+    const joined_table_ids = entry.joined_with || [];
 
     const $confirmButton = $('#confirm-reservation-btn').length
       ? $('#confirm-reservation-btn')
@@ -360,7 +384,7 @@
       method: 'POST',
       contentType: 'application/json',
       headers: { 'X-CSRFToken': csrftoken || '' },
-      data: JSON.stringify({ date: date, time: time, party_size: party_size, table_id: table_id })
+      data: JSON.stringify({ date: date, time: time, party_size: party_size, table_id: table_id, joined_table_ids: joined_table_ids })
     })
       .done(function (data) {
         if (data.error) {
@@ -383,6 +407,13 @@
           window.location.href = '/accounts/login/?next=' + encodeURIComponent(next);
           return;
         }
+        if (xhr.status === 409) {
+          // someone else took the table in the meantime: say so and refresh the map
+          const msg = (xhr.responseJSON && xhr.responseJSON.error) || 'That table was just booked.';
+          alert(msg + ' Please choose another table or time.');
+          fetchAvailable();
+          return;
+        }
         alert('Failed to confirm reservation: Server returned ' + xhr.status);
       })
       .always(function () {
@@ -413,13 +444,9 @@
     const $partySelect = $('#party_size_select');
     if ($partySelect.length) {
       $partySelect.on('change', function () {
-        const allowed = allowedSeatsForParty($partySelect.val());
-        $('svg .table-group').each(function () {
-          const $g = $(this);
-          const seats = parseInt($g.attr('data-seats') || '0', 10);
-          if (allowed === 0 || seats === allowed) $g.removeClass('disabled');
-          else $g.addClass('disabled');
-        });
+        // which tables (or joined tables) fit is decided server-side; ask again
+        clearSelection();
+        markTables(null);
         updateReservationSummary();
       });
     }
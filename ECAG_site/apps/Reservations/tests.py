@@ -0,0 +1,300 @@
+import threading
+from collections import Counter
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from apps.reservations import assignment, booking, schedule
+from apps.reservations.models import BlackoutDate, OpeningHours, Reservation, ReservationSlot, Table
+from apps.reservations.schedule import block_index
+
+
+def make_table(number, seats=4):
+    return Table.objects.create(
+        table_number=number, seats=seats, qr_code=f"table-{number}", x_position=0, y_position=0,
+    )
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Many threads race `booking.book` for one table: exactly one may win."""
+
+    THREADS = 8
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="racer", password="x")
+        self.table = make_table(1)
+        self.day = date.today() + timedelta(days=30)
+        # the in-memory test database reports a busy table at once instead of
+        # waiting for it, so eight threads need more retries than a server does
+        patcher = mock.patch.object(booking, 'LOCK_RETRIES', 10)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def race(self, starts):
+        barrier = threading.Barrier(len(starts))
+        outcomes = []
+        lock = threading.Lock()
+
+        def attempt(start):
+            try:
+                barrier.wait()
+                booking.book(user=self.user, table=self.table, date=self.day, time=start, guest_count=2)
+                outcome = "booked"
+            except booking.BookingConflict:
+                outcome = "conflict"
+            except Exception as exc:
+                outcome = repr(exc)
+            finally:
+                connections.close_all()
+            with lock:
+                outcomes.append(outcome)
+
+        workers = [threading.Thread(target=attempt, args=(start,)) for start in starts]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return Counter(outcomes)
+
+    def assert_no_overlapping_claims(self):
+        claims = Counter(ReservationSlot.objects.values_list('table_id', 'date', 'slot'))
+        self.assertEqual([key for key, n in claims.items() if n > 1], [])
+
+    def test_same_slot_is_booked_once(self):
+        outcomes = self.race([time(19, 0)] * self.THREADS)
+
+        self.assertEqual(outcomes, Counter(booked=1, conflict=self.THREADS - 1))
+        self.assertEqual(Reservation.objects.count(), 1)
+        winner = Reservation.objects.get()
+        self.assertEqual(set(ReservationSlot.objects.values_list('reservation_id', flat=True)), {winner.pk})
+        self.assert_no_overlapping_claims()
+
+    def test_overlapping_slots_are_booked_once(self):
+        # starts 15 minutes apart, all within one two-hour dwell of each other
+        starts = [time(19, 15 * i) for i in range(4)] + [time(20, 0)]
+        outcomes = self.race(starts)
+
+        self.assertEqual(outcomes, Counter(booked=1, conflict=len(starts) - 1))
+        self.assert_no_overlapping_claims()
+
+
+class ReleasedStatusTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="guest", password="x")
+        self.table = make_table(1)
+        self.day = date.today() + timedelta(days=30)
+        self.reservation = booking.book(user=self.user, table=self.table, date=self.day, time=time(19, 0), guest_count=2)
+
+    def book_again(self):
+        return booking.book(user=self.user, table=self.table, date=self.day, time=time(19, 30), guest_count=2)
+
+    def test_claimed_table_rejects_an_overlapping_booking(self):
+        with self.assertRaises(booking.BookingConflict):
+            self.book_again()
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_cancelled_and_no_show_bookings_release_the_table(self):
+        for status in booking.RELEASED_STATUSES:
+            with self.subTest(status=status):
+                booking.change_status(self.reservation, status)
+                self.assertFalse(ReservationSlot.objects.filter(reservation=self.reservation).exists())
+                other = self.book_again()
+                other.delete()
+                booking.change_status(self.reservation, 'confirmed')
+
+    def test_reactivating_a_released_booking_fails_once_the_table_is_taken(self):
+        booking.change_status(self.reservation, 'no-show')
+        self.book_again()
+        with self.assertRaises(booking.BookingConflict):
+            booking.change_status(self.reservation, 'confirmed')
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, 'no-show')
+
+
+class BulkStatusAPITests(TestCase):
+    def setUp(self):
+        self.guest = get_user_model().objects.create_user(username="guest", password="x")
+        table = make_table(1)
+        day = date.today() + timedelta(days=30)
+        self.done, self.open = (
+            booking.book(user=self.guest, table=table, date=day, time=at, guest_count=2)
+            for at in (time(17, 0), time(20, 0))
+        )
+        booking.change_status(self.done, 'completed')
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(username="host", password="x", is_staff=True))
+
+    def post(self, status):
+        return self.client.post("/api/reservations/bookings/bulk-status/",
+                                {'ids': [self.done.pk, self.open.pk], 'status': status}, format='json')
+
+    def test_finished_bookings_stay_finished(self):
+        response = self.post('pending')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [
+            {'id': self.done.pk, 'ok': False, 'error': "Reservation is already finalized"},
+            {'id': self.open.pk, 'ok': True, 'status': 'pending'},
+        ])
+        self.done.refresh_from_db()
+        self.assertEqual(self.done.status, 'completed')
+
+    def test_finished_bookings_may_move_between_final_statuses(self):
+        response = self.post('cancelled')
+        self.assertEqual([row['ok'] for row in response.json()['results']], [True, True])
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.post('pending').status_code, 403)
+
+
+class ReservationAdminTests(TestCase):
+    def setUp(self):
+        self.guest = get_user_model().objects.create_user(username="guest", password="x")
+        self.tables = [make_table(number) for number in (1, 2, 3)]
+        self.day = date.today() + timedelta(days=30)
+        self.client.force_login(get_user_model().objects.create_superuser(username="boss", password="x"))
+
+    def post(self, reservation=None, **fields):
+        data = {
+            'user_id': self.guest.pk, 'table_id': self.tables[0].pk, 'joined_tables': [self.tables[1].pk],
+            'date': self.day.isoformat(), 'time': "19:00", 'guest_count': 6, 'status': 'confirmed',
+            'full_name': "Guest", 'phone': "0917", 'email': "guest@example.com", **fields,
+        }
+        if reservation is None:
+            return self.client.post("/admin/reservations/reservation/add/", data)
+        return self.client.post(f"/admin/reservations/reservation/{reservation.pk}/change/", data)
+
+    def claimed(self, reservation):
+        return set(ReservationSlot.objects.filter(reservation=reservation).values_list('table_id', flat=True))
+
+    def test_claims_the_joined_tables(self):
+        self.assertEqual(self.post().status_code, 302)
+        reservation = Reservation.objects.get()
+        self.assertEqual(self.claimed(reservation), {self.tables[0].pk, self.tables[1].pk})
+
+        self.assertEqual(self.post(reservation, joined_tables=[self.tables[2].pk]).status_code, 302)
+        self.assertEqual(self.claimed(reservation), {self.tables[0].pk, self.tables[2].pk})
+
+    def test_rejects_a_joined_table_that_is_taken(self):
+        booking.book(user=self.guest, table=self.tables[1], date=self.day, time=time(19, 30), guest_count=2)
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Table is not available for the requested slot.")
+        self.assertEqual(Reservation.objects.count(), 1)
+
+    def test_rejects_the_main_table_as_joined(self):
+        response = self.post(joined_tables=[self.tables[0].pk])
+        self.assertContains(response, "The main table cannot also be a joined table.")
+
+
+def busy_mask(start, end):
+    """Bitmask of the 15-minute blocks from `start` up to (not including) `end`."""
+    first, last = block_index(start), block_index(end)
+    return ((1 << (last - first)) - 1) << first
+
+
+class AssignmentTests(TestCase):
+    """Combos, ranking and alternative times, on a small made-up floor.
+
+    T1 and T2 (2 seats) and T3 (4 seats) stand in a row 50 apart, so any two
+    or all three can be pushed together; T4 (4 seats) stands on its own.
+    """
+
+    ROWS = [(1, 1, 2, 0, 0), (2, 2, 2, 50, 0), (3, 3, 4, 100, 0), (4, 4, 4, 1000, 0)]
+
+    def setUp(self):
+        schedule.invalidate()
+        self.addCleanup(schedule.invalidate)
+        self.floor = assignment.build_floor(self.ROWS, distance=100, max_join=3)
+        self.day = date.today() + timedelta(days=30)
+
+    def suggest(self, start, party_size, busy=None, arrivals=None, alternatives=3):
+        return assignment.suggest(
+            self.day, start, party_size, floor=self.floor,
+            busy=busy or {}, arrivals=arrivals or {}, alternatives=alternatives,
+        )
+
+    def labels(self, options):
+        return [option.label for option in options]
+
+    def test_combos_are_neighbouring_tables_up_to_the_join_limit(self):
+        self.assertEqual(
+            {combo[1] for combo in self.floor.combos},
+            {(1,), (2,), (3,), (4,), (1, 2), (2, 3), (1, 3), (1, 2, 3)},
+        )
+        self.assertEqual(self.floor.max_party, 8)
+        # singles first, then by seats
+        self.assertEqual([len(ids) for ids, _, _ in self.floor.combos], [1, 1, 1, 1, 2, 2, 2, 3])
+
+    def test_join_limit_and_distance(self):
+        singles = assignment.build_floor(self.ROWS, distance=100, max_join=1)
+        self.assertEqual(len(singles.combos), 4)
+        apart = assignment.build_floor(self.ROWS, distance=60, max_join=3)
+        self.assertEqual({combo[1] for combo in apart.combos if len(combo[0]) > 1}, {(1, 2), (2, 3), (1, 2, 3)})
+
+    def test_validate_combination(self):
+        self.assertIsNone(assignment.validate_combination([3, 1], 6, floor=self.floor))
+        self.assertIsNone(assignment.validate_combination([4], 4, floor=self.floor))
+        self.assertEqual(assignment.validate_combination([1, 4], 4, floor=self.floor),
+                         'Selected tables are not next to each other')
+        self.assertEqual(assignment.validate_combination([1, 2], 5, floor=self.floor),
+                         'Selected table cannot accommodate the party size')
+
+    def test_smallest_fitting_table_ranks_first(self):
+        result = self.suggest(time(19, 0), 2)
+        self.assertEqual(self.labels(result['options'])[:4], ['T1', 'T2', 'T3', 'T4'])
+        self.assertEqual(result['options'][0].score, 0)
+        self.assertEqual(result['alternatives'], [])
+
+    def test_tables_are_joined_only_when_needed(self):
+        self.assertNotIn('+', ''.join(self.labels(self.suggest(time(19, 0), 4)['options'])[:2]))
+        options = self.suggest(time(19, 0), 6)['options']
+        self.assertEqual(self.labels(options), ['T1+T3', 'T2+T3', 'T1+T2+T3'])
+        self.assertEqual(options[0].table_id, 1)
+        self.assertEqual(options[0].joined, [3])
+
+    def test_claimed_tables_are_skipped(self):
+        busy = {1: busy_mask(time(18, 0), time(20, 0))}
+        self.assertEqual(self.labels(self.suggest(time(19, 0), 2, busy)['options'])[0], 'T2')
+        # the sitting after it starts right when T1 is free again
+        self.assertEqual(self.labels(self.suggest(time(20, 0), 2, busy)['options'])[0], 'T1')
+
+    def test_gaps_too_short_for_another_sitting_cost(self):
+        # T1 is taken 17:00-18:00: a booking at 18:30 would leave it idle for half an hour
+        busy = {1: busy_mask(time(17, 0), time(18, 0))}
+        options = self.suggest(time(18, 30), 2, busy)['options']
+        self.assertEqual(options[0].label, 'T2')
+        self.assertEqual(next(o.score for o in options if o.label == 'T1'), 2 * assignment.DEAD_BLOCK_COST)
+
+    def test_nearby_times_are_offered_when_the_floor_is_full(self):
+        full = {table_id: busy_mask(time(19, 0), time(21, 0)) for table_id in (1, 2, 3, 4)}
+        result = self.suggest(time(19, 0), 2, full, alternatives=2)
+        self.assertEqual(result['options'], [])
+        self.assertEqual([option.start for option in result['alternatives']], [time(17, 0), time(21, 0)])
+
+    def test_times_outside_the_booking_window_get_alternatives_only(self):
+        for start in (time(19, 5), time(23, 0)):
+            with self.subTest(start=start):
+                result = self.suggest(start, 2)
+                self.assertEqual(result['options'], [])
+                self.assertEqual(len(result['alternatives']), 3)
+
+    def test_party_larger_than_the_floor(self):
+        self.assertEqual(self.suggest(time(19, 0), 9), {'options': [], 'alternatives': []})
+
+    def test_arrivals_cap(self):
+        OpeningHours.objects.update_or_create(weekday=self.day.weekday(), defaults={
+            'opens_at': time(15, 0), 'last_start': time(22, 0), 'max_covers_per_slot': 4,
+        })
+        result = self.suggest(time(19, 0), 2, arrivals={block_index(time(19, 0)): 3})
+        self.assertEqual(result['options'], [])
+        # nearest first, the earlier of two equally near times winning
+        self.assertEqual([option.start for option in result['alternatives']], [time(18, 30), time(18, 45), time(19, 15)])
+
+    def test_closed_days(self):
+        BlackoutDate.objects.create(date=self.day, reason="Private event")
+        self.assertEqual(self.suggest(time(19, 0), 2), {'options': [], 'alternatives': []})
@@ -0,0 +1,189 @@
+"""Staff day view: the reservation list, its status counters and a table timeline.
+
+`day_view` loads everything the staff reservations screens (the web page and
+the app's ``bookings/day/`` endpoint) show:
+
+* the reservations, with their table and guest joined in the same query;
+* ``counts``: reservations per status plus ``total`` and ``guests``, from one
+  grouped query instead of a ``count()`` per status;
+* for a single day, a `Timeline`: a row per table with one cell per 15-minute
+  slot holding the reservation that has the table then. Cells come from the
+  day's `ReservationSlot` claims, so joined tables show the party too and
+  cancelled bookings (whose claims are released) leave the table free.
+
+Each row is also cut into runs (consecutive cells of the same booking, or
+free), so a template draws a booking as one ``colspan`` cell and the app as
+one bar.
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .assignment import get_floor
+from .models import Reservation, ReservationSlot
+from .schedule import BLOCKS_PER_DAY, SLOT_MINUTES, block_index, block_time, get_schedule
+
+SORTS = {
+    'time_asc': ('date', 'time'),
+    'time_desc': ('-date', '-time'),
+    'guests_asc': ('guest_count', 'date', 'time'),
+    'guests_desc': ('-guest_count', 'date', 'time'),
+    'table_asc': ('table_id', 'date', 'time'),
+    'table_desc': ('-table_id', 'date', 'time'),
+}
+DEFAULT_SORT = 'time_asc'
+
+
+def count_key(status):
+    # 'no-show' -> 'no_show', readable from templates
+    return status.replace('-', '_')
+
+
+def status_counts(reservations):
+    """{'total', 'guests', 'pending', ..., 'no_show'} for a reservation queryset, in one query."""
+    counts = {'total': 0, 'guests': 0, **{count_key(value): 0 for value, _ in Reservation.STATUS_CHOICES}}
+    rows = reservations.order_by().values('status').annotate(n=Count('pk'), guests=Sum('guest_count'))
+    for row in rows:
+        counts[count_key(row['status'])] = row['n']
+        counts['total'] += row['n']
+        counts['guests'] += row['guests'] or 0
+    return counts
+
+
+@dataclass
+class TimelineRow:
+    table_id: int
+    table_number: int
+    seats: int
+    cells: list                                 # reservation id, or None when free, per slot
+    runs: list = field(default_factory=list)    # {'reservation_id', 'span', 'start', ...}
+
+    @property
+    def busy(self):
+        return sum(1 for cell in self.cells if cell is not None)
+
+    def as_dict(self):
+        return {
+            'table_id': self.table_id,
+            'table_number': self.table_number,
+            'seats': self.seats,
+            'cells': self.cells,
+            'runs': self.runs,
+        }
+
+
+@dataclass
+class Timeline:
+    date: object
+    first_index: int
+    width: int
+    rows: list
+
+    @property
+    def slots(self):
+        return [block_time(self.first_index + offset).strftime('%H:%M') for offset in range(self.width)]
+
+    @property
+    def busy_tables(self):
+        """How many tables are taken in each slot."""
+        return [sum(1 for row in self.rows if row.cells[offset] is not None) for offset in range(self.width)]
+
+    @property
+    def occupancy(self):
+        """Share of table-slots taken over the day, 0..1."""
+        total = self.width * len(self.rows)
+        return sum(row.busy for row in self.rows) / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'slot_minutes': SLOT_MINUTES,
+            'slots': self.slots,
+            'busy_tables': self.busy_tables,
+            'occupancy': round(self.occupancy, 3),
+            'tables': [row.as_dict() for row in self.rows],
+        }
+
+
+def _runs(cells, first_index, bookings):
+    runs = []
+    for offset, cell in enumerate(cells):
+        if runs and runs[-1]['reservation_id'] == cell:
+            runs[-1]['span'] += 1
+            continue
+        booking = bookings.get(cell)
+        runs.append({
+            'reservation_id': cell,
+            'span': 1,
+            'start': block_time(first_index + offset).strftime('%H:%M'),
+            'status': booking.status if booking else None,
+            'guests': booking.guest_count if booking else None,
+            'name': (booking.full_name or '') if booking else '',
+        })
+    return runs
+
+
+def build_timeline(date, reservations=()):
+    """The table timeline of `date`. `reservations` (already loaded) label the runs.
+
+    Columns run from opening time (or the first claim) to the last start plus
+    the shortest sitting (or the last claim), so late bookings running past
+    midnight stay on their own day.
+    """
+    schedule = get_schedule()
+    hours = schedule.hours_for(date)
+    floor = get_floor()
+    bookings = {r.reservation_id: r for r in reservations}
+
+    claims = []
+    qs = ReservationSlot.objects.filter(reservation__date=date, date__in=[date, date + timedelta(days=1)])
+    for table_id, slot_date, slot, reservation_id in qs.values_list('table_id', 'date', 'slot', 'reservation_id'):
+        claims.append((table_id, block_index(slot) + (BLOCKS_PER_DAY if slot_date != date else 0), reservation_id))
+
+    starts = [index for _, index, _ in claims]
+    ends = [index + 1 for _, index, _ in claims]
+    if hours is not None:
+        starts.append(hours.first_index)
+        ends.append(hours.last_index + schedule.min_dwell_blocks)
+    first = min(starts, default=0)
+    width = max(ends, default=first) - first
+
+    cells = {table_id: [None] * width for table_id in floor.tables}
+    for table_id, index, reservation_id in claims:
+        if table_id in cells:
+            cells[table_id][index - first] = reservation_id
+
+    rows = []
+    for table_id, (number, seats, _, _) in sorted(floor.tables.items(), key=lambda item: item[1][0]):
+        row_cells = cells[table_id]
+        rows.append(TimelineRow(table_id, number, seats, row_cells, _runs(row_cells, first, bookings)))
+    return Timeline(date, first, width, rows)
+
+
+@dataclass
+class DayView:
+    reservations: list
+    counts: dict
+    timeline: Timeline | None = None
+
+
+def day_view(date=None, sort=DEFAULT_SORT, today=None):
+    """Reservations on `date` (every upcoming one when None), sorted by `sort` (a `SORTS` key).
+
+    The query count doesn't grow with the list: the counters, the reservations
+    with their table and guest, their joined tables and, for one date, the
+    floor and the slot claims.
+    """
+    if date is not None:
+        base = Reservation.objects.filter(date=date)
+    else:
+        base = Reservation.objects.filter(date__gte=today or timezone.now().date())
+    reservations = list(
+        base.select_related('table_id', 'user_id')
+        .prefetch_related('joined_tables')
+        .order_by(*SORTS.get(sort, SORTS[DEFAULT_SORT]))
+    )
+    timeline = build_timeline(date, reservations) if date is not None else None
+    return DayView(reservations, status_counts(base), timeline)
@@ -1,13 +1,21 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse, HttpResponseBadRequest, HttpResponseForbidden
 from django.views.decorators.http import require_POST
-from datetime import datetime, timedelta, time as dt_time, date as dt_date
+from datetime import datetime, time as dt_time, date as dt_date
 
 from .models import Table, Reservation
+from . import assignment, booking, timeline
+from .schedule import get_schedule
 
 
 def reservations(request):
-    context = {'step_number': 1}
+    # widest booking window across the week, for the time input and picker
+    week = [hours for hours in get_schedule().days if hours]
+    context = {
+        'step_number': 1,
+        'first_start': min((h.opens_at for h in week), default=dt_time(15, 0)).strftime('%H:%M'),
+        'last_start': max((h.last_start for h in week), default=dt_time(22, 0)).strftime('%H:%M'),
+    }
     return render(request, "reservations/reservations.html", context)
 
 def reservations_step2(request):
@@ -37,7 +45,7 @@ def reservations_step2(request):
             'date': pending.get('date'),
             'time': pending.get('time'),
             'guests': pending.get('party_size'),
-            'table_label': f"T{pending.get('table_number')} ({pending.get('table_seats')}-Seater)",
+            'table_label': f"{pending.get('table_label') or 'T%s' % pending.get('table_number')} ({pending.get('table_seats')}-Seater)",
         }
 
     # If this is a form POST we treat it as completing the reservation (create DB record)
@@ -63,12 +71,14 @@ def reservations_step2(request):
         try:
             # If we have a DB object from older flow, update it
             if reservation_obj:
-                reservation_obj.full_name = full_name
-                reservation_obj.phone = phone
-                reservation_obj.email = email
-                reservation_obj.special_requests = special
-                reservation_obj.status = 'confirmed'
-                reservation_obj.save()
+                booking.reschedule(
+                    reservation_obj,
+                    full_name=full_name,
+                    phone=phone,
+                    email=email,
+                    special_requests=special,
+                    status='confirmed',
+                )
                 try:
                     del request.session['pending_reservation_id']
                 except Exception:
@@ -81,10 +91,12 @@ def reservations_step2(request):
             req_date = datetime.strptime(pending.get('date'), '%Y-%m-%d').date()
             req_time = datetime.strptime(pending.get('time'), '%H:%M').time()
             party_size = int(pending.get('party_size'))
+            joined = list(Table.objects.filter(table_id__in=pending.get('joined_table_ids') or []))
 
-            res = Reservation.objects.create(
-                user_id=request.user,
-                table_id=table,
+            res = booking.book(
+                user=request.user,
+                table=table,
+                joined_tables=joined,
                 date=req_date,
                 time=req_time,
                 guest_count=party_size,
@@ -106,6 +118,9 @@ def reservations_step2(request):
 
             # redirect to confirmation (step3)
             return redirect('reservations:reservations_step3')
+        except booking.BookingConflict:
+            context = {'step_number': 2, 'reservation': reservation, 'error': 'Sorry, this table was just booked for that time. Please go back and choose another table or time.'}
+            return render(request, "reservations/reservations_step2.html", context)
         except Exception:
             context = {'step_number': 2, 'reservation': reservation, 'error': 'Unable to confirm reservation. Please try again.'}
             return render(request, "reservations/reservations_step2.html", context)
@@ -120,6 +135,7 @@ def reservations_step3(request):
     if confirmed_id:
         try:
             res_obj = Reservation.objects.select_related('table_id').get(reservation_id=confirmed_id)
+            tables = res_obj.all_tables()
             reservation = {
                 'reservation_id': res_obj.reservation_id,
                 'full_name': res_obj.full_name,
@@ -128,7 +144,10 @@ def reservations_step3(request):
                 'date': res_obj.date,
                 'time': res_obj.time,
                 'guests': res_obj.guest_count,
-                'table_label': f"T{res_obj.table_id.table_number} ({res_obj.table_id.seats}-Seater)",
+                'table_label': "{} ({}-Seater)".format(
+                    '+'.join(f"T{t.table_number}" for t in tables),
+                    sum(t.seats for t in tables),
+                ),
             }
             # clear it so refresh doesn't accidentally reuse it
             try:
@@ -181,51 +200,35 @@ def available_tables(request):
     if req_date < dt_date.today():
         return JsonResponse({'available': [], 'error': 'Please select today or a future date'})
 
-    # Validate restaurant opening hours: 15:00 - 23:00, last booking start at 22:00
-    open_time = dt_time(15, 0)
-    last_start = dt_time(22, 0)
-    if not (open_time <= req_time <= last_start):
-        return JsonResponse({'available': [], 'error': 'Restaurant is open 15:00-23:00; last booking start 22:00'})
-
-    # Enforce 15-minute increments
-    if req_time.minute % 15 != 0:
-        return JsonResponse({'available': [], 'error': 'Please select a time with minutes in 15-minute increments (00,15,30,45)'})
+    # Opening hours, blackout dates and slot size come from the capacity model.
+    # A bad time still gets alternatives below; a closed day gets none.
+    hours_error = get_schedule().check(req_date, req_time)
 
-    # Build requested interval
-    req_start = datetime.combine(req_date, req_time)
-    req_end = req_start + timedelta(hours=2)
+    if party_size < 1:
+        return JsonResponse({'available': [], 'error': 'Please choose a party size'})
 
-    # Map party size to preferred table size: 1-2 -> 2 seats, 3-4 -> 4 seats
-    if party_size <= 2:
-        seat_required = 2
-    else:
-        seat_required = 4
-
-    # Candidate tables with the exact matching seat capacity (business requirement)
-    candidate_tables = Table.objects.filter(seats=seat_required).order_by('seats', 'table_number')
+    # Ranked single tables and adjacent-table combinations, from one claims query
+    result = assignment.suggest(req_date, req_time, party_size)
 
+    # One entry per primary table (its best option), in ranking order
     available = []
-    for table in candidate_tables:
-        # fetch reservations for this table on the requested date that could overlap
-        existing = Reservation.objects.filter(table_id=table, date=req_date).exclude(status='cancelled')
-        conflict = False
-        for r in existing:
-            r_start = datetime.combine(r.date, r.time)
-            r_end = r_start + timedelta(hours=2)
-            # overlap if intervals intersect
-            if not (req_end <= r_start or req_start >= r_end):
-                conflict = True
-                break
-        if not conflict:
-            available.append({
-                'table_id': table.table_id,
-                'table_number': table.table_number,
-                'seats': table.seats,
-                'x_position': table.x_position,
-                'y_position': table.y_position,
-            })
-
-    return JsonResponse({'available': available})
+    seen = set()
+    for option in result['options']:
+        if option.table_id in seen:
+            continue
+        seen.add(option.table_id)
+        available.append(option.as_dict())
+
+    response = {
+        'available': available,
+        'suggested': available[0] if available else None,
+        'alternatives': [option.as_dict() for option in result['alternatives']],
+    }
+    if hours_error:
+        response['error'] = hours_error
+    elif not available:
+        response['error'] = 'No tables are free for that party at this time'
+    return JsonResponse(response)
 
 
 @require_POST
@@ -243,6 +246,7 @@ def confirm_reservation(request):
     time_str = request.POST.get('time')
     party_size = request.POST.get('party_size')
     table_id = request.POST.get('table_id')
+    joined_ids = request.POST.getlist('joined_table_ids')
     if request.content_type == 'application/json':
         import json
         try:
@@ -251,6 +255,7 @@ def confirm_reservation(request):
             time_str = time_str or payload.get('time')
             party_size = party_size or payload.get('party_size')
             table_id = table_id or payload.get('table_id')
+            joined_ids = joined_ids or payload.get('joined_table_ids') or []
         except Exception:
             return HttpResponseBadRequest('Invalid JSON body')
 
@@ -262,40 +267,30 @@ def confirm_reservation(request):
         req_time = datetime.strptime(time_str, '%H:%M').time()
         party_size = int(party_size)
         table = Table.objects.get(table_id=int(table_id))
+        joined = list(Table.objects.filter(table_id__in=[int(j) for j in joined_ids]).exclude(table_id=table.table_id))
     except Table.DoesNotExist:
         return HttpResponseBadRequest('Invalid table')
     except Exception:
         return HttpResponseBadRequest('Invalid input')
 
-    # Ensure the selected table can seat the requested party size
-    if party_size <= 2 and table.seats != 2:
-        return HttpResponseBadRequest('Selected table cannot accommodate the party size')
-    if party_size >= 3 and table.seats != 4:
-        return HttpResponseBadRequest('Selected table cannot accommodate the party size')
+    # Ensure the selected table (plus any joined neighbours) can seat the party
+    combo_error = assignment.validate_combination([table.table_id, *[t.table_id for t in joined]], party_size)
+    if combo_error:
+        return HttpResponseBadRequest(combo_error)
 
-    # Validate opening hours as above (restaurant open 15:00-23:00; last start 22:00)
     # Disallow past dates
     if req_date < dt_date.today():
         return HttpResponseBadRequest('Requested date is in the past')
 
-    open_time = dt_time(15, 0)
-    last_start = dt_time(22, 0)
-    if not (open_time <= req_time <= last_start):
-        return HttpResponseBadRequest('Requested time outside opening hours')
-
-    # Enforce 15-minute increments on server-side as well
-    if req_time.minute % 15 != 0:
-        return HttpResponseBadRequest('Please select minutes in 15-minute increments (00,15,30,45)')
-
-    # Check availability again (race-condition safe-ish: check then create)
-    req_start = datetime.combine(req_date, req_time)
-    req_end = req_start + timedelta(hours=2)
-    existing = Reservation.objects.filter(table_id=table, date=req_date).exclude(status='cancelled')
-    for r in existing:
-        r_start = datetime.combine(r.date, r.time)
-        r_end = r_start + timedelta(hours=2)
-        if not (req_end <= r_start or req_start >= r_end):
-            return HttpResponseBadRequest('Table not available for requested slot')
+    # Opening hours / blackout dates / slot size, same rules as available_tables
+    hours_error = get_schedule().check(req_date, req_time)
+    if hours_error:
+        return HttpResponseBadRequest(hours_error)
+
+    # Early check so the customer is told now; the slot itself is only locked
+    # when step 2 creates the booking through booking.book().
+    if not booking.are_tables_free([table, *joined], req_date, req_time, party_size):
+        return JsonResponse({'ok': False, 'conflict': True, 'error': 'Table not available for requested slot'}, status=409)
 
     # Do not create a DB reservation yet — store pending selection in session
     request.session['pending_reservation'] = {
@@ -304,7 +299,9 @@ def confirm_reservation(request):
         'party_size': party_size,
         'table_id': int(table.table_id),
         'table_number': table.table_number,
-        'table_seats': table.seats,
+        'table_seats': table.seats + sum(t.seats for t in joined),
+        'joined_table_ids': [t.table_id for t in joined],
+        'table_label': '+'.join(f"T{t.table_number}" for t in [table, *joined]),
     }
 
     return JsonResponse({'ok': True, 'next': '/reservations/step2/'})
@@ -313,13 +310,17 @@ def confirm_reservation(request):
 
 from .models import Table, Reservation
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .serializers import ReservationSerializer, TableSerializer
 # API ViewSets
 class TableViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("reservations",)
     queryset = Table.objects.all()
     serializer_class = TableSerializer
 
 class ReservationViewSet(viewsets.ModelViewSet):
+    data_scopes = ("reservations", "users")
     serializer_class = ReservationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -329,5 +330,72 @@ class ReservationViewSet(viewsets.ModelViewSet):
         is_staff_view = self.request.query_params.get('view') == 'staff'
 
         if (user.is_staff and is_staff_view):
-            return Reservation.objects.all()
-        return Reservation.objects.filter(user_id=user)
+            qs = Reservation.objects.all()
+        else:
+            qs = Reservation.objects.filter(user_id=user)
+        return qs.select_related('table_id').prefetch_related('joined_tables')
+
+    @action(detail=False, methods=['post'], url_path='bulk-status', permission_classes=[permissions.IsAdminUser])
+    def bulk_status(self, request):
+        """Set one status on many bookings: {"ids": [...], "status": "seated"}."""
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not 0 < len(ids) <= 200:
+            return Response({'detail': 'ids must be a list of 1 to 200 ids.'}, status=400)
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in ids))
+            results = booking.bulk_change_status(
+                ids, (request.data.get('status') or '').lower(), final_statuses=booking.FINAL_STATUSES,
+            )
+        except (TypeError, ValueError) as exc:
+            return Response({'detail': str(exc)}, status=400)
+        return Response({'results': results})
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def day(self, request):
+        """Staff day view for ?date= (every upcoming booking without it) and ?sort=.
+
+        The reservations, their counts per status and, for one date, the
+        table timeline (see timeline.py); not paginated.
+        """
+        req_date = None
+        if request.query_params.get('date'):
+            try:
+                req_date = datetime.strptime(request.query_params['date'], '%Y-%m-%d').date()
+            except ValueError:
+                return Response({'detail': 'date must be YYYY-MM-DD.'}, status=400)
+        sort = request.query_params.get('sort', timeline.DEFAULT_SORT)
+        if sort not in timeline.SORTS:
+            return Response({'detail': f"sort must be one of {', '.join(timeline.SORTS)}."}, status=400)
+
+        view = timeline.day_view(req_date, sort=sort)
+        return Response({
+            'date': req_date.isoformat() if req_date else None,
+            'reservations': self.get_serializer(view.reservations, many=True).data,
+            'counts': view.counts,
+            'timeline': view.timeline.as_dict() if view.timeline else None,
+        })
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """Ranked table assignments (and nearby times) for ?date=&time=&guests=."""
+        try:
+            req_date = datetime.strptime(request.query_params.get('date', ''), '%Y-%m-%d').date()
+            req_time = datetime.strptime(request.query_params.get('time', ''), '%H:%M').time()
+            guests = int(request.query_params.get('guests', ''))
+        except ValueError:
+            return Response({'detail': 'date (YYYY-MM-DD), time (HH:MM) and guests are required.'}, status=400)
+
+        result = assignment.suggest(req_date, req_time, guests)
+        return Response({
+            'options': [option.as_dict() for option in result['options']],
+            'alternatives': [option.as_dict() for option in result['alternatives']],
+        })
+
+    @action(detail=False, methods=['get'])
+    def schedule(self, request):
+        """Bookable start times and dwell minutes for ?date=."""
+        try:
+            req_date = datetime.strptime(request.query_params.get('date', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response({'detail': 'date (YYYY-MM-DD) is required.'}, status=400)
+        return Response(get_schedule().as_dict(req_date))
@@ -6,6 +6,9 @@ urlpatterns = [
     path('overview/', views.staff_overview, name='staff_overview'),
     path('orders/', views.staff_orders, name='staff_orders'),
     path('reservations/', views.staff_reservations, name='staff_reservations'),
+    path('prep/', views.staff_prep, name='staff_prep'),
+    path('prep/export/', views.staff_prep_export, name='staff_prep_export'),
+    path('orders/card/<int:order_id>/', views.staff_order_card, name='staff_order_card'),
     path('orders/update-status/<int:order_id>/', views.update_order_status, name='update_order_status'),
     path('reservations/update-status/<int:reservation_id>/', views.update_reservation_status, name='update_reservation_status'),
 ]
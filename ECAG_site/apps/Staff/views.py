@@ -1,14 +1,15 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils import timezone
-from django.db.models import Sum
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.http import require_POST
 import json
 import datetime
 
-from apps.menu.models import Order, Delivery, Takeout
+from apps.menu.models import Order
+from apps.menu import kitchen, lifecycle, prep
 from apps.reservations.models import Reservation, Table
+from apps.reservations import booking, timeline
 
 def is_staff_user(user):
     return user.is_staff
@@ -53,7 +54,10 @@ def staff_overview(request):
 @user_passes_test(is_staff_user)
 def staff_orders(request):
     today = timezone.now().date()
-    orders = Order.objects.filter(order_date__date=today).select_related('delivery', 'takeout').order_by('-order_date')
+    # cursor for the kitchen feed; read before the orders so no change slips between them
+    kitchen_seq = kitchen.latest_seq()
+    orders = (Order.objects.filter(order_date__date=today).select_related('delivery', 'takeout')
+              .prefetch_related('items__item', 'items__topping_links__topping').order_by('-order_date'))
 
     total_orders = orders.count()
 
@@ -68,10 +72,21 @@ def staff_orders(request):
         'dine_in_orders': dine_in_orders,
         'delivery_orders': delivery_orders,
         'take_out_orders': take_out_orders,
+        'kitchen_seq': kitchen_seq,
         'active_page': 'staff_orders'
     }
     return render(request, 'staff/order.html', context)
 
+@login_required
+@user_passes_test(is_staff_user)
+def staff_order_card(request, order_id):
+    """One order card (+ receipt), used by the orders page to patch in feed updates."""
+    order = get_object_or_404(
+        Order.objects.select_related('delivery', 'takeout').prefetch_related('items__item', 'items__topping_links__topping'),
+        pk=order_id,
+    )
+    return render(request, 'staff/includes/order_card.html', {'order': order})
+
 
 @login_required
 @user_passes_test(is_staff_user)
@@ -86,106 +101,94 @@ def staff_reservations(request):
     if selected_date_str:
         try:
             selected_date = datetime.datetime.strptime(selected_date_str, '%Y-%m-%d').date()
-            reservations = Reservation.objects.filter(date=selected_date)
             view_title = f"Reservations for {selected_date.strftime('%b %d, %Y')}"
             view_subtitle = "Viewing specific date"
         except ValueError:
-            reservations = Reservation.objects.filter(date__gte=today)
-            view_title = "Upcoming Reservations"
-            view_subtitle = f"Manage dining reservations from {today.strftime('%b %d, %Y')} onwards"
-    else:
-        reservations = Reservation.objects.filter(date__gte=today)
+            pass    # not a date: show the upcoming list
+    if selected_date is None:
         view_title = "Upcoming Reservations"
         view_subtitle = f"Manage dining reservations from {today.strftime('%b %d, %Y')} onwards"
 
-    # Sorting
-    if sort_param == 'time_desc':
-        reservations = reservations.order_by('-date', '-time')
-    elif sort_param == 'guests_asc':
-        reservations = reservations.order_by('guest_count', 'date', 'time')
-    elif sort_param == 'guests_desc':
-        reservations = reservations.order_by('-guest_count', 'date', 'time')
-    elif sort_param == 'table_asc':
-        reservations = reservations.order_by('table_id', 'date', 'time')
-    elif sort_param == 'table_desc':
-        reservations = reservations.order_by('-table_id', 'date', 'time')
-    else: # Default: time_asc
-        reservations = reservations.order_by('date', 'time')
-
-    total_reservations = reservations.count()
-    pending_count = reservations.filter(status='pending').count()
-    confirmed_count = reservations.filter(status='confirmed').count()
-    seated_count = reservations.filter(status='seated').count()
-    completed_count = reservations.filter(status='completed').count()
-    cancelled_count = reservations.filter(status='cancelled').count()
-    total_guests = reservations.aggregate(total=Sum('guest_count'))['total'] or 0
+    # one load with tables and guests, one grouped count, and the table timeline for a single day
+    day = timeline.day_view(selected_date, sort=sort_param, today=today)
+    counts = day.counts
 
     context = {
-        'reservations': reservations,
+        'reservations': day.reservations,
+        'timeline': day.timeline,
         'today_date': today,
         'selected_date': selected_date_str,
         'current_sort': sort_param,
         'view_title': view_title,
         'view_subtitle': view_subtitle,
-        'total_reservations': total_reservations,
-        'pending_count': pending_count,
-        'confirmed_count': confirmed_count,
-        'seated_count': seated_count,
-        'completed_count': completed_count,
-        'cancelled_count': cancelled_count,
-        'total_guests': total_guests,
+        'total_reservations': counts['total'],
+        'pending_count': counts['pending'],
+        'confirmed_count': counts['confirmed'],
+        'seated_count': counts['seated'],
+        'completed_count': counts['completed'],
+        'cancelled_count': counts['cancelled'],
+        'total_guests': counts['guests'],
         'active_page': 'staff_reservations'
     }
     return render(request, 'staff/reservation.html', context)
 
+def _prep_date(request):
+    """?date=YYYY-MM-DD, or None (the next service) when missing or not a date."""
+    try:
+        return datetime.datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+@login_required
+@user_passes_test(is_staff_user)
+def staff_prep(request):
+    prep_list, prep_error = None, None
+    try:
+        prep_list = prep.get_prep_list(_prep_date(request))
+    except RuntimeError as e:
+        prep_error = str(e)
+
+    context = {
+        'prep_list': prep_list,
+        'prep_error': prep_error,
+        'today_date': timezone.now().date(),
+        'selected_date': request.GET.get('date', ''),
+        'active_page': 'staff_prep'
+    }
+    return render(request, 'staff/prep.html', context)
+
+@login_required
+@user_passes_test(is_staff_user)
+def staff_prep_export(request):
+    try:
+        prep_list = prep.get_prep_list(_prep_date(request))
+    except RuntimeError as e:
+        return HttpResponse(str(e), status=503, content_type='text/plain')
+
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="prep-{prep_list.date.isoformat()}.csv"'
+    prep.write_csv(prep_list, response)
+    return response
+
 @require_POST
 @login_required
 @user_passes_test(is_staff_user)
 def update_order_status(request, order_id):
     """
-    Updates status for Delivery OR Takeout orders.
+    Updates status along the order's track (dine-in, delivery or takeout).
     """
     try:
         data = json.loads(request.body)
         new_status = data.get('status')
-        order = Order.objects.get(id=order_id)
-
-        # Normalize type for comparison
-        order_type_lower = order.order_type.lower()
-
-        # --- LOGIC FOR DELIVERY ---
-        if order_type_lower == 'delivery':
-            if hasattr(order, 'delivery'):
-                valid_statuses = [choice[0] for choice in Delivery.Status.choices]
-
-                if new_status in valid_statuses:
-                    order.delivery.delivery_status = new_status
-                    order.delivery.save()
-                    return JsonResponse({'success': True, 'status': new_status})
-                else:
-                    return JsonResponse({'success': False, 'error': f'Invalid delivery status. Allowed: {valid_statuses}'}, status=400)
-            else:
-                 return JsonResponse({'success': False, 'error': 'Delivery details missing for this order'}, status=400)
-
-        # --- LOGIC FOR TAKEOUT (Pick Up) ---
-        elif order_type_lower in ['pick up', 'pickup', 'takeout']:
-            if hasattr(order, 'takeout'):
-                valid_statuses = [choice[0] for choice in Takeout.Status.choices]
-
-                if new_status in valid_statuses:
-                    order.takeout.pickup_status = new_status
-                    order.takeout.save()
-                    return JsonResponse({'success': True, 'status': new_status})
-                else:
-                    return JsonResponse({'success': False, 'error': f'Invalid takeout status. Allowed: {valid_statuses}'}, status=400)
-            else:
-                return JsonResponse({'success': False, 'error': 'Takeout details missing for this order'}, status=400)
-
-        else:
-            return JsonResponse({'success': False, 'error': 'Status updates are only available for Delivery or Takeout orders'}, status=400)
+        order = Order.objects.select_related('delivery', 'takeout').get(id=order_id)
+        machine, row = lifecycle.track_for(order)
+        lifecycle.move(machine, row, 'set', new_status)
+        return JsonResponse({'success': True, 'status': new_status})
 
     except Order.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Order not found'}, status=404)
+    except lifecycle.InvalidTransition as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -205,13 +208,15 @@ def update_reservation_status(request, reservation_id):
         valid_statuses = ['pending', 'confirmed', 'seated', 'completed', 'cancelled']
 
         if new_status in valid_statuses:
-            res.status = new_status
-            res.save()
+            # re-opening a cancelled booking has to win its table slot back
+            booking.change_status(res, new_status)
             return JsonResponse({'success': True, 'status': new_status})
         else:
              return JsonResponse({'success': False, 'error': f'Invalid status: {new_status}'}, status=400)
 
     except Reservation.DoesNotExist:
         return JsonResponse({'success': False, 'error': 'Reservation not found'}, status=404)
+    except booking.BookingConflict as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=409)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
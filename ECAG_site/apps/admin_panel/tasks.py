@@ -0,0 +1,102 @@
+"""Background jobs for the admin panel (run by `manage.py run_jobs`)."""
+import logging
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.files.base import ContentFile
+from django.core.mail import send_mail
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from apps.core import versions
+from apps.jobs.queue import job
+from apps.menu.models import MenuItem
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+# Longest edge, in pixels, kept for uploaded menu photos.
+MENU_IMAGE_MAX_SIDE = 1200
+
+
+@job("admin_panel.send_staff_credentials_email", queue="email", max_attempts=5, scrub=("temp_password",))
+def send_staff_credentials_email(*, user_id: int, role: str, reason: str, site_url: str) -> None:
+    """Email a new or reset staff member a link to set their own password.
+
+    The temporary password never goes into the payload, where it would sit in
+    the jobs table and admin until the job ran; the admin who made it hands it
+    over. The link is made here, at send time, and stops working once the
+    password changes. (`scrub` still covers rows queued by older versions.)
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return
+    link = site_url.rstrip("/") + reverse("login_registration:password_reset_confirm", kwargs={
+        "uidb64": urlsafe_base64_encode(force_bytes(user.pk)),
+        "token": default_token_generator.make_token(user),
+    })
+    reason_text = "invited to join" if reason == "invite" else "issued a password reset for"
+    subject = "Escale Cuisine and Grill Staff Credentials"
+    message = f"""Hello,
+
+You have been {reason_text} Escale staff as {role.capitalize()}.
+
+Email: {user.email}
+Username: {user.username}
+
+Choose your password here (the link works until the password is changed):
+{link}
+
+Your administrator also has a temporary password for you.
+"""
+    send_mail(subject, message, 'noreply@escalecuisine.com', [user.email], fail_silently=False)
+
+
+@job("admin_panel.optimize_menu_image", queue="images", max_attempts=3)
+def optimize_menu_image(*, item_id: int, max_side: int = MENU_IMAGE_MAX_SIDE) -> None:
+    """Downscale and re-encode a freshly uploaded menu photo."""
+    from PIL import Image
+
+    item = MenuItem.objects.filter(item_id=item_id).first()
+    if not item or not item.menu_img:
+        return
+
+    with item.menu_img.open("rb") as fh:
+        img = Image.open(fh)
+        img.load()
+
+    if max(img.size) <= max_side:
+        return
+
+    fmt = (img.format or "JPEG").upper()
+
+    img.thumbnail((max_side, max_side))
+    save_kwargs = {"optimize": True}
+    if fmt == "JPEG":
+        img = img.convert("RGB")
+        save_kwargs["quality"] = 85
+        save_kwargs["progressive"] = True
+
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, **save_kwargs)
+
+    # Write the new file first (the storage gives it a free name), then point the
+    # item at it and only then drop the original: a failed save loses nothing.
+    storage = item.menu_img.storage
+    name = item.menu_img.name
+    saved_name = storage.save(name, ContentFile(buffer.getvalue()))
+    try:
+        # unless the photo was replaced meanwhile
+        moved = MenuItem.objects.filter(item_id=item_id, menu_img=name).update(menu_img=saved_name)
+    except Exception:
+        storage.delete(saved_name)
+        raise
+    if not moved:
+        storage.delete(saved_name)
+        return
+    if saved_name != name:
+        storage.delete(name)
+    versions.bump("menu")
+    logger.info("optimized menu image %s (%sx%s)", saved_name, *img.size)
@@ -20,11 +20,16 @@ urlpatterns = [
     path('export/reviews/', views.export_reviews, name='export_reviews'),
 
     # Mobile admin JSON endpoints
+    path('mobile/ping/', views.mobile_ping, name='admin-mobile-ping'),
+    path('mobile/bootstrap/', views.mobile_bootstrap_data, name='admin-mobile-bootstrap'),
     path('mobile/overview/', views.mobile_overview_data, name='admin-mobile-overview'),
+    path('mobile/forecast/', views.mobile_covers_forecast, name='admin-mobile-forecast'),
     path('mobile/orders/', views.mobile_orders_data, name='admin-mobile-orders'),
     path('mobile/orders/<int:order_id>/action/', views.mobile_order_action, name='admin-mobile-order-action'),
+    path('mobile/orders/bulk-action/', views.mobile_order_bulk_action, name='admin-mobile-order-bulk-action'),
     path('mobile/reservations/', views.mobile_reservations_data, name='admin-mobile-reservations'),
     path('mobile/reservations/<int:reservation_id>/action/', views.mobile_reservation_action, name='admin-mobile-reservation-action'),
+    path('mobile/reservations/bulk-action/', views.mobile_reservation_bulk_action, name='admin-mobile-reservation-bulk-action'),
     path('mobile/menu/', views.mobile_menu_data, name='admin-mobile-menu'),
     path('mobile/customers/', views.mobile_customers_data, name='admin-mobile-customers'),
     path('mobile/staffs/', views.mobile_staffs_data, name='admin-mobile-staffs'),
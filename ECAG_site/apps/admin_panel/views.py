@@ -1,24 +1,38 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
-from apps.menu.models import Order, MenuItem, MenuSubCategory
+from apps.menu.models import CustomerStats, Order, MenuItem, MenuSubCategory
+from apps.menu import bulk, kitchen, lifecycle
 from apps.reservations.models import Reservation
-from django.db.models import Sum, Count, Avg, Q, Max
+from apps.reservations import booking, forecast
+from apps.archive import reports
+from django.db.models import Sum, Count, Avg, Q, F, Case, When, Value
+from django.db.models.functions import Coalesce
 from apps.review.models import Review
 from django.utils.timezone import now, timedelta
 from decimal import Decimal, InvalidOperation
+from datetime import datetime
 from django.urls import reverse
 from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
 import secrets
 import logging
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 import csv
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from django.db import connection, connections
 from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from apps.login_registration.authentication import CachedTokenAuthentication
+from .tasks import send_staff_credentials_email, optimize_menu_image
+from apps.core.fastjson import fast_json_response
+from apps.core.versions import depends_on
 
 User = get_user_model()  
 logger = logging.getLogger(__name__)
@@ -28,33 +42,28 @@ def _generate_temp_password() -> str:
     return secrets.token_urlsafe(12)
 
 
-def _send_staff_credentials_email(*, email: str, role: str, temp_password: str, reason: str) -> None:
-    reason_text = "invited to join" if reason == "invite" else "issued a password reset for"
-    subject = "Escale Cuisine and Grill Staff Credentials"
-    message = f"""Hello,
-
-You have been {reason_text} Escale staff as {role.capitalize()}.
-
-Email: {email}
-Temporary Password: {temp_password}
-
-Please log in and change your password immediately.
-"""
-    send_mail(subject, message, 'noreply@escalecuisine.com', [email], fail_silently=False)
-
-
 def _set_staff_credentials_flash(request, *, email: str, role: str, temp_password: str, warning: str = "", reason: str = "invite") -> None:
-    request.session['staff_temp_credentials'] = {
+    # the session is a readable (signed, not encrypted) cookie: keep the password server-side,
+    # in the shared cache (settings.CACHES) so whichever worker serves the redirect finds it
+    flash_id = secrets.token_urlsafe(16)
+    cache.set(f"staff-temp-credentials:{flash_id}", {
         'email': email,
         'role': role,
         'temp_password': temp_password,
         'warning': warning,
         'reason': reason,
-    }
+    }, 600)
+    request.session['staff_temp_credentials'] = flash_id
 
 
 def _pop_staff_credentials_flash(request) -> dict | None:
-    return request.session.pop('staff_temp_credentials', None)
+    flash_id = request.session.pop('staff_temp_credentials', None)
+    if not isinstance(flash_id, str):
+        return None
+    key = f"staff-temp-credentials:{flash_id}"
+    data = cache.get(key)
+    cache.delete(key)
+    return data
 
 
 def _save_menu_item_from_payload(item, *, name, desc, price, subcategory_id, is_available, image_file=None):
@@ -94,13 +103,14 @@ def _save_menu_item_from_payload(item, *, name, desc, price, subcategory_id, is_
     if image_file:
         item.menu_img = image_file
     item.save()
+    if image_file:
+        # Resizing/re-encoding the upload is slow; leave it to the job worker.
+        optimize_menu_image.delay(item_id=item.item_id)
     return item
 
 def overview(request):
-    # --- TOTAL REVENUE ---
-    total_revenue = Order.objects.filter(
-        status=Order.Status.COMPLETED
-    ).aggregate(total=Sum("total"))["total"] or Decimal("0.00")
+    # --- TOTAL REVENUE (live orders plus the archive rollups) ---
+    total_revenue = reports.revenue()
 
     # --- ACTIVE ORDERS ---
     active_orders = Order.objects.filter(
@@ -118,19 +128,11 @@ def overview(request):
     # --- RECENT ACTIVITIES ---
     recent_orders = Order.objects.select_related("user").order_by("-order_date")[:5]
 
-    # --- POPULAR MENU ITEMS ---
-    popular_qs = MenuItem.objects.annotate(
-        order_count=Count("orderitem")
-    ).order_by("-order_count")[:5]
-
-    # compute revenue per item (price * order_count) and attach it
-    popular_items = []
-    for item in popular_qs:
-        order_count = getattr(item, "order_count", 0) or 0
-        price = item.price or Decimal("0.00")
-        # attach revenue attribute for use in template
-        item.revenue = (price * Decimal(order_count)).quantize(Decimal("0.01"))
-        popular_items.append(item)
+    # --- POPULAR MENU ITEMS (completed order lines, archived ones included) ---
+    popular_items = [
+        {"name": row["name"], "order_count": row["lines"], "revenue": row["revenue"]}
+        for row in reports.item_sales(limit=5)
+    ]
 
     # --- CHART DATA ---
     monthly_revenue = (
@@ -145,14 +147,12 @@ def overview(request):
     week_dates = [week_start + timedelta(days=i) for i in range(7)]
     
     chart_labels = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-    chart_data = []
-    
-    for date in week_dates:
-        daily_revenue = Order.objects.filter(
-            order_date__date=date
-        ).aggregate(Sum('total'))['total__sum'] or 0
-        chart_data.append(float(daily_revenue))
+    by_day = reports.revenue_by_day(week_start, week_start + timedelta(days=7))
+    chart_data = [float(by_day[date]) for date in week_dates]
     
+    # --- COVERS FORECAST (stored nightly by `manage.py forecast_covers`) ---
+    covers_forecast = forecast.daily_totals(today, 7)
+
     context = {
         'total_revenue': total_revenue,
         'active_orders': active_orders,
@@ -162,22 +162,15 @@ def overview(request):
         'recent_orders': recent_orders,
         'chart_labels': chart_labels,
         'chart_data': chart_data,
+        'covers_forecast': covers_forecast,
+        'covers_forecast_max': max((day['total'] for day in covers_forecast), default=0),
     }
     
     return render(request, 'admin_panel/overview.html', context)
 
 
-STATUS_FLOW = {
-    "pending": "confirmed",
-    "confirmed": "preparing",
-    "in_progress": "preparing",
-    "preparing": "ready",
-    "ready": "completed",
-    "completed": None,
-    "cancelled": None
-}
 def orders(request):
-    qs = Order.objects.select_related("user").prefetch_related("items__item").order_by("-order_date")
+    qs = Order.objects.select_related("user").prefetch_related("items__item", "items__topping_links__topping").order_by("-order_date")
 
     search = request.GET.get("search", "").strip()
     status_filter = request.GET.get("status", "all")
@@ -250,15 +243,12 @@ def order_detail(request, order_id):
 def order_next_status(request, order_id):
     order = get_object_or_404(Order, id=order_id)
 
-   
-    next_status = STATUS_FLOW.get(order.status)
-    if not next_status:
-        
+    try:
+        next_status = lifecycle.move(lifecycle.BOARD, order, "next")
+    except lifecycle.InvalidTransition:
         messages.info(request, "Order is already in a final state.")
         return redirect(request.META.get("HTTP_REFERER", reverse("admin-orders")))
 
-    order.status = next_status
-    order.save(update_fields=["status"])
     messages.success(request, f"Order #{order.id} moved to {next_status}.")
     return redirect(request.META.get("HTTP_REFERER", reverse("admin-orders")))
 
@@ -267,12 +257,12 @@ def order_next_status(request, order_id):
 def order_cancel(request, order_id):
     order = get_object_or_404(Order, id=order_id)
 
-    if order.status in ("completed", "cancelled"):
+    try:
+        lifecycle.move(lifecycle.BOARD, order, "cancel")
+    except lifecycle.InvalidTransition:
         messages.info(request, "Order cannot be cancelled.")
         return redirect(request.META.get("HTTP_REFERER", reverse("admin-orders")))
 
-    order.status = "cancelled"
-    order.save(update_fields=["status"])
     messages.success(request, f"Order #{order.id} cancelled.")
     
     return redirect(request.META.get("HTTP_REFERER", reverse("admin-orders")))
@@ -446,6 +436,39 @@ def menu(request):
     return render(request, "admin_panel/menu.html", context)
 
 
+# ?sort= for the customer lists; ties broken by id so pages don't overlap
+CUSTOMER_SORTS = {
+    "orders": (F("orders_count").desc(), "id"),
+    "spend": (F("total_spent").desc(nulls_last=True), "id"),
+    "recent": (F("last_order_date").desc(nulls_last=True), "id"),
+}
+
+
+def _with_customer_stats(users, labels):
+    """`users` with orders_count, total_spent, last_order_date and a `status` label per tier.
+
+    A customer without a CustomerStats row yet (added by a bulk import, say)
+    shows as a new customer with no orders and no spend (None).
+    """
+    return users.annotate(
+        orders_count=Coalesce("order_stats__orders_count", 0),
+        total_spent=F("order_stats__lifetime_spend"),
+        last_order_date=F("order_stats__last_order_date"),
+        tier=Coalesce("order_stats__tier", Value(CustomerStats.Tier.NEW)),
+        status=Case(
+            *[When(tier=tier, then=Value(label)) for tier, label in labels.items()],
+            default=Value(labels[CustomerStats.Tier.NEW]),
+        ),
+    )
+
+
+def _customer_tier_counts():
+    return CustomerStats.objects.aggregate(
+        active=Count("pk", filter=Q(orders_count__gt=0)),
+        vip=Count("pk", filter=Q(tier=CustomerStats.Tier.VIP)),
+    )
+
+
 def customers(request):
     search_query = request.GET.get("search", "").strip()
     
@@ -458,28 +481,18 @@ def customers(request):
             Q(email__icontains=search_query)
         )
     
-    # Annotate with order counts & totals per customer
-    from django.db.models import Max
-    
-    customers = customers.annotate(
-        orders_count=Count("order"),
-        total_spent=Sum("order__total", filter=Q(order__status=Order.Status.COMPLETED)),
-        last_order_date=Max("order__order_date", filter=Q(order__status=Order.Status.COMPLETED))
-    ).order_by("-orders_count")
-    
-    # Add status based on annotation
-    for c in customers:
-        if c.orders_count >= 10:
-            c.status = "VIP"
-        elif c.orders_count > 0:
-            c.status = "Active"
-        else:
-            c.status = "Regular"
+    # order counts & totals per customer come from CustomerStats
+    customers = _with_customer_stats(customers, {
+        CustomerStats.Tier.VIP: "VIP",
+        CustomerStats.Tier.ACTIVE: "Active",
+        CustomerStats.Tier.NEW: "Regular",
+    }).order_by(*CUSTOMER_SORTS.get(request.GET.get("sort"), CUSTOMER_SORTS["orders"]))
     
     total_customers = User.objects.count()
-    active_customers = User.objects.filter(order__isnull=False).distinct().count()
-    vip_customers = customers.filter(orders_count__gte=10).count()
-    total_revenue = Order.objects.filter(status=Order.Status.COMPLETED).aggregate(Sum("total"))["total__sum"] or Decimal("0.00")
+    tiers = _customer_tier_counts()
+    active_customers = tiers["active"]
+    vip_customers = tiers["vip"]
+    total_revenue = reports.revenue()
     
     context = {
         "customers": customers,
@@ -544,16 +557,16 @@ def staffs(request):
                 role = "admin" if staff.is_superuser else "staff"
                 warning = ""
                 try:
-                    _send_staff_credentials_email(
-                        email=staff.email,
+                    send_staff_credentials_email.delay(
+                        user_id=staff.pk,
                         role=role,
-                        temp_password=temp_password,
                         reason="reset",
+                        site_url=request.build_absolute_uri("/"),
                     )
                     messages.success(request, f"Temporary password reset for {staff.email}.")
                 except Exception as exc:
-                    warning = "Password was reset, but email could not be sent."
-                    logger.warning("staffs reset_password email failed for %s: %s", staff.email, exc)
+                    warning = "Password was reset, but email could not be queued."
+                    logger.warning("staffs reset_password email enqueue failed for %s: %s", staff.email, exc)
                     messages.warning(request, warning)
 
                 _set_staff_credentials_flash(
@@ -610,16 +623,16 @@ def invite_staff(request):
             
             warning = ""
             try:
-                _send_staff_credentials_email(
-                    email=email,
+                send_staff_credentials_email.delay(
+                    user_id=user.pk,
                     role=role,
-                    temp_password=temp_password,
                     reason="invite",
+                    site_url=request.build_absolute_uri("/"),
                 )
-                messages.success(request, f"Staff member created and invitation sent to {email}")
+                messages.success(request, f"Staff member created and invitation queued for {email}")
             except Exception as exc:
-                warning = "Staff member created, but invitation email could not be sent."
-                logger.warning("invite_staff email failed for %s: %s", email, exc)
+                warning = "Staff member created, but invitation email could not be queued."
+                logger.warning("invite_staff email enqueue failed for %s: %s", email, exc)
                 messages.warning(request, warning)
 
             _set_staff_credentials_flash(
@@ -743,6 +756,31 @@ def _json_error(message, status=400):
     return JsonResponse({'ok': False, 'error': message}, status=status)
 
 
+def _api_user(request):
+    """The caller of a mobile endpoint: the session's user, else the API token's (None if neither)."""
+    if request.user.is_authenticated:
+        return request.user
+    try:
+        found = CachedTokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return found[0] if found else None
+
+
+def mobile_staff_required(view):
+    """401 for anonymous callers and 403 for non-staff ones, as JSON; the admin app sends its token."""
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        user = _api_user(request)
+        if user is None:
+            return _json_error('Authentication required', 401)
+        if not user.is_staff:
+            return _json_error('Staff access required', 403)
+        request.user = user
+        return view(request, *args, **kwargs)
+    return wrapped
+
+
 def _unique_username_from_email(email: str) -> str:
     base = (email.split('@')[0] or 'staff').strip()[:120]
     candidate = base
@@ -753,15 +791,55 @@ def _unique_username_from_email(email: str) -> str:
     return candidate
 
 
-@csrf_exempt
-def mobile_overview_data(request):
-    if request.method != 'GET':
-        return _json_error('GET required', 405)
+def _user_counts():
+    """All the user counts the mobile tabs show, in one query."""
+    return User.objects.aggregate(
+        total=Count('id'),
+        staff=Count('id', filter=Q(is_staff=True)),
+        admins=Count('id', filter=Q(is_staff=True, is_superuser=True)),
+    )
+
+
+MOBILE_PAGE_SIZE = 50
+MOBILE_MAX_PAGE_SIZE = 200
+
+
+def _page_bounds(request):
+    """(offset, limit) from ?offset=&limit=; ValueError with a message for the app otherwise."""
+    try:
+        offset = int(request.GET.get('offset') or 0)
+        limit = int(request.GET.get('limit') or MOBILE_PAGE_SIZE)
+    except ValueError:
+        offset = limit = -1
+    if offset < 0 or limit < 1:
+        raise ValueError('offset must be an integer >= 0 and limit an integer >= 1')
+    return offset, min(limit, MOBILE_MAX_PAGE_SIZE)
 
-    total_revenue = Order.objects.filter(status=Order.Status.COMPLETED).aggregate(total=Sum('total'))['total'] or Decimal('0.00')
+
+def _mobile_page(request, qs):
+    """The ?offset=&limit= page of `qs` (50 rows by default, 200 at most) and its `page` info.
+
+    `more` comes from reading one row past the page rather than a COUNT;
+    `next_offset` is what the app sends for the following page. `qs` needs
+    a total ordering or pages can overlap.
+    """
+    offset, limit = _page_bounds(request)
+    rows = list(qs[offset:offset + limit + 1])
+    more = len(rows) > limit
+    return rows[:limit], {
+        'offset': offset,
+        'limit': limit,
+        'more': more,
+        'next_offset': offset + limit if more else None,
+    }
+
+
+def _mobile_overview_payload(request, user_counts=None):
+    user_counts = user_counts or _user_counts()
+    total_revenue = reports.revenue()
     active_orders = Order.objects.filter(status=Order.Status.IN_PROGRESS).count()
     pending_reservations = Reservation.objects.filter(status='pending').count()
-    total_customers = User.objects.count()
+    total_customers = user_counts['total']
 
     recent_orders = list(
         Order.objects.select_related('user')
@@ -769,20 +847,17 @@ def mobile_overview_data(request):
         .values('id', 'order_id_str', 'status', 'order_type', 'total', 'order_date')
     )
 
-    # --- Weekly daily revenue (last 7 days) ---
+    # --- Weekly daily revenue (last 7 days), one grouped query ---
     today = now().date()
+    by_day = reports.revenue_by_day(today - timedelta(days=6), today + timedelta(days=1))
     chart_labels = []
     chart_data = []
     for i in range(6, -1, -1):
         day = today - timedelta(days=i)
-        day_revenue = Order.objects.filter(
-            status=Order.Status.COMPLETED,
-            order_date__date=day,
-        ).aggregate(total=Sum('total'))['total'] or 0
         chart_labels.append(day.strftime('%a'))
-        chart_data.append(float(day_revenue))
+        chart_data.append(float(by_day.get(day) or 0))
 
-    return JsonResponse({
+    return {
         'ok': True,
         'metrics': {
             'total_revenue': str(total_revenue),
@@ -793,19 +868,179 @@ def mobile_overview_data(request):
         'recent_orders': recent_orders,
         'chart_labels': chart_labels,
         'chart_data': chart_data,
+        'covers_forecast': forecast.daily_totals(today, 7),
+    }
+
+
+@depends_on('orders', 'reservations', 'users')
+@csrf_exempt
+def mobile_overview_data(request):
+    if request.method != 'GET':
+        return _json_error('GET required', 405)
+    return fast_json_response(_mobile_overview_payload(request))
+
+
+@depends_on('reservations')
+@csrf_exempt
+def mobile_covers_forecast(request):
+    """Forecast covers per 15-minute slot for ?date= (default today)."""
+    if request.method != 'GET':
+        return _json_error('GET required', 405)
+    day = now().date()
+    if request.GET.get('date'):
+        try:
+            day = datetime.strptime(request.GET['date'], '%Y-%m-%d').date()
+        except ValueError:
+            return _json_error('date must be YYYY-MM-DD')
+    return fast_json_response({
+        'ok': True,
+        'date': day,
+        'slots': forecast.slot_rows(day),
     })
 
 
+BOOTSTRAP_WORKERS = 4
+
+
+def _run_sections(sections):
+    """{name: payload} for {name: builder}, the builders running on a thread pool.
+
+    Each worker thread opens its own database connection and closes it when
+    its builder returns. Inside a transaction (a test, a caller's atomic
+    block) those connections would not see its writes, so the builders run
+    one after another on this connection instead.
+    """
+    if BOOTSTRAP_WORKERS < 2 or connection.in_atomic_block:
+        return {name: build() for name, build in sections.items()}
+
+    def run(build):
+        try:
+            return build()
+        finally:
+            connections.close_all()     # this thread's connections only
+
+    with ThreadPoolExecutor(max_workers=BOOTSTRAP_WORKERS) as pool:
+        futures = {name: pool.submit(run, build) for name, build in sections.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+@depends_on('orders', 'reservations', 'menu', 'users', 'reviews')
+@csrf_exempt
+@mobile_staff_required
+def mobile_bootstrap_data(request):
+    """Every tab's first page for the admin app's start-up, in one response.
+
+    The same payloads as the per-tab endpoints (orders include the delta
+    feed's watermark), built concurrently; the user counts the overview,
+    customers and staff tabs all show come from one shared query. Staff
+    only, by session or API token.
+    """
+    if request.method != 'GET':
+        return _json_error('GET required', 405)
+
+    try:
+        _page_bounds(request)
+        since = _orders_since(request)
+    except ValueError as exc:
+        return _json_error(str(exc))
+
+    user_counts = _user_counts()
+    sections = _run_sections({
+        'overview': partial(_mobile_overview_payload, request, user_counts),
+        'orders': partial(_mobile_orders_payload, request, since),
+        'reservations': partial(_mobile_reservations_payload, request),
+        'menu': partial(_mobile_menu_payload, request),
+        'customers': partial(_mobile_customers_payload, request, user_counts),
+        'staffs': partial(_mobile_staffs_payload, request, user_counts),
+        'reviews': partial(_mobile_reviews_payload, request),
+    })
+    return fast_json_response({'ok': True, **sections})
+
+
+def mobile_ping(request):
+    """Liveness check for the admin app's base-URL discovery: no database, no session."""
+    return JsonResponse({'ok': True, 'service': 'admin_panel'})
+
+
+def _mobile_order_payload(o):
+    items_payload = []
+    for it in o.items.all()[:8]:
+        items_payload.append({
+            'name': getattr(it.item, 'name', 'Item'),
+            'quantity': it.quantity,
+            'price': str(getattr(it.item, 'price', '0.00') or '0.00'),
+            'subtotal': str(it.subtotal),
+        })
+
+    delivery_info = None
+    try:
+        d = o.delivery
+        delivery_info = {
+            'address': d.address,
+            'fee': str(d.fee),
+            'delivery_status': d.delivery_status,
+            'arrival_time': str(d.arrival_time) if d.arrival_time else None,
+        }
+    except Exception:
+        pass
+
+    return {
+        'id': o.id,
+        'order_id_str': o.order_id_str,
+        'status': o.status,
+        'order_type': o.order_type,
+        'subtotal': str(o.subtotal),
+        'total': str(o.total),
+        'order_date': o.order_date.isoformat() if o.order_date else None,
+        'user': {
+            'id': o.user_id,
+            'name': (o.user.get_full_name() if o.user else '') or (o.user.username if o.user else 'Guest'),
+            'email': o.user.email if o.user else '',
+            'phone': getattr(o.user, 'phone', '') or '',
+        },
+        'items': items_payload,
+        'delivery': delivery_info,
+    }
+
+
+@depends_on('orders', 'menu', 'users')
 @csrf_exempt
 def mobile_orders_data(request):
+    """Orders for the admin app, in full or as a delta.
+
+    Without `since`: up to 300 orders plus a `watermark` (the kitchen feed's
+    last event seq). With ``?since=<watermark>``: only the orders changed
+    after it, with `removed` listing ids to drop (deleted, or no longer
+    matching the filters) and the new `watermark`; `more` means call again
+    straight away. A watermark older than the kept events gets `full` again.
+    An unchanged poll repeats its URL, so the ETag middleware answers it
+    with a 304 and no body.
+    """
     if request.method != 'GET':
         return _json_error('GET required', 405)
+    try:
+        since = _orders_since(request)
+    except ValueError as exc:
+        return _json_error(str(exc))
+    return fast_json_response(_mobile_orders_payload(request, since))
+
+
+def _orders_since(request):
+    """The ?since= watermark (None without one); ValueError with a message for the app otherwise."""
+    if not request.GET.get('since'):
+        return None
+    try:
+        return int(request.GET['since'])
+    except ValueError:
+        raise ValueError('since must be an integer')
+
 
+def _mobile_orders_payload(request, since=None):
     search = request.GET.get('search', '').strip()
     status_filter = request.GET.get('status', 'all')
     type_filter = request.GET.get('type', 'all')
 
-    qs = Order.objects.select_related('user').prefetch_related('items__item').order_by('-order_date')
+    qs = Order.objects.select_related('user', 'delivery').prefetch_related('items__item').order_by('-order_date')
 
     if search:
         if search.isdigit():
@@ -824,48 +1059,29 @@ def mobile_orders_data(request):
     if type_filter and type_filter != 'all':
         qs = qs.filter(order_type__icontains=type_filter)
 
-    orders_payload = []
-    for o in qs[:300]:
-        items_payload = []
-        for it in o.items.all()[:8]:
-            items_payload.append({
-                'name': getattr(it.item, 'name', 'Item'),
-                'quantity': it.quantity,
-                'price': str(getattr(it.item, 'price', '0.00') or '0.00'),
-                'subtotal': str(it.subtotal),
-            })
-
-        delivery_info = None
-        try:
-            d = o.delivery
-            delivery_info = {
-                'address': d.address,
-                'fee': str(d.fee),
-                'delivery_status': d.delivery_status,
-                'arrival_time': str(d.arrival_time) if d.arrival_time else None,
-            }
-        except Exception:
-            pass
-
-        orders_payload.append({
-            'id': o.id,
-            'order_id_str': o.order_id_str,
-            'status': o.status,
-            'order_type': o.order_type,
-            'subtotal': str(o.subtotal),
-            'total': str(o.total),
-            'order_date': o.order_date.isoformat() if o.order_date else None,
-            'user': {
-                'id': o.user_id,
-                'name': (o.user.get_full_name() if o.user else '') or (o.user.username if o.user else 'Guest'),
-                'email': o.user.email if o.user else '',
-                'phone': getattr(o.user, 'phone', '') or '',
-            },
-            'items': items_payload,
-            'delivery': delivery_info,
-        })
+    if since is None or since < 0 or kitchen.is_stale(since):
+        # read the watermark first so nothing written meanwhile is skipped
+        watermark = kitchen.latest_seq()
+        return {
+            'ok': True,
+            'full': True,
+            'watermark': watermark,
+            'orders': [_mobile_order_payload(o) for o in qs[:300]],
+            'removed': [],
+            'more': False,
+        }
 
-    return JsonResponse({'ok': True, 'orders': orders_payload})
+    events, more = kitchen.events_since(since)
+    changed = {e.order_id for e in events}
+    orders = list(qs.filter(pk__in=changed)) if changed else []
+    return {
+        'ok': True,
+        'full': False,
+        'watermark': events[-1].seq if events else since,
+        'orders': [_mobile_order_payload(o) for o in orders],
+        'removed': sorted(changed - {o.pk for o in orders}),
+        'more': more,
+    }
 
 
 @csrf_exempt
@@ -883,29 +1099,63 @@ def mobile_order_action(request, order_id):
     action = (payload.get('action') or '').lower()
     status = (payload.get('status') or '').lower()
 
-    if action == 'next':
-        next_status = STATUS_FLOW.get(order.status)
-        if not next_status:
-            return _json_error('Order is already in a final state', 400)
-        order.status = next_status
-    elif action == 'cancel':
-        if order.status in ('completed', 'cancelled'):
-            return _json_error('Order cannot be cancelled', 400)
-        order.status = 'cancelled'
-    elif status:
-        order.status = status
-    else:
-        return _json_error('Action or status is required', 400)
+    if action not in ('next', 'cancel'):
+        if not status:
+            return _json_error('Action or status is required', 400)
+        action = 'set'
 
-    order.save(update_fields=['status'])
+    try:
+        lifecycle.move(lifecycle.BOARD, order, action, status)
+    except lifecycle.InvalidTransition as exc:
+        return _json_error(str(exc), 400)
     return JsonResponse({'ok': True, 'status': order.status})
 
 
+def _bulk_payload(request):
+    try:
+        payload = json.loads(request.body.decode('utf-8') or '{}')
+    except Exception:
+        payload = {}
+    return (
+        bulk.parse_ids(payload.get('ids')),
+        (payload.get('action') or '').lower(),
+        (payload.get('status') or '').lower(),
+    )
+
+
+def _bulk_response(results):
+    return JsonResponse({
+        'ok': True,
+        'updated': sum(1 for r in results if r['ok']),
+        'failed': sum(1 for r in results if not r['ok']),
+        'results': results,
+    })
+
+
+@csrf_exempt
+@mobile_staff_required
+def mobile_order_bulk_action(request):
+    if request.method != 'POST':
+        return _json_error('POST required', 405)
+    try:
+        ids, action, status = _bulk_payload(request)
+        if not action and status:
+            action = 'set'
+        results = bulk.change_board_statuses(ids, action, status)
+    except ValueError as exc:
+        return _json_error(str(exc), 400)
+    return _bulk_response(results)
+
+
+@depends_on('reservations', 'users')
 @csrf_exempt
 def mobile_reservations_data(request):
     if request.method != 'GET':
         return _json_error('GET required', 405)
+    return fast_json_response(_mobile_reservations_payload(request))
+
 
+def _mobile_reservations_payload(request):
     query = request.GET.get('q', '')
     status = request.GET.get('status', 'all')
 
@@ -945,7 +1195,15 @@ def mobile_reservations_data(request):
             },
         })
 
-    return JsonResponse({'ok': True, 'reservations': payload})
+    return {'ok': True, 'reservations': payload}
+
+
+RESERVATION_ACTIONS = {
+    'confirm': 'confirmed',
+    'seat': 'seated',
+    'complete': 'completed',
+    'cancel': 'cancelled',
+}
 
 
 @csrf_exempt
@@ -963,15 +1221,8 @@ def mobile_reservation_action(request, reservation_id):
     action = (payload.get('action') or '').lower()
     new_status = (payload.get('status') or '').lower()
 
-    allowed = {
-        'confirm': 'confirmed',
-        'seat': 'seated',
-        'complete': 'completed',
-        'cancel': 'cancelled',
-    }
-
     if not new_status:
-        new_status = allowed.get(action)
+        new_status = RESERVATION_ACTIONS.get(action)
 
     if not new_status:
         return _json_error('Invalid action/status', 400)
@@ -984,40 +1235,30 @@ def mobile_reservation_action(request, reservation_id):
     return JsonResponse({'ok': True, 'status': reservation.status})
 
 
+@csrf_exempt
+@mobile_staff_required
+def mobile_reservation_bulk_action(request):
+    if request.method != 'POST':
+        return _json_error('POST required', 405)
+    try:
+        ids, action, new_status = _bulk_payload(request)
+        new_status = new_status or RESERVATION_ACTIONS.get(action)
+        if not new_status:
+            return _json_error('Invalid action/status', 400)
+        results = booking.bulk_change_status(ids, new_status, final_statuses=booking.FINAL_STATUSES)
+    except ValueError as exc:
+        return _json_error(str(exc), 400)
+    return _bulk_response(results)
+
+
+@depends_on('menu')
 @csrf_exempt
 def mobile_menu_data(request):
     if request.method == 'GET':
-        search_query = request.GET.get('search', '').strip()
-        category_id = request.GET.get('category', '')
-
-        menu_items = MenuItem.objects.select_related('subcategory_id').all()
-        if search_query:
-            menu_items = menu_items.filter(Q(name__icontains=search_query) | Q(desc__icontains=search_query))
-        if category_id and category_id != 'all':
-            menu_items = menu_items.filter(subcategory_id_id=category_id)
-
-        payload = []
-        for item in menu_items.order_by('name')[:500]:
-            if item.menu_img:
-                image_url = request.build_absolute_uri(item.menu_img.url)
-            else:
-                image_url = ''
-            payload.append({
-                'item_id': item.item_id,
-                'name': item.name,
-                'desc': item.desc,
-                'price': str(item.price),
-                'is_available': item.is_available,
-                'subcategory_id': item.subcategory_id_id,
-                'subcategory': item.subcategory_id.subcategory if item.subcategory_id else '',
-                'image_url': image_url,
-            })
-
-        categories = [
-            {'subcategory_id': c.id, 'subcategory': c.subcategory}
-            for c in MenuSubCategory.objects.order_by('subcategory')
-        ]
-        return JsonResponse({'ok': True, 'menu_items': payload, 'categories': categories})
+        try:
+            return fast_json_response(_mobile_menu_payload(request))
+        except ValueError as exc:
+            return _json_error(str(exc))
 
     if request.method == 'POST':
         if (request.content_type or '').startswith('application/json'):
@@ -1077,12 +1318,63 @@ def mobile_menu_data(request):
     return _json_error('Unsupported method', 405)
 
 
+def _mobile_menu_payload(request):
+    search_query = request.GET.get('search', '').strip()
+    category_id = request.GET.get('category', '')
+
+    menu_items = MenuItem.objects.select_related('subcategory_id').all()
+    if search_query:
+        menu_items = menu_items.filter(Q(name__icontains=search_query) | Q(desc__icontains=search_query))
+    if category_id and category_id != 'all':
+        menu_items = menu_items.filter(subcategory_id_id=category_id)
+
+    items, page = _mobile_page(request, menu_items.order_by('name', 'item_id'))
+    payload = []
+    for item in items:
+        if item.menu_img:
+            image_url = request.build_absolute_uri(item.menu_img.url)
+        else:
+            image_url = ''
+        payload.append({
+            'item_id': item.item_id,
+            'name': item.name,
+            'desc': item.desc,
+            'price': str(item.price),
+            'is_available': item.is_available,
+            'subcategory_id': item.subcategory_id_id,
+            'subcategory': item.subcategory_id.subcategory if item.subcategory_id else '',
+            'image_url': image_url,
+        })
+
+    categories = [
+        {'subcategory_id': c.id, 'subcategory': c.subcategory}
+        for c in MenuSubCategory.objects.order_by('subcategory')
+    ]
+    return {'ok': True, 'menu_items': payload, 'categories': categories, 'page': page}
+
+
+@depends_on('users', 'orders')
 @csrf_exempt
 def mobile_customers_data(request):
     if request.method != 'GET':
         return _json_error('GET required', 405)
+    try:
+        return fast_json_response(_mobile_customers_payload(request))
+    except ValueError as exc:
+        return _json_error(str(exc))
+
 
+# the app's chip and label for each tier
+MOBILE_CUSTOMER_TIERS = {
+    'vip': CustomerStats.Tier.VIP,
+    'regular': CustomerStats.Tier.ACTIVE,
+    'new': CustomerStats.Tier.NEW,
+}
+
+
+def _mobile_customers_payload(request, user_counts=None):
     search_query = request.GET.get('search', '').strip()
+    status_filter = request.GET.get('status', 'all').lower()
     customers_qs = User.objects.all()
 
     if search_query:
@@ -1093,86 +1385,53 @@ def mobile_customers_data(request):
             | Q(username__icontains=search_query)
         )
 
-    customers_qs = customers_qs.annotate(
-        orders_count=Count('order'),
-        total_spent=Sum('order__total', filter=Q(order__status=Order.Status.COMPLETED)),
-        last_order_date=Max('order__order_date', filter=Q(order__status=Order.Status.COMPLETED)),
-    ).order_by('-orders_count')
+    customers_qs = _with_customer_stats(customers_qs, {
+        CustomerStats.Tier.VIP: 'VIP',
+        CustomerStats.Tier.ACTIVE: 'Regular',
+        CustomerStats.Tier.NEW: 'New',
+    }).order_by(*CUSTOMER_SORTS.get(request.GET.get('sort'), CUSTOMER_SORTS['orders']))
 
-    customers = []
-    for c in customers_qs[:500]:
-        if c.orders_count >= 10:
-            status = 'VIP'
-        elif c.orders_count > 0:
-            status = 'Regular'
-        else:
-            status = 'New'
+    if status_filter in MOBILE_CUSTOMER_TIERS:
+        customers_qs = customers_qs.filter(tier=MOBILE_CUSTOMER_TIERS[status_filter])
 
+    rows, page = _mobile_page(request, customers_qs)
+    customers = []
+    for c in rows:
         customers.append({
             'id': c.id,
             'name': c.get_full_name() or c.username,
             'email': c.email,
-            'orders_count': c.orders_count or 0,
+            'orders_count': c.orders_count,
             'total_spent': str(c.total_spent or Decimal('0.00')),
-            'status': status,
+            'status': c.status,
             'last_order_date': c.last_order_date.isoformat() if c.last_order_date else None,
         })
 
-    total_customers = User.objects.count()
-    active_customers = User.objects.filter(order__isnull=False).distinct().count()
-    vip_customers = sum(1 for c in customers if str(c['status']).lower() == 'vip')
+    total_customers = (user_counts or _user_counts())['total']
+    tiers = _customer_tier_counts()
+    active_customers = tiers['active']
+    vip_customers = tiers['vip']
 
-    return JsonResponse(
-        {
-            'ok': True,
-            'stats': {
-                'total_customers': total_customers,
-                'active_customers': active_customers,
-                'vip_customers': vip_customers,
-            },
-            'customers': customers,
-        }
-    )
+    return {
+        'ok': True,
+        'stats': {
+            'total_customers': total_customers,
+            'active_customers': active_customers,
+            'vip_customers': vip_customers,
+        },
+        'customers': customers,
+        'page': page,
+    }
 
 
+@depends_on('users')
 @csrf_exempt
 def mobile_staffs_data(request):
     if request.method == 'GET':
-        search_query = request.GET.get('search', '').strip()
-        staff_qs = User.objects.filter(is_staff=True)
-
-        if search_query:
-            staff_qs = staff_qs.filter(
-                Q(first_name__icontains=search_query)
-                | Q(last_name__icontains=search_query)
-                | Q(email__icontains=search_query)
-                | Q(username__icontains=search_query)
-            )
-
-        payload = []
-        for s in staff_qs.order_by('-date_joined')[:500]:
-            payload.append(
-                {
-                    'id': s.id,
-                    'username': s.username,
-                    'name': s.get_full_name() or s.username,
-                    'email': s.email,
-                    'is_admin': bool(s.is_superuser),
-                    'date_joined': s.date_joined.isoformat() if s.date_joined else None,
-                }
-            )
-
-        return JsonResponse(
-            {
-                'ok': True,
-                'stats': {
-                    'total_staff': User.objects.filter(is_staff=True).count(),
-                    'admin_count': User.objects.filter(is_staff=True, is_superuser=True).count(),
-                    'staff_count': User.objects.filter(is_staff=True, is_superuser=False).count(),
-                },
-                'staff_list': payload,
-            }
-        )
+        try:
+            return fast_json_response(_mobile_staffs_payload(request))
+        except ValueError as exc:
+            return _json_error(str(exc))
 
     if request.method == 'POST':
         try:
@@ -1205,15 +1464,15 @@ def mobile_staffs_data(request):
             role = 'admin' if staff.is_superuser else 'staff'
             warning = ''
             try:
-                _send_staff_credentials_email(
-                    email=staff.email,
+                send_staff_credentials_email.delay(
+                    user_id=staff.pk,
                     role=role,
-                    temp_password=temp_password,
                     reason='reset',
+                    site_url=request.build_absolute_uri('/'),
                 )
             except Exception as exc:
-                warning = 'Password reset worked, but email could not be sent.'
-                logger.warning("mobile_staffs_data reset_password email failed for %s: %s", staff.email, exc)
+                warning = 'Password reset worked, but email could not be queued.'
+                logger.warning("mobile_staffs_data reset_password email enqueue failed for %s: %s", staff.email, exc)
             return JsonResponse({
                 'ok': True,
                 'email': staff.email,
@@ -1237,6 +1496,56 @@ def mobile_staffs_data(request):
     return _json_error('Unsupported method', 405)
 
 
+def _mobile_staffs_payload(request, user_counts=None):
+    search_query = request.GET.get('search', '').strip()
+    role_filter = request.GET.get('role', 'all').lower()
+    staff_qs = User.objects.filter(is_staff=True)
+
+    if search_query:
+        staff_qs = staff_qs.filter(
+            Q(first_name__icontains=search_query)
+            | Q(last_name__icontains=search_query)
+            | Q(email__icontains=search_query)
+            | Q(username__icontains=search_query)
+        )
+
+    if role_filter == 'admins':
+        staff_qs = staff_qs.filter(is_superuser=True)
+    elif role_filter == 'chefs':
+        staff_qs = staff_qs.filter(
+            Q(first_name__icontains='chef')
+            | Q(last_name__icontains='chef')
+            | Q(username__icontains='chef')
+            | Q(email__icontains='chef')
+        )
+
+    rows, page = _mobile_page(request, staff_qs.order_by('-date_joined', '-id'))
+    payload = []
+    for s in rows:
+        payload.append(
+            {
+                'id': s.id,
+                'username': s.username,
+                'name': s.get_full_name() or s.username,
+                'email': s.email,
+                'is_admin': bool(s.is_superuser),
+                'date_joined': s.date_joined.isoformat() if s.date_joined else None,
+            }
+        )
+
+    user_counts = user_counts or _user_counts()
+    return {
+        'ok': True,
+        'stats': {
+            'total_staff': user_counts['staff'],
+            'admin_count': user_counts['admins'],
+            'staff_count': user_counts['staff'] - user_counts['admins'],
+        },
+        'staff_list': payload,
+        'page': page,
+    }
+
+
 @csrf_exempt
 def mobile_invite_staff(request):
     if request.method != 'POST':
@@ -1259,7 +1568,7 @@ def mobile_invite_staff(request):
     temp_password = _generate_temp_password()
 
     try:
-        User.objects.create_user(
+        user = User.objects.create_user(
             username=_unique_username_from_email(email),
             email=email,
             password=temp_password,
@@ -1270,18 +1579,18 @@ def mobile_invite_staff(request):
         return _json_error(str(exc), 500)
 
     try:
-        _send_staff_credentials_email(
-            email=email,
+        send_staff_credentials_email.delay(
+            user_id=user.pk,
             role=role,
-            temp_password=temp_password,
             reason='invite',
+            site_url=request.build_absolute_uri('/'),
         )
     except Exception as exc:
-        logger.warning("mobile_invite_staff email failed for %s: %s", email, exc)
+        logger.warning("mobile_invite_staff email enqueue failed for %s: %s", email, exc)
         return JsonResponse(
             {
                 'ok': True,
-                'warning': 'Staff account created, but invite email could not be sent.',
+                'warning': 'Staff account created, but invite email could not be queued.',
                 'email': email,
                 'temporary_password': temp_password,
             }
@@ -1290,11 +1599,18 @@ def mobile_invite_staff(request):
     return JsonResponse({'ok': True, 'email': email, 'temporary_password': temp_password})
 
 
+@depends_on('reviews')
 @csrf_exempt
 def mobile_reviews_data(request):
     if request.method != 'GET':
         return _json_error('GET required', 405)
+    try:
+        return fast_json_response(_mobile_reviews_payload(request))
+    except ValueError as exc:
+        return _json_error(str(exc))
+
 
+def _mobile_reviews_payload(request):
     search_query = request.GET.get('search', '').strip()
     status_filter = request.GET.get('status', 'all')
 
@@ -1312,8 +1628,9 @@ def mobile_reviews_data(request):
     elif status_filter == 'approved':
         reviews_qs = reviews_qs.filter(is_verified=True)
 
+    rows, page = _mobile_page(request, reviews_qs.order_by('-submission_date', '-review_id'))
     payload = []
-    for review in reviews_qs.order_by('-submission_date')[:500]:
+    for review in rows:
         payload.append(
             {
                 'review_id': review.review_id,
@@ -1327,22 +1644,23 @@ def mobile_reviews_data(request):
             }
         )
 
-    total_reviews = Review.objects.count()
-    avg_rating = Review.objects.aggregate(Avg('rating'))['rating__avg'] or 0
-    pending_count = Review.objects.filter(is_verified=False).count()
-
-    return JsonResponse(
-        {
-            'ok': True,
-            'stats': {
-                'total_reviews': total_reviews,
-                'avg_rating': float(avg_rating),
-                'pending_count': pending_count,
-            },
-            'reviews': payload,
-        }
+    stats = Review.objects.aggregate(
+        total_reviews=Count('review_id'),
+        avg_rating=Avg('rating'),
+        pending_count=Count('review_id', filter=Q(is_verified=False)),
     )
 
+    return {
+        'ok': True,
+        'stats': {
+            'total_reviews': stats['total_reviews'],
+            'avg_rating': float(stats['avg_rating'] or 0),
+            'pending_count': stats['pending_count'],
+        },
+        'reviews': payload,
+        'page': page,
+    }
+
 
 @csrf_exempt
 def mobile_review_action(request, review_id):
@@ -1376,22 +1694,31 @@ def mobile_review_action(request, review_id):
     return _json_error('Invalid action', 400)
 
 def export_orders(request):
-    orders = Order.objects.select_related('user').all()
+    # ?from=&to= (YYYY-MM-DD, `to` inclusive); archived orders are read only when `from` reaches them
+    try:
+        start = datetime.strptime(request.GET['from'], '%Y-%m-%d').date() if request.GET.get('from') else None
+        end = datetime.strptime(request.GET['to'], '%Y-%m-%d').date() + timedelta(days=1) if request.GET.get('to') else None
+    except ValueError:
+        return HttpResponse('from/to must be YYYY-MM-DD', status=400, content_type='text/plain')
+    orders = reports.orders(start, end)
+    users = User.objects.in_bulk({order['user_id'] for order in orders if order['user_id']})
     
     response = HttpResponse(content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="orders.csv"'
     
     writer = csv.writer(response)
-    writer.writerow(['Order ID', 'Customer', 'Email', 'Total', 'Status', 'Date'])
+    writer.writerow(['Order ID', 'Customer', 'Email', 'Total', 'Status', 'Date', 'Archived'])
     
     for order in orders:
+        user = users.get(order['user_id'])
         writer.writerow([
-            order.id,
-            order.user.get_full_name() or order.user.username,
-            order.user.email,
-            f"Rs {order.total}",
-            order.status or 'Pending',
-            order.order_date.strftime('%Y-%m-%d %H:%M'),
+            order['id'],
+            (user.get_full_name() or user.username) if user else 'Guest',
+            user.email if user else '',
+            f"Rs {order['total']}",
+            order['status'] or 'Pending',
+            order['order_date'].strftime('%Y-%m-%d %H:%M'),
+            'Yes' if order['archived'] else 'No',
         ])
     
     return response
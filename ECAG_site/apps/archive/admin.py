@@ -0,0 +1,45 @@
+from django.contrib import admin
+
+from .models import ArchivedOrder, ArchiveRun, CustomerRollup, DailyItemSales, DailySales
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+	# written by the archiver only
+	def has_add_permission(self, request):
+		return False
+
+	def has_change_permission(self, request, obj=None):
+		return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(ReadOnlyAdmin):
+	list_display = ('order_id', 'order_id_str', 'user_id', 'order_type', 'total', 'order_date', 'archived_at')
+	list_filter = ('order_type',)
+	search_fields = ('order_id_str',)
+	date_hierarchy = 'order_date'
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(ReadOnlyAdmin):
+	list_display = ('date', 'order_type', 'orders', 'revenue', 'portions')
+	list_filter = ('order_type',)
+	date_hierarchy = 'date'
+
+
+@admin.register(DailyItemSales)
+class DailyItemSalesAdmin(ReadOnlyAdmin):
+	list_display = ('date', 'name', 'lines', 'quantity', 'revenue')
+	search_fields = ('name',)
+	date_hierarchy = 'date'
+
+
+@admin.register(CustomerRollup)
+class CustomerRollupAdmin(ReadOnlyAdmin):
+	list_display = ('user', 'orders_count', 'spend', 'last_order_date')
+	search_fields = ('user__username', 'user__email')
+
+
+@admin.register(ArchiveRun)
+class ArchiveRunAdmin(ReadOnlyAdmin):
+	list_display = ('started_at', 'finished_at', 'cutoff', 'orders')
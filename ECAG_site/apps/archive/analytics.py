@@ -0,0 +1,395 @@
+"""Analytics export: order, reservation and review history as columnar files.
+
+``manage.py export_analytics DIR`` writes these tables under ``DIR``:
+
+* ``orders``: one row per completed order (type, totals, fees, payment);
+* ``order_items``: one row per line of those orders (item, category,
+  quantity, prices, promotion, toppings);
+* ``reservations``: one row per booking (party, slot, status, table, lead time);
+* ``reviews``: one row per review (no names or e-mail addresses).
+
+Every row carries its day, weekday and hour where it has them, so
+time-of-day questions need no re-scraping. Archived orders (`ArchivedOrder`)
+are exported like live ones, flagged ``archived``.
+
+Files are Parquet (or Arrow IPC) when pyarrow is installed, CSV otherwise,
+partitioned by month the Hive way::
+
+    DIR/order_items/month=2025-03/part-20250401T020000.parquet
+
+Rows are read with ``.iterator()`` and written `BATCH_SIZE` at a time, so
+memory stays flat however long the history. Exports are incremental: only
+closed days are written (up to yesterday), and ``DIR/_state.json`` records
+per source the first day not yet exported, so each run adds one new part
+file per month it touches. Part files are written under a ``.tmp`` name and
+renamed, and the state saved, only once every table is complete; a failed
+run leaves nothing behind and the next one starts from the same day.
+
+Orders are exported once completed, which may be after their day was. So each
+run reads orders again from `LATE_DAYS` before its first new day, and skips
+those the state lists as already written; the late ones land in a new part
+file of their month. An order completed more than `LATE_DAYS` after it was
+placed is not picked up.
+"""
+import csv
+import json
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from apps.menu.models import MenuItem, Order
+from apps.reservations.models import Reservation
+from apps.review.models import Review
+
+from .archiver import detail, start_of
+from .models import ArchivedOrder
+from .reports import reaches_archive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:     # optional: without it the export falls back to CSV
+    pa = pq = None
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv'}
+BATCH_SIZE = 5000
+STATE_FILE = '_state.json'
+ZERO = Decimal("0.00")
+# days of orders re-read for those completed after their day was exported
+LATE_DAYS = 7
+
+# column name -> type ('int', 'str', 'bool', 'decimal', 'date', 'time', 'datetime')
+TABLES = {
+    'orders': {
+        'order_id': 'int', 'order_id_str': 'str', 'order_date': 'datetime', 'day': 'date',
+        'weekday': 'int', 'hour': 'int', 'order_type': 'str', 'status': 'str', 'user_id': 'int',
+        'lines': 'int', 'portions': 'int', 'subtotal': 'decimal', 'total': 'decimal',
+        'delivery_fee': 'decimal', 'takeout_fee': 'decimal', 'payment_method': 'str', 'archived': 'bool',
+    },
+    'order_items': {
+        'order_id': 'int', 'order_date': 'datetime', 'day': 'date', 'weekday': 'int', 'hour': 'int',
+        'order_type': 'str', 'item_id': 'int', 'item_name': 'str', 'category': 'str', 'subcategory': 'str',
+        'quantity': 'int', 'unit_price': 'decimal', 'subtotal': 'decimal', 'promo_id': 'int',
+        'toppings': 'str', 'topping_count': 'int', 'toppings_price': 'decimal', 'archived': 'bool',
+    },
+    'reservations': {
+        'reservation_id': 'int', 'user_id': 'int', 'date': 'date', 'time': 'time', 'weekday': 'int',
+        'hour': 'int', 'guest_count': 'int', 'status': 'str', 'table_number': 'int', 'tables': 'int',
+        'created_at': 'datetime', 'lead_days': 'int',
+    },
+    'reviews': {
+        'review_id': 'int', 'submission_date': 'datetime', 'day': 'date', 'weekday': 'int', 'hour': 'int',
+        'rating': 'int', 'would_you_recommend': 'str', 'is_verified': 'bool', 'helpful_count': 'int',
+        'date_of_visit': 'date', 'dishes_ordered': 'str', 'review_title': 'str', 'review_text': 'str',
+    },
+}
+
+
+def default_format():
+    return 'parquet' if pa is not None else 'csv'
+
+
+def _month(day):
+    return f"{day:%Y-%m}"
+
+
+def _when(moment):
+    """day/weekday/hour columns of an aware datetime, in local time."""
+    local = timezone.localtime(moment)
+    return {'day': local.date(), 'weekday': local.weekday(), 'hour': local.hour}
+
+
+# --- sources: each yields (table, month, row) for the days in [start, end) ---
+
+def _window(qs, field, start, end):
+    if start is not None:
+        qs = qs.filter(**{f'{field}__gte': start_of(start)})
+    return qs.filter(**{f'{field}__lt': start_of(end)})
+
+
+def _categories():
+    return {
+        row['item_id']: (row['subcategory_id__category_id__category'] or '', row['subcategory_id__subcategory'] or '')
+        for row in MenuItem.objects.values('item_id', 'subcategory_id__category_id__category', 'subcategory_id__subcategory')
+    }
+
+
+def _order_records(order_id, header, data, archived, categories):
+    """('orders' | 'order_items', month, row) of one order: its header fields plus `archiver.detail` data."""
+    when = _when(header['order_date'])
+    month = _month(when['day'])
+    lines = []
+    for line in data['items']:
+        category, subcategory = categories.get(line['item_id'], ('', ''))
+        toppings = line['toppings']
+        lines.append({
+            'order_id': order_id, 'order_date': header['order_date'], **when,
+            'order_type': header['order_type'], 'item_id': line['item_id'], 'item_name': line['name'],
+            'category': category, 'subcategory': subcategory, 'quantity': line['quantity'],
+            'unit_price': Decimal(line['price']), 'subtotal': Decimal(line['subtotal']), 'promo_id': line['promo_id'],
+            'toppings': ','.join(topping['name'] for topping in toppings), 'topping_count': len(toppings),
+            'toppings_price': sum((Decimal(topping['price']) for topping in toppings), ZERO),
+            'archived': archived,
+        })
+    yield 'orders', month, {
+        'order_id': order_id, **header, **when,
+        'lines': len(lines), 'portions': sum(line['quantity'] for line in lines),
+        'delivery_fee': Decimal(data['delivery']['fee']) if 'delivery' in data else ZERO,
+        'takeout_fee': Decimal(data['takeout']['fee']) if 'takeout' in data else ZERO,
+        'payment_method': data['transactions'][0]['method'] if data['transactions'] else '',
+        'archived': archived,
+    }
+    for line in lines:
+        yield 'order_items', month, line
+
+
+def _header(order):
+    return {
+        'order_id_str': order.order_id_str, 'order_date': order.order_date, 'order_type': order.order_type,
+        'status': order.status, 'user_id': order.user_id, 'subtotal': order.subtotal, 'total': order.total,
+    }
+
+
+def orders(start, end, batch_size=BATCH_SIZE, skip=()):
+    """Completed orders and their lines, live then archived, leaving out the ids in `skip`."""
+    categories = _categories()
+    live = (
+        _window(Order.objects.filter(status=Order.Status.COMPLETED), 'order_date', start, end)
+        .select_related('delivery', 'takeout')
+        .prefetch_related('items__item', 'items__topping_links__topping', 'transactions')
+        .order_by('order_date', 'pk')
+    )
+    exported = set(skip)
+    for order in live.iterator(chunk_size=batch_size):
+        if order.pk in exported:
+            continue
+        exported.add(order.pk)
+        yield from _order_records(order.pk, _header(order), detail(order), False, categories)
+
+    if not reaches_archive(start):
+        return
+    archived = _window(ArchivedOrder.objects.all(), 'order_date', start, end).order_by('order_date', 'pk')
+    for order in archived.iterator(chunk_size=batch_size):
+        if order.order_id in exported:      # written earlier, or live in this run after an archive pass cut short
+            continue
+        yield from _order_records(order.order_id, _header(order), order.detail, True, categories)
+
+
+def reservations(start, end, batch_size=BATCH_SIZE):
+    qs = Reservation.objects.filter(date__lt=end)
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    qs = qs.select_related('table_id').prefetch_related('joined_tables').order_by('date', 'time', 'pk')
+    for booking in qs.iterator(chunk_size=batch_size):
+        yield 'reservations', _month(booking.date), {
+            'reservation_id': booking.reservation_id, 'user_id': booking.user_id_id,
+            'date': booking.date, 'time': booking.time, 'weekday': booking.date.weekday(),
+            'hour': booking.time.hour, 'guest_count': booking.guest_count, 'status': booking.status,
+            'table_number': booking.table_id.table_number, 'tables': 1 + len(booking.joined_tables.all()),
+            'created_at': booking.created_at,
+            'lead_days': (booking.date - timezone.localdate(booking.created_at)).days,
+        }
+
+
+def reviews(start, end, batch_size=BATCH_SIZE):
+    qs = _window(Review.objects.all(), 'submission_date', start, end).order_by('submission_date', 'pk')
+    for review in qs.iterator(chunk_size=batch_size):
+        when = _when(review.submission_date)
+        yield 'reviews', _month(when['day']), {
+            'review_id': review.review_id, 'submission_date': review.submission_date, **when,
+            'rating': review.rating, 'would_you_recommend': review.would_you_recommend,
+            'is_verified': review.is_verified, 'helpful_count': review.helpful_count,
+            'date_of_visit': review.date_of_visit, 'dishes_ordered': review.dishes_ordered,
+            'review_title': review.review_title, 'review_text': review.review_text,
+        }
+
+
+# source name -> (rows, tables it writes, days re-read for late rows)
+# A source with late days takes `skip`, the ids (first column of its first
+# table) it already wrote; the state keeps those of the re-read days.
+SOURCES = {
+    'orders': (orders, ('orders', 'order_items'), LATE_DAYS),
+    'reservations': (reservations, ('reservations',), 0),
+    'reviews': (reviews, ('reviews',), 0),
+}
+
+
+# --- writers ---
+
+def _arrow_schema(columns):
+    types = {
+        'int': pa.int64(), 'str': pa.string(), 'bool': pa.bool_(), 'decimal': pa.decimal128(12, 2),
+        'date': pa.date32(), 'time': pa.time64('us'), 'datetime': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([pa.field(name, types[kind]) for name, kind in columns.items()])
+
+
+class CsvPart:
+    def __init__(self, path, columns):
+        self.columns = list(columns)
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+
+    def write(self, rows):
+        self.writer.writerows([['' if row[name] is None else row[name] for name in self.columns] for row in rows])
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowPart:
+    """A Parquet or Arrow IPC file, one record batch (row group) per `write`."""
+    def __init__(self, path, columns, fmt):
+        self.schema = _arrow_schema(columns)
+        if fmt == 'parquet':
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self.sink = pa.OSFile(path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+
+    def write(self, rows):
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+        if hasattr(self, 'sink'):
+            self.sink.close()
+
+
+class PartitionedWriter:
+    """One table of one run: buffers rows per month, one part file per month."""
+    def __init__(self, root, table, fmt, run_id, batch_size=BATCH_SIZE):
+        self.root, self.table, self.fmt, self.run_id, self.batch_size = root, table, fmt, run_id, batch_size
+        self.columns = TABLES[table]
+        self.buffers = {}
+        self.parts = {}         # month -> (part, tmp path)
+        self.rows = 0
+
+    def add(self, month, row):
+        buffer = self.buffers.setdefault(month, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._flush(month)
+
+    def _flush(self, month):
+        rows = self.buffers.pop(month, None)
+        if not rows:
+            return
+        if month not in self.parts:
+            folder = os.path.join(self.root, self.table, f"month={month}")
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"part-{self.run_id}{FORMATS[self.fmt]}.tmp")
+            part = CsvPart(path, self.columns) if self.fmt == 'csv' else ArrowPart(path, self.columns, self.fmt)
+            self.parts[month] = (part, path)
+        self.parts[month][0].write(rows)
+        self.rows += len(rows)
+
+    def close(self):
+        for month in list(self.buffers):
+            self._flush(month)
+        for part, _ in self.parts.values():
+            part.close()
+
+    def commit(self):
+        for _, path in self.parts.values():
+            os.replace(path, path[:-len('.tmp')])
+
+    def abort(self):
+        for part, path in self.parts.values():
+            try:
+                part.close()
+            except Exception:
+                pass
+            if os.path.exists(path):
+                os.remove(path)
+
+
+# --- state ---
+
+def load_state(root):
+    try:
+        with open(os.path.join(root, STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'format': None, 'sources': {}, 'late': {}, 'runs': []}
+
+
+def save_state(root, state):
+    path = os.path.join(root, STATE_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def export(root, fmt=None, sources=tuple(SOURCES), batch_size=BATCH_SIZE, today=None):
+    """Write the days not exported yet, up to yesterday; returns {table: rows written}."""
+    fmt = fmt or default_format()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}.")
+    if fmt != 'csv' and pa is None:
+        raise RuntimeError(f"Writing {fmt} needs pyarrow (pip install pyarrow); use --format csv.")
+    unknown = set(sources) - set(SOURCES)
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(sorted(unknown))}.")
+
+    os.makedirs(root, exist_ok=True)
+    state = load_state(root)
+    if state['format'] not in (None, fmt):
+        raise ValueError(f"{root} holds {state['format']} files; export to another directory to change format.")
+
+    end = today or timezone.localdate()
+    now = timezone.now()
+    run_id = f"{now:%Y%m%dT%H%M%S}"
+    # a second run within the same second must not overwrite the first one's parts
+    taken = {run['run'] for run in state['runs']}
+    for n in range(2, len(taken) + 2):
+        if run_id not in taken:
+            break
+        run_id = f"{now:%Y%m%dT%H%M%S}-{n}"
+    writers = {}
+    written = {}            # source with late days -> {day: ids written}
+    try:
+        for name in sources:
+            rows, tables, late_days = SOURCES[name]
+            start = state['sources'].get(name)
+            start = date.fromisoformat(start) if start else None
+            for table in tables:
+                writers[table] = PartitionedWriter(root, table, fmt, run_id, batch_size)
+            options = {}
+            if late_days:
+                late = state.get('late', {}).get(name)
+                written[name] = {day: set(ids) for day, ids in late['ids'].items()} if late else {}
+                if late:
+                    start = date.fromisoformat(late['since'])
+                options['skip'] = set().union(*written[name].values())
+            if start is not None and start >= end:
+                continue
+            key = next(iter(TABLES[tables[0]]))
+            for table, month, row in rows(start, end, batch_size, **options):
+                writers[table].add(month, row)
+                if late_days and table == tables[0]:
+                    written[name].setdefault(row['day'].isoformat(), set()).add(row[key])
+        for writer in writers.values():
+            writer.close()
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+
+    for writer in writers.values():
+        writer.commit()
+    counts = {table: writer.rows for table, writer in writers.items()}
+    state['format'] = fmt
+    for name in sources:
+        state['sources'][name] = end.isoformat()
+        if name in written:
+            since = (end - timedelta(days=SOURCES[name][2])).isoformat()
+            state.setdefault('late', {})[name] = {'since': since, 'ids': {
+                day: sorted(ids) for day, ids in sorted(written[name].items()) if day >= since
+            }}
+    state['runs'].append({'run': run_id, 'until': end.isoformat(), 'rows': counts})
+    save_state(root, state)
+    return counts
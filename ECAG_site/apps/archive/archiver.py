@@ -0,0 +1,239 @@
+"""Order archiving: move old completed orders out of the live order tables.
+
+`archive` takes the completed orders placed before the cutoff (today minus
+``ORDER_ARCHIVE["HORIZON_DAYS"]``) and, `BATCH_SIZE` orders at a time:
+
+1. writes one `ArchivedOrder` per order to the archive database, with its
+   lines, toppings, delivery/takeout and payments folded into ``detail``
+   (payment card data is not copied, only the last four digits);
+2. in one transaction on the main database, adds the batch to the rollups
+   (`DailySales`, `DailyItemSales`, `CustomerRollup`) and deletes the orders
+   with everything hanging off them.
+
+Step 1 skips orders already archived, so a pass cut short between the two
+steps is finished by the next one; until then the live rows are what
+`reports` reads. The live rows are deleted table by table, without per-row
+signals: the kitchen feed has no use for "removed" events about orders closed
+months ago, and the customers' `CustomerStats` are refreshed directly (their
+archived orders are counted from `CustomerRollup`).
+
+Orders still in progress are never archived, however old. The live tables
+hold the last `HORIZON_DAYS` of orders plus those, so their size, index depth
+and VACUUM time stay bounded. ``manage.py archive_orders`` runs a pass.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core import versions
+from apps.menu import customer_stats
+from apps.menu.models import Delivery, Order, OrderItem, OrderItemTopping, Takeout, Transaction
+
+from .models import ArchivedOrder, ArchiveRun, CustomerRollup, DailyItemSales, DailySales
+from .router import database, get_setting
+
+
+def cutoff_for(today=None, horizon_days=None):
+    """First day whose orders stay live."""
+    horizon_days = get_setting("HORIZON_DAYS") if horizon_days is None else horizon_days
+    return (today or timezone.localdate()) - timedelta(days=horizon_days)
+
+
+def start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def candidates(cutoff):
+    """Completed orders placed before `cutoff`, oldest first."""
+    return Order.objects.filter(status=Order.Status.COMPLETED, order_date__lt=start_of(cutoff)).order_by('order_date', 'pk')
+
+
+def _money(value):
+    return str(value if value is not None else Decimal("0.00"))
+
+
+def _related(order, name):
+    # reverse one-to-one: raises when the order has none
+    try:
+        return getattr(order, name)
+    except (Delivery.DoesNotExist, Takeout.DoesNotExist):
+        return None
+
+
+def detail(order):
+    """What `ArchivedOrder.detail` keeps of an order (with its relations prefetched)."""
+    data = {
+        'items': [
+            {
+                'item_id': line.item_id,
+                'name': line.item.name,
+                'quantity': line.quantity,
+                'price': _money(line.price),
+                'subtotal': _money(line.subtotal),
+                'promo_id': line.promo_id,
+                'toppings': [
+                    {'topping_id': link.topping_id, 'name': link.topping.name, 'price': _money(link.price)}
+                    for link in line.topping_links.all()
+                ],
+            }
+            for line in order.items.all()
+        ],
+        'transactions': [
+            {
+                'method': payment.payment_method,
+                'amount': _money(payment.amount),
+                'status': payment.status,
+                'date': payment.transaction_date.isoformat(),
+                'card_last4': payment.card_number[-4:] if payment.card_number else '',
+            }
+            for payment in order.transactions.all()
+        ],
+    }
+    delivery = _related(order, 'delivery')
+    if delivery is not None:
+        data['delivery'] = {
+            'address': delivery.address,
+            'fee': _money(delivery.fee),
+            'status': delivery.delivery_status,
+            'arrival_time': delivery.arrival_time.isoformat() if delivery.arrival_time else None,
+        }
+    takeout = _related(order, 'takeout')
+    if takeout is not None:
+        data['takeout'] = {'fee': _money(takeout.fee), 'status': takeout.pickup_status}
+    return data
+
+
+def _archive_rows(batch):
+    now = timezone.now()
+    return [
+        ArchivedOrder(
+            order_id=order.pk,
+            order_id_str=order.order_id_str,
+            user_id=order.user_id,
+            order_type=order.order_type,
+            status=order.status,
+            order_date=order.order_date,
+            subtotal=order.subtotal,
+            total=order.total,
+            detail=detail(order),
+            archived_at=now,
+        )
+        for order in batch
+    ]
+
+
+def _add_sales(batch):
+    sales = defaultdict(lambda: {'orders': 0, 'revenue': Decimal("0.00"), 'portions': 0})
+    items = defaultdict(lambda: {'name': '', 'lines': 0, 'quantity': 0, 'revenue': Decimal("0.00")})
+    for order in batch:
+        day = timezone.localdate(order.order_date)
+        row = sales[(day, order.order_type)]
+        row['orders'] += 1
+        row['revenue'] += order.total
+        for line in order.items.all():
+            row['portions'] += line.quantity
+            item = items[(day, line.item_id)]
+            item['name'] = line.item.name
+            item['lines'] += 1
+            item['quantity'] += line.quantity
+            item['revenue'] += line.subtotal
+
+    days = {day for day, _ in sales}
+    for old in DailySales.objects.filter(date__in=days):
+        if (old.date, old.order_type) in sales:
+            row = sales[(old.date, old.order_type)]
+            row['orders'] += old.orders
+            row['revenue'] += old.revenue
+            row['portions'] += old.portions
+    DailySales.objects.bulk_create(
+        [DailySales(date=day, order_type=order_type, **row) for (day, order_type), row in sales.items()],
+        update_conflicts=True,
+        unique_fields=['date', 'order_type'],
+        update_fields=['orders', 'revenue', 'portions'],
+    )
+
+    for old in DailyItemSales.objects.filter(date__in=days):
+        if (old.date, old.item_id) in items:
+            item = items[(old.date, old.item_id)]
+            item['lines'] += old.lines
+            item['quantity'] += old.quantity
+            item['revenue'] += old.revenue
+    DailyItemSales.objects.bulk_create(
+        [DailyItemSales(date=day, item_id=item_id, **row) for (day, item_id), row in items.items()],
+        update_conflicts=True,
+        unique_fields=['date', 'item'],
+        update_fields=['name', 'lines', 'quantity', 'revenue'],
+    )
+
+
+def _add_customers(batch):
+    customers = {}
+    for order in batch:
+        if order.user_id is None:
+            continue
+        row = customers.setdefault(order.user_id, CustomerRollup(user_id=order.user_id, spend=Decimal("0.00")))
+        row.orders_count += 1
+        row.spend += order.total
+        row.last_order_date = max(filter(None, [row.last_order_date, order.order_date]))
+    for old in CustomerRollup.objects.filter(user_id__in=customers):
+        row = customers[old.user_id]
+        row.orders_count += old.orders_count
+        row.spend += old.spend
+        row.last_order_date = max(filter(None, [row.last_order_date, old.last_order_date]), default=None)
+    CustomerRollup.objects.bulk_create(
+        list(customers.values()),
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['orders_count', 'spend', 'last_order_date'],
+    )
+    return set(customers)
+
+
+def _delete_live(order_ids):
+    # children first; `_raw_delete` neither cascades nor sends per-row signals
+    for qs in (
+        OrderItemTopping.objects.filter(order_item__order_id__in=order_ids),
+        OrderItem.objects.filter(order_id__in=order_ids),
+        Delivery.objects.filter(order_id__in=order_ids),
+        Takeout.objects.filter(order_id__in=order_ids),
+        Transaction.objects.filter(order_id__in=order_ids),
+        Order.objects.filter(pk__in=order_ids),
+    ):
+        qs._raw_delete(qs.db)
+
+
+def archive_batch(batch):
+    """Archive these completed orders (loaded with `load_batch`)."""
+    with transaction.atomic(using=database()):
+        ArchivedOrder.objects.bulk_create(_archive_rows(batch), ignore_conflicts=True)
+    with transaction.atomic():
+        _add_sales(batch)
+        customer_ids = _add_customers(batch)
+        _delete_live([order.pk for order in batch])
+        customer_stats.queue(customer_ids)
+        versions.bump("orders", "users")
+
+
+def load_batch(cutoff, batch_size):
+    return list(
+        candidates(cutoff)
+        .select_related('delivery', 'takeout')
+        .prefetch_related('items__item', 'items__topping_links__topping', 'transactions')[:batch_size]
+    )
+
+
+def archive(cutoff=None, batch_size=None):
+    """Archive every completed order placed before `cutoff`; returns the `ArchiveRun`."""
+    cutoff = cutoff or cutoff_for()
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    # recorded first: from now on reports read the rollups for days before `cutoff`
+    run = ArchiveRun.objects.create(cutoff=cutoff)
+    while batch := load_batch(cutoff, batch_size):
+        archive_batch(batch)
+        run.orders += len(batch)
+    run.finished_at = timezone.now()
+    run.save(update_fields=['orders', 'finished_at'])
+    return run
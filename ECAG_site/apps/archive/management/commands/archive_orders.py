@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from apps.archive import archiver
+from apps.archive.router import database, get_setting
+
+
+class Command(BaseCommand):
+    help = "Move completed orders older than the archive horizon out of the live order tables (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help=f"Archive orders older than N days (default ORDER_ARCHIVE['HORIZON_DAYS'], {get_setting('HORIZON_DAYS')}).")
+        parser.add_argument("--batch-size", type=int, default=None, help="Orders moved per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the orders that would be archived.")
+        parser.add_argument("--vacuum", action="store_true", help="VACUUM the main SQLite database afterwards.")
+
+    def handle(self, *args, **options):
+        if options["days"] is not None and options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+        cutoff = archiver.cutoff_for(horizon_days=options["days"])
+
+        if options["dry_run"]:
+            count = archiver.candidates(cutoff).count()
+            self.stdout.write(f"{count} completed order(s) placed before {cutoff} would be archived.")
+            return
+
+        try:
+            run = archiver.archive(cutoff, batch_size=options["batch_size"])
+        except DatabaseError as e:
+            raise CommandError(f"Archiving failed ({e}). Has `manage.py migrate --database={database()}` been run?")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {run.orders} completed order(s) placed before {cutoff} to the '{database()}' database."
+        ))
+
+        if options["vacuum"]:
+            if connection.vendor != "sqlite":
+                raise CommandError("--vacuum is only supported on SQLite.")
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+            self.stdout.write(self.style.SUCCESS("Vacuumed the main database."))
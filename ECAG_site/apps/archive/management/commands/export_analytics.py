@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.archive import analytics
+
+
+class Command(BaseCommand):
+    help = "Append the days not exported yet (up to yesterday) to the columnar analytics files in DIR."
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Output directory; keeps its own export state (_state.json).")
+        parser.add_argument("--format", choices=sorted(analytics.FORMATS), default=None,
+                            help=f"File format (default {analytics.default_format()}; parquet/arrow need pyarrow).")
+        parser.add_argument("--sources", default=",".join(analytics.SOURCES),
+                            help="Comma-separated sources to export (default: all).")
+        parser.add_argument("--batch-size", type=int, default=analytics.BATCH_SIZE, help="Rows per write and per query chunk.")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        sources = [name.strip() for name in options["sources"].split(",") if name.strip()]
+        try:
+            written = analytics.export(
+                options["directory"], fmt=options["format"], sources=sources, batch_size=options["batch_size"],
+            )
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(str(e))
+        summary = ", ".join(f"{table}: {rows}" for table, rows in written.items())
+        self.stdout.write(self.style.SUCCESS(f"Exported to {options['directory']} ({summary})."))
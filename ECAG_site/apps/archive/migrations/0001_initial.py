@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('menu', '0016_customerstats_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('order_id', models.IntegerField(help_text="The live Order's id.", primary_key=True, serialize=False)),
+                ('order_id_str', models.CharField(db_index=True, max_length=20)),
+                ('user_id', models.IntegerField(blank=True, db_index=True, null=True)),
+                ('order_type', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('order_date', models.DateTimeField(db_index=True)),
+                ('subtotal', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10)),
+                ('detail', models.JSONField(blank=True, default=dict, help_text='Lines, delivery/takeout and payments (no card data).')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['order_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchiveRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('cutoff', models.DateField(help_text='Completed orders placed before this day were archived.')),
+                ('orders', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CustomerRollup',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archived_orders', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('spend', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('last_order_date', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('order_type', models.CharField(max_length=20)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('portions', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'daily sales',
+                'ordering': ['date', 'order_type'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'order_type'), name='archive_dailysales_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyItemSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(help_text="The item's name when archived.", max_length=100)),
+                ('lines', models.PositiveIntegerField(default=0)),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('item', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='menu.menuitem')),
+            ],
+            options={
+                'verbose_name_plural': 'daily item sales',
+                'ordering': ['date', 'item'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'item'), name='archive_dailyitemsales_unique')],
+            },
+        ),
+    ]
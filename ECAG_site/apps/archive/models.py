@@ -0,0 +1,98 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class ArchivedOrder(models.Model):
+    """A completed order moved out of the live order tables (see archiver.py).
+
+    One row per order: its lines, delivery/takeout and payments are folded
+    into `detail`. Lives in the archive database (`router.py`), so users and
+    menu items are plain ids, not foreign keys.
+    """
+    order_id = models.IntegerField(primary_key=True, help_text="The live Order's id.")
+    order_id_str = models.CharField(max_length=20, db_index=True)
+    user_id = models.IntegerField(null=True, blank=True, db_index=True)
+    order_type = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    order_date = models.DateTimeField(db_index=True)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+    detail = models.JSONField(default=dict, blank=True, help_text="Lines, delivery/takeout and payments (no card data).")
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['order_date']
+
+    def __str__(self):
+        return f"{self.order_id_str or self.order_id} ({self.order_date:%Y-%m-%d})"
+
+
+# Rollups: what the reports need of the archived orders, kept in the main
+# database so dashboards never have to open the archive.
+
+class DailySales(models.Model):
+    """Archived completed orders of one day and order type."""
+    date = models.DateField()
+    order_type = models.CharField(max_length=20)
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    portions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date', 'order_type']
+        verbose_name_plural = "daily sales"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'order_type'], name='archive_dailysales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.order_type}: {self.orders} orders"
+
+
+class DailyItemSales(models.Model):
+    """Archived order lines of one day and menu item."""
+    date = models.DateField()
+    # no FK constraint: the rollup outlives menu items deleted later
+    item = models.ForeignKey('menu.MenuItem', on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    name = models.CharField(max_length=100, help_text="The item's name when archived.")
+    lines = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        ordering = ['date', 'item']
+        verbose_name_plural = "daily item sales"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'item'], name='archive_dailyitemsales_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.name}: {self.quantity}"
+
+
+class CustomerRollup(models.Model):
+    """A customer's archived orders, added back into `CustomerStats` (menu/customer_stats.py)."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='archived_orders')
+    orders_count = models.PositiveIntegerField(default=0)
+    spend = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    last_order_date = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.orders_count} archived orders"
+
+
+class ArchiveRun(models.Model):
+    """One pass of ``manage.py archive_orders``."""
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    cutoff = models.DateField(help_text="Completed orders placed before this day were archived.")
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M}: {self.orders} orders before {self.cutoff}"
@@ -0,0 +1,143 @@
+"""Sales figures over live and archived orders.
+
+Reports take a range of days, ``[start, end)``, either end open (None). The
+live order tables always answer; the archive is added only when the range
+starts before the latest archive cutoff (`archived_before`), so the "last 7
+days" charts never look at it. Totals come from the rollups in the main
+database; only `orders`, which lists orders one by one, reads the archive
+database itself.
+
+Figures are over completed orders (the only ones archived).
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+
+from apps.menu.models import Order, OrderItem
+
+from .archiver import start_of
+from .models import ArchivedOrder, ArchiveRun, DailyItemSales, DailySales
+
+ZERO = Decimal("0.00")
+
+
+def archived_before():
+    """Day before which completed orders may have been archived; None when nothing was."""
+    return ArchiveRun.objects.aggregate(cutoff=Max('cutoff'))['cutoff']
+
+
+def reaches_archive(start):
+    cutoff = archived_before()
+    return cutoff is not None and (start is None or start < cutoff)
+
+
+def _live(qs, field, start, end):
+    if start is not None:
+        qs = qs.filter(**{f'{field}__gte': start_of(start)})
+    if end is not None:
+        qs = qs.filter(**{f'{field}__lt': start_of(end)})
+    return qs
+
+
+def _rolled(qs, start, end):
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lt=end)
+    return qs
+
+
+def _completed(start, end):
+    return _live(Order.objects.filter(status=Order.Status.COMPLETED), 'order_date', start, end)
+
+
+def revenue(start=None, end=None):
+    """Total of the completed orders placed in [start, end)."""
+    total = _completed(start, end).aggregate(total=Sum('total'))['total'] or ZERO
+    if reaches_archive(start):
+        total += _rolled(DailySales.objects.all(), start, end).aggregate(total=Sum('revenue'))['total'] or ZERO
+    return Decimal(total).quantize(Decimal("0.01"))
+
+
+def revenue_by_day(start, end):
+    """{day: revenue} for every day in [start, end), days without sales at zero."""
+    by_day = {start + timedelta(days=offset): ZERO for offset in range((end - start).days)}
+    live = (
+        _completed(start, end)
+        .annotate(day=TruncDate('order_date'))
+        .values('day')
+        .annotate(total=Sum('total'))
+        .values_list('day', 'total')
+    )
+    for day, total in live:
+        if day in by_day:
+            by_day[day] += total or ZERO
+    if reaches_archive(start):
+        rolled = _rolled(DailySales.objects.all(), start, end).values('date').annotate(total=Sum('revenue'))
+        for row in rolled.values_list('date', 'total'):
+            by_day[row[0]] += row[1] or ZERO
+    return by_day
+
+
+def item_sales(start=None, end=None, limit=None):
+    """Menu items by completed order lines in [start, end), most first.
+
+    Returns [{'item_id', 'name', 'lines', 'quantity', 'revenue'}, ...].
+    """
+    items = {}
+    live = (
+        _live(OrderItem.objects.filter(order__status=Order.Status.COMPLETED), 'order__order_date', start, end)
+        .values('item_id', 'item__name')
+        .annotate(lines=Count('id'), quantity=Sum('quantity'), revenue=Sum('subtotal'))
+        .order_by()
+    )
+    for row in live:
+        items[row['item_id']] = {
+            'item_id': row['item_id'], 'name': row['item__name'],
+            'lines': row['lines'], 'quantity': row['quantity'] or 0, 'revenue': row['revenue'] or ZERO,
+        }
+    if reaches_archive(start):
+        rolled = (
+            _rolled(DailyItemSales.objects.all(), start, end)
+            .values('item_id')
+            .annotate(name=Max('name'), lines=Sum('lines'), quantity=Sum('quantity'), revenue=Sum('revenue'))
+            .order_by()
+        )
+        for row in rolled:
+            item = items.setdefault(row['item_id'], {
+                'item_id': row['item_id'], 'name': row['name'], 'lines': 0, 'quantity': 0, 'revenue': ZERO,
+            })
+            item['lines'] += row['lines']
+            item['quantity'] += row['quantity']
+            item['revenue'] += row['revenue'] or ZERO
+    rows = sorted(items.values(), key=lambda item: (-item['lines'], -item['quantity'], item['name']))
+    for row in rows:
+        row['revenue'] = Decimal(row['revenue']).quantize(Decimal("0.01"))
+    return rows[:limit] if limit else rows
+
+
+ORDER_FIELDS = ('order_id_str', 'user_id', 'order_type', 'status', 'subtotal', 'total', 'order_date')
+
+
+def orders(start=None, end=None):
+    """Orders placed in [start, end) as dicts, newest first, archived ones included.
+
+    Each has ``id``, the `ORDER_FIELDS` and ``archived``. An order found in
+    both places (an archive pass cut short) is listed once, live.
+    """
+    rows = [
+        {'id': row.pop('id'), **row, 'archived': False}
+        for row in _live(Order.objects.all(), 'order_date', start, end).values('id', *ORDER_FIELDS)
+    ]
+    if reaches_archive(start):
+        live_ids = {row['id'] for row in rows}
+        archived = _live(ArchivedOrder.objects.all(), 'order_date', start, end).values('order_id', *ORDER_FIELDS)
+        rows += [
+            {'id': row.pop('order_id'), **row, 'archived': True}
+            for row in archived.iterator()
+            if row['order_id'] not in live_ids
+        ]
+    rows.sort(key=lambda row: (row['order_date'], row['id']), reverse=True)
+    return rows
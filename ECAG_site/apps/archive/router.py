@@ -0,0 +1,58 @@
+"""Database routing for archived orders.
+
+`ArchivedOrder` rows go to ``DATABASES[ORDER_ARCHIVE["DATABASE"]]``, a
+separate SQLite file by default, so the main database (and its VACUUM) only
+holds recent orders. Everything else, the archive's rollups included, stays
+on ``default``. Without that alias the archive table lives in ``default`` too.
+
+The archive database is created with ``manage.py migrate --database=archive``.
+
+Settings (all optional) live in ``settings.ORDER_ARCHIVE``::
+
+    ORDER_ARCHIVE = {
+        "HORIZON_DAYS": 365,       # archive completed orders older than this
+        "DATABASE": "archive",     # DATABASES alias of the archive
+        "BATCH_SIZE": 500,         # orders moved per transaction
+    }
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    "HORIZON_DAYS": 365,
+    "DATABASE": "archive",
+    "BATCH_SIZE": 500,
+}
+
+ARCHIVED_MODELS = {'archivedorder'}
+
+
+def get_setting(key):
+    return getattr(settings, "ORDER_ARCHIVE", {}).get(key, DEFAULTS[key])
+
+
+def database():
+    """Alias of the database holding `ArchivedOrder`."""
+    alias = get_setting("DATABASE")
+    return alias if alias in settings.DATABASES else 'default'
+
+
+def _archived(model):
+    return model._meta.app_label == 'archive' and model._meta.model_name in ARCHIVED_MODELS
+
+
+class ArchiveRouter:
+    def db_for_read(self, model, **hints):
+        return database() if _archived(model) else None
+
+    def db_for_write(self, model, **hints):
+        return database() if _archived(model) else None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        archive = database()
+        if archive == 'default':
+            return None
+        if db == archive:
+            return app_label == 'archive' and model_name in ARCHIVED_MODELS
+        if app_label == 'archive' and model_name in ARCHIVED_MODELS:
+            return False
+        return None
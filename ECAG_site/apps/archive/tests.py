@@ -0,0 +1,214 @@
+import csv
+import glob
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.menu.models import CustomerStats, MenuCategory, MenuItem, MenuSubCategory, Order, OrderItem
+
+from . import analytics, archiver, reports
+from .models import ArchivedOrder, ArchiveRun, CustomerRollup, DailyItemSales, DailySales
+from .router import database
+
+
+class ArchiveTestCase(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="regular", password="x", email="r@example.com")
+        category = MenuCategory.objects.create(category="Mains")
+        subcategory = MenuSubCategory.objects.create(subcategory="Rice", category_id=category)
+        self.dish = MenuItem.objects.create(name="Fried Rice", desc="-", price=Decimal("100"), menu_img="x.jpg",
+                                            is_available=True, subcategory_id=subcategory)
+        self.today = timezone.localdate()
+        self.cutoff = archiver.cutoff_for(self.today, horizon_days=30)
+
+    def order(self, days_ago, quantity=1, status=Order.Status.COMPLETED):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.user, order_type=Order.Ordertype.DINE_IN, status=status)
+            OrderItem.objects.create(order=order, item=self.dish, quantity=quantity)
+            Order.objects.filter(pk=order.pk).update(order_date=timezone.now() - timedelta(days=days_ago))
+        return Order.objects.get(pk=order.pk)
+
+    def archive(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return archiver.archive(self.cutoff, **kwargs)
+
+
+class ArchivePassTests(ArchiveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = [self.order(40, quantity=2), self.order(45)]
+        self.open = self.order(50, status=Order.Status.IN_PROGRESS)
+        self.recent = self.order(5, quantity=3)
+
+    def sales(self):
+        return (
+            list(DailySales.objects.order_by('date').values_list('orders', 'revenue', 'portions')),
+            list(DailyItemSales.objects.order_by('date').values_list('lines', 'quantity', 'revenue')),
+            list(CustomerRollup.objects.values_list('orders_count', 'spend')),
+        )
+
+    def test_moves_old_completed_orders_only(self):
+        run = self.archive(batch_size=1)
+        self.assertEqual(run.orders, 2)
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(set(Order.objects.values_list('pk', flat=True)), {self.open.pk, self.recent.pk})
+        self.assertFalse(OrderItem.objects.filter(order_id__in=[o.pk for o in self.old]).exists())
+
+        archived = ArchivedOrder.objects.get(order_id=self.old[0].pk)
+        self.assertEqual(archived.total, Decimal("200.00"))
+        self.assertEqual(archived.detail['items'][0]['quantity'], 2)
+        self.assertEqual(self.sales(), (
+            [(1, Decimal("100.00"), 1), (1, Decimal("200.00"), 2)],
+            [(1, 1, Decimal("100.00")), (1, 2, Decimal("200.00"))],
+            [(2, Decimal("300.00"))],
+        ))
+        # live orders plus the rollup
+        stats = CustomerStats.objects.get(user=self.user)
+        self.assertEqual((stats.orders_count, stats.lifetime_spend), (4, Decimal("600.00")))
+
+    def test_rerun_after_a_pass_cut_short(self):
+        # step 1 of a batch made it to the archive database, step 2 never ran
+        ArchiveRun.objects.create(cutoff=self.cutoff)
+        with transaction.atomic(using=database()):
+            ArchivedOrder.objects.bulk_create(archiver._archive_rows(archiver.load_batch(self.cutoff, 10)))
+        listed = [row['id'] for row in reports.orders()]
+        self.assertEqual(sorted(listed), sorted([*(o.pk for o in self.old), self.open.pk, self.recent.pk]))
+        self.assertEqual(reports.revenue(), Decimal("600.00"))
+
+        self.assertEqual(self.archive().orders, 2)
+        counted = self.sales()
+        self.assertEqual(counted[2], [(2, Decimal("300.00"))])
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+
+        # and a pass with nothing left to move changes nothing
+        self.assertEqual(self.archive().orders, 0)
+        self.assertEqual(self.sales(), counted)
+        self.assertEqual(reports.revenue(), Decimal("600.00"))
+
+
+class ReportsAcrossCutoffTests(ArchiveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = self.order(40, quantity=2)
+        self.recent = self.order(5, quantity=3)
+        self.order(6, status=Order.Status.IN_PROGRESS)
+        self.archive()
+
+    def test_revenue(self):
+        self.assertEqual(reports.revenue(), Decimal("500.00"))
+        self.assertEqual(reports.revenue(start=self.cutoff), Decimal("300.00"))
+        self.assertEqual(reports.revenue(end=self.cutoff), Decimal("200.00"))
+
+    def test_revenue_by_day(self):
+        by_day = reports.revenue_by_day(self.today - timedelta(days=45), self.today + timedelta(days=1))
+        self.assertEqual(len(by_day), 46)
+        self.assertEqual(by_day[timezone.localdate(self.old.order_date)], Decimal("200.00"))
+        self.assertEqual(by_day[timezone.localdate(self.recent.order_date)], Decimal("300.00"))
+        self.assertEqual(sum(by_day.values()), Decimal("500.00"))
+
+    def test_item_sales(self):
+        self.assertEqual(reports.item_sales(), [{
+            'item_id': self.dish.pk, 'name': "Fried Rice", 'lines': 2, 'quantity': 5, 'revenue': Decimal("500.00"),
+        }])
+        self.assertEqual(reports.item_sales(start=self.cutoff)[0]['quantity'], 3)
+
+    def test_orders(self):
+        rows = reports.orders()
+        self.assertEqual([(row['id'], row['archived']) for row in rows][-1], (self.old.pk, True))
+        self.assertEqual(len(rows), 3)
+        self.assertNotIn(self.old.pk, [row['id'] for row in reports.orders(start=self.cutoff)])
+
+
+class ExportOrdersTests(ArchiveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = self.order(40)
+        self.recent = self.order(5)
+        self.archive()
+
+    def export(self, **params):
+        response = self.client.get("/admin_panel/export/orders/", params)
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        return [(int(row[0]), row[-1]) for row in rows[1:]]
+
+    def day(self, days_ago):
+        return (self.today - timedelta(days=days_ago)).isoformat()
+
+    def test_date_filter(self):
+        self.assertEqual(self.export(), [(self.recent.pk, "No"), (self.old.pk, "Yes")])
+        self.assertEqual(self.export(**{'from': self.day(10)}), [(self.recent.pk, "No")])
+        self.assertEqual(self.export(**{'from': self.day(60), 'to': self.day(20)}), [(self.old.pk, "Yes")])
+        # `to` is inclusive
+        old_day = timezone.localdate(self.old.order_date).isoformat()
+        self.assertEqual(self.export(**{'from': old_day, 'to': old_day}), [(self.old.pk, "Yes")])
+
+    def test_bad_dates(self):
+        response = self.client.get("/admin_panel/export/orders/", {'from': "last week"})
+        self.assertEqual(response.status_code, 400)
+
+
+class AnalyticsExportTests(ArchiveTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def export(self, days_ahead=0):
+        return analytics.export(self.root, fmt='csv', sources=('orders',), today=self.today + timedelta(days=days_ahead))
+
+    def exported(self, table='orders'):
+        ids = []
+        for path in sorted(glob.glob(os.path.join(self.root, table, 'month=*', '*.csv'))):
+            with open(path, newline='', encoding='utf-8') as f:
+                ids += [int(row['order_id']) for row in csv.DictReader(f)]
+        return ids
+
+    def state(self):
+        with open(os.path.join(self.root, analytics.STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_csv_files_and_state(self):
+        done = self.order(3, quantity=2)
+        self.order(2, status=Order.Status.IN_PROGRESS)
+        self.assertEqual(self.export(), {'orders': 1, 'order_items': 1})
+
+        with open(glob.glob(os.path.join(self.root, 'orders', 'month=*', '*.csv'))[0], newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(list(rows[0]), list(analytics.TABLES['orders']))
+        self.assertEqual((rows[0]['order_id'], rows[0]['portions'], rows[0]['total']), (str(done.pk), "2", "200.00"))
+        self.assertFalse(glob.glob(os.path.join(self.root, '**', '*.tmp'), recursive=True))
+
+        state = self.state()
+        self.assertEqual((state['format'], state['sources']), ('csv', {'orders': self.today.isoformat()}))
+        self.assertEqual(state['late']['orders']['since'], (self.today - timedelta(days=analytics.LATE_DAYS)).isoformat())
+        self.assertEqual(state['late']['orders']['ids'], {timezone.localdate(done.order_date).isoformat(): [done.pk]})
+        self.assertEqual(state['runs'][0]['rows'], {'orders': 1, 'order_items': 1})
+
+    def test_order_completed_after_its_day_was_exported(self):
+        done = self.order(3)
+        late = self.order(2, status=Order.Status.IN_PROGRESS)
+        self.export()
+        self.assertEqual(self.exported(), [done.pk])
+
+        late.status = Order.Status.COMPLETED
+        with self.captureOnCommitCallbacks(execute=True):
+            late.save()
+        self.assertEqual(self.export(days_ahead=1), {'orders': 1, 'order_items': 1})
+        self.assertEqual(sorted(self.exported()), sorted([done.pk, late.pk]))
+
+        # nothing is written twice, and days leave the state once past the window
+        self.assertEqual(self.export(days_ahead=9), {'orders': 0, 'order_items': 0})
+        self.assertEqual(sorted(self.exported('order_items')), sorted([done.pk, late.pk]))
+        self.assertEqual(self.state()['late']['orders']['ids'], {})
@@ -0,0 +1,428 @@
+"""Static asset build and serving.
+
+``manage.py collectstatic`` is the build step. The staticfiles storage below
+runs three stages on top of Django's manifest storage:
+
+1. bundles: each entry of ``STATIC_PIPELINE["BUNDLES"]`` is the sources a
+   page loads, concatenated and minified into ``bundles/<name>``;
+2. hashing: ``ManifestStaticFilesStorage`` copies every file to a
+   content-hashed name (``menu.3f9a1c.js``) and records it in
+   ``staticfiles.json``, which ``{% static %}`` and ``{% bundle %}`` read;
+3. precompression: text files get ``.gz`` (and ``.br`` when the optional
+   ``brotli`` package is installed) siblings, written once at build time.
+
+`StaticFilesApplication` wraps the WSGI app (see ECAG_site/wsgi.py) and
+answers ``STATIC_URL`` requests from ``STATIC_ROOT`` before Django sees them:
+it picks the precompressed variant the client accepts, marks hashed files
+cacheable for a year (``immutable``) and answers revalidation with 304. With
+a reverse proxy in front, point it at ``STATIC_ROOT`` instead; the files and
+headers are the same.
+
+Settings live in ``settings.STATIC_PIPELINE``::
+
+    STATIC_PIPELINE = {
+        "BUNDLES": {"menu.js": ["js/cart_sync.js", "js/sidebar.js"]},
+        "COMPRESS_MIN_SIZE": 512,
+        "MAX_AGE": 365 * 24 * 3600,
+    }
+"""
+import gzip
+import json
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .middleware import accepted_encodings
+
+try:
+    import brotli
+except ImportError:     # optional: only .gz variants are written without it
+    brotli = None
+
+DEFAULTS = {
+    "BUNDLES": {},
+    "COMPRESS_MIN_SIZE": 512,
+    "MAX_AGE": 365 * 24 * 3600,
+}
+
+BUNDLE_DIR = "bundles"
+COMPRESSIBLE = {".js", ".css", ".svg", ".json", ".txt", ".html", ".map", ".xml", ".ico", ".ttf", ".eot"}
+SHORT_MAX_AGE = 60      # files requested by their unhashed name may change on the next deploy
+
+
+def get_setting(key):
+    return getattr(settings, "STATIC_PIPELINE", {}).get(key, DEFAULTS[key])
+
+
+def bundle_path(name):
+    return f"{BUNDLE_DIR}/{name}"
+
+
+# --- minification ---------------------------------------------------------
+
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "instanceof", "new", "delete", "void", "throw"}
+
+
+def _skip_string(src, i):
+    quote = src[i]
+    j = i + 1
+    while j < len(src) and src[j] != quote:
+        if src[j] == "\\":
+            j += 1
+        elif src[j] == "\n":
+            break
+        j += 1
+    return j + 1
+
+
+def _skip_code(src, i):
+    """Index just past the `}` closing a template `${ ... }` that starts at `i`."""
+    depth = 0
+    j = i
+    while j < len(src):
+        c = src[j]
+        if c in "\"'":
+            j = _skip_string(src, j)
+            continue
+        if c == "`":
+            j = _skip_template(src, j)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            if depth == 0:
+                return j + 1
+            depth -= 1
+        j += 1
+    return j
+
+
+def _skip_template(src, i):
+    j = i + 1
+    while j < len(src):
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "`":
+            return j + 1
+        if src.startswith("${", j):
+            j = _skip_code(src, j + 2)
+            continue
+        j += 1
+    return j
+
+
+def _skip_regex(src, i):
+    j = i + 1
+    in_class = False
+    while j < len(src) and src[j] != "\n":
+        c = src[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "[":
+            in_class = True
+        elif c == "]":
+            in_class = False
+        elif c == "/" and not in_class:
+            return j + 1
+        j += 1
+    return j
+
+
+def minify_js(src):
+    """Drop comments, indentation, blank lines and repeated spaces.
+
+    Line breaks are kept, so automatic semicolon insertion sees the same
+    program; strings, template literals and regex literals are copied as-is.
+    A ``/`` starts a regex literal where an operand is expected: after an
+    operator or punctuator (but not a postfix ``++``/``--``), at the start
+    of a line, or after a keyword such as ``return``.
+    """
+    src = src.replace("\r\n", "\n")
+    out = []
+    i, n = 0, len(src)
+    pending_space = False
+    last = ""           # last significant character written
+    tail = ""           # last two, to tell `i++ / 2` from `x = +/re/.test(s)`
+    word = ""           # last identifier written, for `return /re/` and friends
+
+    def emit(text):
+        nonlocal pending_space, last, tail
+        if pending_space and out and out[-1][-1:] != "\n":
+            out.append(" ")
+        pending_space = False
+        out.append(text)
+        last = text[-1]
+        tail = (tail + text)[-2:]
+
+    def newline():
+        nonlocal pending_space, last, tail
+        pending_space = False
+        if out and out[-1][-1:] != "\n":
+            out.append("\n")
+            last = tail = "\n"
+
+    while i < n:
+        c = src[i]
+        if c in " \t":
+            pending_space = True
+            i += 1
+        elif c == "\n":
+            newline()
+            i += 1
+        elif c in "\"'":
+            end = _skip_string(src, i)
+            emit(src[i:end])
+            word = ""
+            i = end
+        elif c == "`":
+            end = _skip_template(src, i)
+            emit(src[i:end])
+            word = ""
+            i = end
+        elif src.startswith("//", i):
+            end = src.find("\n", i)
+            i = n if end == -1 else end
+        elif src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            if "\n" in src[i:end]:
+                newline()
+            else:
+                pending_space = True
+            i = end
+        elif c == "/" and tail not in ("++", "--") and (
+                last in _REGEX_PRECEDERS or last in ("", "\n") or word in _REGEX_KEYWORDS):
+            end = _skip_regex(src, i)
+            emit(src[i:end])
+            word = ""
+            i = end
+        else:
+            match = re.match(r"[A-Za-z0-9_$]+", src[i:i + 64])
+            token = match.group(0) if match else c
+            emit(token)
+            word = token if match else ""
+            i += len(token)
+    return "".join(out).strip() + "\n"
+
+
+def minify_css(src):
+    """Drop comments and the whitespace CSS doesn't need; strings are kept as-is."""
+    src = src.replace("\r\n", "\n")
+    out = []
+    i, n = 0, len(src)
+    while i < n:
+        c = src[i]
+        if c in "\"'":
+            end = _skip_string(src, i)
+            out.append(src[i:end])
+            i = end
+        elif src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            out.append(" ")
+        elif c.isspace():
+            while i < n and src[i].isspace():
+                i += 1
+            out.append(" ")
+        else:
+            out.append(c)
+            i += 1
+    css = "".join(out)
+    # only outside strings: split on them so their contents stay untouched
+    parts = re.split(r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')", css)
+    for index in range(0, len(parts), 2):
+        part = re.sub(r" ?([{};,]) ?", r"\1", parts[index])
+        parts[index] = part.replace(";}", "}")
+    return "".join(parts).strip() + "\n"
+
+
+def build_bundle(name, sources):
+    """Concatenated, minified contents of `sources` (paths as used with {% static %})."""
+    minify = minify_css if name.endswith(".css") else minify_js
+    chunks = []
+    for source in sources:
+        path = finders.find(source)
+        if not path:
+            raise ValueError(f"Static bundle {name!r}: {source!r} not found")
+        with open(path, encoding="utf-8") as handle:
+            chunks.append(minify(handle.read()))
+    # `;` between scripts so one file's last statement can't run into the next
+    separator = "\n" if name.endswith(".css") else ";\n"
+    return separator.join(chunks)
+
+
+# --- build ----------------------------------------------------------------
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes page bundles and precompressed variants.
+
+    Until collectstatic has written a manifest (a fresh checkout, the test
+    runner) it hands out the plain source names instead of failing on every
+    ``{% static %}``; `collected` tells ``{% bundle %}`` to list the sources.
+    """
+
+    @property
+    def collected(self):
+        return bool(self.hashed_files)
+
+    def stored_name(self, name):
+        if not self.collected:
+            return self.clean_name(name)
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        paths = dict(paths)
+        for name, sources in get_setting("BUNDLES").items():
+            path = bundle_path(name)
+            if self.exists(path):
+                self.delete(path)
+            self._save(path, ContentFile(build_bundle(name, sources).encode("utf-8")))
+            paths[path] = (self, path)
+
+        written = set()
+        for original, processed, done in super().post_process(paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                written.update(name for name in (original, processed) if name)
+            yield original, processed, done
+
+        for name in sorted(written):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                self._compress(name)
+
+    def _compress(self, name):
+        path = self.path(name)
+        with open(path, "rb") as handle:
+            data = handle.read()
+        if len(data) < get_setting("COMPRESS_MIN_SIZE"):
+            return
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            if len(compressed) < len(data):
+                with open(path + suffix, "wb") as handle:
+                    handle.write(compressed)
+
+
+# --- serving --------------------------------------------------------------
+
+class _StaticFile:
+    __slots__ = ("path", "headers", "etag", "variants")
+
+    def __init__(self, path, headers, etag, variants):
+        self.path = path
+        self.headers = headers
+        self.etag = etag
+        self.variants = variants        # [(encoding, path, size)], best first
+
+
+class StaticFilesApplication:
+    """WSGI wrapper serving collected static files (with their .br/.gz variants)."""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = str(root or getattr(settings, "STATIC_ROOT", "") or "")
+        self.prefix = prefix or settings.STATIC_URL
+        if not self.prefix.startswith("/"):
+            self.prefix = "/" + self.prefix
+        self.files = self._scan() if self.root and not settings.DEBUG else {}
+
+    def _immutable_names(self):
+        try:
+            with open(os.path.join(self.root, ManifestStaticFilesStorage.manifest_name), encoding="utf-8") as handle:
+                return set(json.load(handle).get("paths", {}).values())
+        except (OSError, ValueError):
+            return set()
+
+    def _scan(self):
+        if not os.path.isdir(self.root):
+            return {}
+        immutable = self._immutable_names()
+        max_age = get_setting("MAX_AGE")
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for filename in names:
+                if filename.endswith((".gz", ".br")):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                stat = os.stat(path)
+                content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+                    content_type += "; charset=utf-8"
+                cache = (f"public, max-age={max_age}, immutable" if name in immutable
+                         else f"public, max-age={SHORT_MAX_AGE}")
+                variants = [
+                    (encoding, path + suffix, os.path.getsize(path + suffix))
+                    for encoding, suffix in (("br", ".br"), ("gzip", ".gz"))
+                    if os.path.exists(path + suffix)
+                ]
+                variants.append((None, path, stat.st_size))
+                headers = [
+                    ("Content-Type", content_type),
+                    ("Cache-Control", cache),
+                    ("Last-Modified", formatdate(stat.st_mtime, usegmt=True)),
+                ]
+                if len(variants) > 1:
+                    headers.append(("Vary", "Accept-Encoding"))
+                etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}'
+                files[name] = _StaticFile(path, headers, etag, variants)
+        return files
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if not path.startswith(self.prefix) or environ.get("REQUEST_METHOD") not in ("GET", "HEAD"):
+            return self.application(environ, start_response)
+        static_file = self.files.get(path[len(self.prefix):])
+        if static_file is None:
+            return self.application(environ, start_response)
+
+        accepted = accepted_encodings(environ.get("HTTP_ACCEPT_ENCODING", ""))
+        encoding, file_path, size = next(
+            variant for variant in static_file.variants
+            if variant[0] is None or variant[0] in accepted
+        )
+        etag = static_file.etag + (f'-{encoding}"' if encoding else '"')
+        headers = list(static_file.headers) + [("ETag", etag)]
+
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+            start_response("304 Not Modified", headers)
+            return []
+
+        headers.append(("Content-Length", str(size)))
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
+        start_response("200 OK", headers)
+        if environ.get("REQUEST_METHOD") == "HEAD":
+            return []
+        handle = open(file_path, "rb")
+        file_wrapper = environ.get("wsgi.file_wrapper")
+        if file_wrapper:
+            return file_wrapper(handle, self.chunk_size)
+        return _iter_file(handle, self.chunk_size)
+
+
+def _iter_file(handle, chunk_size):
+    with handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
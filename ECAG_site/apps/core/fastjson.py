@@ -0,0 +1,128 @@
+"""JSON encoding for the APIs: orjson when installed, the standard library otherwise.
+
+* `dumps` / `loads` are drop-in for the whole site: compact UTF-8 bytes out,
+  ``Decimal`` as a string (as DRF and ``DjangoJSONEncoder`` already do),
+  ``datetime``, ``date``, ``time`` and ``UUID`` as ISO strings.
+* `fast_json_response` replaces ``JsonResponse`` in the hand-written mobile
+  endpoints.
+* `JSONRenderer` / `JSONParser` replace DRF's (see ``REST_FRAMEWORK`` in
+  settings.py).
+
+orjson does the UUID work in C; the types it doesn't know (``Decimal``, lazy
+translation strings, querysets, sets) come back to Python through `_default`.
+So do dates and times: orjson would write UTC as ``+00:00`` with microseconds,
+where ``DjangoJSONEncoder`` writes ``Z`` and milliseconds, and the APIs keep
+Django's format. Without orjson the same output comes from ``json`` with
+``DjangoJSONEncoder``.
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.query import QuerySet
+from django.http import HttpResponse
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+try:
+    import orjson
+except ImportError:     # optional: the stdlib path below gives the same output, slower
+    orjson = None
+
+CONTENT_TYPE = "application/json"
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _default(obj):
+    if isinstance(obj, (datetime.date, datetime.time)):     # datetime too
+        return _django_encoder.default(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):     # numpy scalars and arrays
+        return obj.tolist()
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class _Encoder(DjangoJSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, (datetime.date, datetime.time, uuid.UUID)):
+            return super().default(obj)
+        try:
+            return _default(obj)
+        except TypeError:
+            return super().default(obj)
+
+
+def stdlib_dumps(obj, indent=None):
+    separators = None if indent else (",", ":")
+    return json.dumps(obj, cls=_Encoder, ensure_ascii=False, indent=indent, separators=separators).encode("utf-8")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(obj, indent=None):
+        """`obj` as compact (or 2-space indented) UTF-8 JSON bytes."""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    dumps = stdlib_dumps
+
+    def loads(data):
+        return json.loads(data)
+
+
+def fast_json_response(data, status=200, **kwargs):
+    """``JsonResponse`` equivalent that encodes with `dumps`."""
+    return HttpResponse(dumps(data), content_type=CONTENT_TYPE, status=status, **kwargs)
+
+
+class JSONRenderer(BaseRenderer):
+    media_type = CONTENT_TYPE
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = None
+        if accepted_media_type:
+            # the browsable API asks for ``application/json; indent=4``
+            params = dict(part.strip().partition("=")[::2] for part in accepted_media_type.split(";")[1:])
+            indent = params.get("indent")
+        indent = indent or (renderer_context or {}).get("indent")
+        try:
+            indent = int(indent) if indent else None
+        except ValueError:
+            indent = None
+        return dumps(data, indent=indent)
+
+
+class JSONParser(BaseParser):
+    media_type = CONTENT_TYPE
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,60 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from apps.login_registration import tokens
+
+ENDPOINTS = [
+    "/menu/mobile/data/",
+    "/admin_panel/mobile/orders/",
+    "/admin_panel/mobile/reservations/",
+    "/admin_panel/mobile/reviews/",
+    "/api/menu/orders/?view=staff",
+]
+
+
+class Command(BaseCommand):
+    help = "Bytes on the wire, time and queries per JSON API request: plain, compressed, and revalidated (304)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=30, help="Requests per endpoint and mode.")
+        parser.add_argument("--username", default="bench_api_responses")
+        parser.add_argument("--path", action="append", dest="paths", help="Endpoint to measure (repeatable).")
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=options["username"], defaults={"is_staff": True})
+        client = Client(HTTP_AUTHORIZATION=f"Token {tokens.issue(user)['token']}")
+        rows = []
+        with override_settings(ALLOWED_HOSTS=["*"]):
+            for path in options["paths"] or ENDPOINTS:
+                first = client.get(path, HTTP_ACCEPT_ENCODING="gzip, br")
+                if first.status_code != 200:
+                    self.stderr.write(f"{path} -> HTTP {first.status_code}")
+                    continue
+                etag = first.get("ETag", "")
+                for label, headers in (
+                    ("identity", {}),
+                    ("compressed", {"HTTP_ACCEPT_ENCODING": "gzip, br"}),
+                    ("revalidated", {"HTTP_ACCEPT_ENCODING": "gzip, br", "HTTP_IF_NONE_MATCH": etag}),
+                ):
+                    if label == "revalidated" and not etag:
+                        continue
+                    sizes, queries, timings = [], [], []
+                    for _ in range(options["requests"]):
+                        with CaptureQueriesContext(connection) as ctx:
+                            started = time.perf_counter()
+                            response = client.get(path, **headers)
+                            timings.append((time.perf_counter() - started) * 1000)
+                        sizes.append(len(response.content))
+                        queries.append(len(ctx.captured_queries))
+                    rows.append((path, label, response.status_code, response.get("Content-Encoding", "-"),
+                                 statistics.median(sizes), statistics.median(queries), statistics.median(timings)))
+
+        self.stdout.write(f"{'endpoint':<40}{'mode':<13}{'status':>7}{'enc':>6}{'body bytes':>12}{'queries':>9}{'median ms':>11}")
+        for path, label, status, encoding, size, count, ms in rows:
+            self.stdout.write(f"{path:<40}{label:<13}{status:>7}{encoding:>6}{size:>12.0f}{count:>9}{ms:>11.2f}")
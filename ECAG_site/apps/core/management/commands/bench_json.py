@@ -0,0 +1,68 @@
+import datetime
+import json
+import timeit
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+
+from apps.core import fastjson
+
+
+def order_list(count):
+    """`count` orders shaped like the mobile order payloads, with native Decimal/datetime values."""
+    now = timezone.now()
+    orders = []
+    for n in range(count):
+        items = [
+            {"name": f"Item {n % 40 + k}", "quantity": k + 1, "price": Decimal("125.50") + k, "subtotal": Decimal("251.00") * (k + 1)}
+            for k in range(4)
+        ]
+        orders.append({
+            "id": n,
+            "order_id_str": f"ORD-{n:06d}",
+            "status": "preparing",
+            "order_type": "delivery",
+            "subtotal": Decimal("1004.00"),
+            "total": Decimal("1124.48"),
+            "order_date": now - datetime.timedelta(minutes=n),
+            "user": {"id": n % 300, "name": "Guest Customer", "email": "guest@example.com", "phone": ""},
+            "items": items,
+            "delivery": {"address": "12 Harbour Road", "fee": Decimal("60.00"), "arrival_date": now.date()},
+        })
+    return {"ok": True, "orders": orders}
+
+
+class Command(BaseCommand):
+    help = "Time JSON encoding of a large order list: JsonResponse's encoder, DRF's renderer and apps.core.fastjson."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=2000, help="Orders in the payload.")
+        parser.add_argument("--repeat", type=int, default=10, help="Encodings per contender (best is reported).")
+
+    def handle(self, *args, **options):
+        payload = order_list(options["orders"])
+        drf = DRFJSONRenderer()
+        contenders = [
+            ("json + DjangoJSONEncoder (JsonResponse)", lambda: json.dumps(payload, cls=DjangoJSONEncoder).encode()),
+            ("DRF JSONRenderer", lambda: drf.render(payload)),
+            ("fastjson, stdlib fallback", lambda: fastjson.stdlib_dumps(payload)),
+        ]
+        if fastjson.orjson is not None:
+            contenders.append(("fastjson, orjson", lambda: fastjson.dumps(payload)))
+        else:
+            self.stderr.write("orjson is not installed; fastjson.dumps is the stdlib fallback.")
+
+        baseline = None
+        self.stdout.write(f"{options['orders']} orders, best of {options['repeat']}")
+        self.stdout.write(f"{'encoder':<42}{'ms':>9}{'bytes':>11}{'speed-up':>10}")
+        for label, encode in contenders:
+            size = len(encode())
+            best = min(timeit.repeat(encode, number=1, repeat=options["repeat"])) * 1000
+            baseline = baseline or best
+            self.stdout.write(f"{label:<42}{best:>9.2f}{size:>11}{baseline / best:>9.1f}x")
+
+        sample = fastjson.loads(fastjson.dumps(payload["orders"][0]))
+        self.stdout.write(f"sample: total={sample['total']!r} order_date={sample['order_date']!r}")
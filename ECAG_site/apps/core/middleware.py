@@ -0,0 +1,187 @@
+"""Response middleware for the JSON APIs.
+
+`VersionedETagMiddleware` gives GET responses of views marked with
+`versions.depends_on` (or a ``data_scopes`` class attribute on DRF views) a
+strong ETag built from the data versions they depend on plus what else
+shapes the response: the URL, the caller and the Accept header. It is known
+before the view runs, so a client sending it back in ``If-None-Match`` gets a
+304 after one query (the versions) instead of the view's.
+
+`CompressionMiddleware` gzips (or brotli-compresses, when the optional
+``brotli`` package is installed and the client accepts ``br``) JSON responses
+above ``COMPRESS_MIN_SIZE`` bytes; below that the saving doesn't pay for the
+CPU. HTML is left alone: its pages carry CSRF tokens and one-off secrets
+next to text an attacker can reflect, which compression would leak (BREACH).
+Static assets are precompressed by assets.py. Strong ETags get an encoding
+suffix (``"abc-gzip"``), since the compressed bytes are a different
+representation.
+
+Settings (all optional) live in ``settings.API_RESPONSES``::
+
+    API_RESPONSES = {
+        "COMPRESS_MIN_SIZE": 1024,
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 5,
+        "RELEASE": "",              # change when a deploy changes payload shapes
+    }
+"""
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.http import HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+from . import versions
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only without it
+    brotli = None
+
+DEFAULTS = {
+    "COMPRESS_MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    "RELEASE": "",
+}
+
+# application/json and the structured +json types (application/problem+json, ...)
+COMPRESSIBLE_TYPES = ("application/json",)
+COMPRESSIBLE_SUFFIXES = ("+json",)
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def get_setting(key):
+    return getattr(settings, "API_RESPONSES", {}).get(key, DEFAULTS[key])
+
+
+def accepted_encodings(header):
+    """Content codings `header` accepts (``q=0`` means refused)."""
+    codings = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            codings.add(coding.strip().lower())
+    return codings
+
+
+def is_compressible(content_type):
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in COMPRESSIBLE_TYPES or media_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def _strip_encoding(tag):
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def data_scopes(view_func):
+    scopes = getattr(view_func, "data_scopes", None)
+    if scopes is None:
+        # DRF: as_view() keeps the class on the function it returns
+        scopes = getattr(getattr(view_func, "cls", None), "data_scopes", None)
+    return scopes
+
+
+class VersionedETagMiddleware:
+    """Strong ETags and 304s from data versions; place after AuthenticationMiddleware."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        etag = getattr(request, "_versioned_etag", None)
+        if etag and response.status_code == 200 and not response.has_header("ETag"):
+            response["ETag"] = f'"{etag}"'
+            self._patch(response)
+        return response
+
+    @staticmethod
+    def _patch(response):
+        # always revalidate: the copy is only good while the versions match
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Accept", "Authorization", "Cookie"))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        scopes = data_scopes(view_func)
+        if not scopes:
+            return None
+
+        session = getattr(request, "session", None)
+        stamp = versions.current(scopes)
+        material = "|".join([
+            get_setting("RELEASE"),
+            f"{view_func.__module__}.{view_func.__name__}",
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+            request.META.get("HTTP_AUTHORIZATION", ""),
+            str(session.get(SESSION_KEY, "")) if session is not None else "",
+            # a few payloads ("today", the last 7 days) move with the date alone
+            timezone.localdate().isoformat(),
+            *(f"{scope}={stamp[scope]}" for scope in sorted(stamp)),
+        ])
+        etag = hashlib.blake2b(material.encode(), digest_size=12).hexdigest()
+        request._versioned_etag = etag
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            for tag in parse_etags(if_none_match):
+                if tag == "*" or _strip_encoding(tag.strip('"')) == etag:
+                    response = HttpResponseNotModified()
+                    # echo the representation the client holds (gzip'd or not)
+                    response["ETag"] = tag if tag != "*" else f'"{etag}"'
+                    self._patch(response)
+                    return response
+        return None
+
+
+class CompressionMiddleware:
+    """gzip/brotli for JSON responses above a size threshold (never HTML)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming or response.status_code != 200
+                or response.has_header("Content-Encoding")
+                or not is_compressible(response.get("Content-Type", ""))):
+            return response
+        content = response.content
+        if len(content) < get_setting("COMPRESS_MIN_SIZE"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        accepted = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and "br" in accepted:
+            encoding, compressed = "br", brotli.compress(content, quality=get_setting("BROTLI_QUALITY"))
+        elif "gzip" in accepted:
+            encoding, compressed = "gzip", gzip.compress(content, compresslevel=get_setting("GZIP_LEVEL"), mtime=0)
+        else:
+            return response
+        if len(compressed) >= len(content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and not etag.startswith("W/"):
+            response["ETag"] = f'{etag[:-1]}-{encoding}"'
+        return response
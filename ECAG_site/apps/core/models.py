@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class DataVersion(models.Model):
+    """Change counter of one data scope (see versions.py)."""
+    scope = models.CharField(max_length=20, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.scope}={self.version}"
@@ -0,0 +1,32 @@
+"""``{% bundle "menu.js" %}``: the tags for one bundle from STATIC_PIPELINE.
+
+In production this is a single tag pointing at the hashed, minified bundle
+built by collectstatic (apps/core/assets.py). With DEBUG on, or before
+anything was collected, it expands to one tag per source file instead, so
+edits show up without a rebuild.
+"""
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from apps.core.assets import bundle_path, get_setting
+
+register = template.Library()
+
+
+def _tag(name, url):
+    if name.endswith(".css"):
+        return format_html('<link rel="stylesheet" href="{}">', url)
+    return format_html('<script src="{}"></script>', url)
+
+
+@register.simple_tag
+def bundle(name):
+    sources = get_setting("BUNDLES").get(name)
+    if sources is None:
+        raise template.TemplateSyntaxError(f"Unknown static bundle: {name!r}")
+    if settings.DEBUG or not getattr(staticfiles_storage, "collected", False):
+        return format_html_join("\n", "{}", ((_tag(name, static(source)),) for source in sources))
+    return _tag(name, static(bundle_path(name)))
@@ -0,0 +1,182 @@
+import datetime
+import tempfile
+import uuid
+from decimal import Decimal
+from pathlib import Path
+
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.core import assets, fastjson, versions
+from apps.core.models import DataVersion
+
+
+class MinifyJsTests(SimpleTestCase):
+    def minify(self, src):
+        return assets.minify_js(src)
+
+    def test_comments_and_indentation_are_dropped(self):
+        src = "// header\nfunction f(a) {\n    /* one */  return a;   // trailing\n}\n"
+        self.assertEqual(self.minify(src), "function f(a) {\nreturn a;\n}\n")
+
+    def test_multiline_comment_leaves_a_line_break(self):
+        src = "if (ok) {\n  /* block\n     comment */\n  run();\n}\n"
+        self.assertEqual(self.minify(src), "if (ok) {\nrun();\n}\n")
+
+    def test_line_breaks_are_kept_for_semicolon_insertion(self):
+        self.assertEqual(self.minify("var x = a\n\n\n+ b\nreturn\nx\n"), "var x = a\n+ b\nreturn\nx\n")
+
+    def test_strings_are_copied_as_is(self):
+        for src in (
+            'var s = "a // not a comment";\n',
+            "var s = 'it\\'s /* kept */  too';\n",
+            'var s = "say \\"hi\\"   // still text";\n',
+        ):
+            with self.subTest(src=src):
+                self.assertEqual(self.minify(src), src)
+
+    def test_template_literals_are_copied_as_is(self):
+        for src in (
+            "var t = `two  spaces // and /* no */ comment`;\n",
+            'var t = `a ${ b + "}" } // kept\n    c`;\n',
+            "var t = `outer ${ `inner ${ x }` }   end`;\n",
+        ):
+            with self.subTest(src=src):
+                self.assertEqual(self.minify(src), src)
+
+    def test_regex_literals_are_copied_as_is(self):
+        for src in (
+            "var r = /ab+c\\/d[/]  x/g.test(s);\n",
+            "f(/\\/\\/ not a comment/);\n",
+            "var ok = !/^\\s*$/.test(s) && /[*/]/.test(t);\n",
+        ):
+            with self.subTest(src=src):
+                self.assertEqual(self.minify(src), src)
+
+    def test_regex_after_keyword(self):
+        self.assertEqual(self.minify("function f(a) {\n  return /x  y/.test(a);\n}\n"),
+                         "function f(a) {\nreturn /x  y/.test(a);\n}\n")
+        self.assertEqual(self.minify("var t = typeof /a/;\n"), "var t = typeof /a/;\n")
+
+    def test_division_is_not_a_regex(self):
+        for src in (
+            "var a = b / 2 / c;  // half\n",
+            "var a = (b) / 2, c = d[0] / e;\n",
+            "var half = i++ / 2;\n",
+            "var q = j-- / k / 2;\n",
+            "var r = total/count/ 2;\n",
+        ):
+            with self.subTest(src=src):
+                self.assertEqual(self.minify(src), src.split("  //")[0].rstrip() + "\n")
+
+    def test_crlf_input(self):
+        self.assertEqual(self.minify("var a = 1;\r\n\r\nvar b = 2;\r\n"), "var a = 1;\nvar b = 2;\n")
+
+
+class MinifyCssTests(SimpleTestCase):
+    def test_whitespace_and_comments_are_dropped_outside_strings(self):
+        src = "/* c */\na {\n  color : red ;\n  content: \"  ; { } \";\n}\n"
+        self.assertEqual(assets.minify_css(src), 'a{color : red;content: "  ; { } "}\n')
+
+
+@override_settings(DEBUG=False)
+class StaticFilesApplicationTests(SimpleTestCase):
+    def setUp(self):
+        root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        for name, body in (("site.css", b"a{}"), ("site.css.gz", b"gz"), ("site.css.br", b"br")):
+            (root / name).write_bytes(body)
+        self.app = assets.StaticFilesApplication(self.fallback, root=root, prefix="/static/")
+
+    @staticmethod
+    def fallback(environ, start_response):
+        start_response("404 Not Found", [])
+        return [b"django"]
+
+    def get(self, path="/static/site.css", accept_encoding=""):
+        sent = {}
+
+        def start_response(status, headers):
+            sent.update(status=status, headers=dict(headers))
+        environ = {"PATH_INFO": path, "REQUEST_METHOD": "GET", "HTTP_ACCEPT_ENCODING": accept_encoding}
+        sent["body"] = b"".join(self.app(environ, start_response))
+        return sent
+
+    def test_picks_the_best_accepted_variant(self):
+        for header, body in (
+            ("gzip, deflate, br", b"br"),
+            ("gzip", b"gz"),
+            ("br;q=0, gzip", b"gz"),
+            ("br; q=0, gzip;q=0", b"a{}"),
+            ("", b"a{}"),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(accept_encoding=header)["body"], body)
+        self.assertEqual(self.get(accept_encoding="gzip")["headers"]["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Encoding", self.get()["headers"])
+
+    def test_unknown_files_reach_django(self):
+        self.assertEqual(self.get("/static/missing.css")["body"], b"django")
+
+
+class VersionsTests(TestCase):
+    def test_first_read_seeds_the_counters(self):
+        stamp = versions.current(("menu", "orders"))
+        self.assertEqual(set(stamp), {"menu", "orders"})
+        self.assertEqual(versions.current(("menu",)), {"menu": stamp["menu"]})
+        self.assertEqual(DataVersion.objects.count(), 2)
+
+    def test_bump_counts_every_change(self):
+        before = versions.current(("menu", "orders"))
+        versions.bump("menu")
+        versions.bump("menu", "orders")
+        self.assertEqual(versions.current(("menu", "orders")),
+                         {"menu": before["menu"] + 2, "orders": before["orders"] + 1})
+
+    def test_bump_rolls_back_with_the_transaction(self):
+        before = versions.current(("menu",))
+        with transaction.atomic():
+            versions.bump("menu")
+            self.assertEqual(versions.current(("menu",))["menu"], before["menu"] + 1)
+            transaction.set_rollback(True)
+        self.assertEqual(versions.current(("menu",)), before)
+
+    def test_bump_before_any_read(self):
+        versions.bump("reviews")
+        self.assertTrue(DataVersion.objects.filter(scope="reviews").exists())
+
+    def test_seen_by_other_processes(self):
+        # another process's bump only reaches us through the table
+        before = versions.current(("users",))["users"]
+        DataVersion.objects.filter(scope="users").update(version=before + 5)
+        self.assertEqual(versions.current(("users",))["users"], before + 5)
+
+    def test_unknown_scope(self):
+        with self.assertRaisesMessage(ValueError, "Unknown data scope"):
+            versions.bump("menus")
+
+
+class FastJsonTests(SimpleTestCase):
+    PAYLOAD = {
+        'at': datetime.datetime(2025, 3, 1, 18, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+        'local': datetime.datetime(2025, 3, 1, 18, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=8))),
+        'day': datetime.date(2025, 3, 1),
+        'time': datetime.time(9, 15, 0, 500000),
+        'id': uuid.UUID(int=1),
+        'total': Decimal("12.50"),
+        'tags': ["a"],
+    }
+
+    def test_matches_django_encoder(self):
+        self.assertEqual(fastjson.dumps(self.PAYLOAD), fastjson.stdlib_dumps(self.PAYLOAD))
+        self.assertEqual(fastjson.loads(fastjson.dumps(self.PAYLOAD)), {
+            'at': "2025-03-01T18:30:05.123Z",
+            'local': "2025-03-01T18:30:00+08:00",
+            'day': "2025-03-01",
+            'time': "09:15:00.500",
+            'id': "00000000-0000-0000-0000-000000000001",
+            'total': "12.50",
+            'tags': ["a"],
+        })
+
+    def test_indent(self):
+        self.assertEqual(fastjson.dumps({'a': 1}, indent=2), b'{\n  "a": 1\n}')
@@ -0,0 +1,82 @@
+"""Data versions: one counter per kind of data the JSON APIs serve.
+
+Every write to the menu, orders, reservations, reviews or users bumps that
+scope's counter (the receivers are at the bottom of each app's models.py, and
+the few bulk writes that skip signals call `bump` themselves). A view marks
+what its payload is built from::
+
+    @depends_on("orders", "menu")
+    def mobile_orders_data(request): ...
+
+    class ReservationViewSet(viewsets.ModelViewSet):
+        data_scopes = ("reservations",)
+
+and `VersionedETagMiddleware` (middleware.py) derives the response's ETag from
+those counters and the request, without running the view or hashing a body.
+
+Counters are `DataVersion` rows in the main database, bumped with
+``F("version") + 1``: every process (runserver, run_jobs, the nightly
+commands) sees every other's writes, and concurrent bumps never collapse
+into one. Reading them is one indexed query per request.
+"""
+import time
+
+from django.db.models import F
+
+from .models import DataVersion
+
+SCOPES = ("menu", "orders", "reservations", "reviews", "users")
+
+
+def _seed():
+    # never restart at 1: a client may still hold an ETag built from an old counter
+    return time.time_ns()
+
+
+def _create(scopes):
+    # another process may create the same rows first; theirs win
+    DataVersion.objects.bulk_create(
+        [DataVersion(scope=scope, version=_seed()) for scope in scopes], ignore_conflicts=True,
+    )
+
+
+def current(scopes):
+    """{scope: version} for `scopes`, in one query."""
+    found = dict(DataVersion.objects.filter(scope__in=scopes).values_list('scope', 'version'))
+    missing = set(scopes) - set(found)
+    if missing:
+        _create(missing)
+        found.update(DataVersion.objects.filter(scope__in=missing).values_list('scope', 'version'))
+    return found
+
+
+def _incr(scopes):
+    updated = DataVersion.objects.filter(scope__in=scopes).update(version=F('version') + 1)
+    if updated < len(scopes):      # never read yet: a fresh seed is a change too
+        _create(scopes)
+
+
+def bump(*scopes):
+    """Mark `scopes` as changed, inside the current transaction.
+
+    The new version commits (or rolls back) together with the rows it
+    describes, so no request can pair it with old data; and no write is left
+    for after the commit, where a failure would surface in the caller after
+    its own work was already saved.
+    """
+    unknown = set(scopes) - set(SCOPES)
+    if unknown:
+        raise ValueError(f"Unknown data scope(s): {sorted(unknown)}")
+    _incr(scopes)
+
+
+def depends_on(*scopes):
+    """Mark a function view's GET payload as built from `scopes`."""
+    unknown = set(scopes) - set(SCOPES)
+    if unknown:
+        raise ValueError(f"Unknown data scope(s): {sorted(unknown)}")
+
+    def decorator(view):
+        view.data_scopes = scopes
+        return view
+    return decorator
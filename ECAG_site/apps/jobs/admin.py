@@ -0,0 +1,36 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+	list_display = ('id', 'name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+	list_filter = ('status', 'queue', 'name')
+	search_fields = ('name', 'last_error')
+	ordering = ('-created_at',)
+	# the raw payload may still hold a secret (scrubbed only once the job ends), so show a masked copy
+	exclude = ('payload',)
+	readonly_fields = ('payload_display', 'created_at', 'finished_at', 'locked_by', 'locked_at', 'last_error')
+
+	@admin.display(description='Payload')
+	def payload_display(self, obj):
+		return queue.masked_payload(obj)
+
+	def retry_now(self, request, queryset):
+		"""Admin action: put failed jobs back on the queue immediately."""
+		jobs = queryset.exclude(status=Job.Status.RUNNING)
+		wiped = [job.pk for job in jobs if queue.is_scrubbed(job)]
+		updated = jobs.exclude(pk__in=wiped).update(
+			status=Job.Status.QUEUED, attempts=0, run_at=timezone.now(), last_error=''
+		)
+		self.message_user(request, f"{updated} job(s) queued for retry.")
+		if wiped:
+			self.message_user(
+				request, f"{len(wiped)} job(s) not retried: their secrets were wiped from the payload.",
+				level=messages.WARNING,
+			)
+
+	actions = ('retry_now',)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+
+    def ready(self):
+        # Pull in every app's tasks.py so @job handlers are registered before
+        # the worker (or an eager enqueue) needs them.
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
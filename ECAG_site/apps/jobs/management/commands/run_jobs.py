@@ -0,0 +1,85 @@
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.jobs import queue
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (emails, image processing, rollups)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Worker threads in this process.")
+        parser.add_argument("--queue", action="append", dest="queues", help="Only run jobs from this queue (repeatable).")
+        parser.add_argument("--once", action="store_true", help="Drain the due jobs and exit instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=None, help="Seconds to sleep when idle.")
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        queues = options["queues"]
+        poll_interval = options["poll_interval"] or float(queue.get_setting("POLL_INTERVAL"))
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = {"flag": False}
+
+        def _stop(*_):
+            stopping["flag"] = True
+            self.stdout.write("Finishing running jobs, then exiting...")
+
+        signal.signal(signal.SIGINT, _stop)
+        signal.signal(signal.SIGTERM, _stop)
+
+        def _run(job_id):
+            try:
+                return queue.execute(job_id, worker_id=worker_id)
+            finally:
+                close_old_connections()
+
+        # Keep our own jobs' locks fresh and take over those of dead workers,
+        # a few times per STALE_AFTER so a long job is never mistaken for one.
+        sweep_every = float(queue.get_setting("STALE_AFTER")) / 4
+        next_sweep = 0.0
+
+        def _sweep():
+            queue.heartbeat(worker_id)
+            requeued = queue.requeue_stale()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale job(s).")
+
+        self.stdout.write(f"Worker {worker_id} started with {concurrency} thread(s).")
+
+        done = failed = 0
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not stopping["flag"]:
+                if time.monotonic() >= next_sweep:
+                    _sweep()
+                    next_sweep = time.monotonic() + sweep_every
+
+                while len(in_flight) < concurrency:
+                    claimed = queue.claim_next(worker_id, queues)
+                    if not claimed:
+                        break
+                    in_flight.add(pool.submit(_run, claimed.pk))
+
+                if not in_flight:
+                    if options["once"]:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                finished, in_flight = wait(in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future.result():
+                        done += 1
+                    else:
+                        failed += 1
+                in_flight = set(in_flight)
+
+            wait(in_flight)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker stopped: {done} done, {failed} failed."))
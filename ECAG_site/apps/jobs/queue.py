@@ -0,0 +1,210 @@
+"""Database-backed job queue.
+
+Handlers are plain functions registered with ``@job`` in an app's ``tasks.py``;
+``enqueue`` stores a row in ``jobs_job`` and the ``run_jobs`` management command
+executes it outside the request/response cycle. No broker is needed: the
+database the site already uses is the queue.
+
+Settings (all optional) live in ``settings.JOB_QUEUE``::
+
+    JOB_QUEUE = {
+        "EAGER": False,            # run handlers inline in enqueue() (tests/dev)
+        "CONCURRENCY": {"default": 4, "email": 2},   # max RUNNING jobs per queue
+        "BACKOFF_BASE": 10,        # seconds; retry n waits BACKOFF_BASE * 2**(n-1)
+        "BACKOFF_MAX": 3600,
+        "STALE_AFTER": 600,        # seconds before a RUNNING job is presumed dead
+        "POLL_INTERVAL": 1.0,
+    }
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "EAGER": False,
+    "CONCURRENCY": {"default": 4},
+    "BACKOFF_BASE": 10,
+    "BACKOFF_MAX": 3600,
+    "STALE_AFTER": 600,
+    "POLL_INTERVAL": 1.0,
+}
+
+_registry: dict[str, "JobHandler"] = {}
+
+
+# what a scrubbed payload value is replaced with
+SCRUBBED = "***"
+
+
+class UnknownJob(LookupError):
+    pass
+
+
+def get_setting(key):
+    return getattr(settings, "JOB_QUEUE", {}).get(key, DEFAULTS[key])
+
+
+def queue_concurrency(queue: str) -> int:
+    limits = get_setting("CONCURRENCY")
+    return int(limits.get(queue, limits.get("default", DEFAULTS["CONCURRENCY"]["default"])))
+
+
+def backoff_delay(attempt: int) -> timedelta:
+    """Exponential backoff: base, 2*base, 4*base ... capped at BACKOFF_MAX."""
+    base = float(get_setting("BACKOFF_BASE"))
+    cap = float(get_setting("BACKOFF_MAX"))
+    return timedelta(seconds=min(cap, base * (2 ** max(attempt - 1, 0))))
+
+
+class JobHandler:
+    def __init__(self, func, name, queue, max_attempts, scrub):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        # payload keys (e.g. passwords) wiped from the row once the job is done or has failed for good
+        self.scrub = tuple(scrub)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, **payload):
+        return enqueue(self.name, **payload)
+
+
+def job(name=None, *, queue="default", max_attempts=5, scrub=()):
+    """Register a function as a job handler.
+
+    Payloads are passed as keyword arguments, so they must be JSON-serialisable.
+    """
+    def decorator(func):
+        handler_name = name or f"{func.__module__}.{func.__name__}"
+        handler = JobHandler(func, handler_name, queue, max_attempts, scrub)
+        _registry[handler_name] = handler
+        return handler
+    return decorator
+
+
+def get_handler(name: str) -> JobHandler:
+    try:
+        return _registry[name]
+    except KeyError:
+        raise UnknownJob(f"No job handler registered as '{name}'")
+
+
+def enqueue(name: str, *, run_at=None, **payload) -> Job:
+    """Queue `name` to run with `payload`.
+
+    The row is only visible to workers once the surrounding transaction commits,
+    so a job never races ahead of the data it refers to.
+    """
+    handler = get_handler(name)
+    job_row = Job.objects.create(
+        name=name,
+        queue=handler.queue,
+        payload=payload,
+        max_attempts=handler.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+    if get_setting("EAGER"):
+        transaction.on_commit(lambda: execute(job_row.pk, worker_id="eager"))
+    return job_row
+
+
+def heartbeat(worker_id: str) -> int:
+    """Refresh the lock on `worker_id`'s RUNNING jobs so requeue_stale leaves them alone."""
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_by=worker_id).update(locked_at=timezone.now())
+
+
+def requeue_stale() -> int:
+    """Put RUNNING jobs whose worker disappeared back on the queue.
+
+    Live workers call heartbeat() more often than STALE_AFTER, so only the
+    jobs of a crashed or killed worker go stale.
+    """
+    cutoff = timezone.now() - timedelta(seconds=float(get_setting("STALE_AFTER")))
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.Status.QUEUED, locked_by="", locked_at=None
+    )
+
+
+def claim_next(worker_id: str, queues=None) -> Job | None:
+    """Atomically move one due job to RUNNING, honouring per-queue limits.
+
+    The claim is a conditional UPDATE on (pk, status=queued), so two workers can
+    never both win the same row, on SQLite or anything else. The per-queue limit
+    is checked just before the claim, so separate worker processes may overshoot
+    it by at most one job each.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now)
+    if queues:
+        due = due.filter(queue__in=queues)
+
+    running = {}
+    for candidate in due.only("id", "queue")[:50]:
+        if candidate.queue not in running:
+            running[candidate.queue] = Job.objects.filter(queue=candidate.queue, status=Job.Status.RUNNING).count()
+        if running[candidate.queue] >= queue_concurrency(candidate.queue):
+            continue
+        won = Job.objects.filter(pk=candidate.pk, status=Job.Status.QUEUED).update(
+            status=Job.Status.RUNNING, locked_by=worker_id, locked_at=now
+        )
+        if won:
+            return Job.objects.get(pk=candidate.pk)
+    return None
+
+
+def _scrub(job_row: Job) -> None:
+    """Wipe the handler's `scrub` keys from the payload; the job will not run again."""
+    job_row.payload = masked_payload(job_row)
+
+
+def masked_payload(job_row: Job) -> dict:
+    """The payload with the handler's `scrub` keys hidden, for display."""
+    handler = _registry.get(job_row.name)
+    secret = handler.scrub if handler else ()
+    return {k: (SCRUBBED if k in secret else v) for k, v in job_row.payload.items()}
+
+
+def is_scrubbed(job_row: Job) -> bool:
+    """True once secrets were wiped from the payload, so the job cannot be retried."""
+    handler = _registry.get(job_row.name)
+    return bool(handler) and any(job_row.payload.get(k) == SCRUBBED for k in handler.scrub)
+
+
+def execute(job_id: int, worker_id: str = "") -> bool:
+    """Run a claimed (or eager) job and record the outcome. Returns True on success."""
+    job_row = Job.objects.get(pk=job_id)
+    job_row.attempts += 1
+    try:
+        handler = get_handler(job_row.name)
+        handler(**job_row.payload)
+    except Exception as exc:
+        logger.warning("job %s #%s attempt %s failed: %s", job_row.name, job_row.pk, job_row.attempts, exc)
+        job_row.last_error = f"{type(exc).__name__}: {exc}"
+        job_row.locked_by = ""
+        job_row.locked_at = None
+        if job_row.attempts >= job_row.max_attempts or isinstance(exc, UnknownJob):
+            job_row.status = Job.Status.FAILED
+            job_row.finished_at = timezone.now()
+            _scrub(job_row)
+        else:
+            job_row.status = Job.Status.QUEUED
+            job_row.run_at = timezone.now() + backoff_delay(job_row.attempts)
+        job_row.save()
+        return False
+
+    job_row.status = Job.Status.DONE
+    job_row.finished_at = timezone.now()
+    job_row.last_error = ""
+    _scrub(job_row)
+    job_row.save()
+    return True
@@ -0,0 +1,154 @@
+import re
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db.models.query import QuerySet
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from apps.admin_panel.tasks import send_staff_credentials_email
+
+from . import queue
+from .models import Job
+
+calls = []
+
+
+@queue.job("tests.record", queue="tests", max_attempts=3, scrub=("secret",))
+def record(**payload):
+    calls.append(payload)
+
+
+@queue.job("tests.explode", queue="tests", max_attempts=2, scrub=("secret",))
+def explode(**payload):
+    raise RuntimeError("boom")
+
+
+@override_settings(JOB_QUEUE={'CONCURRENCY': {'default': 4, 'tests': 2}, 'BACKOFF_BASE': 10, 'STALE_AFTER': 600})
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_next(self, worker_id="w1"):
+        claimed = queue.claim_next(worker_id)
+        return claimed and queue.execute(claimed.pk, worker_id=worker_id)
+
+    def test_claim_respects_due_time_and_concurrency(self):
+        later = queue.enqueue("tests.record", run_at=timezone.now() + timedelta(minutes=5))
+        first, second, third = (queue.enqueue("tests.record", n=n) for n in range(3))
+
+        self.assertEqual(queue.claim_next("w1").pk, first.pk)
+        self.assertEqual(queue.claim_next("w2").pk, second.pk)
+        # two RUNNING is the `tests` queue's limit
+        self.assertIsNone(queue.claim_next("w3"))
+        self.assertEqual(Job.objects.get(pk=third.pk).status, Job.Status.QUEUED)
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.Status.QUEUED)
+
+        self.assertEqual(queue.claim_next("w1", queues=["default"]), None)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.locked_by), (Job.Status.RUNNING, "w1"))
+
+    def test_a_row_is_claimed_once(self):
+        row = queue.enqueue("tests.record")
+        update = QuerySet.update
+
+        # another worker wins the row between our read and our conditional update
+        def raced(qs, **values):
+            if values.get('locked_by') == "w1":
+                update(Job.objects.filter(pk=row.pk), status=Job.Status.RUNNING, locked_by="w2")
+            return update(qs, **values)
+
+        with mock.patch.object(QuerySet, "update", raced):
+            self.assertIsNone(queue.claim_next("w1"))
+        row.refresh_from_db()
+        self.assertEqual(row.locked_by, "w2")
+
+    def test_done_scrubs_the_payload(self):
+        row = queue.enqueue("tests.record", secret="hunter2", to="a@example.com")
+        self.assertTrue(self.run_next())
+        self.assertEqual(calls, [{'secret': "hunter2", 'to': "a@example.com"}])
+        row.refresh_from_db()
+        self.assertEqual(row.status, Job.Status.DONE)
+        self.assertEqual(row.payload, {'secret': queue.SCRUBBED, 'to': "a@example.com"})
+        self.assertTrue(queue.is_scrubbed(row))
+
+    def test_retry_with_backoff_then_fail(self):
+        row = queue.enqueue("tests.explode", secret="hunter2")
+        before = timezone.now()
+        self.assertFalse(self.run_next())
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.locked_by), (Job.Status.QUEUED, 1, ""))
+        self.assertEqual(row.last_error, "RuntimeError: boom")
+        self.assertGreaterEqual(row.run_at, before + timedelta(seconds=10))
+        # still waiting out its backoff, and the secret is kept for the retry
+        self.assertIsNone(queue.claim_next("w1"))
+        self.assertEqual(row.payload, {'secret': "hunter2"})
+
+        Job.objects.filter(pk=row.pk).update(run_at=timezone.now())
+        self.assertFalse(self.run_next())
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (Job.Status.FAILED, 2))
+        self.assertIsNotNone(row.finished_at)
+        self.assertEqual(row.payload, {'secret': queue.SCRUBBED})
+
+    def test_backoff_delay(self):
+        self.assertEqual([queue.backoff_delay(n).total_seconds() for n in (1, 2, 3)], [10, 20, 40])
+        with override_settings(JOB_QUEUE={'BACKOFF_BASE': 10, 'BACKOFF_MAX': 25}):
+            self.assertEqual(queue.backoff_delay(5).total_seconds(), 25)
+
+    def test_requeue_stale_spares_jobs_with_a_heartbeat(self):
+        dead, alive = queue.enqueue("tests.record"), queue.enqueue("tests.record")
+        queue.claim_next("crashed")
+        queue.claim_next("w1")
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=11))
+
+        self.assertEqual(queue.heartbeat("w1"), 1)
+        self.assertEqual(queue.requeue_stale(), 1)
+        dead.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual((dead.status, dead.locked_by, dead.locked_at), (Job.Status.QUEUED, "", None))
+        self.assertEqual((alive.status, alive.locked_by), (Job.Status.RUNNING, "w1"))
+
+    def test_admin_masks_and_does_not_retry_scrubbed_jobs(self):
+        model_admin = admin.site._registry[Job]
+        pending = queue.enqueue("tests.explode", secret="hunter2")
+        self.assertEqual(model_admin.payload_display(pending), {'secret': queue.SCRUBBED})
+
+        Job.objects.filter(pk=pending.pk).update(status=Job.Status.FAILED)
+        wiped = queue.enqueue("tests.explode", secret=queue.SCRUBBED)
+        Job.objects.filter(pk=wiped.pk).update(status=Job.Status.FAILED)
+        request = RequestFactory().post("/")
+        with mock.patch.object(model_admin, "message_user") as message_user:
+            model_admin.retry_now(request, Job.objects.all())
+        self.assertEqual(message_user.call_args_list[0].args[1], "1 job(s) queued for retry.")
+        self.assertEqual(Job.objects.get(pk=wiped.pk).status, Job.Status.FAILED)
+        self.assertEqual(Job.objects.get(pk=pending.pk).status, Job.Status.QUEUED)
+
+
+class StaffCredentialsEmailTests(TestCase):
+    def test_sends_a_set_password_link_without_queueing_a_password(self):
+        user = get_user_model().objects.create_user(username="cook", email="cook@example.com", password="Temp-123")
+        row = send_staff_credentials_email.delay(
+            user_id=user.pk, role="staff", reason="invite", site_url="http://testserver/",
+        )
+        self.assertNotIn("Temp-123", str(row.payload))
+
+        self.assertTrue(queue.execute(row.pk))
+        self.assertEqual(len(mail.outbox), 1)
+        body = mail.outbox[0].body
+        self.assertNotIn("Temp-123", body)
+        link = re.search(r"http://testserver(/\S+)", body).group(1)
+
+        response = self.client.get(link, follow=True)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(response.redirect_chain[-1][0], {
+            'new_password1': "Chosen-pass-9", 'new_password2': "Chosen-pass-9",
+        })
+        self.assertRedirects(response, "/login/reset/done/", fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password("Chosen-pass-9"))
+        # and the link is spent
+        self.assertFalse(self.client.get(link, follow=True).context['validlink'])
@@ -0,0 +1,190 @@
+"""Token authentication without a database hit on every API call.
+
+DRF's `TokenAuthentication` reads `authtoken_token` joined to `auth_user` on
+each request, and `UserSerializer` then reads `userprofile` again. This
+authenticator resolves a token key in three steps:
+
+1. a small in-process dict (`LOCAL_TTL` seconds, per worker),
+2. the shared Django cache (`SHARED_TTL` seconds, `CACHE_ALIAS`),
+3. one query for token + user + profile, whose result fills both layers.
+
+Signed tokens (tokens.py) carry the user id, so for them the same layers are
+keyed by user id and the token table is never read.
+
+Deleting a token (`LogoutAPIView`) or saving a user/profile drops the shared
+entries and this worker's local ones (see the receivers in models.py). Other
+workers may keep serving their local copy for at most `LOCAL_TTL` seconds,
+which is why that layer is kept short.
+
+Settings (all optional) live in ``settings.AUTH_TOKEN_CACHE``::
+
+    AUTH_TOKEN_CACHE = {
+        "LOCAL_TTL": 5,
+        "SHARED_TTL": 300,
+        "CACHE_ALIAS": "default",
+        "LOCAL_MAX": 1024,
+    }
+"""
+import copy
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from . import tokens
+
+DEFAULTS = {
+    "LOCAL_TTL": 5,
+    "SHARED_TTL": 300,
+    "CACHE_ALIAS": "default",
+    "LOCAL_MAX": 1024,
+}
+
+_local = {}            # cache key -> (expires_at, user)
+_local_lock = threading.Lock()
+
+
+def get_setting(key):
+    return getattr(settings, "AUTH_TOKEN_CACHE", {}).get(key, DEFAULTS[key])
+
+
+def _shared():
+    return caches[get_setting("CACHE_ALIAS")]
+
+
+def cache_key(token_key):
+    # never put raw tokens in a shared cache
+    return "authtoken:" + hashlib.sha256(token_key.encode()).hexdigest()
+
+
+def _user_index_key(user_id):
+    return f"authtoken:user:{user_id}"
+
+
+def _local_get(key):
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    if entry[0] < time.monotonic():
+        _local.pop(key, None)
+        return None
+    return entry[1]
+
+
+def _local_set(key, user):
+    with _local_lock:
+        if len(_local) >= get_setting("LOCAL_MAX"):
+            # drop the entry closest to expiry; cheap enough at this size
+            _local.pop(min(_local, key=lambda k: _local[k][0]), None)
+        _local[key] = (time.monotonic() + get_setting("LOCAL_TTL"), user)
+
+
+def _lookup(key, fetch):
+    """Cached user under `key`; `fetch()` loads it (or returns None) on a miss."""
+    user = _local_get(key)
+    if user is not None:
+        return user
+
+    shared = _shared()
+    user = shared.get(key)
+    if user is None:
+        user = fetch()
+        if user is None:
+            return None
+        ttl = get_setting("SHARED_TTL")
+        shared.set(key, user, ttl)
+        # remember which keys belong to the user so a profile save can drop them
+        index = shared.get(_user_index_key(user.pk)) or []
+        if key not in index:
+            shared.set(_user_index_key(user.pk), index + [key], ttl)
+    _local_set(key, user)
+    return user
+
+
+def load_user(token_key):
+    """The active user for the DRF token `token_key` (cached), or None for an unknown key."""
+    def fetch():
+        token = Token.objects.select_related("user", "user__userprofile").filter(key=token_key).first()
+        return token.user if token else None
+
+    return _lookup(cache_key(token_key), fetch)
+
+
+def load_user_by_id(user_id):
+    """The user behind a signed token (cached), or None if it no longer exists."""
+    def fetch():
+        return User.objects.select_related("userprofile").filter(pk=user_id).first()
+
+    return _lookup(f"authtoken:uid:{user_id}", fetch)
+
+
+def forget_token(token_key):
+    key = cache_key(token_key)
+    _local.pop(key, None)
+    _shared().delete(key)
+
+
+def forget_user(user_id):
+    shared = _shared()
+    keys = shared.get(_user_index_key(user_id)) or []
+    shared.delete_many(keys + [_user_index_key(user_id)])
+    with _local_lock:
+        for key in keys:
+            _local.pop(key, None)
+        for key in [k for k, (_, user) in _local.items() if user.pk == user_id]:
+            _local.pop(key, None)
+
+
+def clear_local():
+    _local.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in replacement for `TokenAuthentication` backed by `load_user`.
+
+    Also accepts the signed, expiring tokens from tokens.py; those are checked
+    without touching the token table at all.
+    """
+
+    def authenticate_credentials(self, key):
+        if tokens.is_signed(key):
+            user = self._signed_user(key)
+        else:
+            user = load_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        # each request gets its own copy; views may modify request.user
+        return (copy.copy(user), _CachedToken(key, user))
+
+    def _signed_user(self, key):
+        try:
+            user_id, version, _started = tokens.read(key)
+        except tokens.TokenExpired:
+            raise exceptions.AuthenticationFailed(_("Token expired."))
+        except tokens.TokenInvalid:
+            return None
+        user = load_user_by_id(user_id)
+        if user is not None and tokens.token_version(user) != version:
+            raise exceptions.AuthenticationFailed(_("Token revoked."))
+        return user
+
+
+class _CachedToken:
+    """Stands in for the Token row as `request.auth` (only `key` and `user` are used)."""
+
+    def __init__(self, key, user):
+        self.key = key
+        self.user = user
+        self.user_id = user.pk
+
+    def __str__(self):
+        return self.key
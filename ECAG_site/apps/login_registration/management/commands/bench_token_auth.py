@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from apps.login_registration import authentication, tokens
+from apps.login_registration.authentication import CachedTokenAuthentication
+
+ENDPOINTS = ["/api/menu/orders/", "/api/reservations/bookings/", "/api/auth/me/"]
+AUTH_TABLES = ("authtoken_token", "auth_user", "login_registration_userprofile")
+
+
+def _is_auth_query(sql):
+    head = sql.split(" WHERE ")[0]
+    return any(f'"{table}"' in head for table in AUTH_TABLES) and "FROM" in head
+
+
+class Command(BaseCommand):
+    help = "Compare queries and time per API request with DRF's TokenAuthentication, the cached authenticator and signed tokens."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and mode.")
+        parser.add_argument("--username", default="bench_token_auth")
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=options["username"])
+        token, _ = Token.objects.get_or_create(user=user)
+        signed = tokens.issue(user)["token"]
+        original = APIView.authentication_classes
+        rows = []
+        try:
+            with override_settings(ALLOWED_HOSTS=["*"]):
+                for label, classes, key in (
+                    ("TokenAuthentication", [SessionAuthentication, TokenAuthentication], token.key),
+                    ("CachedTokenAuthentication", [SessionAuthentication, CachedTokenAuthentication], token.key),
+                    ("signed token", [SessionAuthentication, CachedTokenAuthentication], signed),
+                ):
+                    APIView.authentication_classes = classes
+                    client = Client(HTTP_AUTHORIZATION=f"Token {key}")
+                    authentication.clear_local()
+                    authentication.forget_user(user.pk)
+                    for path in ENDPOINTS:
+                        client.get(path)   # warm up (fills the cache in the cached mode)
+                        queries, auth_queries, timings = [], [], []
+                        for _ in range(options["requests"]):
+                            with CaptureQueriesContext(connection) as ctx:
+                                started = time.perf_counter()
+                                response = client.get(path)
+                                timings.append((time.perf_counter() - started) * 1000)
+                            if response.status_code != 200:
+                                self.stderr.write(f"{path} -> HTTP {response.status_code}")
+                                break
+                            queries.append(len(ctx.captured_queries))
+                            auth_queries.append(sum(_is_auth_query(q["sql"]) for q in ctx.captured_queries))
+                        if queries:
+                            rows.append((label, path, statistics.median(queries), statistics.median(auth_queries), statistics.median(timings)))
+        finally:
+            APIView.authentication_classes = original
+
+        self.stdout.write(f"{'authenticator':<27}{'endpoint':<30}{'queries':>8}{'auth/user':>10}{'median ms':>11}")
+        for label, path, total, auth, ms in rows:
+            self.stdout.write(f"{label:<27}{path:<30}{total:>8}{auth:>10}{ms:>11.2f}")
@@ -1,25 +1,64 @@
-from django.db import models
-from django.contrib.auth.models import User
-from django.core.validators import RegexValidator
-
-
-class UserProfile(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE)  # Link to the User model
-    phone_regex = RegexValidator(
-                                    regex=r'^(?:\+230|230|0)?5\d{7}$',
-                                    message="Enter a valid Mauritian mobile number (e.g. 5XXXXXXX or +2305XXXXXXX)."
-                                )
-    address = models.CharField(max_length=50, null=True, blank=True)
-    date_of_birth = models.DateField(null=True, blank=True)
-    phone_number = models.CharField(validators=[phone_regex], max_length=20, null=True, blank=True)
-
-    def __str__(self):
-        return self.user.username
-
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.get_or_create(user=instance)
+from django.db import models
+from django.contrib.auth.models import User
+from django.core.validators import RegexValidator
+
+
+class UserProfile(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE)  # Link to the User model
+    phone_regex = RegexValidator(
+                                    regex=r'^(?:\+230|230|0)?5\d{7}$',
+                                    message="Enter a valid Mauritian mobile number (e.g. 5XXXXXXX or +2305XXXXXXX)."
+                                )
+    address = models.CharField(max_length=50, null=True, blank=True)
+    date_of_birth = models.DateField(null=True, blank=True)
+    phone_number = models.CharField(validators=[phone_regex], max_length=20, null=True, blank=True)
+    # bumped on logout; signed API tokens carrying an older value are refused (tokens.py)
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    def __str__(self):
+        return self.user.username
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, **kwargs):
+    if created:
+        UserProfile.objects.get_or_create(user=instance)
+
+
+from django.db.models.signals import post_delete
+from rest_framework.authtoken.models import Token
+from . import authentication
+
+# keep the cached token -> user lookups (authentication.py) honest
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    authentication.forget_token(instance.key)
+
+@receiver([post_save, post_delete], sender=User)
+def forget_changed_user(sender, instance, **kwargs):
+    authentication.forget_user(instance.pk)
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def forget_changed_profile(sender, instance, **kwargs):
+    authentication.forget_user(instance.user_id)
+
+from . import tokens
+
+# a new password (set_password, from any view or form) ends every API session;
+# Django clears `_password` itself for hash upgrades on login
+@receiver(post_save, sender=User)
+def revoke_tokens_on_password_change(sender, instance, created, **kwargs):
+    if not created and getattr(instance, "_password", None) is not None:
+        tokens.revoke_all(instance)
+        Token.objects.filter(user=instance).delete()
+
+
+from apps.core import versions
+
+# data versions behind the API ETags (apps/core/versions.py)
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=UserProfile)
+def bump_users_version(sender, **kwargs):
+    versions.bump("users")
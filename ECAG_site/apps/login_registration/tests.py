@@ -1,3 +1,91 @@
-from django.test import TestCase
-
-# Create your tests here.
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import authentication
+
+DAY = 24 * 3600
+# SessionAuthentication comes first, so DRF answers refused tokens with 403, not 401
+REFUSED = 403
+
+
+@override_settings(AUTH_TOKENS={'ACCESS_TTL': DAY, 'REFRESH_TTL': 30 * DAY})
+class SignedTokenTests(TestCase):
+    def setUp(self):
+        authentication.clear_local()
+        self.addCleanup(authentication.clear_local)
+        self.user = User.objects.create_user(username="diner", password="old-secret-42")
+        self.client = APIClient()
+        self.now = time.time()
+
+    def at(self, offset):
+        """Run the block `offset` seconds after setUp."""
+        return mock.patch("time.time", return_value=self.now + offset)
+
+    def login(self):
+        with self.at(0):
+            response = self.client.post("/api/auth/login/", {'username': "diner", 'password': "old-secret-42"})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['token']
+
+    def me(self, token, offset=0):
+        authentication.clear_local()
+        with self.at(offset):
+            return self.client.get("/api/auth/me/", HTTP_AUTHORIZATION=f"Token {token}")
+
+    def refresh(self, token, offset=0):
+        with self.at(offset):
+            return self.client.post("/api/auth/token/refresh/", HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_access_expires(self):
+        token = self.login()
+        self.assertEqual(self.me(token, DAY - 60).status_code, 200)
+        response = self.me(token, DAY + 60)
+        self.assertEqual(response.status_code, REFUSED)
+        self.assertEqual(response.json()['detail'], "Token expired.")
+
+    def test_refresh_gives_a_working_token(self):
+        token = self.login()
+        response = self.refresh(token, DAY + 60)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.me(response.json()['token'], DAY + 120).status_code, 200)
+
+    def test_refresh_chain_ends_refresh_ttl_after_login(self):
+        token = self.login()
+        # refreshed every 10 days, each token is fresh when swapped...
+        for day in (10, 20, 29):
+            response = self.refresh(token, day * DAY)
+            self.assertEqual(response.status_code, 200, day)
+            token = response.json()['token']
+        # ...but the chain started at login
+        self.assertEqual(self.refresh(token, 31 * DAY).status_code, 401)
+        self.assertEqual(self.me(token, 29 * DAY + 60).status_code, 200)
+
+    def test_garbage_and_missing_tokens(self):
+        self.assertEqual(self.refresh("nope:nope:nope").status_code, 401)
+        with self.at(0):
+            self.assertEqual(self.client.post("/api/auth/token/refresh/").status_code, 401)
+
+    def test_logout_revokes_every_token(self):
+        first, second = self.login(), self.login()
+        with self.at(0):
+            response = self.client.post("/api/auth/logout/", HTTP_AUTHORIZATION=f"Token {first}")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.me(second).json()['detail'], "Token revoked.")
+        self.assertEqual(self.refresh(second).status_code, 401)
+
+    def test_password_change_revokes_every_token(self):
+        token = self.login()
+        self.user.set_password("new-secret-42")
+        self.user.save(update_fields=['password'])
+        self.assertEqual(self.me(token).json()['detail'], "Token revoked.")
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_other_saves_keep_tokens(self):
+        token = self.login()
+        self.user.first_name = "Ana"
+        self.user.save()
+        self.assertEqual(self.me(token).status_code, 200)
@@ -0,0 +1,105 @@
+"""Expiring, signed API tokens for the mobile apps.
+
+A token is ``django.core.signing.dumps({"u": user_id, "v": token_version,
+"s": login_time})`` with a timestamp, so checking one needs no table at all: the signature proves
+we issued it, the timestamp says how old it is, and the user behind it comes
+from the cached lookups in authentication.py.
+
+* A token is accepted for API calls for ``ACCESS_TTL`` seconds.
+* It can be exchanged at ``/api/auth/token/refresh/`` for a fresh one (the
+  app does this on start-up and when a call is refused) until ``REFRESH_TTL``
+  seconds after the login that started the chain: refreshed tokens carry the
+  login time along, so a leaked token cannot be kept alive forever and every
+  device logs in again once per ``REFRESH_TTL``.
+* Logging out or changing the password bumps ``UserProfile.token_version``;
+  every token carrying the old version is refused from then on, on every
+  device.
+
+Keys rotate the Django way: move the old ``SECRET_KEY`` into
+``SECRET_KEY_FALLBACKS`` and tokens signed with it keep working until they
+expire.
+
+Settings (all optional) live in ``settings.AUTH_TOKENS``::
+
+    AUTH_TOKENS = {
+        "ACCESS_TTL": 24 * 3600,
+        "REFRESH_TTL": 30 * 24 * 3600,
+    }
+"""
+import time
+
+from django.conf import settings
+from django.core import signing
+
+SALT = "login_registration.api-token"
+
+DEFAULTS = {
+    "ACCESS_TTL": 24 * 3600,
+    "REFRESH_TTL": 30 * 24 * 3600,
+}
+
+
+class TokenExpired(Exception):
+    pass
+
+
+class TokenInvalid(Exception):
+    pass
+
+
+def get_setting(key):
+    return getattr(settings, "AUTH_TOKENS", {}).get(key, DEFAULTS[key])
+
+
+def is_signed(key):
+    # DRF's Token keys are 40 hex characters; ours always contain the signer's separator
+    return ":" in key
+
+
+def token_version(user):
+    profile = getattr(user, "userprofile", None)
+    return profile.token_version if profile is not None else 0
+
+
+def issue(user, started=None):
+    """A new token for `user`, plus how long it is good for.
+
+    `started` is the login time (epoch seconds) of the chain a refreshed token
+    continues; a new login starts a new chain.
+    """
+    started = int(time.time()) if started is None else started
+    key = signing.dumps({"u": user.pk, "v": token_version(user), "s": started}, salt=SALT, compress=True)
+    return {"token": key, "expires_in": get_setting("ACCESS_TTL")}
+
+
+def read(key, max_age=None):
+    """(user_id, version, started) from `key` if it is ours and younger than `max_age` seconds."""
+    if max_age is None:
+        max_age = get_setting("ACCESS_TTL")
+    try:
+        payload = signing.loads(key, salt=SALT, max_age=max_age)
+    except signing.SignatureExpired:
+        raise TokenExpired()
+    except signing.BadSignature:
+        raise TokenInvalid()
+    try:
+        # tokens issued before chains were tracked have no "s"; theirs starts at the next refresh
+        started = int(payload["s"]) if payload.get("s") is not None else None
+        return int(payload["u"]), int(payload["v"]), started
+    except (KeyError, TypeError, ValueError, AttributeError):
+        raise TokenInvalid()
+
+
+def refreshable(started):
+    """Whether a chain that began at `started` may still be refreshed."""
+    return started is None or time.time() - started <= get_setting("REFRESH_TTL")
+
+
+def revoke_all(user):
+    """Invalidate every signed token issued to `user` so far (logout, password change)."""
+    from .models import UserProfile
+
+    profile, _ = UserProfile.objects.get_or_create(user=user)
+    profile.token_version += 1
+    # the post_save receiver drops the cached user, so the new version is seen right away
+    profile.save(update_fields=["token_version"])
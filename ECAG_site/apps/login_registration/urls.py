@@ -1,4 +1,5 @@
-from django.urls import path
+from django.contrib.auth import views as auth_views
+from django.urls import path, reverse_lazy
 from . import views
 
 app_name='login_registration'
@@ -6,5 +7,10 @@ app_name='login_registration'
 urlpatterns =   [
                     path('register/',views.register,name="register"), # registration_view
                     path('',views.login_view, name="login"),
-                    path('logout/', views.logout_view, name='logout')
+                    path('logout/', views.logout_view, name='logout'),
+                    # the set-password link in staff invite/reset emails (admin_panel/tasks.py)
+                    path('reset/<uidb64>/<token>/', auth_views.PasswordResetConfirmView.as_view(
+                        success_url=reverse_lazy('login_registration:password_reset_complete'),
+                    ), name='password_reset_confirm'),
+                    path('reset/done/', auth_views.PasswordResetCompleteView.as_view(), name='password_reset_complete'),
                 ]
\ No newline at end of file
@@ -8,7 +8,10 @@ from .models import (
     OrderItem,
     Delivery,
     Takeout,
+    Topping,
+    OrderItemTopping,
     Transaction,
+    CustomerStats,
 )
 
 @admin.register(MenuCategory)
@@ -38,6 +41,13 @@ class PromotionAdmin(admin.ModelAdmin):
     search_fields = ("title", "item__name")
 
 
+@admin.register(Topping)
+class ToppingAdmin(admin.ModelAdmin):
+    list_display = ("name", "kind", "price")
+    list_filter = ("kind",)
+    search_fields = ("name",)
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ("order_id_str", "user", "order_type", "status", "subtotal", "total", "order_date")
@@ -45,11 +55,23 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ("order_id_str", "user__username")
 
 
+class OrderItemToppingInline(admin.TabularInline):
+    # read-only: toppings change through the cart/API, which reprice the line
+    model = OrderItemTopping
+    extra = 0
+    can_delete = False
+    readonly_fields = ("topping", "price", "added_at")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ("order", "item", "quantity", "price", "subtotal")
     list_filter = ("order__status", "item__subcategory_id")
     search_fields = ("order__order_id_str", "item__name")
+    inlines = [OrderItemToppingInline]
 
 
 @admin.register(Delivery)
@@ -70,3 +92,16 @@ class TransactionAdmin(admin.ModelAdmin):
     list_display = ("order", "amount", "payment_method", "status", "transaction_date")
     list_filter = ("payment_method", "status", "transaction_date")
     search_fields = ("order__order_id_str",)
+
+
+@admin.register(CustomerStats)
+class CustomerStatsAdmin(admin.ModelAdmin):
+    # kept up to date from orders (apps/menu/customer_stats.py); read-only here
+    list_display = ("user", "tier", "orders_count", "lifetime_spend", "last_order_date", "updated_at")
+    list_filter = ("tier",)
+    search_fields = ("user__username", "user__email")
+    ordering = ("-lifetime_spend",)
+    readonly_fields = ("user", "orders_count", "lifetime_spend", "last_order_date", "tier", "updated_at")
+
+    def has_add_permission(self, request):
+        return False
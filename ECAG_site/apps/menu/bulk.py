@@ -0,0 +1,79 @@
+"""Bulk status changes for orders.
+
+Staff often move a batch of orders at once ("advance these 12"). Each order is
+checked against its flow on its own and gets its own result, and all the
+valid changes are written in one transaction by `lifecycle.apply` (one
+`bulk_update` per table). Nothing goes through per-row `save()`, so there is
+no `Delivery.save` -> `order.update_total()` cascade for what is only a
+status change.
+
+Results come back in request order:
+
+    [{"id": 12, "ok": True, "status": "ready_for_pickup"},
+     {"id": 13, "ok": False, "error": "Order is already in a final state"}]
+"""
+from django.db import transaction
+
+from . import lifecycle
+from .models import Order
+
+MAX_BATCH = 200
+
+
+def parse_ids(raw):
+    """Distinct integer ids from client JSON, in the order given."""
+    if not isinstance(raw, list):
+        raise ValueError("ids must be a list")
+    ids = []
+    for value in raw:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid id: {value!r}")
+        if value not in ids:
+            ids.append(value)
+    if not ids:
+        raise ValueError("No ids given")
+    if len(ids) > MAX_BATCH:
+        raise ValueError(f"At most {MAX_BATCH} ids per request")
+    return ids
+
+
+def _change(order_ids, action, status, pick_track):
+    if action not in ('next', 'cancel', 'set'):
+        raise ValueError("action must be next, cancel or set")
+    if action == 'set' and not status:
+        raise ValueError("status is required for set")
+
+    with transaction.atomic():
+        orders = (Order.objects.select_for_update()
+                  .select_related('delivery', 'takeout')
+                  .in_bulk(order_ids))
+        results, moves = [], []
+        for pk in order_ids:
+            order = orders.get(pk)
+            if order is None:
+                results.append({'id': pk, 'ok': False, 'error': "Order not found"})
+                continue
+            try:
+                machine, row = pick_track(order)
+                target = machine.resolve(getattr(row, machine.field), action, status)
+            except lifecycle.InvalidTransition as exc:
+                results.append({'id': pk, 'ok': False, 'error': str(exc)})
+                continue
+            moves.append((machine, row, target))
+            results.append({'id': pk, 'ok': True, 'status': target})
+        lifecycle.apply(moves)
+    return results
+
+
+def change_board_statuses(order_ids, action, status=None):
+    """Admin board: move `Order.status` along the board machine (action: next | cancel | set)."""
+    return _change(order_ids, action, status, lambda order: (lifecycle.BOARD, order))
+
+
+def change_track_statuses(order_ids, action, status=None):
+    """Staff screens: move each order along its type's track (action: next | set)."""
+    if action == 'cancel':
+        raise ValueError("action must be next or set")
+    return _change(order_ids, action, status, lifecycle.track_for)
@@ -0,0 +1,102 @@
+"""Session cart with versioned, line-level patches.
+
+The browser keeps the cart in localStorage and tells the server only what
+changed since the last version the server acknowledged:
+
+    {"version": 7, "order_type": "pick_up",
+     "ops": [{"op": "set", "item_id": 3, "quantity": 2, "meat_topping": "Beef", "extra_toppings": ["Eggs"]},
+             {"op": "remove", "key": "5||"}]}
+
+Lines are keyed by `line_key` (item, meat, sorted extras), the string
+cart_sync.js builds for its "remove" ops. Once the cart becomes an order,
+`Order.sync_items_from_cart` keys lines by item and topping *ids* instead
+(`pricing.topping_ids`): cart lines that differ only by names that are not
+known toppings become one order line there, the last one winning. A patch
+built against an older version is rejected with the current cart so the
+client can diff against it and resend; a patch that changes nothing leaves
+the session untouched (no session write).
+"""
+
+SESSION_ITEMS = 'cart_items'
+SESSION_VERSION = 'cart_version'
+ORDER_TYPES = ('dine_in', 'pick_up', 'delivery')
+
+
+class CartVersionConflict(Exception):
+    pass
+
+
+def line_key(item_id, meat, extras):
+    """``"<item_id>|<meat>|<extra,extra>"``: a session cart line's identity, by topping name."""
+    return f"{item_id}|{meat or ''}|{','.join(sorted(e for e in extras if e))}"
+
+
+def normalize_line(raw):
+    """Cart line dict from client JSON, or None if it has no usable item id."""
+    try:
+        iid = int(raw.get('item_id'))
+    except (TypeError, ValueError):
+        return None
+    try:
+        qty = int(raw.get('quantity', 1) or 1)
+    except (TypeError, ValueError):
+        qty = 1
+    extras = raw.get('extra_toppings') or []
+    if not isinstance(extras, list):
+        extras = []
+    return {
+        'item_id': iid,
+        'quantity': qty,
+        'meat_topping': raw.get('meat_topping') or '',
+        'extra_toppings': [e for e in extras if e],
+    }
+
+
+def _key_of(line):
+    return line_key(line['item_id'], line.get('meat_topping'), line.get('extra_toppings') or [])
+
+
+def get_version(session):
+    return session.get(SESSION_VERSION, 0)
+
+
+def bump_version(session):
+    # never reset to 0: a client still holding an old version must get a conflict, not a false match
+    session[SESSION_VERSION] = get_version(session) + 1
+    session.modified = True
+    return session[SESSION_VERSION]
+
+
+def replace(session, lines):
+    """Store a full cart (the old save_cart behaviour)."""
+    session[SESSION_ITEMS] = lines
+    return bump_version(session)
+
+
+def apply_patch(session, version, ops, order_type=None):
+    """Apply `ops` if `version` is current. Returns the (possibly unchanged) version."""
+    if version != get_version(session):
+        raise CartVersionConflict()
+
+    lines = {_key_of(line): line for line in session.get(SESSION_ITEMS, [])}
+    before = dict(lines)
+    for op in ops:
+        if op.get('op') == 'remove':
+            lines.pop(op.get('key'), None)
+            continue
+        line = normalize_line(op)
+        if line is None:
+            continue
+        key = _key_of(line)
+        if line['quantity'] < 1:
+            lines.pop(key, None)
+        else:
+            lines[key] = line
+
+    changed = lines != before
+    if changed:
+        session[SESSION_ITEMS] = list(lines.values())
+    if order_type in ORDER_TYPES and session.get('order_type_raw') != order_type:
+        session['order_type_raw'] = order_type
+        changed = True
+    return bump_version(session) if changed else version
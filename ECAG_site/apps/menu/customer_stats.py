@@ -0,0 +1,114 @@
+"""Customer order totals: one `CustomerStats` row per customer.
+
+The admin customer lists (the web page and the mobile endpoint) sort and
+filter customers by how much they order. Instead of grouping the whole order
+table per request, they read `CustomerStats`:
+
+* ``orders_count``: every order the customer has, whatever its status;
+* ``lifetime_spend`` and ``last_order_date``: over completed orders only;
+* ``tier``: VIP from `VIP_ORDERS` orders, active from the first one, new before.
+
+Orders moved out by the archiver (apps/archive) count through the
+customer's `CustomerRollup`, added to what the live orders give.
+
+A customer's row is recomputed from their orders whenever one is created,
+deleted, moves status or, once completed, has its total recalculated (the
+receivers in models.py, and `lifecycle.apply` for bulk status moves). Like
+kitchen events, the customers touched in a transaction are refreshed once,
+after it commits, with one grouped query. ``manage.py rebuild_customer_stats``
+recomputes every row, for after bulk imports or raw SQL.
+"""
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+
+VIP_ORDERS = 10
+BATCH_SIZE = 500
+
+_pending = threading.local()
+
+
+def tier_for(orders_count):
+    from .models import CustomerStats
+    if orders_count >= VIP_ORDERS:
+        return CustomerStats.Tier.VIP
+    if orders_count > 0:
+        return CustomerStats.Tier.ACTIVE
+    return CustomerStats.Tier.NEW
+
+
+def queue(user_ids):
+    """Refresh these customers' rows once the current transaction commits."""
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    pending = getattr(_pending, 'users', None)
+    if pending is None:
+        pending = _pending.users = set()
+    pending |= user_ids
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    pending = getattr(_pending, 'users', None)
+    if not pending:
+        return
+    _pending.users = set()
+    refresh(pending)
+
+
+def refresh(user_ids):
+    """Recompute the rows of `user_ids` from their orders; returns how many were written."""
+    from apps.archive.models import CustomerRollup
+
+    from .models import CustomerStats, Order
+
+    user_ids = set(get_user_model().objects.filter(pk__in=set(user_ids)).values_list('pk', flat=True))
+    if not user_ids:
+        return 0
+    completed = Q(status=Order.Status.COMPLETED)
+    totals = {
+        row['user_id']: row
+        for row in Order.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+            orders_count=Count('id'),
+            lifetime_spend=Sum('total', filter=completed),
+            last_order_date=Max('order_date', filter=completed),
+        )
+    }
+    archived = {row.user_id: row for row in CustomerRollup.objects.filter(user_id__in=user_ids)}
+    rows = []
+    for user_id in user_ids:
+        row = totals.get(user_id, {})
+        old = archived.get(user_id, CustomerRollup())
+        count = (row.get('orders_count') or 0) + old.orders_count
+        rows.append(CustomerStats(
+            user_id=user_id,
+            orders_count=count,
+            lifetime_spend=(row.get('lifetime_spend') or 0) + old.spend,
+            last_order_date=max(filter(None, [row.get('last_order_date'), old.last_order_date]), default=None),
+            tier=tier_for(count),
+        ))
+    CustomerStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['orders_count', 'lifetime_spend', 'last_order_date', 'tier', 'updated_at'],
+    )
+    return len(rows)
+
+
+def rebuild(batch_size=BATCH_SIZE):
+    """Recompute every customer's row, `batch_size` customers per query; returns the count."""
+    user_ids = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+    done = 0
+    batch = []
+    for user_id in user_ids.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            done += refresh(batch)
+            batch = []
+    if batch:
+        done += refresh(batch)
+    return done
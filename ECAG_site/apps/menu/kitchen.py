@@ -0,0 +1,164 @@
+"""Kitchen display feed.
+
+Every change a kitchen screen cares about (an order was placed, its items
+changed, its status moved on, it was removed) appends an `OrderEvent` row.
+Events are numbered by `seq`, which only ever goes up, so a screen loads
+today's orders once, remembers the last `seq` it saw and from then on asks for
+"events since N" (optionally waiting for the next one) and patches its cards
+by order id instead of reloading the whole list.
+
+Changes made inside one transaction are coalesced into a single event per
+order, written after commit with a snapshot of the order as committed. The
+snapshot is read when the event is written, so an entry left over from a
+rolled-back transaction only re-publishes the order's current state.
+
+Old events are dropped by ``manage.py prune_order_events``; a client whose
+cursor is older than the oldest kept event gets ``reset`` and reloads.
+"""
+import threading
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+MAX_EVENTS = 200       # per response; clients come straight back while `more` is set
+MAX_WAIT = 25          # seconds a long-poll may hold the request
+POLL_INTERVAL = 0.5    # how often a waiting request re-checks the table
+
+_pending = threading.local()
+_changed = threading.Condition()
+
+
+def _kinds():
+    from .models import OrderEvent
+    return OrderEvent.Kind
+
+
+def _priority(kind):
+    Kind = _kinds()
+    return (Kind.STATUS_CHANGED, Kind.ITEMS_CHANGED, Kind.CREATED, Kind.REMOVED).index(kind)
+
+
+def record(order_id, kind):
+    """Queue a `kind` event for `order_id`; written once the current transaction commits."""
+    if not order_id:
+        return
+    pending = getattr(_pending, 'orders', None)
+    if pending is None:
+        pending = _pending.orders = {}
+    current = pending.get(order_id)
+    if current is None or _priority(kind) > _priority(current):
+        pending[order_id] = kind
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    from .models import OrderEvent
+
+    pending = getattr(_pending, 'orders', None)
+    if not pending:
+        return
+    _pending.orders = {}
+
+    orders = {order.pk: order for order in kitchen_orders().filter(pk__in=list(pending))}
+    events = []
+    for order_id, kind in pending.items():
+        order = orders.get(order_id)
+        if order is None:
+            if kind != OrderEvent.Kind.REMOVED:
+                continue    # created and deleted again before we got here
+            payload = {'id': order_id}
+        else:
+            payload = snapshot(order)
+        events.append(OrderEvent(order_id=order_id, kind=kind, payload=payload))
+    if events:
+        OrderEvent.objects.bulk_create(events)
+        with _changed:
+            _changed.notify_all()
+
+
+def kitchen_orders():
+    from .models import Order
+    return (Order.objects
+            .select_related('delivery', 'takeout')
+            .prefetch_related('items__item', 'items__topping_links__topping'))
+
+
+def todays_orders():
+    return kitchen_orders().filter(order_date__date=timezone.now().date()).order_by('-order_date')
+
+
+def snapshot(order):
+    """What a kitchen card needs to render `order` (no payment data)."""
+    try:
+        delivery = order.delivery
+    except Exception:
+        delivery = None
+    try:
+        takeout = order.takeout
+    except Exception:
+        takeout = None
+    return {
+        'id': order.pk,
+        'order_id_str': order.order_id_str,
+        'order_type': order.order_type,
+        'status': order.status,
+        'order_date': order.order_date.isoformat() if order.order_date else None,
+        'total': str(order.total),
+        'items': [
+            {
+                'id': line.pk,
+                'quantity': line.quantity,
+                'item': {'item_id': line.item_id, 'name': line.item.name},
+                'subtotal': str(line.subtotal),
+                'toppings': [t['name'] for t in line.toppings_list],
+            }
+            for line in order.items.all()
+        ],
+        'delivery': {
+            'id': delivery.pk,
+            'delivery_status': delivery.delivery_status,
+            'address': delivery.address,
+            'arrival_time': delivery.arrival_time.strftime('%H:%M') if delivery.arrival_time else None,
+        } if delivery else None,
+        'takeout': {
+            'id': takeout.pk,
+            'pickup_status': takeout.pickup_status,
+        } if takeout else None,
+    }
+
+
+def latest_seq():
+    from .models import OrderEvent
+    return OrderEvent.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+def events_since(since, limit=MAX_EVENTS):
+    """(events, more) with seq > `since`, oldest first."""
+    from .models import OrderEvent
+    rows = list(OrderEvent.objects.filter(seq__gt=since).order_by('seq')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def is_stale(since):
+    """True when events after `since` may already have been pruned (or the log was reset)."""
+    from .models import OrderEvent
+    if since > latest_seq():
+        return True
+    oldest = OrderEvent.objects.order_by('seq').values_list('seq', flat=True).first()
+    return oldest is not None and since < oldest - 1
+
+
+def wait_for_events(since, timeout):
+    """Block for up to `timeout` seconds until an event after `since` exists."""
+    from .models import OrderEvent
+    deadline = time.monotonic() + min(max(timeout, 0), MAX_WAIT)
+    while True:
+        if OrderEvent.objects.filter(seq__gt=since).exists():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        # woken early by writes from this process, otherwise re-check periodically
+        with _changed:
+            _changed.wait(min(POLL_INTERVAL, remaining))
@@ -0,0 +1,192 @@
+"""Order lifecycle: the status machines for orders, deliveries and pickups.
+
+Every status an order can be in, and every move between statuses, is
+declared once here and compiled at import into plain dicts and frozensets,
+so checking a move is one lookup:
+
+* ``BOARD``: ``Order.status`` as the admin board drives it
+  (pending -> confirmed -> preparing -> ready -> completed, or cancelled).
+* ``DINE_IN``, ``DELIVERY``, ``PICKUP``: the track staff follow for each
+  order type (``Order.status``, ``Delivery.delivery_status``,
+  ``Takeout.pickup_status``).
+
+`apply` writes a batch of moves: one `bulk_update` per table inside one
+transaction, then the side effects once per moved order. Nothing goes
+through the models' `save()`, so a status change never recalculates totals
+or touches the other fulfilment rows.
+"""
+from django.db import transaction
+
+from apps.core import versions
+
+from . import customer_stats, kitchen
+from .models import Delivery, Order, OrderEvent, Takeout
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class Machine:
+    """Compiled transition table for one status field.
+
+    `flow` maps each state to the one `advance` moves it to. With
+    ``free=True`` staff may also jump to any other state of the machine
+    (to correct a mis-tap); `final` states can't be left at all, and
+    `cancel`, if given, can be reached from any state that isn't final.
+    """
+
+    def __init__(self, name, model, field, flow, *, final=(), cancel=None, free=False):
+        self.name = name
+        self.model = model
+        self.field = field
+        states = set(flow) | {target for target in flow.values() if target}
+        if cancel:
+            states.add(cancel)
+        self.states = frozenset(states)
+        self.final = frozenset(final)
+        self.next_state = {state: flow.get(state) for state in states}
+        table = {}
+        for state in states:
+            if state in self.final:
+                targets = set()
+            elif free:
+                targets = states - {state}
+            else:
+                targets = {flow[state]} if flow.get(state) else set()
+            if cancel and state not in self.final and state != cancel:
+                targets.add(cancel)
+            table[state] = frozenset(targets)
+        self.table = table
+        self.cancel_state = cancel
+
+    def __repr__(self):
+        return f"<Machine {self.name}>"
+
+    def advance(self, state):
+        target = self.next_state.get(state)
+        if not target:
+            raise InvalidTransition("Order is already in a final state")
+        return target
+
+    def cancel(self, state):
+        if not self.cancel_state or self.cancel_state not in self.table.get(state, ()):
+            raise InvalidTransition("Order cannot be cancelled")
+        return self.cancel_state
+
+    def check(self, state, target):
+        """`target` if moving there from `state` is allowed (staying put always is)."""
+        if target not in self.states:
+            raise InvalidTransition(f"Invalid status for this order type. Allowed: {sorted(self.states)}")
+        if target != state and target not in self.table.get(state, ()):
+            if state in self.final:
+                raise InvalidTransition("Order is already in a final state")
+            raise InvalidTransition(f"Cannot move from {state} to {target}")
+        return target
+
+    def resolve(self, state, action, status=None):
+        """Target state for `action` (next | cancel | set)."""
+        if action == 'next':
+            return self.advance(state)
+        if action == 'cancel':
+            return self.cancel(state)
+        if action == 'set':
+            return self.check(state, status)
+        raise InvalidTransition(f"Unknown action: {action}")
+
+
+BOARD = Machine('board', Order, 'status', {
+    "pending": "confirmed",
+    "confirmed": "preparing",
+    "in_progress": "preparing",
+    "preparing": "ready",
+    "ready": "completed",
+    "completed": None,
+}, final=("completed", "cancelled"), cancel="cancelled", free=True)
+
+
+def _track(name, model, field, statuses):
+    return Machine(name, model, field, dict(zip(statuses, statuses[1:])), free=True)
+
+
+DINE_IN = _track('dine_in', Order, 'status', Order.Status.values)
+DELIVERY = _track('delivery', Delivery, 'delivery_status', Delivery.Status.values)
+PICKUP = _track('pickup', Takeout, 'pickup_status', Takeout.Status.values)
+
+TRACKS = {
+    Order.Ordertype.DINE_IN: DINE_IN,
+    Order.Ordertype.DELIVERY: DELIVERY,
+    Order.Ordertype.CARRY_OUT: PICKUP,
+}
+
+# The step after each board status, for callers that only need "what's next".
+STATUS_FLOW = {state: BOARD.next_state[state] for state in sorted(BOARD.states)}
+
+
+# What older clients send for an order type, mapped onto Order.Ordertype values.
+TYPE_ALIASES = {
+    'dine in': 'dine in', 'dine_in': 'dine in', 'dine-in': 'dine in',
+    'delivery': 'delivery',
+    'pick up': 'pick up', 'pick_up': 'pick up', 'pickup': 'pick up', 'takeout': 'pick up',
+}
+
+
+def track_for(order):
+    """(machine, row) for the track `order` follows on staff screens.
+
+    `row` is the Order, Delivery or Takeout whose field the machine drives;
+    raises InvalidTransition if the order has no such track or row.
+    """
+    machine = TRACKS.get(TYPE_ALIASES.get((order.order_type or '').lower()))
+    if machine is None:
+        raise InvalidTransition("Status updates are not available for this order type")
+    if machine.model is Order:
+        return machine, order
+    relation = 'delivery' if machine is DELIVERY else 'takeout'
+    row = getattr(order, relation, None)
+    if row is None:
+        raise InvalidTransition(f"{relation.title()} details missing for this order")
+    return machine, row
+
+
+def order_id_of(row):
+    return row.pk if isinstance(row, Order) else row.order_id
+
+
+def apply(moves):
+    """Write `moves`, a list of (machine, row, target), as one batch.
+
+    Rows already at their target are skipped. Returns the rows that changed.
+    """
+    by_table = {}
+    changed = []
+    for machine, row, target in moves:
+        if getattr(row, machine.field) == target:
+            continue
+        setattr(row, machine.field, target)
+        by_table.setdefault((machine.model, machine.field), []).append(row)
+        changed.append(row)
+
+    with transaction.atomic():
+        for (model, field), rows in by_table.items():
+            model.objects.bulk_update(rows, [field])
+        if changed:
+            # bulk_update sends no post_save, so the ETag versions are bumped here
+            versions.bump("orders")
+        # side effects once per order, however many of its rows moved
+        for order_id in dict.fromkeys(order_id_of(row) for row in changed):
+            kitchen.record(order_id, OrderEvent.Kind.STATUS_CHANGED)
+        # completing (or reopening) an order moves its customer's spend
+        customer_stats.queue(row.user_id for row in changed if isinstance(row, Order))
+    for row in changed:
+        if isinstance(row, Order):
+            # a later save() of this instance shouldn't report the move again
+            row._loaded_state = (row.status, row.order_type)
+    return changed
+
+
+def move(machine, row, action, status=None):
+    """Resolve and apply a single move; returns the new state."""
+    target = machine.resolve(getattr(row, machine.field), action, status)
+    apply([(machine, row, target)])
+    return target
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.menu.models import OrderEvent
+
+
+class Command(BaseCommand):
+    help = "Delete kitchen feed events older than a few days (screens only need today's)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="Keep events from the last N days.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=max(options["days"], 1))
+        deleted, _ = OrderEvent.objects.filter(created_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} order event(s) older than {cutoff:%Y-%m-%d %H:%M}."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.menu import customer_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute every customer's CustomerStats row from their orders (after bulk imports or raw SQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=customer_stats.BATCH_SIZE,
+            help="Customers recomputed per query.",
+        )
+
+    def handle(self, *args, **options):
+        done = customer_stats.rebuild(batch_size=max(options["batch_size"], 1))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt order stats for {done} customer(s)."))
@@ -9,10 +9,14 @@ class Migration(migrations.Migration):
 
     dependencies = [
         ('menu', '0001_initial'),
+        # the other branch (0003_orderitem_toppings, 0004_transaction_card_...) adds the same
+        # columns; run after it so a fresh database gets them once
+        ('menu', '0004_transaction_card_name_transaction_card_number_and_more'),
         migrations.swappable_dependency(settings.AUTH_USER_MODEL),
     ]
 
     operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
         migrations.AddField(
             model_name='orderitem',
             name='extra_toppings',
@@ -43,6 +47,7 @@ class Migration(migrations.Migration):
             name='exp_date',
             field=models.DateField(blank=True, null=True),
         ),
+        ]),
         migrations.AlterField(
             model_name='order',
             name='user',
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0010_takeout_pickup_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('created', 'Created'), ('items_changed', 'Items Changed'), ('status_changed', 'Status Changed'), ('removed', 'Removed')], max_length=20)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Snapshot of the order when the event was written.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('order', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='menu.order')),
+            ],
+            options={
+                'ordering': ['seq'],
+            },
+        ),
+    ]
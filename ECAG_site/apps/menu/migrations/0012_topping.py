@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:34
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0011_orderevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Topping',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('kind', models.CharField(choices=[('meat', 'Meat'), ('extra', 'Extra')], default='extra', max_length=10)),
+                ('price', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=8, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))])),
+            ],
+            options={
+                'ordering': ['kind', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderItemTopping',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=8)),
+                ('added_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='topping_links', to='menu.orderitem')),
+                ('topping', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='order_links', to='menu.topping')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='toppings',
+            field=models.ManyToManyField(blank=True, related_name='order_items', through='menu.OrderItemTopping', to='menu.topping'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitemtopping',
+            index=models.Index(fields=['added_at', 'topping'], name='menu_topping_added_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='orderitemtopping',
+            constraint=models.UniqueConstraint(fields=('order_item', 'topping'), name='menu_orderitemtopping_unique'),
+        ),
+    ]
@@ -0,0 +1,94 @@
+"""Move order-line toppings from the comma-separated text columns to topping links.
+
+The topping list is seeded with the prices sidebar.js used; names found on old
+lines that aren't on that list are kept as free extra toppings. Each link gets
+the price the line was charged for it (nothing unless the dish takes
+toppings) and the order's date, so Topping.most_added covers past orders too.
+"""
+from decimal import Decimal
+
+from django.db import migrations
+
+SEED = [
+    # name, kind, price
+    ("Chicken", "meat", Decimal("0")),
+    ("Beef", "meat", Decimal("15")),
+    ("Lamb", "meat", Decimal("30")),
+    ("Eggs", "extra", Decimal("25")),
+    ("Shrimps", "extra", Decimal("30")),
+    ("Mushrooms", "extra", Decimal("20")),
+]
+
+# copy of menu.models.eligible_for_toppings as of this migration
+TOPPING_DISHES = ("fried rice", "fried noodles", "magic bowl")
+
+
+def _names(meat, extras):
+    names = [meat.strip()] if meat and meat.strip() else []
+    names += [e.strip() for e in (extras or "").split(",") if e.strip()]
+    return list(dict.fromkeys(names))
+
+
+def forwards(apps, schema_editor):
+    Topping = apps.get_model("menu", "Topping")
+    OrderItem = apps.get_model("menu", "OrderItem")
+    OrderItemTopping = apps.get_model("menu", "OrderItemTopping")
+
+    for name, kind, price in SEED:
+        Topping.objects.get_or_create(name=name, defaults={"kind": kind, "price": price})
+    toppings = {t.name: t for t in Topping.objects.all()}
+
+    links = []
+    lines = (
+        OrderItem.objects.exclude(meat_topping="", extra_toppings="")
+        .values_list("id", "meat_topping", "extra_toppings", "item__name", "order__order_date")
+    )
+    for line_id, meat, extras, item_name, order_date in lines.iterator(chunk_size=2000):
+        eligible = any(dish in (item_name or "").lower() for dish in TOPPING_DISHES)
+        for name in _names(meat, extras):
+            topping = toppings.get(name)
+            if topping is None:
+                topping = toppings[name] = Topping.objects.create(name=name[:50], kind="extra")
+            links.append(OrderItemTopping(
+                order_item_id=line_id,
+                topping=topping,
+                price=topping.price if eligible else Decimal("0.00"),
+                added_at=order_date,
+            ))
+        if len(links) >= 2000:
+            OrderItemTopping.objects.bulk_create(links)
+            links = []
+    OrderItemTopping.objects.bulk_create(links)
+
+
+def backwards(apps, schema_editor):
+    OrderItem = apps.get_model("menu", "OrderItem")
+    OrderItemTopping = apps.get_model("menu", "OrderItemTopping")
+
+    by_line = {}
+    for line_id, name, kind in OrderItemTopping.objects.order_by("id").values_list(
+            "order_item_id", "topping__name", "topping__kind"):
+        meat, extras = by_line.setdefault(line_id, ["", []])
+        if kind == "meat" and not meat:
+            by_line[line_id][0] = name
+        else:
+            extras.append(name)
+    lines = []
+    for line in OrderItem.objects.filter(pk__in=list(by_line)).only("id"):
+        line.meat_topping, extras = by_line[line.pk]
+        line.extra_toppings = ",".join(extras)
+        lines.append(line)
+    OrderItem.objects.bulk_update(lines, ["meat_topping", "extra_toppings"], batch_size=500)
+    # the text is the record again; stale links would clash when forwards re-runs
+    OrderItemTopping.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0012_topping'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
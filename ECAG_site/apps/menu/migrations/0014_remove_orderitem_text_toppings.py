@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0013_orderitem_toppings_data'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='extra_toppings',
+        ),
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='meat_topping',
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:49
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('menu', '0014_remove_orderitem_text_toppings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='order_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('orders_count', models.PositiveIntegerField(default=0)),
+                ('lifetime_spend', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('last_order_date', models.DateTimeField(blank=True, null=True)),
+                ('tier', models.CharField(choices=[('new', 'New'), ('active', 'Active'), ('vip', 'VIP')], default='new', max_length=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'customer stats',
+                'indexes': [models.Index(fields=['-lifetime_spend'], name='menu_custstats_spend_idx'), models.Index(fields=['-orders_count'], name='menu_custstats_orders_idx'), models.Index(fields=['tier', '-lifetime_spend'], name='menu_custstats_tier_idx')],
+            },
+        ),
+    ]
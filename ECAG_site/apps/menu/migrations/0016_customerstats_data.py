@@ -0,0 +1,65 @@
+"""Fill CustomerStats for every existing customer from their orders.
+
+Same totals as menu.customer_stats.refresh, with the tier thresholds as of this
+migration.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, Max, Q, Sum
+
+# copy of menu.customer_stats.VIP_ORDERS as of this migration
+VIP_ORDERS = 10
+
+
+def _tier(count):
+    if count >= VIP_ORDERS:
+        return "vip"
+    return "active" if count > 0 else "new"
+
+
+def forwards(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Order = apps.get_model("menu", "Order")
+    CustomerStats = apps.get_model("menu", "CustomerStats")
+
+    completed = Q(status="completed")
+    totals = {
+        row["user_id"]: row
+        for row in Order.objects.filter(user__isnull=False).values("user_id").annotate(
+            orders_count=Count("id"),
+            lifetime_spend=Sum("total", filter=completed),
+            last_order_date=Max("order_date", filter=completed),
+        )
+    }
+    rows = []
+    for user_id in User.objects.values_list("pk", flat=True).iterator(chunk_size=2000):
+        row = totals.get(user_id, {})
+        count = row.get("orders_count") or 0
+        rows.append(CustomerStats(
+            user_id=user_id,
+            orders_count=count,
+            lifetime_spend=row.get("lifetime_spend") or Decimal("0.00"),
+            last_order_date=row.get("last_order_date"),
+            tier=_tier(count),
+        ))
+        if len(rows) >= 2000:
+            CustomerStats.objects.bulk_create(rows)
+            rows = []
+    CustomerStats.objects.bulk_create(rows)
+
+
+def backwards(apps, schema_editor):
+    apps.get_model("menu", "CustomerStats").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0015_customerstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
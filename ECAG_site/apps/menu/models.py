@@ -6,22 +6,14 @@ from decimal import Decimal, ROUND_HALF_UP
 from django.utils import timezone
 from datetime import timedelta
 
+from . import customer_stats, kitchen
+
 def default_arrival_time():
     return (timezone.now() + timedelta(minutes=15)).time() #adds 15 min to current time when entering a default arrival time for delivery
 
 def roundup(val):
     return Decimal(val).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) #makes 1.555 become 1.56
 
-# Server-side topping pricing to mirror frontend sidebar.js
-TOPPING_PRICES = {
-    "Eggs": Decimal("25"),
-    "Chicken": Decimal("0"),
-    "Shrimps": Decimal("30"),
-    "Beef": Decimal("15"),
-    "Lamb": Decimal("30"),
-    "Mushrooms": Decimal("20"),
-}
-
 def eligible_for_toppings(item_name: str) -> bool:
     if not item_name:
         return False
@@ -75,6 +67,46 @@ class Promotion(models.Model):
     def __str__(self): #this is so only the user's name appears on the admin page when an order is added
         return self.title
 
+class Topping(models.Model):
+    """A meat or extra topping for the fried rice / noodles / magic bowl dishes.
+
+    Prices here are what the server charges; sidebar.js and the mobile app
+    show the same list (the price-quote endpoint returns it).
+    """
+    class Kind(models.TextChoices): #enum data type
+        MEAT = "meat", "Meat"
+        EXTRA = "extra", "Extra"
+
+    name = models.CharField(max_length=50, unique=True)
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.EXTRA)
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=Decimal("0.00"), validators=[MinValueValidator(Decimal("0.00"))])
+
+    class Meta:
+        ordering = ['kind', 'name']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def most_added(cls, since=None, until=None, limit=10):
+        """Toppings by portions ordered between `since` and `until`, most first.
+
+        Reads only the order_item_toppings rows in that window (the
+        (added_at, topping) index), never the order lines' text.
+        Returns [{'topping_id', 'name', 'lines', 'portions'}, ...].
+        """
+        links = OrderItemTopping.objects.all()
+        if since is not None:
+            links = links.filter(added_at__gte=since)
+        if until is not None:
+            links = links.filter(added_at__lt=until)
+        rows = (
+            links.values('topping_id', name=models.F('topping__name'))
+            .annotate(lines=models.Count('id'), portions=Sum('order_item__quantity'))
+            .order_by('-portions', '-lines', 'name')
+        )
+        return list(rows[:limit] if limit else rows)
+
 class Order(models.Model):
     # allow anonymous orders by permitting a NULL user
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
@@ -114,10 +146,27 @@ class Order(models.Model):
             self.order_id_str = f"ORD-{self.id:03d}"
             super(Order, self).save(update_fields=['order_id_str'])
 
-        # Handle order_type changes and create/delete Delivery/Takeout accordingly
-        # Only run this when it's not a new order AND we're not in the middle of updating specific fields
-        if not is_new and update_fields is None:
-            self.update_total_with_type()
+        # Create/delete Delivery/Takeout only when the order type actually changed;
+        # a plain save (status, notes, ...) must not probe or rewrite those rows.
+        loaded_type = getattr(self, '_loaded_state', (None, None))[1]
+        if not is_new and (update_fields is None or 'order_type' in update_fields):
+            if loaded_type is None or loaded_type != self.order_type:
+                self.update_total_with_type()
+
+        # let kitchen screens know; totals-only saves (update_total) aren't news
+        state = (self.status, self.order_type)
+        if is_new:
+            kitchen.record(self.pk, OrderEvent.Kind.CREATED)
+        elif state != getattr(self, '_loaded_state', state):
+            kitchen.record(self.pk, OrderEvent.Kind.STATUS_CHANGED)
+        self._loaded_state = state
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        order = super().from_db(db, field_names, values)
+        # what the row held when loaded; save() compares against it
+        order._loaded_state = (order.__dict__.get('status'), order.__dict__.get('order_type'))
+        return order
 
 
     def __str__(self): # readable representation for admin
@@ -151,44 +200,21 @@ class Order(models.Model):
         # Import locally to avoid circular dependency since these are defined later in the file
         from apps.menu import models as menu_models
 
+        # one delete per table that no longer applies, no per-relation probing
+        if self.order_type != self.Ordertype.DELIVERY:
+            menu_models.Delivery.objects.filter(order=self).delete()
+        if self.order_type != self.Ordertype.CARRY_OUT:
+            menu_models.Takeout.objects.filter(order=self).delete()
+        # cached reverse accessors may still point at the deleted rows
+        self._state.fields_cache.pop('delivery', None)
+        self._state.fields_cache.pop('takeout', None)
+
         if self.order_type == self.Ordertype.DELIVERY:
-            # Ensure Delivery exists, remove Takeout
-            try:
-                self.takeout.delete()
-            except menu_models.Takeout.DoesNotExist:
-                pass
-            except Exception:
-                pass
-            try:
-                self.delivery
-            except menu_models.Delivery.DoesNotExist:
+            if not menu_models.Delivery.objects.filter(order=self).exists():
                 menu_models.Delivery.objects.create(order=self, address="", fee=Decimal("100.00"))
         elif self.order_type == self.Ordertype.CARRY_OUT:
-            # Ensure Takeout exists, remove Delivery
-            try:
-                self.delivery.delete()
-            except menu_models.Delivery.DoesNotExist:
-                pass
-            except Exception:
-                pass
-            try:
-                self.takeout
-            except menu_models.Takeout.DoesNotExist:
+            if not menu_models.Takeout.objects.filter(order=self).exists():
                 menu_models.Takeout.objects.create(order=self, fee=Decimal("50.00"))
-        else:  # DINE_IN
-            # Remove both Delivery and Takeout
-            try:
-                self.delivery.delete()
-            except menu_models.Delivery.DoesNotExist:
-                pass
-            except Exception:
-                pass
-            try:
-                self.takeout.delete()
-            except menu_models.Takeout.DoesNotExist:
-                pass
-            except Exception:
-                pass
 
         # Recalculate total after order_type changes
         self.update_total()
@@ -218,7 +244,7 @@ class Order(models.Model):
         """Sync OrderItems to match a cart_items list.
 
         cart_items: list of dicts [{'item_id': int, 'quantity': int, 'meat_topping': str, 'extra_toppings': [..]}, ...]
-        Items are keyed by (item_id, meat_topping, sorted extras signature) so the same dish with different
+        Items are keyed by (item_id, sorted topping ids) so the same dish with different
         toppings becomes distinct OrderItem rows.
         Returns a tuple (created_count, updated_count, removed_count).
         """
@@ -226,10 +252,8 @@ class Order(models.Model):
         updated = 0
         removed = 0
 
-        def signature(item_id, meat, extras):
-            extras_sig = ",".join(sorted([e for e in extras if e]))
-            meat_sig = meat or ""
-            return f"{item_id}|{meat_sig}|{extras_sig}"
+        # Import locally to avoid circular dependency: pricing reads these models
+        from .pricing import topping_ids
 
         incoming_structs = []
         for x in cart_items:
@@ -243,10 +267,11 @@ class Order(models.Model):
                 extras = []
             incoming_structs.append({'item_id': iid, 'quantity': qty, 'meat': meat, 'extras': extras})
 
-        incoming_map = {signature(s['item_id'], s['meat'], s['extras']): s for s in incoming_structs}
+        # a line is its item plus the set of topping ids on it
+        incoming_map = {(s['item_id'], topping_ids([s['meat'], *s['extras']])): s for s in incoming_structs}
 
-        existing_items = list(self.items.select_related('item').all())
-        existing_map = {signature(oi.item_id, oi.meat_topping, [e.strip() for e in oi.extra_toppings.split(',') if e.strip()]): oi for oi in existing_items}
+        existing_items = list(self.items.select_related('item').prefetch_related('topping_links__topping'))
+        existing_map = {(oi.item_id, oi.topping_ids): oi for oi in existing_items}
 
         # create or update
         for sig, data in incoming_map.items():
@@ -254,7 +279,6 @@ class Order(models.Model):
             qty = data['quantity']
             meat = data['meat']
             extras_list = data['extras']
-            extras_text = ",".join([e for e in extras_list if e])
             if sig in existing_map:
                 oi = existing_map[sig]
                 if oi.quantity != qty:
@@ -271,7 +295,7 @@ class Order(models.Model):
                     item=menu_item,
                     quantity=qty,
                     meat_topping=meat,
-                    extra_toppings=extras_text,
+                    extra_toppings=extras_list,
                 )
                 created += 1
 
@@ -330,36 +354,115 @@ class OrderItem(models.Model):
         blank=True,          # forms/admin can leave it empty
         on_delete=models.SET_NULL,  # keep the order item if promo is deleted
     )
-    meat_topping = models.CharField(max_length=50, blank=True, help_text="Selected meat topping if applicable.")
-    extra_toppings = models.TextField(blank=True, help_text="Comma-separated list of extra toppings.")
+    toppings = models.ManyToManyField(Topping, through="OrderItemTopping", blank=True, related_name="order_items")
+
+    # `meat_topping` / `extra_toppings` keep the names the carts, serializers and
+    # templates use; they read and write the topping links. Assignments (and
+    # OrderItem(meat_topping=..., extra_toppings=...)) are held until save().
+
+    @property
+    def meat_topping(self):
+        """Name of the line's meat topping, '' if none."""
+        return next((row.name for row in self._topping_rows() if row.meat), "")
+
+    @meat_topping.setter
+    def meat_topping(self, value):
+        extras = tuple(row.name for row in self._topping_rows() if not row.meat)
+        self._pending_toppings = ((value or "").strip(), extras)
+
+    @property
+    def extra_toppings(self):
+        """Extra topping names, comma-separated (the text this column used to hold)."""
+        return ",".join(row.name for row in self._topping_rows() if not row.meat)
+
+    @extra_toppings.setter
+    def extra_toppings(self, value):
+        # Import locally to avoid circular dependency: pricing reads these models
+        from .pricing import topping_names
+        meat = self.meat_topping
+        self._pending_toppings = (meat, topping_names(value))
+
+    def _topping_rows(self):
+        """This line's toppings as pricing.ToppingPrice rows, meat first.
+
+        Saved links are read through `topping_links`, so a queryset with
+        ``prefetch_related('topping_links__topping')`` costs no query per line;
+        unsaved assignments are priced from the price table.
+        """
+        from .pricing import ToppingPrice, get_table
+        pending = getattr(self, '_pending_toppings', None)
+        if pending is not None:
+            meat, extras = pending
+            table = get_table()
+            rows = [table.topping(meat, meat=True)] if meat else []
+            return rows + [table.topping(name) for name in extras]
+        if self.pk is None:
+            return []
+        if 'topping_links' in getattr(self, '_prefetched_objects_cache', {}):
+            links = self.topping_links.all()
+        else:
+            links = self.topping_links.select_related('topping')
+        rows = [
+            ToppingPrice(link.topping_id, link.topping.name, link.topping.kind == Topping.Kind.MEAT, link.price)
+            for link in links
+        ]
+        return sorted(rows, key=lambda row: not row.meat)   # stable: extras keep their order
+
+    @property
+    def topping_ids(self):
+        """Sorted topping ids: with item_id, what makes two cart lines the same line."""
+        return tuple(sorted(row.topping_id for row in self._topping_rows() if row.topping_id is not None))
+
+    def _write_toppings(self, line):
+        """Replace this line's topping links with the pending assignment."""
+        from .pricing import get_table
+        meat, extras = self._pending_toppings
+        table = get_table()
+        self.topping_links.all().delete()
+        links, seen = [], set()
+        for name in ([meat] if meat else []) + list(extras):
+            row = table.topping(name)
+            if row.topping_id is None or row.topping_id in seen:    # not on the topping list: nothing to link or charge
+                continue
+            seen.add(row.topping_id)
+            links.append(OrderItemTopping(
+                order_item=self,
+                topping_id=row.topping_id,
+                price=row.price if line.toppings_eligible else Decimal("0.00"),
+            ))
+        OrderItemTopping.objects.bulk_create(links)
+        self._pending_toppings = None
+        getattr(self, '_prefetched_objects_cache', {}).pop('topping_links', None)
 
     def save(self, *args, **kwargs):
-        unit = self.item.price
-        if self.promo:
-            # only apply if promo is active AND for this item
-            now = timezone.now()
-            if self.promo.item_id == self.item_id and self.promo.start_date <= now <= self.promo.end_date:
-                unit = unit * (Decimal("1") - self.promo.discountpercent)
-        # add topping prices if applicable
-        extra_charge = Decimal("0.00")
-        if eligible_for_toppings(getattr(self.item, "name", "")):
-            # meat topping
-            if self.meat_topping:
-                extra_charge += TOPPING_PRICES.get(self.meat_topping, Decimal("0.00"))
-            # extra toppings (comma-separated)
-            if self.extra_toppings:
-                for t in [x.strip() for x in self.extra_toppings.split(',') if x.strip()]:
-                    extra_charge += TOPPING_PRICES.get(t, Decimal("0.00"))
-
-        self.price = roundup(unit + extra_charge)
-        self.subtotal = roundup(self.price * self.quantity)
+        # Import locally to avoid circular dependency: pricing reads these models
+        from .pricing import price_lines
+
+        rows = self._topping_rows()
+        is_new = self.pk is None
+        # a new line gets the item's running promotion unless it names one;
+        # a saved line keeps its promotion, or its lack of one
+        line, = price_lines([{
+            'item_id': self.item_id,
+            'quantity': self.quantity,
+            'meat_topping': next((row.name for row in rows if row.meat), ""),
+            'extra_toppings': [row.name for row in rows if not row.meat],
+            'promo_id': self.promo_id if self.promo_id is not None or is_new else False,
+        }])
+        self.price = line.unit_price
+        self.subtotal = line.subtotal
+        self.promo_id = line.promo_id if line.promo_id is not None else self.promo_id
         super().save(*args, **kwargs)
+        if getattr(self, '_pending_toppings', None) is not None:
+            self._write_toppings(line)
         self.order.update_total()
+        kitchen.record(self.order_id, OrderEvent.Kind.ITEMS_CHANGED)
 
     def delete(self, *args, **kwargs):
         order = self.order
         super().delete(*args, **kwargs)
         order.update_total()
+        kitchen.record(order.pk, OrderEvent.Kind.ITEMS_CHANGED)
 
     def __str__(self): #this is so only the user's name appears on the admin page when an order is added
         return f"{self.quantity} x {self.item.name}(s)"
@@ -377,21 +480,28 @@ class OrderItem(models.Model):
     @property
     def toppings_list(self):
         """Returns a list of dictionaries [{'name': 'Beef', 'price': 15}, ...] for template iteration."""
-        results = []
+        return [{'name': row.name, 'price': row.price} for row in self._topping_rows()]
+
+
+class OrderItemTopping(models.Model):
+    """One topping on one order line, with the price it added to the line."""
+    order_item = models.ForeignKey(OrderItem, on_delete=models.CASCADE, related_name="topping_links")
+    topping = models.ForeignKey(Topping, on_delete=models.PROTECT, related_name="order_links")
+    price = models.DecimalField(max_digits=8, decimal_places=2, default=Decimal("0.00"))
+    added_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['order_item', 'topping'], name='menu_orderitemtopping_unique'),
+        ]
+        indexes = [
+            # Topping.most_added: range scan on added_at, grouped by topping, without touching the table
+            models.Index(fields=['added_at', 'topping'], name='menu_topping_added_idx'),
+        ]
 
-        # Meat topping
-        if self.meat_topping:
-            price = TOPPING_PRICES.get(self.meat_topping, Decimal("0.00"))
-            results.append({'name': self.meat_topping, 'price': price})
-
-        # Extra toppings
-        if self.extra_toppings:
-            extras = [x.strip() for x in self.extra_toppings.split(',') if x.strip()]
-            for x in extras:
-                price = TOPPING_PRICES.get(x, Decimal("0.00"))
-                results.append({'name': x, 'price': price})
-
-        return results
+    def __str__(self):
+        return f"{self.topping} on {self.order_item}"
 
 
 class Delivery(models.Model):
@@ -415,6 +525,7 @@ class Delivery(models.Model):
         # recalc order total whenever delivery is created/edited
         if self.order_id:
             self.order.update_total()
+            kitchen.record(self.order_id, OrderEvent.Kind.STATUS_CHANGED)
 
     def delete(self, *args, **kwargs):
         order = self.order
@@ -442,6 +553,7 @@ class Takeout(models.Model):
         super().save(*args, **kwargs)
         if self.order_id:
             self.order.update_total()
+            kitchen.record(self.order_id, OrderEvent.Kind.STATUS_CHANGED)
 
     def delete(self, *args, **kwargs):
         order = self.order
@@ -490,3 +602,96 @@ class Transaction(models.Model):
 
     def __str__(self): #this is so only the user's name appears on the admin page when an order is added
         return f"{self.order.user}'s Transaction"
+
+
+class OrderEvent(models.Model):
+    """Append-only change log read by kitchen screens (see kitchen.py)."""
+    class Kind(models.TextChoices): #enum data type
+        CREATED = "created", "Created"
+        ITEMS_CHANGED = "items_changed", "Items Changed"
+        STATUS_CHANGED = "status_changed", "Status Changed"
+        REMOVED = "removed", "Removed"
+
+    seq = models.BigAutoField(primary_key=True)  # the feed cursor; only ever increases
+    # no FK constraint: events outlive the orders they describe
+    order = models.ForeignKey(Order, on_delete=models.DO_NOTHING, db_constraint=False, related_name="events")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    payload = models.JSONField(default=dict, blank=True, help_text="Snapshot of the order when the event was written.")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['seq']
+
+    def __str__(self):
+        return f"#{self.seq} {self.kind} order {self.order_id}"
+
+
+class CustomerStats(models.Model):
+    """One customer's order totals, kept current for the admin customer lists (see customer_stats.py)."""
+    class Tier(models.TextChoices): #enum data type
+        NEW = "new", "New"            # no orders yet
+        ACTIVE = "active", "Active"
+        VIP = "vip", "VIP"            # customer_stats.VIP_ORDERS orders or more
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="order_stats")
+    orders_count = models.PositiveIntegerField(default=0)  # every order, any status
+    lifetime_spend = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))  # completed orders only
+    last_order_date = models.DateTimeField(null=True, blank=True)  # latest completed order
+    tier = models.CharField(max_length=10, choices=Tier.choices, default=Tier.NEW)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "customer stats"
+        indexes = [
+            models.Index(fields=['-lifetime_spend'], name='menu_custstats_spend_idx'),
+            models.Index(fields=['-orders_count'], name='menu_custstats_orders_idx'),
+            # tier chips: filter on tier, already sorted by spend
+            models.Index(fields=['tier', '-lifetime_spend'], name='menu_custstats_tier_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} ({self.tier})"
+
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core import versions
+
+@receiver(post_delete, sender=Order)
+def record_order_removed(sender, instance, **kwargs):
+    kitchen.record(instance.pk, OrderEvent.Kind.REMOVED)
+    customer_stats.queue([instance.user_id])
+
+@receiver(post_save, sender=Order)
+def refresh_customer_stats(sender, instance, created, update_fields=None, **kwargs):
+    # a new order counts; spend moves when an order completes (or stops being
+    # completed) and when a completed order's total is recalculated
+    loaded = getattr(instance, '_loaded_state', None)
+    if (created or loaded is None or loaded[0] != instance.status
+            or (instance.status == Order.Status.COMPLETED and (update_fields is None or 'total' in update_fields))):
+        customer_stats.queue([instance.user_id])
+
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=Promotion)
+@receiver([post_save, post_delete], sender=Topping)
+def reset_price_table(sender, **kwargs):
+    from .pricing import invalidate
+    invalidate()
+
+# data versions behind the API ETags (apps/core/versions.py)
+@receiver([post_save, post_delete], sender=MenuCategory)
+@receiver([post_save, post_delete], sender=MenuSubCategory)
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=Promotion)
+@receiver([post_save, post_delete], sender=Topping)
+def bump_menu_version(sender, **kwargs):
+    versions.bump("menu")
+
+@receiver([post_save, post_delete], sender=Order)
+@receiver([post_save, post_delete], sender=OrderItem)
+@receiver([post_save, post_delete], sender=Delivery)
+@receiver([post_save, post_delete], sender=Takeout)
+@receiver([post_save, post_delete], sender=Transaction)
+def bump_orders_version(sender, **kwargs):
+    versions.bump("orders")
@@ -0,0 +1,280 @@
+"""Prep list: how many portions of each dish and topping the next service needs.
+
+`build_history` reads the completed orders of the last `HISTORY_DAYS` as two
+grouped queries (portions per day, hour and dish; per day, hour and topping)
+and scatters them into arrays of shape ``(days, dishes, 24)`` and
+``(days, toppings, 24)``. Toppings come from the ``order_item_toppings``
+links, weighted by the line's quantity, so a line of three with egg counts
+three eggs.
+
+`fit` reduces each array to one ``(dishes, 24)`` profile per weekday, the
+exponentially weighted mean of that weekday's past days (most recent weighing
+most, `ALPHA`); days without any completed order are left out, as in the
+covers forecast. `build` cuts the profile of the service's weekday from its
+first hour and turns it into rows: expected portions, what to prep (expected
+plus `BUFFER`, rounded up), the busiest hour and the per-hour split.
+
+The fitted model is kept in the cache for `CACHE_SECONDS` (it only changes as
+orders complete, and a few minutes' lag is fine for prep), so the staff page,
+its CSV export and the app share one fit. Building a prep list needs NumPy.
+"""
+import csv
+import math
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from .models import MenuItem, Order, OrderItem, OrderItemTopping, Topping
+
+try:
+    import numpy as np
+except ImportError:     # optional: only building prep lists needs it
+    np = None
+
+HISTORY_DAYS = 84
+ALPHA = 0.3
+BUFFER = 0.15           # prep this much over the expected portions
+MIN_PORTIONS = 0.5      # dishes expected below this are left off the list
+HOURS = 24
+CACHE_SECONDS = 15 * 60
+CACHE_KEY = "prep-model:{today}:{days}:{alpha}"
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Building the prep list needs NumPy (pip install numpy).")
+
+
+@dataclass
+class History:
+    start: object           # first day (a date)
+    item_ids: object        # (dishes,) MenuItem ids, the rows of `items`
+    items: object           # (days, dishes, HOURS) portions ordered
+    topping_ids: object     # (toppings,)
+    toppings: object        # (days, toppings, HOURS) portions ordered
+
+    @property
+    def weekdays(self):
+        return (self.start.weekday() + np.arange(self.items.shape[0])) % 7
+
+
+def _scatter(rows, start, days):
+    """(ids, (days, len(ids), HOURS)) from (day, hour, id, portions) rows."""
+    if not rows:
+        return np.zeros(0, dtype=int), np.zeros((days, 0, HOURS))
+    day_index = np.array([(day - start).days for day, _, _, _ in rows])
+    hour_index = np.array([hour for _, hour, _, _ in rows])
+    ids, id_index = np.unique(np.array([pk for _, _, pk, _ in rows]), return_inverse=True)
+    demand = np.zeros((days, len(ids), HOURS))
+    np.add.at(demand, (day_index, id_index, hour_index), np.array([n for _, _, _, n in rows], dtype=float))
+    return ids, demand
+
+
+def build_history(start, end):
+    """Completed portions per day, hour and dish (and topping) for the days in [start, end)."""
+    _require_numpy()
+    days = (end - start).days
+    window = {
+        'order__status': Order.Status.COMPLETED,
+        'order__order_date__date__gte': start,
+        'order__order_date__date__lt': end,
+    }
+    items = (
+        OrderItem.objects.filter(**window)
+        .annotate(day=TruncDate('order__order_date'), hour=ExtractHour('order__order_date'))
+        .values('day', 'hour', 'item_id')
+        .annotate(n=Sum('quantity'))
+        .order_by()
+        .values_list('day', 'hour', 'item_id', 'n')
+    )
+    toppings = (
+        OrderItemTopping.objects.filter(**{f'order_item__{key}': value for key, value in window.items()})
+        .annotate(day=TruncDate('order_item__order__order_date'), hour=ExtractHour('order_item__order__order_date'))
+        .values('day', 'hour', 'topping_id')
+        .annotate(n=Sum('order_item__quantity'))
+        .order_by()
+        .values_list('day', 'hour', 'topping_id', 'n')
+    )
+    item_ids, item_demand = _scatter([row for row in items if start <= row[0] < end], start, days)
+    topping_ids, topping_demand = _scatter([row for row in toppings if start <= row[0] < end], start, days)
+    return History(start, item_ids, item_demand, topping_ids, topping_demand)
+
+
+def _weekday_means(series, weekdays, alpha):
+    """(7, ...): per weekday, the exponentially weighted mean of its days."""
+    profiles = np.zeros((7,) + series.shape[1:])
+    for weekday in range(7):
+        days = series[weekdays == weekday]              # oldest first
+        if not len(days):
+            continue
+        weights = (1 - alpha) ** np.arange(len(days) - 1, -1, -1)
+        profiles[weekday] = np.tensordot(weights, days, axes=1) / weights.sum()
+    return profiles
+
+
+@dataclass
+class Model:
+    item_ids: object
+    items: object           # (7, dishes, HOURS) profile per weekday, Monday first
+    topping_ids: object
+    toppings: object        # (7, toppings, HOURS)
+
+
+def fit(history, alpha=ALPHA):
+    _require_numpy()
+    open_days = history.items.sum(axis=(1, 2)) > 0
+    weekdays = history.weekdays[open_days]
+    return Model(
+        item_ids=history.item_ids,
+        items=_weekday_means(history.items[open_days], weekdays, alpha),
+        topping_ids=history.topping_ids,
+        toppings=_weekday_means(history.toppings[open_days], weekdays, alpha),
+    )
+
+
+def get_model(today=None, history_days=HISTORY_DAYS, alpha=ALPHA):
+    """The model fitted on the `history_days` before `today`, from the cache when fresh."""
+    today = today or timezone.localdate()
+    key = CACHE_KEY.format(today=today.isoformat(), days=history_days, alpha=alpha)
+    model = cache.get(key)
+    if model is None:
+        model = fit(build_history(today - timedelta(days=history_days), today), alpha)
+        cache.set(key, model, CACHE_SECONDS)
+    return model
+
+
+def next_service(model, now=None):
+    """(date, first hour) of the next service: the rest of today while it still expects
+    orders, else the next weekday that usually has them."""
+    now = timezone.localtime(now)
+    today = now.date()
+    if model.items[today.weekday()][:, now.hour:].sum() >= MIN_PORTIONS:
+        return today, now.hour
+    for offset in range(1, 8):
+        day = today + timedelta(days=offset)
+        if model.items[day.weekday()].sum() >= MIN_PORTIONS:
+            return day, 0
+    return today + timedelta(days=1), 0
+
+
+@dataclass
+class PrepRow:
+    id: int
+    name: str
+    group: str              # the dish's category, or the topping's kind
+    expected: float         # portions
+    prep: int               # expected plus BUFFER, rounded up
+    peak_hour: int | None
+    by_hour: list           # expected portions per hour of `PrepList.hours`
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'group': self.group,
+            'expected': self.expected,
+            'prep': self.prep,
+            'peak_hour': self.peak_hour,
+            'by_hour': self.by_hour,
+        }
+
+
+@dataclass
+class PrepList:
+    date: object
+    from_hour: int
+    hours: list                                     # hours of day the `by_hour` columns cover
+    items: list = field(default_factory=list)       # PrepRow per dish, most needed first
+    toppings: list = field(default_factory=list)    # PrepRow per topping
+
+    @property
+    def total_portions(self):
+        return sum(row.prep for row in self.items)
+
+    def as_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'from_hour': self.from_hour,
+            'hours': self.hours,
+            'buffer': BUFFER,
+            'items': [row.as_dict() for row in self.items],
+            'toppings': [row.as_dict() for row in self.toppings],
+        }
+
+
+def _rows(ids, demand, labels, first, last):
+    """PrepRows for the (ids, (n, HOURS)) demand worth prepping, hours first..last."""
+    expected = demand.sum(axis=1)
+    rows = []
+    for index in np.argsort(-expected, kind='stable'):
+        if expected[index] < MIN_PORTIONS or int(ids[index]) not in labels:
+            continue
+        name, group = labels[int(ids[index])]
+        rows.append(PrepRow(
+            id=int(ids[index]),
+            name=name,
+            group=group,
+            expected=round(float(expected[index]), 1),
+            prep=math.ceil(round(float(expected[index]) * (1 + BUFFER), 6)),
+            peak_hour=int(demand[index].argmax()),
+            by_hour=demand[index, first:last + 1].round(1).tolist(),
+        ))
+    return rows
+
+
+def build(model, day, from_hour=0):
+    """The prep list of `day` from `from_hour` on, out of a fitted `model`."""
+    _require_numpy()
+    item_demand = model.items[day.weekday()].copy()
+    topping_demand = model.toppings[day.weekday()].copy()
+    item_demand[:, :from_hour] = 0
+    topping_demand[:, :from_hour] = 0
+
+    busy = np.flatnonzero(item_demand.sum(axis=0) > 0)
+    first, last = (int(busy[0]), int(busy[-1])) if len(busy) else (from_hour, from_hour)
+
+    dishes = {
+        row['item_id']: (row['name'], row['subcategory_id__category_id__category'] or '')
+        for row in MenuItem.objects.filter(item_id__in=model.item_ids.tolist())
+        .values('item_id', 'name', 'subcategory_id__category_id__category')
+    }
+    toppings = {
+        row['id']: (row['name'], row['kind'])
+        for row in Topping.objects.filter(id__in=model.topping_ids.tolist()).values('id', 'name', 'kind')
+    }
+    return PrepList(
+        date=day,
+        from_hour=from_hour,
+        hours=list(range(first, last + 1)),
+        items=_rows(model.item_ids, item_demand, dishes, first, last),
+        toppings=_rows(model.topping_ids, topping_demand, toppings, first, last),
+    )
+
+
+def get_prep_list(day=None, now=None):
+    """The prep list of `day` (the whole day), or of the next service when None."""
+    now = timezone.localtime(now)
+    model = get_model(now.date())
+    if day is None:
+        day, from_hour = next_service(model, now)
+    else:
+        from_hour = 0
+    return build(model, day, from_hour)
+
+
+def write_csv(prep_list, out):
+    """Write `prep_list` to the file-like `out`: one row per dish, then per topping."""
+    writer = csv.writer(out)
+    hour_labels = [f"{hour:02d}:00" for hour in prep_list.hours]
+    writer.writerow(['Type', 'Name', 'Group', 'Expected', 'Prep', 'Peak hour', *hour_labels])
+    for kind, rows in (('dish', prep_list.items), ('topping', prep_list.toppings)):
+        for row in rows:
+            writer.writerow([
+                kind, row.name, row.group, row.expected, row.prep,
+                f"{row.peak_hour:02d}:00" if row.peak_hour is not None else '',
+                *row.by_hour,
+            ])
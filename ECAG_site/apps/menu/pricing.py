@@ -0,0 +1,235 @@
+"""Menu pricing: an in-memory price table and one function to price cart lines.
+
+Everything that decides what a line costs is worked out once per menu change
+instead of once per line:
+
+* the item's base price and whether it takes toppings (`eligible_for_toppings`
+  is a lowercase + substring scan of the name);
+* its current and upcoming promotions, best discount first;
+* the topping list (`Topping` rows: id, kind and price by name).
+
+`price_lines` prices a batch of cart lines against that table with dict
+lookups only. `OrderItem.save`, the checkout page, cart sync and the mobile
+price-quote endpoint all go through it, so the apps show exactly what the
+order will be charged.
+
+The table is rebuilt when a `MenuItem`, `Promotion` or `Topping` is saved in this
+process (receivers in models.py), when the "menu" data version moves (a
+change made by another process; see apps/core/versions.py), and at the
+latest every `CACHE_SECONDS`.
+"""
+import time as clock
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.utils import timezone
+
+from apps.core import versions
+
+from .models import MenuItem, Promotion, Topping, eligible_for_toppings, roundup
+
+CACHE_SECONDS = 300
+ZERO = Decimal("0.00")
+
+# fee per cart order type (the values the web and mobile carts send)
+FEES = {
+    'dine_in': ZERO,
+    'pick_up': Decimal("50.00"),
+    'delivery': Decimal("100.00"),
+}
+
+
+@dataclass(frozen=True)
+class ItemPrice:
+    item_id: int
+    name: str
+    base: Decimal
+    available: bool
+    toppings: bool              # takes meat/extra toppings
+    promotions: tuple = ()      # (start, end, discount, promo_id), best discount first
+
+    def promotion(self, when, promo_id=None):
+        """(promo_id, discount) in effect at `when`; only `promo_id` if one is given."""
+        for start, end, discount, pid in self.promotions:
+            if start <= when <= end and (promo_id is None or pid == promo_id):
+                return pid, discount
+        return None, None
+
+
+@dataclass(frozen=True)
+class ToppingPrice:
+    topping_id: int | None      # None: a name that isn't on the topping list
+    name: str
+    meat: bool
+    price: Decimal
+
+
+@dataclass(frozen=True)
+class LinePrice:
+    item_id: int
+    quantity: int
+    meat_topping: str
+    extra_toppings: tuple
+    unit_price: Decimal
+    subtotal: Decimal
+    promo_id: int | None
+    toppings_eligible: bool
+    available: bool
+
+    def as_dict(self):
+        return {
+            'item_id': self.item_id,
+            'quantity': self.quantity,
+            'meat_topping': self.meat_topping,
+            'extra_toppings': list(self.extra_toppings),
+            'unit_price': self.unit_price,
+            'subtotal': self.subtotal,
+            'promo_id': self.promo_id,
+            'toppings_eligible': self.toppings_eligible,
+            'available': self.available,
+        }
+
+
+class PriceTable:
+    def __init__(self, items, toppings, stamp):
+        self.items = items          # item_id -> ItemPrice
+        self.topping_rows = toppings                                    # topping name -> ToppingPrice
+        self.toppings = {name: row.price for name, row in toppings.items()}    # topping name -> Decimal
+        self.stamp = stamp          # "menu" data version it was built at
+        self.expires = clock.monotonic() + CACHE_SECONDS
+
+    def topping(self, name, meat=None):
+        """The `ToppingPrice` for `name`; an unknown name gets no id and no price."""
+        row = self.topping_rows.get(name)
+        if row is None:
+            return ToppingPrice(None, name, bool(meat), ZERO)
+        if meat is not None and meat != row.meat:
+            return ToppingPrice(row.topping_id, row.name, meat, row.price)
+        return row
+
+
+def _load_items(item_ids=None):
+    items = MenuItem.objects.all()
+    promotions = Promotion.objects.filter(end_date__gte=timezone.now())
+    if item_ids is not None:
+        items = items.filter(item_id__in=item_ids)
+        promotions = promotions.filter(item_id__in=item_ids)
+
+    by_item = {}
+    for promo_id, item_id, start, end, discount in (
+        promotions.order_by('-discountpercent', '-start_date')
+        .values_list('id', 'item_id', 'start_date', 'end_date', 'discountpercent')
+    ):
+        by_item.setdefault(item_id, []).append((start, end, discount, promo_id))
+
+    return {
+        item_id: ItemPrice(item_id, name, price, available, eligible_for_toppings(name), tuple(by_item.get(item_id, ())))
+        for item_id, name, price, available in items.values_list('item_id', 'name', 'price', 'is_available')
+    }
+
+
+def _load_toppings():
+    return {
+        name: ToppingPrice(topping_id, name, kind == Topping.Kind.MEAT, price)
+        for topping_id, name, kind, price in Topping.objects.values_list('id', 'name', 'kind', 'price')
+    }
+
+
+def build_table():
+    stamp = versions.current(("menu",))["menu"]
+    return PriceTable(_load_items(), _load_toppings(), stamp)
+
+
+_compiled = {'table': None}
+
+
+def get_table():
+    table = _compiled['table']
+    if (table is None or clock.monotonic() >= table.expires
+            or versions.current(("menu",))["menu"] != table.stamp):
+        table = _compiled['table'] = build_table()
+    return table
+
+
+def invalidate():
+    _compiled['table'] = None
+
+
+def topping_names(value):
+    """Topping names from a list or comma-separated text, stripped, each once, in order."""
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(dict.fromkeys(e.strip() for e in value or () if e and e.strip()))
+
+
+def topping_ids(names):
+    """Sorted ids of the known toppings among `names`: the toppings part of a cart line's identity."""
+    rows = get_table().topping_rows
+    return tuple(sorted({rows[name].topping_id for name in names if name in rows}))
+
+
+def price_lines(lines, when=None):
+    """Price cart lines: one `LinePrice` per line, None where the item doesn't exist.
+
+    A line is ``{"item_id", "quantity", "meat_topping", "extra_toppings"}``
+    (extras as a list or the comma-separated text OrderItem stores). The
+    best promotion running at `when` applies, unless the line names one in
+    ``"promo_id"``: then only that promotion can apply, and only while it runs.
+    ``"promo_id": False`` prices the line without any promotion.
+    """
+    lines = list(lines)
+    table = get_table()
+    when = when or timezone.now()
+
+    ids = set()
+    for line in lines:
+        try:
+            ids.add(int(line.get('item_id')))
+        except (TypeError, ValueError):
+            pass
+    missing = ids - table.items.keys()
+    if missing:
+        # created since the table was built (still inside that transaction, say)
+        table.items.update(_load_items(missing))
+
+    priced = []
+    for line in lines:
+        try:
+            entry = table.items.get(int(line.get('item_id')))
+        except (TypeError, ValueError):
+            entry = None
+        if entry is None:
+            priced.append(None)
+            continue
+        quantity = int(line.get('quantity') or 1)
+        meat = line.get('meat_topping') or ''
+        extras = tuple(e for e in topping_names(line.get('extra_toppings')) if e != meat)
+
+        promo = line.get('promo_id')
+        promo_id, discount = (None, None) if promo is False else entry.promotion(when, promo)
+        unit = entry.base if discount is None else entry.base * (Decimal("1") - discount)
+        if entry.toppings:
+            if meat:
+                unit += table.toppings.get(meat, ZERO)
+            for topping in extras:
+                unit += table.toppings.get(topping, ZERO)
+        unit = roundup(unit)
+        priced.append(LinePrice(
+            entry.item_id, quantity, meat, extras, unit, roundup(unit * quantity),
+            promo_id, entry.toppings, entry.available,
+        ))
+    return priced
+
+
+def quote(lines, order_type='dine_in'):
+    """Priced lines plus subtotal, fee and total for a cart; the price-quote payload."""
+    priced = price_lines(lines)
+    subtotal = roundup(sum((line.subtotal for line in priced if line), ZERO))
+    fee = FEES.get(order_type, ZERO)
+    return {
+        'lines': [line.as_dict() if line else None for line in priced],
+        'subtotal': subtotal,
+        'fee': fee,
+        'total': roundup(subtotal + fee),
+        'topping_prices': get_table().toppings,
+    }
@@ -9,11 +9,12 @@ from .models import (
     Order,
     OrderItem,
     Promotion,
-    TOPPING_PRICES,
     Takeout,
+    Topping,
     Transaction,
     eligible_for_toppings,
 )
+from .pricing import get_table
 
 
 class MenuCategorySerializer(serializers.ModelSerializer):
@@ -105,12 +106,21 @@ class PromotionSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class ToppingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Topping
+        fields = ["id", "name", "kind", "price"]
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     item = MenuItemSerializer(read_only=True)
     item_id = serializers.PrimaryKeyRelatedField(queryset=MenuItem.objects.all(), source="item")
     promo_id = serializers.PrimaryKeyRelatedField(
         queryset=Promotion.objects.all(), source="promo", required=False, allow_null=True
     )
+    # stored as topping links; read and written by name (see OrderItem.meat_topping)
+    meat_topping = serializers.CharField(required=False, allow_blank=True)
+    extra_toppings = serializers.CharField(required=False, allow_blank=True)
     toppings_list = serializers.ReadOnlyField()
 
     class Meta:
@@ -155,12 +165,12 @@ class OrderItemSerializer(serializers.ModelSerializer):
                 )
             return attrs
 
-        allowed_toppings = set(TOPPING_PRICES.keys())
+        toppings = get_table().topping_rows
 
-        if meat_topping and meat_topping not in allowed_toppings:
+        if meat_topping and not getattr(toppings.get(meat_topping), "meat", False):
             raise serializers.ValidationError({"meat_topping": "Invalid meat topping selected."})
 
-        invalid_extras = [x for x in extras if x not in allowed_toppings]
+        invalid_extras = [x for x in extras if x not in toppings or toppings[x].meat]
         if invalid_extras:
             raise serializers.ValidationError(
                 {"extra_toppings": f"Invalid topping(s): {', '.join(invalid_extras)}"}
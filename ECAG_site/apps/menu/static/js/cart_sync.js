@@ -0,0 +1,131 @@
+// Debounced, delta-based cart sync shared by sidebar.js and menu_mobile.js.
+//
+// The session keeps a versioned copy of the cart (see menu/cart.py). Changes
+// are coalesced for SYNC_DELAY ms and only the lines that differ from what the
+// server last acknowledged are sent to /menu/cart/patch/. A 409 means the
+// session moved on (another tab, checkout, expiry): adopt its copy and diff again.
+(function () {
+  const PATCH_URL = "/menu/cart/patch/";
+  const SYNC_DELAY = 800;
+  const STORAGE_KEY = "ecag_cart_synced";
+  const MAX_RETRIES = 3;
+
+  function getCookie(name) {
+    const v = document.cookie.match("(^|;)\\s*" + name + "\\s*=\\s*([^;]+)");
+    return v ? v.pop() : "";
+  }
+
+  // same identity as menu.cart.line_key: item|meat|sorted extras
+  function lineKey(line) {
+    const extras = (line.extra_toppings || []).filter(Boolean).sort().join(",");
+    return line.item_id + "|" + (line.meat_topping || "") + "|" + extras;
+  }
+
+  function cartLines(cart) {
+    const lines = {};
+    (cart || []).forEach((it) => {
+      const itemId = Number(it && (it.item_id || it.id));
+      if (!itemId) return;
+      const line = {
+        item_id: itemId,
+        quantity: Number(it.qty || 1),
+        meat_topping: it.meatTopping || "",
+        extra_toppings: Array.isArray(it.extraToppings) ? it.extraToppings.filter(Boolean) : [],
+      };
+      const key = lineKey(line);
+      if (lines[key]) lines[key].quantity += line.quantity;
+      else lines[key] = line;
+    });
+    return lines;
+  }
+
+  window.createCartSync = function (getCart, getOrderType) {
+    let timer = null;
+    let inFlight = null;
+    let synced = { version: 0, lines: {}, orderType: null };
+    try {
+      synced = JSON.parse(localStorage.getItem(STORAGE_KEY)) || synced;
+    } catch (e) {}
+
+    function remember(version, lines, orderType) {
+      synced = { version: version, lines: lines, orderType: orderType };
+      try {
+        localStorage.setItem(STORAGE_KEY, JSON.stringify(synced));
+      } catch (e) {}
+    }
+
+    function diff(lines) {
+      const ops = [];
+      Object.keys(lines).forEach((key) => {
+        const old = synced.lines[key];
+        if (!old || old.quantity !== lines[key].quantity) {
+          ops.push(Object.assign({ op: "set" }, lines[key]));
+        }
+      });
+      Object.keys(synced.lines).forEach((key) => {
+        if (!lines[key]) ops.push({ op: "remove", key: key });
+      });
+      return ops;
+    }
+
+    async function send(lines, ops, orderType) {
+      const res = await fetch(PATCH_URL, {
+        method: "POST",
+        credentials: "same-origin",
+        keepalive: true,
+        headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") },
+        body: JSON.stringify({ version: synced.version, ops: ops, order_type: orderType }),
+      });
+      const data = await res.json().catch(() => ({}));
+      if (res.ok) {
+        remember(data.version, lines, orderType);
+        return true;
+      }
+      if (res.status === 409) {
+        const serverLines = {};
+        (data.items || []).forEach((line) => { serverLines[lineKey(line)] = line; });
+        remember(data.version, serverLines, data.order_type || null);
+        return "conflict";
+      }
+      return false;
+    }
+
+    // Send whatever is pending now; resolves true once the server has the cart.
+    async function flush(attempt) {
+      clearTimeout(timer);
+      timer = null;
+      while (inFlight) await inFlight.catch(() => {});
+
+      const lines = cartLines(getCart());
+      const orderType = getOrderType();
+      const ops = diff(lines);
+      if (!ops.length && orderType === synced.orderType) return true;
+
+      inFlight = send(lines, ops, orderType);
+      let result = false;
+      try {
+        result = await inFlight;
+      } catch (e) {
+        result = false;
+      } finally {
+        inFlight = null;
+      }
+      if (result === "conflict") {
+        return (attempt || 0) < MAX_RETRIES ? flush((attempt || 0) + 1) : false;
+      }
+      return result;
+    }
+
+    function schedule() {
+      clearTimeout(timer);
+      timer = setTimeout(flush, SYNC_DELAY);
+    }
+
+    // don't lose the last few taps when the user navigates away mid-debounce
+    window.addEventListener("pagehide", () => {
+      if (timer) flush();
+    });
+
+    return { schedule: schedule, flush: flush };
+  };
+})();
@@ -1,6 +1,5 @@
 (function () {
   const dataUrl = window.ECAG_MENU_MOBILE_DATA_URL;
-  const saveCartUrl = "/menu/save_cart/";
   const checkoutUrl = "/menu/checkout/";
   const statusEl = $("#menu-status");
   const tabsEl = $("#menu-tabs");
@@ -96,9 +95,13 @@
     return 0;
   }
 
+  // only changed lines go to the session, debounced (cart_sync.js)
+  const cartSync = window.createCartSync(() => cart, () => currentOrderType);
+
   function saveCartLocally() {
     localStorage.setItem("ecag_cart", JSON.stringify(cart));
     localStorage.setItem("ecag_order_type", currentOrderType);
+    cartSync.schedule();
   }
 
   function recalcCartTotals() {
@@ -268,24 +271,6 @@
     recalcCartTotals();
   }
 
-  function syncCartToSession() {
-    const payload = cart.map((it) => ({
-      item_id: it.item_id || it.id,
-      quantity: it.qty || 1,
-      meat_topping: it.meatTopping || "",
-      extra_toppings: Array.isArray(it.extraToppings) ? it.extraToppings : [],
-    }));
-
-    return fetch(saveCartUrl, {
-      method: "POST",
-      credentials: "same-origin",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify({ items: payload, order_type: currentOrderType }),
-    });
-  }
-
   function renderCategories(categories) {
     if (!Array.isArray(categories) || !categories.length) {
       statusEl.text("No available menu items.");
@@ -433,9 +418,10 @@
       return;
     }
     statusEl.text("Preparing checkout...");
-    syncCartToSession()
-      .then(function (res) {
-        if (!res.ok) throw new Error("sync failed");
+    cartSync
+      .flush()
+      .then(function (ok) {
+        if (!ok) throw new Error("sync failed");
         window.location.href = checkoutUrl;
       })
       .catch(function () {
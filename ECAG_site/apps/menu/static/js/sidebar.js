@@ -244,42 +244,14 @@
     try {
       localStorage.setItem("ecag_cart", JSON.stringify(cart));
     } catch (e) {}
+    cartSync.schedule();
   }
 
-  // Send the current client-side cart to the server so it can be stored
-  // in the user's session. The server exposes a POST endpoint at
-  // /menu/save_cart/ that accepts JSON array of items.
-  async function syncCartToSession() {
-    try {
-      // read CSRF token from cookie
-      function getCookie(name) {
-        const v = document.cookie.match('(^|;)\\s*' + name + '\\s*=\\s*([^;]+)');
-        return v ? v.pop() : '';
-      }
-
-      const payload = cart.map((it) => ({
-        item_id: it.item_id || it.id || null,
-        quantity: it.qty || it.qty === 0 ? it.qty : it.qty || 1,
-        meat_topping: it.meatTopping || '',
-        extra_toppings: Array.isArray(it.extraToppings) ? it.extraToppings : [],
-      }));
-      // include current order type for persistence
-      const orderType = currentOrderType; // values: dine_in, pick_up, delivery
-      const res = await fetch('/menu/save_cart/', {
-        method: 'POST',
-        credentials: 'same-origin',
-        headers: {
-          'Content-Type': 'application/json',
-          'X-CSRFToken': getCookie('csrftoken')
-        },
-        body: JSON.stringify({ items: payload, order_type: orderType })
-      });
-
-      return res.ok;
-    } catch (e) {
-      return false;
-    }
-  }
+  // The session copy of the cart is patched in the background with only the
+  // changed lines (cart_sync.js); checkout flushes it before navigating.
+  const cartSync = window.createCartSync
+    ? window.createCartSync(() => cart, () => currentOrderType)
+    : { schedule: function () {}, flush: async function () { return false; } };
 
   // ---------- ORDER TYPE STATE ----------
   let currentOrderType =
@@ -740,8 +712,8 @@
 
     saveOrderType();
     recalcTotals();
-    // live sync order type to server (fire-and-forget)
-    try { syncCartToSession(); } catch (e) {}
+    // sync order type to server (debounced; a no-op when nothing changed)
+    cartSync.schedule();
   }
 
   // Event listeners for order buttons are attached after DOM load (see INIT)
@@ -769,7 +741,7 @@
           // prevent default navigation while syncing
           e.preventDefault();
           try {
-            await syncCartToSession();
+            await cartSync.flush();
           } catch (_) {}
           // navigate to checkout page after sync
           window.location.href = checkoutCTA.href;
@@ -0,0 +1,374 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import versions
+
+from . import bulk, lifecycle, pricing
+from .models import (
+    Delivery, MenuCategory, MenuItem, MenuSubCategory, Order, OrderEvent, OrderItem, OrderItemTopping,
+    Promotion, Takeout, Topping,
+)
+
+
+class MachineTests(SimpleTestCase):
+    """The compiled transition tables."""
+
+    def test_board_advances_along_its_flow(self):
+        state, path = "pending", []
+        while state != "completed":
+            state = lifecycle.BOARD.advance(state)
+            path.append(state)
+        self.assertEqual(path, ["confirmed", "preparing", "ready", "completed"])
+        self.assertEqual(lifecycle.BOARD.advance("in_progress"), "preparing")
+
+    def test_board_final_states_cannot_be_left(self):
+        for state in ("completed", "cancelled"):
+            with self.subTest(state=state):
+                self.assertEqual(lifecycle.BOARD.table[state], frozenset())
+                with self.assertRaisesMessage(lifecycle.InvalidTransition, "already in a final state"):
+                    lifecycle.BOARD.advance(state)
+                with self.assertRaisesMessage(lifecycle.InvalidTransition, "cannot be cancelled"):
+                    lifecycle.BOARD.cancel(state)
+                with self.assertRaisesMessage(lifecycle.InvalidTransition, "already in a final state"):
+                    lifecycle.BOARD.check(state, "pending")
+                self.assertEqual(lifecycle.BOARD.check(state, state), state)
+
+    def test_board_is_free_between_open_states(self):
+        # staff may correct a mis-tap, backwards too
+        self.assertEqual(lifecycle.BOARD.check("ready", "pending"), "pending")
+        self.assertEqual(lifecycle.BOARD.check("pending", "completed"), "completed")
+        self.assertEqual(lifecycle.BOARD.cancel("preparing"), "cancelled")
+        self.assertEqual(lifecycle.BOARD.table["pending"], lifecycle.BOARD.states - {"pending"})
+
+    def test_unknown_status_and_action(self):
+        with self.assertRaisesMessage(lifecycle.InvalidTransition, "Invalid status"):
+            lifecycle.BOARD.check("pending", "shipped")
+        with self.assertRaisesMessage(lifecycle.InvalidTransition, "Unknown action"):
+            lifecycle.BOARD.resolve("pending", "skip")
+
+    def test_strict_machine_only_follows_its_flow(self):
+        machine = lifecycle.Machine("strict", Order, "status", {"a": "b", "b": "c", "c": None},
+                                    final=("c",), cancel="x")
+        self.assertEqual(machine.states, {"a", "b", "c", "x"})
+        self.assertEqual(machine.table, {
+            "a": {"b", "x"}, "b": {"c", "x"}, "c": frozenset(), "x": frozenset(),
+        })
+        self.assertEqual(machine.resolve("a", "next"), "b")
+        self.assertEqual(machine.resolve("b", "cancel"), "x")
+        with self.assertRaisesMessage(lifecycle.InvalidTransition, "Cannot move from a to c"):
+            machine.resolve("a", "set", "c")
+
+    def test_tracks_follow_their_models_choices(self):
+        self.assertEqual(lifecycle.DELIVERY.states, set(Delivery.Status.values))
+        self.assertEqual(lifecycle.PICKUP.advance("preparing_order"), "ready_for_pickup")
+        self.assertEqual(lifecycle.PICKUP.check("picked_up", "preparing_order"), "preparing_order")
+        with self.assertRaises(lifecycle.InvalidTransition):
+            lifecycle.PICKUP.advance("picked_up")
+        with self.assertRaisesMessage(lifecycle.InvalidTransition, "cannot be cancelled"):
+            lifecycle.DINE_IN.cancel("in_progress")
+
+
+class ParseIdsTests(SimpleTestCase):
+    def test_distinct_ids_in_order(self):
+        self.assertEqual(bulk.parse_ids([3, "1", 3, 2]), [3, 1, 2])
+
+    def test_bad_input(self):
+        for raw, message in (
+            ("1,2", "ids must be a list"),
+            ([1, "x"], "Invalid id"),
+            ([], "No ids given"),
+            (list(range(bulk.MAX_BATCH + 1)), f"At most {bulk.MAX_BATCH}"),
+        ):
+            with self.subTest(raw=raw):
+                with self.assertRaisesMessage(ValueError, message):
+                    bulk.parse_ids(raw)
+
+
+class StatusChangeTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="diner", password="x")
+
+    def order(self, order_type=Order.Ordertype.DINE_IN, status=Order.Status.IN_PROGRESS):
+        # flush the "created" events now so they don't absorb later status changes
+        with self.captureOnCommitCallbacks(execute=True):
+            order = Order.objects.create(user=self.user, order_type=order_type, status=status)
+            if order_type == Order.Ordertype.DELIVERY:
+                Delivery.objects.create(order=order, address="1 Main Street")
+            elif order_type == Order.Ordertype.CARRY_OUT:
+                Takeout.objects.create(order=order)
+        return Order.objects.select_related("delivery", "takeout").get(pk=order.pk)
+
+    def status_events(self, order):
+        return OrderEvent.objects.filter(order_id=order.pk, kind=OrderEvent.Kind.STATUS_CHANGED).count()
+
+    def test_track_for(self):
+        dine_in = self.order()
+        delivery = self.order(Order.Ordertype.DELIVERY)
+        self.assertEqual(lifecycle.track_for(dine_in), (lifecycle.DINE_IN, dine_in))
+        self.assertEqual(lifecycle.track_for(delivery), (lifecycle.DELIVERY, delivery.delivery))
+
+        Delivery.objects.filter(order=delivery).delete()
+        with self.assertRaisesMessage(lifecycle.InvalidTransition, "Delivery details missing"):
+            lifecycle.track_for(Order.objects.get(pk=delivery.pk))
+        with self.assertRaisesMessage(lifecycle.InvalidTransition, "not available"):
+            lifecycle.track_for(Order(order_type="catering"))
+
+    def test_apply_writes_each_table_once_and_skips_unchanged_rows(self):
+        first = self.order()
+        second = self.order(Order.Ordertype.DELIVERY)
+        total = second.total
+        before = self.status_events(first), self.status_events(second)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = lifecycle.apply([
+                (lifecycle.BOARD, first, "completed"),
+                (lifecycle.BOARD, second, Order.Status.IN_PROGRESS),     # already there
+                (lifecycle.DELIVERY, second.delivery, "delivered"),
+            ])
+
+        self.assertEqual(changed, [first, second.delivery])
+        self.assertEqual(Order.objects.get(pk=first.pk).status, "completed")
+        second.refresh_from_db()
+        self.assertEqual(second.delivery.delivery_status, "delivered")
+        self.assertEqual(second.total, total)       # no Delivery.save() -> update_total()
+        # one event per moved order
+        self.assertEqual((self.status_events(first), self.status_events(second)), (before[0] + 1, before[1] + 1))
+
+    def test_bulk_board_changes_report_per_order(self):
+        open_order = self.order()
+        done = self.order(status=Order.Status.COMPLETED)
+        results = bulk.change_board_statuses([open_order.pk, 999999, done.pk], "next")
+        self.assertEqual(results, [
+            {'id': open_order.pk, 'ok': True, 'status': "preparing"},
+            {'id': 999999, 'ok': False, 'error': "Order not found"},
+            {'id': done.pk, 'ok': False, 'error': "Order is already in a final state"},
+        ])
+        self.assertEqual(Order.objects.get(pk=open_order.pk).status, "preparing")
+        self.assertEqual(Order.objects.get(pk=done.pk).status, Order.Status.COMPLETED)
+
+        results = bulk.change_board_statuses([open_order.pk], "cancel")
+        self.assertEqual(results, [{'id': open_order.pk, 'ok': True, 'status': "cancelled"}])
+
+    def test_bulk_track_changes_follow_each_orders_type(self):
+        dine_in = self.order()
+        pickup = self.order(Order.Ordertype.CARRY_OUT)
+        results = bulk.change_track_statuses([dine_in.pk, pickup.pk], "next")
+        self.assertEqual([r['status'] for r in results], [Order.Status.COMPLETED, "ready_for_pickup"])
+        self.assertEqual(Takeout.objects.get(order=pickup).pickup_status, "ready_for_pickup")
+        self.assertEqual(Order.objects.get(pk=pickup.pk).status, Order.Status.IN_PROGRESS)
+
+    def test_bulk_rejects_bad_actions(self):
+        order = self.order()
+        with self.assertRaisesMessage(ValueError, "action must be next or set"):
+            bulk.change_track_statuses([order.pk], "cancel")
+        with self.assertRaisesMessage(ValueError, "action must be next, cancel or set"):
+            bulk.change_board_statuses([order.pk], "undo")
+        with self.assertRaisesMessage(ValueError, "status is required"):
+            bulk.change_board_statuses([order.pk], "set")
+
+
+class MenuPageTests(TestCase):
+    def test_starters_page_renders_before_collectstatic(self):
+        MenuCategory.objects.create(category="Starters")
+        # no staticfiles manifest here: plain names, one tag per bundle source
+        response = self.client.get(reverse("menu:menu_starters"))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<script src="/static/js/cart_sync.js"></script>')
+        self.assertContains(response, '<script src="/static/js/sidebar.js"></script>')
+
+
+class MostAddedTests(TestCase):
+    def setUp(self):
+        category = MenuCategory.objects.create(category="Mains")
+        subcategory = MenuSubCategory.objects.create(subcategory="Rice", category_id=category)
+        self.dish = MenuItem.objects.create(name="Fried Rice", desc="-", price=Decimal("100"), menu_img="x.jpg",
+                                            is_available=True, subcategory_id=subcategory)
+        self.order = Order.objects.create(order_type=Order.Ordertype.DINE_IN)
+        # not the seeded names (migration 0013), whose links would count too
+        self.brisket = Topping.objects.create(name="Brisket", kind=Topping.Kind.MEAT, price=Decimal("15"))
+        self.yolk = Topping.objects.create(name="Egg Yolk", price=Decimal("25"))
+        self.chop = Topping.objects.create(name="Lamb Chop", kind=Topping.Kind.MEAT, price=Decimal("30"))
+        self.now = timezone.now()
+
+    def add(self, quantity, *toppings, days_ago=0):
+        line = OrderItem.objects.create(order=self.order, item=self.dish, quantity=quantity)
+        for topping in toppings:
+            OrderItemTopping.objects.create(order_item=line, topping=topping, price=topping.price,
+                                            added_at=self.now - timedelta(days=days_ago))
+
+    def test_ranks_by_portions_then_lines_then_name(self):
+        self.add(3, self.brisket)
+        self.add(1, self.yolk)
+        self.add(1, self.yolk, self.chop)
+        self.add(1, self.chop)
+        self.assertEqual(Topping.most_added(), [
+            {'topping_id': self.brisket.pk, 'name': "Brisket", 'lines': 1, 'portions': 3},
+            {'topping_id': self.yolk.pk, 'name': "Egg Yolk", 'lines': 2, 'portions': 2},
+            {'topping_id': self.chop.pk, 'name': "Lamb Chop", 'lines': 2, 'portions': 2},
+        ])
+        self.assertEqual([row['name'] for row in Topping.most_added(limit=1)], ["Brisket"])
+
+    def test_window_is_half_open_on_added_at(self):
+        self.add(5, self.brisket, days_ago=10)
+        self.add(1, self.yolk, days_ago=1)
+        self.add(2, self.chop)
+        since, until = self.now - timedelta(days=1), self.now
+        self.assertEqual([row['name'] for row in Topping.most_added(since=since, until=until)], ["Egg Yolk"])
+        self.assertEqual([row['name'] for row in Topping.most_added(since=since)], ["Lamb Chop", "Egg Yolk"])
+        self.assertEqual(Topping.most_added(since=self.now + timedelta(seconds=1)), [])
+
+
+class PricingTests(TestCase):
+    def setUp(self):
+        # the table outlives each test's rolled-back rows
+        pricing.invalidate()
+        self.addCleanup(pricing.invalidate)
+        category = MenuCategory.objects.create(category="Mains")
+        subcategory = MenuSubCategory.objects.create(subcategory="Rice", category_id=category)
+        self.rice = MenuItem.objects.create(name="Fried Rice", desc="-", price=Decimal("100"), menu_img="x.jpg",
+                                            is_available=True, subcategory_id=subcategory)
+        self.soup = MenuItem.objects.create(name="Soup", desc="-", price=Decimal("80"), menu_img="x.jpg",
+                                            is_available=True, subcategory_id=subcategory)
+        Topping.objects.create(name="Brisket", kind=Topping.Kind.MEAT, price=Decimal("15"))
+        Topping.objects.create(name="Egg Yolk", price=Decimal("25"))
+        self.now = timezone.now()
+
+    def promote(self, item, discount, **window):
+        window.setdefault('start_date', self.now - timedelta(days=1))
+        window.setdefault('end_date', self.now + timedelta(days=1))
+        return Promotion.objects.create(item=item, title="Promo", desc="-", discountpercent=Decimal(discount), **window)
+
+    def line(self, item, **fields):
+        return {'item_id': item.pk, 'quantity': 1, 'meat_topping': "", 'extra_toppings': [], **fields}
+
+    def test_price_lines(self):
+        rice, soup, missing = pricing.price_lines([
+            self.line(self.rice, quantity=2, meat_topping="Brisket", extra_toppings="Egg Yolk, Brisket, Unknown"),
+            self.line(self.soup, meat_topping="Brisket"),
+            {'item_id': 0},
+        ])
+        self.assertEqual((rice.unit_price, rice.subtotal), (Decimal("140.00"), Decimal("280.00")))
+        self.assertEqual(rice.extra_toppings, ("Egg Yolk", "Unknown"))
+        # soup takes no toppings: they cost nothing
+        self.assertEqual((soup.unit_price, soup.toppings_eligible), (Decimal("80.00"), False))
+        self.assertIsNone(missing)
+
+    def test_promotions(self):
+        small = self.promote(self.soup, "0.10")
+        best = self.promote(self.soup, "0.25")
+        self.promote(self.soup, "0.50", start_date=self.now + timedelta(days=1), end_date=self.now + timedelta(days=2))
+        best_line, named, none = pricing.price_lines([
+            self.line(self.soup), self.line(self.soup, promo_id=small.pk), self.line(self.soup, promo_id=False),
+        ])
+        self.assertEqual((best_line.promo_id, best_line.unit_price), (best.pk, Decimal("60.00")))
+        self.assertEqual((named.promo_id, named.unit_price), (small.pk, Decimal("72.00")))
+        self.assertEqual((none.promo_id, none.unit_price), (None, Decimal("80.00")))
+
+    def test_table_is_rebuilt_when_the_menu_changes(self):
+        table = pricing.get_table()
+        self.assertIs(pricing.get_table(), table)
+
+        # a change made elsewhere (no signal here) shows once the "menu" version moves
+        MenuItem.objects.filter(pk=self.soup.pk).update(price=Decimal("90"))
+        self.assertIs(pricing.get_table(), table)
+        with self.captureOnCommitCallbacks(execute=True):
+            versions.bump("menu")
+        self.assertEqual(pricing.get_table().items[self.soup.pk].base, Decimal("90.00"))
+
+        # a save in this process drops the table at once
+        table = pricing.get_table()
+        Topping.objects.filter(name="Egg Yolk").update(price=Decimal("30"))
+        Topping.objects.create(name="Tofu", price=Decimal("5"))
+        self.assertIsNot(pricing.get_table(), table)
+        self.assertEqual(pricing.get_table().toppings["Egg Yolk"], Decimal("30"))
+
+    def test_saving_a_line_applies_a_promotion_only_when_new(self):
+        order = Order.objects.create(order_type=Order.Ordertype.DINE_IN)
+        before = OrderItem.objects.create(order=order, item=self.soup, quantity=1)
+        promo = self.promote(self.soup, "0.25")
+        after = OrderItem.objects.create(order=order, item=self.soup, quantity=1)
+        self.assertEqual((after.promo_id, after.price), (promo.pk, Decimal("60.00")))
+
+        before = OrderItem.objects.get(pk=before.pk)
+        before.quantity = 2
+        before.save()
+        before.refresh_from_db()
+        self.assertEqual((before.promo_id, before.price, before.subtotal), (None, Decimal("80.00"), Decimal("160.00")))
+
+
+class ToppingMigrationTests(TransactionTestCase):
+    """0013 turns the old text columns into topping links (and back)."""
+
+    before = [('menu', '0012_topping')]
+    after = [('menu', '0014_remove_orderitem_text_toppings')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        self.latest = MigrationExecutor(connection).loader.graph.leaf_nodes()
+        self.addCleanup(self.migrate, self.latest)
+        apps = self.migrate(self.before)
+
+        category = apps.get_model('menu', 'MenuCategory').objects.create(category="Mains")
+        subcategory = apps.get_model('menu', 'MenuSubCategory').objects.create(subcategory="Rice", category_id=category)
+        MenuItem = apps.get_model('menu', 'MenuItem')
+        rice = MenuItem.objects.create(name="Fried Rice", desc="-", price=100, menu_img="x.jpg",
+                                       is_available=True, subcategory_id=subcategory)
+        soup = MenuItem.objects.create(name="Soup", desc="-", price=50, menu_img="y.jpg",
+                                       is_available=True, subcategory_id=subcategory)
+        order = apps.get_model('menu', 'Order').objects.create(order_id_str="ORD-1", order_type="dine in",
+                                                               status="completed")
+        OrderItem = apps.get_model('menu', 'OrderItem')
+        self.rice_line = OrderItem.objects.create(order=order, item=rice, meat_topping="Beef",
+                                                  extra_toppings="Eggs, Truffle,Eggs,")
+        self.soup_line = OrderItem.objects.create(order=order, item=soup, meat_topping="", extra_toppings="Eggs")
+        self.plain_line = OrderItem.objects.create(order=order, item=soup, meat_topping="", extra_toppings="")
+        self.order_date = order.order_date
+
+    def links(self, apps, line):
+        return list(
+            apps.get_model('menu', 'OrderItemTopping').objects.filter(order_item_id=line.pk).order_by('id')
+            .values_list('topping__name', 'price', 'added_at')
+        )
+
+    def test_forwards_links_toppings_with_charged_prices(self):
+        apps = self.migrate(self.after)
+        self.assertEqual(self.links(apps, self.rice_line), [
+            ("Beef", Decimal("15.00"), self.order_date),
+            ("Eggs", Decimal("25.00"), self.order_date),
+            ("Truffle", Decimal("0.00"), self.order_date),
+        ])
+        # Soup takes no toppings, so nothing was charged for them
+        self.assertEqual(self.links(apps, self.soup_line), [("Eggs", Decimal("0.00"), self.order_date)])
+        self.assertEqual(self.links(apps, self.plain_line), [])
+
+        Topping = apps.get_model('menu', 'Topping')
+        self.assertEqual(Topping.objects.count(), 7)     # the six seeded plus Truffle
+        self.assertEqual(Topping.objects.get(name="Truffle").kind, "extra")
+
+    def test_backwards_restores_the_text_columns(self):
+        self.migrate(self.after)
+        apps = self.migrate(self.before)
+        OrderItem = apps.get_model('menu', 'OrderItem')
+        self.assertEqual(
+            list(OrderItem.objects.order_by('id').values_list('meat_topping', 'extra_toppings')),
+            [("Beef", "Eggs,Truffle"), ("", "Eggs"), ("", "")],
+        )
+        self.assertFalse(apps.get_model('menu', 'OrderItemTopping').objects.exists())
+
+    def test_forwards_again_after_backwards(self):
+        self.migrate(self.after)
+        self.migrate(self.before)
+        apps = self.migrate(self.after)
+        self.assertEqual([name for name, _, _ in self.links(apps, self.rice_line)], ["Beef", "Eggs", "Truffle"])
@@ -10,6 +10,7 @@ urlpatterns = [
     # /menu/mobile/ -> mobile-first jQuery menu page
     path("mobile/", views.menu_mobile_page, name="menu_mobile"),
     path("mobile/data/", views.menu_mobile_data, name="menu_mobile_data"),
+    path("mobile/quote/", views.mobile_price_quote, name="menu_mobile_price_quote"),
     path("mobile/checkout/start/", views.mobile_checkout_start, name="menu_mobile_checkout_start"),
     path("mobile/checkout/complete/", views.mobile_checkout_complete, name="menu_mobile_checkout_complete"),
 
@@ -24,5 +25,6 @@ urlpatterns = [
     # Checkout page
     path("checkout/", views.checkout, name="checkout"),
     path("save_cart/", views.save_cart, name="save_cart"),
+    path("cart/patch/", views.patch_cart, name="patch_cart"),
     path("checkout/success/", views.checkout_success, name="checkout_success"),
 ]
@@ -2,18 +2,26 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.db import transaction as db_transaction
 from decimal import Decimal
-from .models import MenuCategory, MenuSubCategory, MenuItem, Promotion,Order, OrderItem, Transaction, Delivery, Takeout,TOPPING_PRICES, eligible_for_toppings
+from .models import MenuCategory, MenuSubCategory, MenuItem, Promotion,Order, OrderItem, Transaction, Delivery, Takeout, Topping
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.utils import timezone
+from datetime import datetime, timedelta
 import json
 
+from apps.core.fastjson import fast_json_response
+from apps.core.versions import depends_on
+
+from . import cart, pricing
+
 # Flat delivery fee to mirror frontend snapshot
-DELIVERY_FEE = Decimal("100.00")
-TAKEOUT_FEE = Decimal("50.00")
+DELIVERY_FEE = pricing.FEES['delivery']
+TAKEOUT_FEE = pricing.FEES['pick_up']
 def _reset_cart_session(session):
     """Utility to fully clear cart/session order artifacts so sidebar resets."""
     for key in ["cart_items", "cart_order_id", "order"]:
         session.pop(key, None)
+    cart.bump_version(session)
     # Leave last_order_id so success page can still render once.
     session.modified = True
 
@@ -32,6 +40,7 @@ def menu_mobile_page(request):
     return render(request, "menu_mobile.html")
 
 
+@depends_on("menu")
 def menu_mobile_data(request):
     """Return menu grouped by category/subcategory for mobile clients (jQuery/Flet)."""
     categories_qs = MenuCategory.objects.prefetch_related(
@@ -78,7 +87,31 @@ def menu_mobile_data(request):
                 }
             )
 
-    return JsonResponse({"categories": categories})
+    return fast_json_response({"categories": categories})
+
+
+@csrf_exempt
+def mobile_price_quote(request):
+    """Price a cart exactly as checkout will charge it, so the apps don't re-implement prices.
+
+    Payload: {"items": [{"item_id": 1, "quantity": 2, "meat_topping": "Beef", "extra_toppings": ["Eggs"]}],
+              "order_type": "dine_in" | "pick_up" | "delivery"}
+    Lines come back in the same order; unknown items as null.
+    """
+    if request.method != "POST":
+        return JsonResponse({"ok": False, "error": "POST required"}, status=405)
+
+    try:
+        payload = json.loads(request.body.decode("utf-8") or "{}")
+    except Exception:
+        return JsonResponse({"ok": False, "error": "invalid json"}, status=400)
+
+    items = payload.get("items") or []
+    if not isinstance(items, list):
+        return JsonResponse({"ok": False, "error": "items must be a list"}, status=400)
+    lines = [cart.normalize_line(it) if isinstance(it, dict) else None for it in items]
+    priced = pricing.quote([line or {} for line in lines], payload.get("order_type") or "dine_in")
+    return fast_json_response({"ok": True, **priced})
 
 
 @csrf_exempt
@@ -157,7 +190,7 @@ def mobile_checkout_start(request):
                     item=menu_item,
                     quantity=x["quantity"],
                     meat_topping=x["meat_topping"],
-                    extra_toppings=",".join([e for e in x["extra_toppings"] if e]),
+                    extra_toppings=x["extra_toppings"],
                 )
 
             if mapped_ot == Order.Ordertype.DELIVERY:
@@ -383,7 +416,7 @@ def checkout(request):
     items_count = 0
 
     if order:
-        order_items = order.items.select_related('item').all()
+        order_items = order.items.select_related('item').prefetch_related('topping_links__topping')
         for oi in order_items:
             items_count += oi.quantity
             subtotal_sum += oi.subtotal
@@ -393,11 +426,6 @@ def checkout(request):
                     image_url = oi.item.menu_img.url
                 except Exception:
                     image_url = None
-            toppings_list = []
-            if oi.meat_topping:
-                toppings_list.append(oi.meat_topping)
-            if oi.extra_toppings:
-                toppings_list.extend([t.strip() for t in oi.extra_toppings.split(',') if t.strip()])
             rebuilt.append({
                 "item_id": oi.item.item_id,
                 "name": oi.item.name,
@@ -405,7 +433,7 @@ def checkout(request):
                 "quantity": oi.quantity,
                 "subtotal": oi.subtotal,
                 "image_url": image_url,
-                "toppings": toppings_list,
+                "toppings": [t['name'] for t in oi.toppings_list],
             })
 
         if order.order_type == Order.Ordertype.DELIVERY:
@@ -425,24 +453,15 @@ def checkout(request):
         item_ids = [int(x.get('item_id')) for x in sess_cart if x.get('item_id')]
         items_map = {m.item_id: m for m in MenuItem.objects.filter(item_id__in=item_ids)} if item_ids else {}
 
-        for x in sess_cart:
+        for x, line in zip(sess_cart, pricing.price_lines(sess_cart)):
             iid = int(x.get('item_id')) if x.get('item_id') else None
             qty = int(x.get('quantity', 1) or 1)
             items_count += qty
             mi = items_map.get(iid)
-            if not mi:
+            if not mi or not line:
                 continue
-            # per-unit price = base + toppings
-            unit_price = Decimal(mi.price)
-            if eligible_for_toppings(getattr(mi, 'name', '')):
-                meat = x.get('meat_topping') or ''
-                if meat:
-                    unit_price += TOPPING_PRICES.get(meat, Decimal('0.00'))
-                extras = x.get('extra_toppings') or []
-                for t in extras:
-                    if t:
-                        unit_price += TOPPING_PRICES.get(t, Decimal('0.00'))
-            line_sub = unit_price * qty
+            unit_price = line.unit_price
+            line_sub = line.subtotal
             subtotal_sum += line_sub
             image_url = None
             if getattr(mi, "menu_img", None):
@@ -507,7 +526,7 @@ def checkout(request):
                         item=menu_item,
                         quantity=qty,
                         meat_topping=meat,
-                        extra_toppings=",".join([e for e in extras if e]),
+                        extra_toppings=extras,
                     )
 
                 # Create Delivery/Takeout record
@@ -578,26 +597,9 @@ def save_cart(request):
 
     items = payload.get('items') or []
     raw_order_type = payload.get('order_type')  # expect values: dine_in, pick_up, delivery
-    normalized = []
-    for it in items:
-        try:
-            iid = int(it.get('item_id')) if it.get('item_id') is not None else None
-        except Exception:
-            iid = None
-        qty = int(it.get('quantity', 1) or 1)
-        meat = it.get('meat_topping') or ''
-        extras = it.get('extra_toppings') or []
-        if iid is None:
-            continue
-        normalized.append({
-            'item_id': iid,
-            'quantity': qty,
-            'meat_topping': meat,
-            'extra_toppings': extras,
-        })
+    normalized = [line for line in (cart.normalize_line(it) for it in items) if line]
 
-    request.session['cart_items'] = normalized
-    request.session.modified = True
+    version = cart.replace(request.session, normalized)
 
     # Map frontend order type (dine_in | pick_up | delivery) to model choices ("dine in" | "carry out" | "delivery")
     ORDER_TYPE_MAP = {
@@ -610,7 +612,44 @@ def save_cart(request):
         request.session['order_type_raw'] = raw_order_type
         request.session.modified = True
 
-    return JsonResponse({'ok': True, 'count': len(normalized)})
+    subtotal = pricing.quote(normalized)['subtotal']
+    return JsonResponse({'ok': True, 'count': len(normalized), 'version': version, 'subtotal': str(subtotal)})
+
+
+@csrf_exempt
+def patch_cart(request):
+    """Apply changed cart lines against a cart version (see cart.py).
+
+    409 with the current items/version when the client is behind; it should
+    diff against those and resend.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'ok': False, 'error': 'POST required'}, status=405)
+
+    try:
+        payload = json.loads(request.body.decode('utf-8') or '{}')
+        version = int(payload.get('version', 0))
+    except Exception:
+        return JsonResponse({'ok': False, 'error': 'invalid json'}, status=400)
+
+    ops = payload.get('ops') or []
+    if not isinstance(ops, list):
+        return JsonResponse({'ok': False, 'error': 'ops must be a list'}, status=400)
+
+    try:
+        version = cart.apply_patch(request.session, version, ops, payload.get('order_type'))
+    except cart.CartVersionConflict:
+        return JsonResponse({
+            'ok': False,
+            'error': 'cart changed',
+            'version': cart.get_version(request.session),
+            'items': request.session.get(cart.SESSION_ITEMS, []),
+            'order_type': request.session.get('order_type_raw'),
+        }, status=409)
+
+    items = request.session.get(cart.SESSION_ITEMS, [])
+    subtotal = pricing.quote(items)['subtotal']
+    return JsonResponse({'ok': True, 'version': version, 'count': len(items), 'subtotal': str(subtotal)})
 
 
 def checkout_success(request):
@@ -620,7 +659,7 @@ def checkout_success(request):
     if last_id:
         try:
             # prefetch related items for efficiency
-            order = Order.objects.prefetch_related('items__item', 'transactions').get(pk=last_id)
+            order = Order.objects.prefetch_related('items__item', 'items__topping_links__topping', 'transactions').get(pk=last_id)
             txn = order.transactions.order_by('-id').first()
         except Order.DoesNotExist:
             order = None
@@ -631,30 +670,55 @@ def checkout_success(request):
 
 
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from . import bulk, lifecycle
 from .serializers import (
     MenuCategorySerializer, MenuSubCategorySerializer, MenuItemSerializer,
     PromotionSerializer, OrderSerializer, OrderItemSerializer,
-    TransactionSerializer, DeliverySerializer, TakeoutSerializer, OrderCreateSerializer
+    TransactionSerializer, DeliverySerializer, TakeoutSerializer, OrderCreateSerializer,
+    ToppingSerializer,
 )
 
 # API ViewSets
 class MenuCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("menu",)
     queryset = MenuCategory.objects.all()
     serializer_class = MenuCategorySerializer
 
 class MenuSubCategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("menu",)
     queryset = MenuSubCategory.objects.all()
     serializer_class = MenuSubCategorySerializer
 
 class MenuItemViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("menu",)
     queryset = MenuItem.objects.filter(is_available=True)
     serializer_class = MenuItemSerializer
 
 class PromotionViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("menu",)
     queryset = Promotion.objects.all()
     serializer_class = PromotionSerializer
 
+class ToppingViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("menu", "orders")
+    queryset = Topping.objects.all()
+    serializer_class = ToppingSerializer
+
+    @action(detail=False, methods=['get'], url_path='most-added', permission_classes=[permissions.IsAdminUser])
+    def most_added(self, request):
+        """Toppings by portions ordered in the last ?days=30 (?limit=10)."""
+        try:
+            days = max(1, int(request.query_params.get('days', 30)))
+            limit = max(1, min(100, int(request.query_params.get('limit', 10))))
+        except ValueError:
+            return Response({'detail': 'days and limit must be integers.'}, status=400)
+        since = timezone.now() - timedelta(days=days)
+        return Response({'days': days, 'results': Topping.most_added(since=since, limit=limit)})
+
 class OrderViewSet(viewsets.ModelViewSet):
+    data_scopes = ("orders", "menu", "users")
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -663,29 +727,58 @@ class OrderViewSet(viewsets.ModelViewSet):
         is_staff_view = self.request.query_params.get('view') == 'staff'
 
         if (user.is_staff and is_staff_view):
-            return Order.objects.all().order_by('-order_date')
-        return Order.objects.filter(user=user).order_by('-order_date')
+            orders = Order.objects.all()
+        else:
+            orders = Order.objects.filter(user=user)
+        return orders.prefetch_related('items__item', 'items__topping_links__topping').order_by('-order_date')
 
     def get_serializer_class(self):
         if self.action == "create":
             return OrderCreateSerializer  # POST — full order creation
         return OrderSerializer            # GET — read with nested items/delivery/etc
 
+    @action(detail=False, methods=['post'], url_path='bulk-status', permission_classes=[permissions.IsAdminUser])
+    def bulk_status(self, request):
+        """Move many orders along their delivery/pickup/dine-in track: {"ids": [...], "action": "next"|"set", "status": ...}."""
+        try:
+            ids = bulk.parse_ids(request.data.get('ids'))
+            action_name = (request.data.get('action') or ('set' if request.data.get('status') else '')).lower()
+            results = bulk.change_track_statuses(ids, action_name, request.data.get('status'))
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=400)
+        return Response({'results': results})
+
 class OrderItemViewSet(viewsets.ModelViewSet):
+    data_scopes = ("orders", "menu", "users")
     serializer_class = OrderItemSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return OrderItem.objects.filter(order__user=self.request.user)
+        return (OrderItem.objects.filter(order__user=self.request.user)
+                .select_related('item').prefetch_related('topping_links__topping'))
 
 class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
+    data_scopes = ("orders", "menu", "users")
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Transaction.objects.filter(order__user=self.request.user)
 
+def _status_patch(viewset, request, machine):
+    """PATCH of just the status field: one checked move, no full save() cascade."""
+    if set(request.data) != {machine.field}:
+        return None
+    row = viewset.get_object()
+    try:
+        lifecycle.move(machine, row, 'set', request.data[machine.field])
+    except lifecycle.InvalidTransition as exc:
+        return Response({machine.field: [str(exc)]}, status=400)
+    return Response(viewset.get_serializer(row).data)
+
+
 class DeliveryViewSet(viewsets.ModelViewSet):
+    data_scopes = ("orders", "menu", "users")
     serializer_class = DeliverySerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -695,7 +788,11 @@ class DeliveryViewSet(viewsets.ModelViewSet):
             return Delivery.objects.all()
         return Delivery.objects.filter(order__user=user)
 
+    def partial_update(self, request, *args, **kwargs):
+        return _status_patch(self, request, lifecycle.DELIVERY) or super().partial_update(request, *args, **kwargs)
+
 class TakeoutViewSet(viewsets.ModelViewSet):
+    data_scopes = ("orders", "menu", "users")
     serializer_class = TakeoutSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -704,3 +801,76 @@ class TakeoutViewSet(viewsets.ModelViewSet):
         if user.is_staff:
             return Takeout.objects.all()
         return Takeout.objects.filter(order__user=user)
+
+    def partial_update(self, request, *args, **kwargs):
+        return _status_patch(self, request, lifecycle.PICKUP) or super().partial_update(request, *args, **kwargs)
+
+from rest_framework.views import APIView
+from . import kitchen, prep
+
+
+def _int_param(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class KitchenFeedView(APIView):
+    """Kitchen display feed.
+
+    GET without `since` -> today's orders plus the `last_seq` to continue from.
+    GET ?since=N[&wait=S] -> events after N; with `wait` the request is held
+    (up to 25s) until one arrives. `reset` means the cursor is too old: reload.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        since = _int_param(request.query_params.get('since'))
+        if since is None or since < 0 or kitchen.is_stale(since):
+            # read the cursor first so nothing written meanwhile is skipped
+            last_seq = kitchen.latest_seq()
+            return Response({
+                'reset': since is not None,
+                'last_seq': last_seq,
+                'orders': [kitchen.snapshot(order) for order in kitchen.todays_orders()],
+                'events': [],
+                'more': False,
+            })
+
+        wait = _int_param(request.query_params.get('wait'), 0)
+        if wait > 0:
+            kitchen.wait_for_events(since, wait)
+        events, more = kitchen.events_since(since)
+        return Response({
+            'reset': False,
+            'last_seq': events[-1].seq if events else since,
+            'events': [
+                {'seq': e.seq, 'kind': e.kind, 'order_id': e.order_id, 'created_at': e.created_at.isoformat(), 'order': e.payload}
+                for e in events
+            ],
+            'more': more,
+        })
+
+
+class PrepListView(APIView):
+    """Prep list for staff screens.
+
+    GET -> the next service (the rest of today while orders are still
+    expected, else the next day that usually has them).
+    GET ?date=YYYY-MM-DD -> that whole day.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        day = None
+        if request.query_params.get('date'):
+            try:
+                day = datetime.strptime(request.query_params['date'], '%Y-%m-%d').date()
+            except ValueError:
+                return Response({'detail': 'date must be YYYY-MM-DD'}, status=400)
+        try:
+            prep_list = prep.get_prep_list(day)
+        except RuntimeError as e:
+            return Response({'detail': str(e)}, status=503)
+        return Response(prep_list.as_dict())
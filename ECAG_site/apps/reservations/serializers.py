@@ -1,8 +1,17 @@
-from datetime import datetime, time as dt_time, timedelta
+from datetime import datetime
 
-from rest_framework import serializers
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
 
+from . import assignment, booking
 from .models import Reservation, Table
+from .schedule import get_schedule
+
+
+class BookingConflictError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = {"table_id": "Table is not available for the requested slot."}
+    default_code = "booking_conflict"
 
 
 class TableSerializer(serializers.ModelSerializer):
@@ -21,6 +30,9 @@ class TableSerializer(serializers.ModelSerializer):
 class ReservationSerializer(serializers.ModelSerializer):
     table = TableSerializer(source="table_id", read_only=True)
     table_id = serializers.PrimaryKeyRelatedField(queryset=Table.objects.all())
+    joined_table_ids = serializers.PrimaryKeyRelatedField(
+        source="joined_tables", queryset=Table.objects.all(), many=True, required=False
+    )
 
     class Meta:
         model = Reservation
@@ -29,6 +41,7 @@ class ReservationSerializer(serializers.ModelSerializer):
             "user_id",
             "table_id",
             "table",
+            "joined_table_ids",
             "date",
             "time",
             "guest_count",
@@ -46,19 +59,6 @@ class ReservationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Requested date is in the past.")
         return value
 
-    def validate_time(self, value):
-        open_time = dt_time(15, 0)
-        last_start = dt_time(22, 0)
-        if not (open_time <= value <= last_start):
-            raise serializers.ValidationError(
-                "Restaurant is open 15:00-23:00; last booking start is 22:00."
-            )
-        if value.minute % 15 != 0:
-            raise serializers.ValidationError(
-                "Time must be in 15-minute increments (00, 15, 30, 45)."
-            )
-        return value
-
     def validate_guest_count(self, value):
         if value < 1 or value > 20:
             raise serializers.ValidationError("Guest count must be between 1 and 20.")
@@ -70,30 +70,31 @@ class ReservationSerializer(serializers.ModelSerializer):
         time = attrs.get("time") or getattr(self.instance, "time", None)
         guest_count = attrs.get("guest_count") or getattr(self.instance, "guest_count", None)
 
-        if table and guest_count:
-            expected_seats = 2 if guest_count <= 2 else 4
-            if table.seats != expected_seats:
-                raise serializers.ValidationError(
-                    {"table_id": "Selected table cannot accommodate the party size."}
-                )
-
-        if table and date and time:
-            req_start = datetime.combine(date, time)
-            req_end = req_start + timedelta(hours=2)
-
-            existing = Reservation.objects.filter(table_id=table, date=date).exclude(
-                status="cancelled"
-            )
-            if self.instance:
-                existing = existing.exclude(pk=self.instance.pk)
-
-            for reservation in existing:
-                current_start = datetime.combine(reservation.date, reservation.time)
-                current_end = current_start + timedelta(hours=2)
-                if not (req_end <= current_start or req_start >= current_end):
-                    raise serializers.ValidationError(
-                        {"table_id": "Table is not available for the requested slot."}
-                    )
+        # Opening hours, blackout dates and slot size live in the capacity
+        # model; only re-check when the booking's date or time changes.
+        if date and time and ("date" in attrs or "time" in attrs):
+            error = get_schedule().check(date, time)
+            if error:
+                raise serializers.ValidationError({"time": error})
+
+        if "joined_tables" in attrs:
+            joined = [t for t in attrs["joined_tables"] if table is None or t.pk != table.pk]
+            attrs["joined_tables"] = joined
+        else:
+            joined = list(self.instance.joined_tables.all()) if self.instance else []
+        tables = [table, *joined] if table else []
+
+        if tables and guest_count:
+            error = assignment.validate_combination([t.pk for t in tables], guest_count)
+            if error:
+                raise serializers.ValidationError({"table_id": f"{error}."})
+
+        # Early check for a friendly error; the slot claim in create()/update()
+        # is what actually guarantees no double booking.
+        status_value = attrs.get("status") or getattr(self.instance, "status", None)
+        if table and date and time and status_value not in booking.RELEASED_STATUSES:
+            if not booking.are_tables_free(tables, date, time, guest_count or 1, exclude_reservation=self.instance):
+                raise BookingConflictError()
 
         return attrs
 
@@ -102,5 +103,23 @@ class ReservationSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             raise serializers.ValidationError("Authentication is required.")
 
-        validated_data["user_id"] = request.user
-        return super().create(validated_data)
+        data = dict(validated_data)
+        try:
+            return booking.book(
+                user=request.user,
+                table=data.pop("table_id"),
+                date=data.pop("date"),
+                time=data.pop("time"),
+                guest_count=data.pop("guest_count"),
+                **data,
+            )
+        except booking.BookingConflict as exc:
+            raise BookingConflictError({"table_id": str(exc)})
+
+    def update(self, instance, validated_data):
+        try:
+            if set(validated_data) == {"status"}:
+                return booking.change_status(instance, validated_data["status"])
+            return booking.reschedule(instance, **validated_data)
+        except booking.BookingConflict as exc:
+            raise BookingConflictError({"table_id": str(exc)})
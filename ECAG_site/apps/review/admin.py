@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from apps.core import versions
+
 from .models import Review
 
 
@@ -17,11 +20,13 @@ class ReviewAdmin(admin.ModelAdmin):
 	def mark_verified(self, request, queryset):
 		"""Admin action: mark selected reviews as verified."""
 		updated = queryset.update(is_verified=True)
+		versions.bump("reviews")
 		self.message_user(request, f"{updated} review(s) marked as verified.")
 
 	def mark_unverified(self, request, queryset):
 		"""Admin action: mark selected reviews as not verified."""
 		updated = queryset.update(is_verified=False)
+		versions.bump("reviews")
 		self.message_user(request, f"{updated} review(s) marked as not verified.")
 
 	actions = ('mark_verified', 'mark_unverified')
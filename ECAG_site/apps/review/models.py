@@ -36,4 +36,14 @@ class Review(models.Model):
     def average_rating(cls):
         """Return the average rating across all reviews (float) or 0.0 if none."""
         result = cls.objects.aggregate(avg=Avg('rating'))
-        return result['avg'] or 0.0
\ No newline at end of file
+        return result['avg'] or 0.0
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core import versions
+
+# data versions behind the API ETags (apps/core/versions.py)
+@receiver([post_save, post_delete], sender=Review)
+def bump_reviews_version(sender, **kwargs):
+    versions.bump("reviews")
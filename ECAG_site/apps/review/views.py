@@ -9,6 +9,8 @@ from django.middleware.csrf import get_token
 from django.http import HttpResponseForbidden
 from django.template.loader import render_to_string
 
+from apps.core import versions
+
 def _is_staff_user(user):
     try:
         return user.is_active and user.is_staff
@@ -145,6 +147,7 @@ def review_helpful(request, pk):
 
     # Atomic increment
     Review.objects.filter(pk=pk).update(helpful_count=F('helpful_count') + 1)
+    versions.bump("reviews")
     review.refresh_from_db()
 
     # Record in session
@@ -223,6 +226,7 @@ from .serializers import ReviewSerializer
 
 # API ViewSets
 class ReviewViewSet(viewsets.ModelViewSet):
+    data_scopes = ("reviews",)
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -237,5 +241,6 @@ class ReviewViewSet(viewsets.ModelViewSet):
     def helpful(self, request, pk=None):
         review = self.get_object()
         Review.objects.filter(pk=review.pk).update(helpful_count=F('helpful_count') + 1)
+        versions.bump("reviews")
         review.refresh_from_db()
         return Response({'helpful': review.helpful_count, 'already_voted': False})
@@ -8,18 +8,31 @@ from urllib import error, parse, request
 import flet as ft
 import uuid
 
+from utils.virtual_list import VirtualList
+
 
 BASE_URL = os.getenv("ECAG_API_BASE_URL", "http://192.168.100.12:8000").rstrip("/")
 ADMIN_BASE = "/admin_panel/mobile"
 ACTIVE_BASE_URL = BASE_URL
+# the signed-in staff member's API token; the bulk and bootstrap endpoints require it
+AUTH_TOKEN = ""
+
+# the menu, customers, staff and reviews tabs are searched and filtered on the
+# server, a page at a time; typing waits this long for the next key first
+LIST_PAGE_SIZE = 50
+SEARCH_DEBOUNCE = 0.35
 
 
 class ApiError(RuntimeError):
     pass
 
 
-def _request_json(method: str, path: str, body: dict | None = None, query: dict | None = None, base_url: str | None = None):
+def _request_json(method: str, path: str, body: dict | None = None, query: dict | None = None, base_url: str | None = None,
+                  etags: dict | None = None, timeout: float = 12):
+    """JSON request; with `etags` (url -> ETag) a GET is conditional and returns None on 304."""
     headers = {"Accept": "application/json"}
+    if AUTH_TOKEN:
+        headers["Authorization"] = f"Token {AUTH_TOKEN}"
     data = None
     if body is not None:
         headers["Content-Type"] = "application/json"
@@ -29,14 +42,20 @@ def _request_json(method: str, path: str, body: dict | None = None, query: dict
     url = f"{base}{path}"
     if query:
         url = f"{url}?{parse.urlencode(query)}"
+    if etags is not None and etags.get(url):
+        headers["If-None-Match"] = etags[url]
 
     req = request.Request(url=url, headers=headers, data=data, method=method)
 
     try:
-        with request.urlopen(req, timeout=12) as response:
+        with request.urlopen(req, timeout=timeout) as response:
+            if etags is not None and response.headers.get("ETag"):
+                etags[url] = response.headers["ETag"]
             raw = response.read().decode("utf-8")
             return json.loads(raw) if raw else {}
     except error.HTTPError as exc:
+        if exc.code == 304 and etags is not None:
+            return None
         detail = exc.read().decode("utf-8", errors="ignore")
         raise ApiError(f"HTTP {exc.code}: {detail or exc.reason}") from exc
     except error.URLError as exc:
@@ -64,11 +83,10 @@ def _request_multipart(method: str, path: str, data: dict, files: dict[str, str]
             )
         body_parts.append(f'--{boundary}--\r\n'.encode())
         body = b''.join(body_parts)
-        req = request.Request(
-            url, data=body,
-            headers={"Content-Type": f"multipart/form-data; boundary={boundary}", "Accept": "application/json"},
-            method=method,
-        )
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}", "Accept": "application/json"}
+        if AUTH_TOKEN:
+            headers["Authorization"] = f"Token {AUTH_TOKEN}"
+        req = request.Request(url, data=body, headers=headers, method=method)
         try:
             with request.urlopen(req, timeout=20) as resp:
                 raw = resp.read().decode("utf-8")
@@ -104,13 +122,46 @@ def _get_base_candidates() -> list[str]:
     return cleaned
 
 
+PING_TIMEOUT = 3
+
+
+def api_ping(base_url: str) -> dict:
+    return _request_json("GET", f"{ADMIN_BASE}/ping/", base_url=base_url, timeout=PING_TIMEOUT)
+
+
+def api_bootstrap() -> dict:
+    """Every tab's first page in one request (see mobile_bootstrap_data)."""
+    return _request_json("GET", f"{ADMIN_BASE}/bootstrap/", timeout=30)
+
+
 def api_overview() -> dict:
     return _request_json("GET", f"{ADMIN_BASE}/overview/")
 
 
-def api_orders(search: str = "", status: str = "all", order_type: str = "all") -> list[dict]:
-    payload = _request_json("GET", f"{ADMIN_BASE}/orders/", query={"search": search, "status": status, "type": order_type})
-    return payload.get("orders", [])
+_ORDER_ETAGS: dict[str, str] = {}
+
+
+def api_orders_delta(since: int | None = None) -> dict | None:
+    """All orders (`since` None) or those changed after the `since` watermark; None if nothing changed."""
+    query = {"since": since} if since is not None else None
+    return _request_json("GET", f"{ADMIN_BASE}/orders/", query=query, etags=_ORDER_ETAGS)
+
+
+def merge_orders(orders: list[dict], payload: dict, limit: int = 300) -> tuple[list[dict], set[int]]:
+    """Apply an orders delta (or full list) to `orders`: (new list, ids that changed)."""
+    if payload.get("full"):
+        fresh = payload.get("orders", [])
+        return fresh, {int(o["id"]) for o in orders} | {int(o["id"]) for o in fresh}
+    by_id = {int(o["id"]): o for o in orders}
+    changed = set()
+    for oid in payload.get("removed", []):
+        if by_id.pop(int(oid), None) is not None:
+            changed.add(int(oid))
+    for order in payload.get("orders", []):
+        by_id[int(order["id"])] = order
+        changed.add(int(order["id"]))
+    merged = sorted(by_id.values(), key=lambda o: (o.get("order_date") or "", int(o["id"])), reverse=True)
+    return merged[:limit], changed
 
 
 def api_order_action(order_id: int, action: str | None = None, status: str | None = None) -> None:
@@ -136,9 +187,9 @@ def api_reservation_action(reservation_id: int, action: str | None = None, statu
     _request_json("POST", f"{ADMIN_BASE}/reservations/{reservation_id}/action/", body=body)
 
 
-def api_menu(search: str = "", category: str = "") -> tuple[list[dict], list[dict]]:
-    payload = _request_json("GET", f"{ADMIN_BASE}/menu/", query={"search": search, "category": category})
-    return payload.get("menu_items", []), payload.get("categories", [])
+def api_menu(search: str = "", category: str = "", offset: int = 0, limit: int = LIST_PAGE_SIZE) -> dict:
+    query = {"search": search, "category": category, "offset": offset, "limit": limit}
+    return _request_json("GET", f"{ADMIN_BASE}/menu/", query=query)
 
 
 def api_menu_action(item_id: int, action: str) -> None:
@@ -177,12 +228,14 @@ def api_menu_create(name: str, desc: str, price: str, subcategory_id: str, is_av
     )
 
 
-def api_customers(search: str = "") -> dict:
-    return _request_json("GET", f"{ADMIN_BASE}/customers/", query={"search": search})
+def api_customers(search: str = "", status: str = "all", offset: int = 0, limit: int = LIST_PAGE_SIZE) -> dict:
+    query = {"search": search, "status": status, "offset": offset, "limit": limit}
+    return _request_json("GET", f"{ADMIN_BASE}/customers/", query=query)
 
 
-def api_staffs(search: str = "") -> dict:
-    return _request_json("GET", f"{ADMIN_BASE}/staffs/", query={"search": search})
+def api_staffs(search: str = "", role: str = "all", offset: int = 0, limit: int = LIST_PAGE_SIZE) -> dict:
+    query = {"search": search, "role": role, "offset": offset, "limit": limit}
+    return _request_json("GET", f"{ADMIN_BASE}/staffs/", query=query)
 
 
 def api_staff_action(staff_id: int, action: str) -> dict:
@@ -199,9 +252,9 @@ def api_invite_staff(email: str, role: str) -> dict:
     return _request_json("POST", f"{ADMIN_BASE}/staffs/invite/", body={"email": email, "role": role})
 
 
-def api_reviews(search: str = "", status: str = "all") -> tuple[list[dict], dict]:
-    payload = _request_json("GET", f"{ADMIN_BASE}/reviews/", query={"search": search, "status": status})
-    return payload.get("reviews", []), payload.get("stats", {})
+def api_reviews(search: str = "", status: str = "all", offset: int = 0, limit: int = LIST_PAGE_SIZE) -> dict:
+    query = {"search": search, "status": status, "offset": offset, "limit": limit}
+    return _request_json("GET", f"{ADMIN_BASE}/reviews/", query=query)
 
 
 def api_review_action(review_id: int, action: str, subject: str = "", message: str = "") -> None:
@@ -214,6 +267,11 @@ def api_review_action(review_id: int, action: str, subject: str = "", message: s
 
 
 async def main(page: ft.Page):
+    global AUTH_TOKEN
+    try:
+        AUTH_TOKEN = page.session.store.get("token") or ""
+    except Exception:
+        AUTH_TOKEN = ""
     try:
         page.dialog = None
         page.overlay.clear()
@@ -270,6 +328,28 @@ async def main(page: ft.Page):
         "more_section": "customers",
     }
 
+    # orders tab: the delta feed's watermark and the counters a poll patches in place
+    orders_feed = {"watermark": None}
+    order_view = {"active": None, "preparing": None, "revenue": None}
+    # one VirtualList per card tab, kept across renders so unchanged cards are reused
+    lists: dict[str, VirtualList] = {}
+    shown_list = {"name": None}     # the one on screen
+
+    # server-searched tabs: `gen` numbers the queries so the reply to a superseded
+    # one is dropped, `task` is the query waiting out the debounce
+    list_feeds = {
+        name: {"gen": 0, "task": None, "next_offset": None, "loading": False}
+        for name in ("menu", "customers", "staff", "reviews")
+    }
+    LIST_API = {"menu": api_menu, "customers": api_customers, "staff": api_staffs, "reviews": api_reviews}
+    # tab: (rows in the payload, their id, state key for the rows, state key for the stats)
+    LIST_KEYS = {
+        "menu": ("menu_items", "item_id", "menu_items", None),
+        "customers": ("customers", "id", "customers", "customer_stats"),
+        "staff": ("staff_list", "id", "staff", "staff_stats"),
+        "reviews": ("reviews", "review_id", "reviews", "review_stats"),
+    }
+
     def pad_sym(horizontal: int = 0, vertical: int = 0):
         if hasattr(ft, "Padding") and hasattr(ft.Padding, "symmetric"):
             return ft.Padding.symmetric(horizontal=horizontal, vertical=vertical)
@@ -298,6 +378,8 @@ async def main(page: ft.Page):
         main_app_shell(page)
 
     async def logout_to_main_app(_=None):
+        global AUTH_TOKEN
+        AUTH_TOKEN = ""
         try:
             page.session.store.set("token", "")
         except Exception:
@@ -628,16 +710,22 @@ async def main(page: ft.Page):
         page.update()
 
     async def connect_backend() -> bool:
+        # ping every candidate at once; the first to answer becomes the backend
         global ACTIVE_BASE_URL
-        for base in _get_base_candidates():
-            try:
-                await asyncio.to_thread(_request_json, "GET", f"{ADMIN_BASE}/overview/", None, None, base)
-                ACTIVE_BASE_URL = base
-                backend_status.value = f"Website data: {ACTIVE_BASE_URL}"
-                backend_status.color = "#17623b"
-                return True
-            except Exception:
-                continue
+        probes = {asyncio.create_task(asyncio.to_thread(api_ping, base)): base for base in _get_base_candidates()}
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        ACTIVE_BASE_URL = probes[task]
+                        backend_status.value = f"Website data: {ACTIVE_BASE_URL}"
+                        backend_status.color = "#17623b"
+                        return True
+        finally:
+            for task in pending:
+                task.cancel()
         backend_status.value = "Website data unavailable. Run Django server and verify /admin_panel/mobile endpoints."
         backend_status.color = "#8b1e1e"
         return False
@@ -648,36 +736,39 @@ async def main(page: ft.Page):
             page.update()
             return
         try:
-            overview, orders, reservations, menu_data, customers, staffs, reviews_data = await asyncio.gather(
-                asyncio.to_thread(api_overview),
-                asyncio.to_thread(api_orders),
-                asyncio.to_thread(api_reservations),
-                asyncio.to_thread(api_menu),
-                asyncio.to_thread(api_customers),
-                asyncio.to_thread(api_staffs),
-                asyncio.to_thread(api_reviews),
-            )
-            state["overview"] = overview
-            state["orders"] = orders
-            state["reservations"] = reservations
-            state["menu_items"], state["menu_categories"] = menu_data
-            state["customers"] = customers.get("customers", [])
-            state["customer_stats"] = customers.get("stats", {})
-            state["staff"] = staffs.get("staff_list", [])
-            state["staff_stats"] = staffs.get("stats", {})
-            state["reviews"] = reviews_data[0]
-            state["review_stats"] = reviews_data[1]
+            data = await asyncio.to_thread(api_bootstrap)
+            orders = data.get("orders", {})
+            state["overview"] = data.get("overview", {})
+            state["orders"], _ = merge_orders(state["orders"], orders)
+            orders_feed["watermark"] = orders.get("watermark")
+            state["reservations"] = data.get("reservations", {}).get("reservations", [])
+            store_list("menu", data.get("menu", {}))
+            store_list("customers", data.get("customers", {}))
+            store_list("staff", data.get("staffs", {}))
+            store_list("reviews", data.get("reviews", {}))
         except Exception as exc:
             show_toast(f"Admin load failed: {exc}", danger=True)
 
+    async def sync_orders() -> bool:
+        """Bring state["orders"] up to date from the orders delta feed; True if anything changed."""
+        changed = False
+        while True:
+            payload = await asyncio.to_thread(api_orders_delta, orders_feed["watermark"])
+            if payload is None:     # 304: nothing new since the watermark
+                return changed
+            state["orders"], ids = merge_orders(state["orders"], payload)
+            orders_feed["watermark"] = payload.get("watermark", orders_feed["watermark"])
+            changed = changed or bool(ids)
+            if not payload.get("more"):
+                return changed
+
     async def live_orders_poll():
         # Keep kitchen metrics current without requiring manual refresh.
         while True:
             await asyncio.sleep(5)
             try:
-                state["orders"] = await asyncio.to_thread(api_orders)
-                if int(page.navigation_bar.selected_index or 0) == 1:
-                    render(1)
+                if await sync_orders() and int(page.navigation_bar.selected_index or 0) == 1:
+                    patch_orders()
             except Exception:
                 # Avoid noisy repeated error toasts during transient network issues.
                 pass
@@ -687,27 +778,113 @@ async def main(page: ft.Page):
             if index == 0:
                 state["overview"] = await asyncio.to_thread(api_overview)
             elif index == 1:
-                state["orders"] = await asyncio.to_thread(api_orders)
+                await sync_orders()
             elif index == 2:
                 state["reservations"] = await asyncio.to_thread(api_reservations)
             elif index == 3:
-                state["menu_items"], state["menu_categories"] = await asyncio.to_thread(api_menu)
+                await reload_list("menu")
             elif index == 4:
-                payload = await asyncio.to_thread(api_customers)
-                state["customers"] = payload.get("customers", [])
-                state["customer_stats"] = payload.get("stats", {})
+                await reload_list("customers")
             elif index == 5:
-                payload = await asyncio.to_thread(api_staffs)
-                state["staff"] = payload.get("staff_list", [])
-                state["staff_stats"] = payload.get("stats", {})
+                await reload_list("staff")
             elif index == 6:
-                reviews, stats = await asyncio.to_thread(api_reviews)
-                state["reviews"] = reviews
-                state["review_stats"] = stats
+                await reload_list("reviews")
         except Exception as exc:
             show_toast(str(exc), danger=True)
         render(page.navigation_bar.selected_index)
 
+    def menu_category_id() -> str:
+        selected = str(ui["menu_filter"]).lower()
+        for c in state["menu_categories"]:
+            if str(c.get("subcategory", "")).strip().lower() == selected:
+                return str(c.get("subcategory_id") or "")
+        return ""
+
+    def list_query(name: str) -> tuple:
+        """The filter arguments of LIST_API[name] for what the tab's search box and chips say."""
+        if name == "menu":
+            return ui["menu_search"].strip(), menu_category_id()
+        if name == "customers":
+            return ui["customers_search"].strip(), ui["customers_filter"]
+        if name == "staff":
+            return str(ui.get("staff_search") or "").strip(), ui["staff_filter"]
+        return "", ui["reviews_filter"]
+
+    def store_list(name: str, payload: dict, append: bool = False):
+        rows_key, id_key, state_key, stats_key = LIST_KEYS[name]
+        rows = payload.get(rows_key, [])
+        if append:
+            # a row that moved across the page boundary meanwhile would come twice
+            seen = {r.get(id_key) for r in state[state_key]}
+            rows = state[state_key] + [r for r in rows if r.get(id_key) not in seen]
+        state[state_key] = rows
+        if stats_key:
+            state[stats_key] = payload.get("stats", {})
+        if name == "menu":
+            state["menu_categories"] = payload.get("categories", [])
+        list_feeds[name]["next_offset"] = (payload.get("page") or {}).get("next_offset")
+
+    async def fetch_list(name: str, gen: int, offset: int = 0) -> bool:
+        """Load a page of tab `name` into state; False if a newer query replaced this one meanwhile."""
+        feed = list_feeds[name]
+        feed["loading"] = True
+        try:
+            payload = await asyncio.to_thread(LIST_API[name], *list_query(name), offset)
+        finally:
+            if gen == feed["gen"]:
+                feed["loading"] = False
+        if gen != feed["gen"]:
+            return False
+        store_list(name, payload, append=offset > 0)
+        return True
+
+    async def run_query(name: str, gen: int, delay: float = 0.0, offset: int = 0):
+        await asyncio.sleep(delay)
+        try:
+            if gen == list_feeds[name]["gen"] and await fetch_list(name, gen, offset):
+                patch_list(name)
+        except Exception as exc:
+            if gen == list_feeds[name]["gen"]:
+                show_toast(str(exc), danger=True)
+
+    def queue_query(name: str, delay: float = SEARCH_DEBOUNCE):
+        """Query tab `name` again after `delay`, superseding any query still waiting or in flight."""
+        feed = list_feeds[name]
+        feed["gen"] += 1
+        if feed["task"] is not None:
+            feed["task"].cancel()
+        feed["task"] = page.run_task(run_query, name, feed["gen"], delay)
+
+    async def reload_list(name: str):
+        feed = list_feeds[name]
+        feed["gen"] += 1
+        if feed["task"] is not None:
+            feed["task"].cancel()
+        await fetch_list(name, feed["gen"])
+
+    def load_more(name: str):
+        feed = list_feeds[name]
+        if feed["next_offset"] is None or feed["loading"]:
+            return
+        feed["loading"] = True      # scroll events keep coming while the page loads
+        page.run_task(run_query, name, feed["gen"], 0.0, feed["next_offset"])
+
+    def patch_list(name: str):
+        """Show tab `name`'s new rows if it is on screen, leaving the search box (and its focus) alone."""
+        if shown_list["name"] != name:
+            return
+        lists[name].set_items(menu_rows() if name == "menu" else state[LIST_KEYS[name][2]])
+        page.update()
+
+    def search_list(name: str, key: str, value: str):
+        ui[key] = value
+        queue_query(name)
+
+    def filter_list(name: str, key: str, value: str):
+        ui[key] = value
+        render(page.navigation_bar.selected_index)
+        queue_query(name, 0.0)
+
     async def handle_order_set_status(order_id: int, status: str):
         try:
             await asyncio.to_thread(api_order_action, order_id, None, status)
@@ -1223,7 +1400,7 @@ async def main(page: ft.Page):
             ),
         )
 
-    def build_orders() -> ft.Control:
+    def visible_orders() -> tuple[list[dict], int, int, float]:
         search = ui["orders_search"].strip().lower()
         selected = ui["orders_filter"]
 
@@ -1242,37 +1419,75 @@ async def main(page: ft.Page):
         active_count = sum(1 for o in state["orders"] if str(o.get("status", "")).lower() in ("pending", "confirmed", "in_progress", "preparing"))
         preparing_count = sum(1 for o in state["orders"] if str(o.get("status", "")).lower() in ("in_progress", "preparing"))
         total_revenue = sum(float(str(o.get("total", 0) or 0)) for o in state["orders"] if str(o.get("status", "")).lower() == "completed")
+        return orders, active_count, preparing_count, total_revenue
+
+    def card_list(name: str, build_row, key, items: list, header: list[ft.Control], header_height: float,
+                  row_height: float, empty_text: str, on_end=None) -> ft.Control:
+        """The tab's scrolling list: `header` on top, then only the cards near the viewport."""
+        vl = lists.get(name)
+        if vl is None:
+            vl = lists[name] = VirtualList(build_row, key=key, row_height=row_height)
+        vl.header = header
+        vl.header_height = header_height
+        vl.empty = ft.Text(empty_text, color=text_muted)
+        vl.on_end = on_end
+        vl.rewind(items)
+        shown_list["name"] = name
+        return vl.view
+
+    def order_card(o: dict) -> ft.Control:
+        oid = int(o.get("id"))
+        status = str(o.get("status") or "-")
+        items_text = ", ".join([f"{i.get('quantity', 1)}x {_item_name(i)}" for i in (o.get("items") or [])[:2]]) or "No items"
+        control = card(ft.Column(spacing=8, controls=[
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.Text(f"#{o.get('order_id_str') or oid}", size=16, weight=ft.FontWeight.W_700, color=text_muted),
+                status_chip(status),
+            ]),
+            ft.Text((o.get("user") or {}).get("name") or "Guest", size=18, weight=ft.FontWeight.W_600, color=text_dark, font_family="Georgia"),
+            ft.Divider(height=6, color=line_color),
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.Text(items_text, size=13, color=text_muted, expand=True),
+                ft.Text(f"Rs {float(str(o.get('total', 0) or 0)):.2f}", size=16, color=text_dark),
+            ]),
+            ft.Row(spacing=8, controls=[
+                *([] if status.lower() in ("completed", "cancelled") else [
+                    elevated_btn(
+                        order_primary_label(status),
+                        style=ft.ButtonStyle(bgcolor=dark_btn if status.lower() == "ready" else primary_btn, color="#ffffff", shape=ft.RoundedRectangleBorder(radius=10)),
+                        width=138,
+                        on_click=lambda e, order=o: page.run_task(handle_order_primary, order),
+                    ),
+                ]),
+                ft.OutlinedButton("View", width=86, on_click=lambda e, order=o: open_order_dialog(order)),
+            ]),
+        ]))
+        return control
 
-        cards: list[ft.Control] = []
-        for o in orders:
-            oid = int(o.get("id"))
-            status = str(o.get("status") or "-")
-            items_text = ", ".join([f"{i.get('quantity', 1)}x {_item_name(i)}" for i in (o.get("items") or [])[:2]]) or "No items"
-            cards.append(
-                card(ft.Column(spacing=8, controls=[
-                    ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                        ft.Text(f"#{o.get('order_id_str') or oid}", size=16, weight=ft.FontWeight.W_700, color=text_muted),
-                        status_chip(status),
-                    ]),
-                    ft.Text((o.get("user") or {}).get("name") or "Guest", size=18, weight=ft.FontWeight.W_600, color=text_dark, font_family="Georgia"),
-                    ft.Divider(height=6, color=line_color),
-                    ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                        ft.Text(items_text, size=13, color=text_muted, expand=True),
-                        ft.Text(f"Rs {float(str(o.get('total', 0) or 0)):.2f}", size=16, color=text_dark),
-                    ]),
-                    ft.Row(spacing=8, controls=[
-                        *([] if status.lower() in ("completed", "cancelled") else [
-                            elevated_btn(
-                                order_primary_label(status),
-                                style=ft.ButtonStyle(bgcolor=dark_btn if status.lower() == "ready" else primary_btn, color="#ffffff", shape=ft.RoundedRectangleBorder(radius=10)),
-                                width=138,
-                                on_click=lambda e, order=o: page.run_task(handle_order_primary, order),
-                            ),
-                        ]),
-                        ft.OutlinedButton("View", width=86, on_click=lambda e, order=o: open_order_dialog(order)),
-                    ]),
-                ]))
-            )
+    def patch_orders():
+        """Update the open orders tab in place after a poll: counters and the changed cards."""
+        if "orders" not in lists or order_view["active"] is None:
+            render(1)
+            return
+        orders, active_count, preparing_count, total_revenue = visible_orders()
+        order_view["active"].value = str(active_count)
+        order_view["preparing"].value = f"{preparing_count:02d}"
+        order_view["revenue"].value = f"Rs {total_revenue:,.0f}"
+        lists["orders"].set_items(orders)
+        page.update()
+
+    def search_orders(value: str):
+        # the orders are all here already (the delta feed keeps them): filter in place
+        ui["orders_search"] = value
+        patch_orders()
+
+    def build_orders() -> ft.Control:
+        selected = ui["orders_filter"]
+        orders, active_count, preparing_count, total_revenue = visible_orders()
+
+        order_view["active"] = ft.Text(str(active_count), size=42, color=accent, weight=ft.FontWeight.BOLD)
+        order_view["preparing"] = ft.Text(f"{preparing_count:02d}", size=42, color=text_dark, weight=ft.FontWeight.BOLD)
+        order_view["revenue"] = ft.Text(f"Rs {total_revenue:,.0f}", size=32, color="#ffffff", weight=ft.FontWeight.BOLD, font_family="Georgia")
 
         return ft.Container(
             expand=True,
@@ -1285,17 +1500,16 @@ async def main(page: ft.Page):
                     ft.Container(
                         expand=True,
                         padding=14,
-                        content=ft.Column(
-                            scroll=ft.ScrollMode.AUTO,
-                            spacing=12,
-                            controls=[
+                        content=card_list(
+                            "orders", order_card, lambda o: o.get("id"), orders,
+                            header=[
                                 card(ft.Column(spacing=10, controls=[
                                     ft.Text("LIVE STATUS", size=12, color=text_muted),
                                     ft.Text("Kitchen Overview", size=20, weight=ft.FontWeight.BOLD, color=text_dark, font_family="Georgia"),
                                     ft.Row(alignment=ft.MainAxisAlignment.SPACE_AROUND, controls=[
-                                        ft.Column(spacing=0, controls=[ft.Text(str(active_count), size=42, color=accent, weight=ft.FontWeight.BOLD), ft.Text("Active Orders", color=text_muted)]),
+                                        ft.Column(spacing=0, controls=[order_view["active"], ft.Text("Active Orders", color=text_muted)]),
                                         ft.VerticalDivider(width=1, color=line_color),
-                                        ft.Column(spacing=0, controls=[ft.Text(f"{preparing_count:02d}", size=42, color=text_dark, weight=ft.FontWeight.BOLD), ft.Text("Preparing", color=text_muted)]),
+                                        ft.Column(spacing=0, controls=[order_view["preparing"], ft.Text("Preparing", color=text_muted)]),
                                     ]),
                                 ])),
                                 ft.Container(
@@ -1304,159 +1518,162 @@ async def main(page: ft.Page):
                                     padding=14,
                                     content=ft.Column(spacing=2, controls=[
                                         ft.Text("Daily Revenue", color="#fff1e6"),
-                                        ft.Text(f"Rs {total_revenue:,.0f}", size=32, color="#ffffff", weight=ft.FontWeight.BOLD, font_family="Georgia"),
+                                        order_view["revenue"],
                                     ]),
                                 ),
-                                ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search Order ID, Customer...", value=ui["orders_search"], on_change=lambda e: _set_ui("orders_search", e.control.value), border_radius=16, bgcolor=input_bg, border_color=input_bg),
+                                ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search Order ID, Customer...", value=ui["orders_search"], on_change=lambda e: search_orders(e.control.value), border_radius=16, bgcolor=input_bg, border_color=input_bg),
                                 ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
                                     chip_button("All Orders", selected == "all", lambda e: _set_ui("orders_filter", "all")),
                                     chip_button("Pending", selected == "pending", lambda e: _set_ui("orders_filter", "pending")),
                                     chip_button("Preparing", selected == "preparing", lambda e: _set_ui("orders_filter", "preparing")),
                                 ]),
-                                *(cards if cards else [ft.Text("No orders found.", color=text_muted)]),
                             ],
+                            header_height=350,
+                            row_height=170,
+                            empty_text="No orders found.",
                         ),
                     ),
                 ],
             ),
         )
 
+    def reservation_card(r: dict) -> ft.Control:
+        rid = int(r.get("reservation_id"))
+        status = str(r.get("status") or "-")
+        date_txt = (r.get("date") or "").replace("T", " ")
+        time_txt = str(r.get("time") or "")[:5]
+        table = (r.get("table") or {}).get("table_number")
+        return card(ft.Column(spacing=8, controls=[
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[status_chip(status), ft.Column(spacing=0, horizontal_alignment=ft.CrossAxisAlignment.END, controls=[ft.Text("Tonight" if status == "pending" else date_txt, color=accent if status == "pending" else text_dark, weight=ft.FontWeight.W_600), ft.Text(time_txt or "-", color=text_dark)])]),
+            ft.Text(r.get("full_name") or "Guest", size=20, weight=ft.FontWeight.W_600, color=text_dark, font_family="Georgia"),
+            ft.Divider(height=6, color=line_color),
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[ft.Text(f"{r.get('guest_count', '-')} Guests", color=text_dark), ft.Text(f"Table {table}" if table else "Unassigned", color=text_dark)]),
+            ft.Row(visible=status == "pending", spacing=8, controls=[
+                elevated_btn("Confirm", expand=True, style=ft.ButtonStyle(bgcolor=primary_btn, color="#ffffff"), on_click=lambda e, id_=rid: page.run_task(handle_reservation_set_status, id_, "confirmed")),
+                ft.OutlinedButton("Cancel", expand=True, on_click=lambda e, id_=rid: page.run_task(handle_reservation_set_status, id_, "cancelled")),
+            ]),
+        ]))
+
     def build_reservations() -> ft.Control:
         selected = ui["reservations_filter"]
         reservations = state["reservations"]
         if selected != "all":
             reservations = [r for r in reservations if str(r.get("status", "")).lower() == selected]
 
-        cards: list[ft.Control] = []
-        for r in reservations:
-            rid = int(r.get("reservation_id"))
-            status = str(r.get("status") or "-")
-            date_txt = (r.get("date") or "").replace("T", " ")
-            time_txt = str(r.get("time") or "")[:5]
-            table = (r.get("table") or {}).get("table_number")
-            cards.append(
-                card(ft.Column(spacing=8, controls=[
-                    ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[status_chip(status), ft.Column(spacing=0, horizontal_alignment=ft.CrossAxisAlignment.END, controls=[ft.Text("Tonight" if status == "pending" else date_txt, color=accent if status == "pending" else text_dark, weight=ft.FontWeight.W_600), ft.Text(time_txt or "-", color=text_dark)])]),
-                    ft.Text(r.get("full_name") or "Guest", size=20, weight=ft.FontWeight.W_600, color=text_dark, font_family="Georgia"),
-                    ft.Divider(height=6, color=line_color),
-                    ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[ft.Text(f"{r.get('guest_count', '-')} Guests", color=text_dark), ft.Text(f"Table {table}" if table else "Unassigned", color=text_dark)]),
-                    ft.Row(visible=status == "pending", spacing=8, controls=[
-                        elevated_btn("Confirm", expand=True, style=ft.ButtonStyle(bgcolor=primary_btn, color="#ffffff"), on_click=lambda e, id_=rid: page.run_task(handle_reservation_set_status, id_, "confirmed")),
-                        ft.OutlinedButton("Cancel", expand=True, on_click=lambda e, id_=rid: page.run_task(handle_reservation_set_status, id_, "cancelled")),
-                    ]),
-                ]))
-            )
-
         return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
             header_bar(),
-            ft.Container(expand=True, padding=14, content=ft.Column(scroll=ft.ScrollMode.AUTO, spacing=12, controls=[
-                section_header("Reservations", "Manage your upcoming guest sittings and floor plan.", 2),
-                ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
-                    chip_button("All", selected == "all", lambda e: _set_ui("reservations_filter", "all")),
-                    chip_button("Pending", selected == "pending", lambda e: _set_ui("reservations_filter", "pending")),
-                    chip_button("Confirmed", selected == "confirmed", lambda e: _set_ui("reservations_filter", "confirmed")),
+            ft.Container(expand=True, padding=14, content=card_list(
+                "reservations", reservation_card, lambda r: r.get("reservation_id"), reservations,
+                header=[
+                    section_header("Reservations", "Manage your upcoming guest sittings and floor plan.", 2),
+                    ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
+                        chip_button("All", selected == "all", lambda e: _set_ui("reservations_filter", "all")),
+                        chip_button("Pending", selected == "pending", lambda e: _set_ui("reservations_filter", "pending")),
+                        chip_button("Confirmed", selected == "confirmed", lambda e: _set_ui("reservations_filter", "confirmed")),
+                    ]),
+                ],
+                header_height=120,
+                row_height=190,
+                empty_text="No reservations found.",
+            )),
+        ]))
+
+    menu_columns = 4
+
+    def menu_tile_width() -> float:
+        screen_w = page.width or 390
+        return 280 if screen_w >= 980 else 240 if screen_w >= 700 else 210 if screen_w >= 520 else max(160, (screen_w - 44) / 2)
+
+    def menu_tile(item: dict, tile_width: float) -> ft.Control:
+        iid = int(item.get("item_id"))
+        return ft.Container(
+            width=tile_width,
+            content=card(ft.Column(spacing=8, controls=[
+                ft.Container(
+                    height=120,
+                    border_radius=10,
+                    bgcolor=soft_orange,
+                    alignment=ft.Alignment(0, 0),
+                    clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
+                    content=(
+                        ft.Image(
+                            src=item.get("image_url", ""),
+                            width=tile_width,
+                            height=120,
+                            fit="cover",
+                            error_content=ft.Text("No Image", color=text_muted, size=11),
+                        )
+                        if item.get("image_url")
+                        else ft.Text("No Image", color=text_muted, size=11)
+                    ),
+                ),
+                ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                    ft.Text(item.get("name", "Item"), size=20, weight=ft.FontWeight.BOLD, color=text_dark, font_family="Georgia", expand=True),
+                    ft.Text(f"Rs {float(str(item.get('price', 0) or 0)):.2f}", size=16, weight=ft.FontWeight.BOLD, color=accent),
+                ]),
+                ft.Text(item.get("desc", ""), size=12, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS, color=text_muted),
+                ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                    status_chip("available" if item.get("is_available") else "sold out"),
+                    ft.IconButton(icon=ft.Icons.EDIT_OUTLINED, icon_color=text_muted, on_click=lambda e, menu_item=item: open_menu_edit_dialog(menu_item)),
+                ]),
+                ft.Row(controls=[
+                    ft.OutlinedButton("Toggle", on_click=lambda e, id_=iid: page.run_task(handle_menu_toggle, id_)),
+                    ft.OutlinedButton("Delete", on_click=lambda e, id_=iid: page.run_task(handle_menu_delete, id_)),
                 ]),
-                *(cards if cards else [ft.Text("No reservations found.", color=text_muted)]),
             ])),
-        ]))
+        )
 
-    def build_menu() -> ft.Control:
-        selected = str(ui["menu_filter"]).lower()
-        search = str(ui.get("menu_search", "")).strip().lower()
+    def menu_rows() -> list[tuple]:
+        """The menu grid's rows (tuples of items): the rows the menu's VirtualList shows."""
         items = state["menu_items"]
-        if search:
-            items = [
-                i for i in items
-                if search in str(i.get("name", "")).lower()
-                or search in str(i.get("desc", "")).lower()
-            ]
-        if selected != "all":
-            items = [i for i in items if str((i.get("subcategory") or "")).lower() == selected]
+        return [tuple(items[i:i + menu_columns]) for i in range(0, len(items), menu_columns)]
+
+    def menu_row(row: tuple) -> ft.Control:
+        tile_width = menu_tile_width()
+        return ft.Row(spacing=12, scroll=ft.ScrollMode.AUTO, controls=[menu_tile(item, tile_width) for item in row])
 
+    def build_menu() -> ft.Control:
+        selected = str(ui["menu_filter"]).lower()
         categories = ["all"] + [str(c.get("subcategory", "")).strip() for c in state["menu_categories"] if c.get("subcategory")]
         categories_unique = []
         for c in categories:
             if c and c.lower() not in [x.lower() for x in categories_unique]:
                 categories_unique.append(c)
 
-        screen_w = page.width or 390
-        tile_width = 280 if screen_w >= 980 else 240 if screen_w >= 700 else 210 if screen_w >= 520 else max(160, (screen_w - 44) / 2)
-        cols = 4
-
-        cards: list[ft.Control] = []
-        for item in items:
-            iid = int(item.get("item_id"))
-            cards.append(
-                ft.Container(
-                    width=tile_width,
-                    content=card(ft.Column(spacing=8, controls=[
-                        ft.Container(
-                            height=120,
-                            border_radius=10,
-                            bgcolor=soft_orange,
-                            alignment=ft.Alignment(0, 0),
-                            clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                            content=(
-                                ft.Image(
-                                    src=item.get("image_url", ""),
-                                    width=tile_width,
-                                    height=120,
-                                    fit="cover",
-                                    error_content=ft.Text("No Image", color=text_muted, size=11),
-                                )
-                                if item.get("image_url")
-                                else ft.Text("No Image", color=text_muted, size=11)
-                            ),
-                        ),
-                        ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                            ft.Text(item.get("name", "Item"), size=20, weight=ft.FontWeight.BOLD, color=text_dark, font_family="Georgia", expand=True),
-                            ft.Text(f"Rs {float(str(item.get('price', 0) or 0)):.2f}", size=16, weight=ft.FontWeight.BOLD, color=accent),
-                        ]),
-                        ft.Text(item.get("desc", ""), size=12, max_lines=2, overflow=ft.TextOverflow.ELLIPSIS, color=text_muted),
-                        ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                            status_chip("available" if item.get("is_available") else "sold out"),
-                            ft.IconButton(icon=ft.Icons.EDIT_OUTLINED, icon_color=text_muted, on_click=lambda e, menu_item=item: open_menu_edit_dialog(menu_item)),
-                        ]),
-                        ft.Row(controls=[
-                            ft.OutlinedButton("Toggle", on_click=lambda e, id_=iid: page.run_task(handle_menu_toggle, id_)),
-                            ft.OutlinedButton("Delete", on_click=lambda e, id_=iid: page.run_task(handle_menu_delete, id_)),
-                        ]),
-                    ])),
-                )
-            )
-
-        card_rows: list[ft.Control] = []
-        for i in range(0, len(cards), cols):
-            card_rows.append(ft.Row(spacing=12, scroll=ft.ScrollMode.AUTO, controls=cards[i:i + cols]))
-
         return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
             header_bar(),
-            ft.Container(expand=True, padding=14, content=ft.Column(scroll=ft.ScrollMode.AUTO, spacing=12, controls=[
-                ft.Row(
-                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                    controls=[
-                        ft.Column(
-                            spacing=2,
-                            controls=[
-                                ft.Text("Menu Management", size=21 if (page.width or 390) < 500 else 24, weight=ft.FontWeight.BOLD, color=text_dark, font_family="Georgia"),
-                                ft.Text("Manage dishes and availability.", size=12, color=text_muted),
-                            ],
-                        ),
-                        ft.Row(
-                            spacing=8,
-                            controls=[
-                                elevated_btn("Add Item", icon=ft.Icons.ADD, style=ft.ButtonStyle(bgcolor=primary_btn, color="#ffffff", shape=ft.RoundedRectangleBorder(radius=12)), on_click=lambda e: open_menu_create_dialog()),
-                                ft.IconButton(icon=ft.Icons.REFRESH, icon_color=accent, on_click=lambda e: page.run_task(refresh_tab, 3)),
-                            ],
-                        ),
-                    ],
-                ),
-                ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search menu items...", value=ui["menu_search"], on_change=lambda e: _set_ui("menu_search", e.control.value), border_radius=14, bgcolor=input_bg, border_color=input_bg),
-                ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
-                    *[chip_button(c.title() if c != "all" else "All Items", selected == c.lower(), (lambda v: (lambda e: _set_ui("menu_filter", v)))(c.lower())) for c in categories_unique[:8]]
-                ]),
-                *(card_rows if card_rows else [ft.Text("No menu items found.", color=text_muted)]),
-            ])),
+            ft.Container(expand=True, padding=14, content=card_list(
+                "menu", menu_row, lambda row: tuple(item.get("item_id") for item in row), menu_rows(),
+                header=[
+                    ft.Row(
+                        alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                        controls=[
+                            ft.Column(
+                                spacing=2,
+                                controls=[
+                                    ft.Text("Menu Management", size=21 if (page.width or 390) < 500 else 24, weight=ft.FontWeight.BOLD, color=text_dark, font_family="Georgia"),
+                                    ft.Text("Manage dishes and availability.", size=12, color=text_muted),
+                                ],
+                            ),
+                            ft.Row(
+                                spacing=8,
+                                controls=[
+                                    elevated_btn("Add Item", icon=ft.Icons.ADD, style=ft.ButtonStyle(bgcolor=primary_btn, color="#ffffff", shape=ft.RoundedRectangleBorder(radius=12)), on_click=lambda e: open_menu_create_dialog()),
+                                    ft.IconButton(icon=ft.Icons.REFRESH, icon_color=accent, on_click=lambda e: page.run_task(refresh_tab, 3)),
+                                ],
+                            ),
+                        ],
+                    ),
+                    ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search menu items...", value=ui["menu_search"], on_change=lambda e: search_list("menu", "menu_search", e.control.value), border_radius=14, bgcolor=input_bg, border_color=input_bg),
+                    ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
+                        *[chip_button(c.title() if c != "all" else "All Items", selected == c.lower(), (lambda v: (lambda e: filter_list("menu", "menu_filter", v)))(c.lower())) for c in categories_unique[:8]]
+                    ]),
+                ],
+                header_height=190,
+                row_height=330,
+                empty_text="No menu items found.",
+                on_end=lambda: load_more("menu"),
+            )),
         ]))
 
     def more_tabs_bar() -> ft.Control:
@@ -1470,65 +1687,74 @@ async def main(page: ft.Page):
             ],
         )
 
+    def customer_card(c: dict) -> ft.Control:
+        name = c.get("name") or "Customer"
+        return card(ft.Column(spacing=8, controls=[
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.Row(spacing=10, controls=[
+                    _avatar(name),
+                    ft.Column(spacing=1, controls=[ft.Text(name, size=18, weight=ft.FontWeight.W_600, color=text_dark, font_family="Georgia"), ft.Text("Joined recently", color=text_muted)]),
+                ]),
+                status_chip(c.get("status", "regular")),
+            ]),
+            ft.Divider(height=6, color=line_color),
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.Column(spacing=1, controls=[ft.Text("TOTAL SPEND", size=11, color=text_muted), ft.Text(f"Rs {float(str(c.get('total_spent', 0) or 0)):.2f}", size=30 if (page.width or 390) > 600 else 27, color=text_dark, font_family="Georgia")]),
+                ft.TextButton("View Details >", style=ft.ButtonStyle(color=accent), on_click=lambda e, customer=c: open_customer_dialog(customer)),
+            ]),
+        ]))
+
     def build_customers(in_more: bool = False) -> ft.Control:
         selected = ui["customers_filter"]
-        search = ui["customers_search"].strip().lower()
-        customers = state["customers"]
-        if search:
-            customers = [c for c in customers if search in str(c.get("name", "")).lower() or search in str(c.get("email", "")).lower()]
-        if selected != "all":
-            customers = [c for c in customers if str(c.get("status", "")).lower() == selected]
-
-        cards: list[ft.Control] = []
-        for c in customers:
-            name = c.get("name") or "Customer"
-            cards.append(
-                card(ft.Column(spacing=8, controls=[
-                    ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                        ft.Row(spacing=10, controls=[
-                            _avatar(name),
-                            ft.Column(spacing=1, controls=[ft.Text(name, size=18, weight=ft.FontWeight.W_600, color=text_dark, font_family="Georgia"), ft.Text("Joined recently", color=text_muted)]),
-                        ]),
-                        status_chip(c.get("status", "regular")),
-                    ]),
-                    ft.Divider(height=6, color=line_color),
-                    ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                        ft.Column(spacing=1, controls=[ft.Text("TOTAL SPEND", size=11, color=text_muted), ft.Text(f"Rs {float(str(c.get('total_spent', 0) or 0)):.2f}", size=30 if (page.width or 390) > 600 else 27, color=text_dark, font_family="Georgia")]),
-                        ft.TextButton("View Details >", style=ft.ButtonStyle(color=accent), on_click=lambda e, customer=c: open_customer_dialog(customer)),
-                    ]),
-                ]))
-            )
 
         return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
             header_bar(),
-            ft.Container(expand=True, padding=14, content=ft.Column(scroll=ft.ScrollMode.AUTO, spacing=12, controls=[
-                *([more_tabs_bar()] if in_more else []),
-                section_header("Customer Management", "Review and manage your diner relationships.", 4),
-                ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search by name or email...", value=ui["customers_search"], on_change=lambda e: _set_ui("customers_search", e.control.value), border_radius=14, bgcolor=input_bg, border_color=input_bg),
-                ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
-                    chip_button("All Customers", selected == "all", lambda e: _set_ui("customers_filter", "all")),
-                    chip_button("VIP", selected == "vip", lambda e: _set_ui("customers_filter", "vip")),
-                    chip_button("Regular", selected == "regular", lambda e: _set_ui("customers_filter", "regular")),
+            ft.Container(expand=True, padding=14, content=card_list(
+                "customers", customer_card, lambda c: c.get("id"), state["customers"],
+                header=[
+                    *([more_tabs_bar()] if in_more else []),
+                    section_header("Customer Management", "Review and manage your diner relationships.", 4),
+                    ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search by name or email...", value=ui["customers_search"], on_change=lambda e: search_list("customers", "customers_search", e.control.value), border_radius=14, bgcolor=input_bg, border_color=input_bg),
+                    ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
+                        chip_button("All Customers", selected == "all", lambda e: filter_list("customers", "customers_filter", "all")),
+                        chip_button("VIP", selected == "vip", lambda e: filter_list("customers", "customers_filter", "vip")),
+                        chip_button("Regular", selected == "regular", lambda e: filter_list("customers", "customers_filter", "regular")),
+                    ]),
+                ],
+                header_height=230 if in_more else 180,
+                row_height=150,
+                empty_text="No customers found.",
+                on_end=lambda: load_more("customers"),
+            )),
+        ]))
+
+    def staff_card(s: dict) -> ft.Control:
+        sid = int(s.get("id"))
+        name = s.get("name") or "Staff"
+        status_value = "active" if s.get("is_admin") else "on_shift"
+        return card(ft.Column(spacing=8, controls=[
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.Row(spacing=10, controls=[
+                    _avatar(name),
+                    ft.Column(spacing=1, controls=[ft.Text(name, size=17, weight=ft.FontWeight.W_600, color=text_dark), ft.Text("ADMINISTRATOR" if s.get("is_admin") else "STAFF", color=text_muted)]),
                 ]),
-                *(cards if cards else [ft.Text("No customers found.", color=text_muted)]),
-            ])),
+                ft.Row(spacing=4, controls=[
+                    ft.IconButton(icon=ft.Icons.EDIT_OUTLINED, icon_size=16, icon_color=text_muted, on_click=lambda e, staff_item=s: open_staff_edit_dialog(staff_item)),
+                    ft.IconButton(icon=ft.Icons.DELETE_OUTLINE, icon_size=16, icon_color="#c03b2f", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "remove_access")),
+                ]),
+            ]),
+            ft.Row(controls=[status_chip(status_value)]),
+            ft.Divider(height=6, color=line_color),
+            ft.Text(s.get("email") or "", color=text_muted),
+            ft.Row(controls=[
+                ft.OutlinedButton("Make Admin", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "make_admin")),
+                ft.OutlinedButton("Make Staff", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "make_staff")),
+                ft.OutlinedButton("Reset Password", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "reset_password")),
+            ], wrap=True),
         ]))
 
     def build_staff(in_more: bool = False) -> ft.Control:
         selected = ui["staff_filter"]
-        staff = state["staff"]
-        search_query = str(ui.get("staff_search") or "").strip().lower()
-        if search_query:
-            staff = [
-                s for s in staff
-                if search_query in str(s.get("name") or "").lower()
-                or search_query in str(s.get("email") or "").lower()
-            ]
-        if selected == "admins":
-            staff = [s for s in staff if bool(s.get("is_admin"))]
-        elif selected == "chefs":
-            staff = [s for s in staff if "chef" in str(s.get("name", "")).lower() or "chef" in str(s.get("email", "")).lower()]
-
         invite_email = ft.TextField(
             label="Staff email",
             width=260,
@@ -1541,106 +1767,86 @@ async def main(page: ft.Page):
             options=[ft.dropdown.Option("staff"), ft.dropdown.Option("admin")],
         )
 
-        cards: list[ft.Control] = []
-        for s in staff:
-            sid = int(s.get("id"))
-            name = s.get("name") or "Staff"
-            status_value = "active" if s.get("is_admin") else "on_shift"
-            cards.append(card(ft.Column(spacing=8, controls=[
-                ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                    ft.Row(spacing=10, controls=[
-                        _avatar(name),
-                        ft.Column(spacing=1, controls=[ft.Text(name, size=17, weight=ft.FontWeight.W_600, color=text_dark), ft.Text("ADMINISTRATOR" if s.get("is_admin") else "STAFF", color=text_muted)]),
+        return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
+            header_bar(),
+            ft.Container(expand=True, padding=14, content=card_list(
+                "staff", staff_card, lambda s: s.get("id"), state["staff"],
+                header=[
+                    *([more_tabs_bar()] if in_more else []),
+                    section_header("Staff Management", "OPERATIONS", 5),
+                    card(ft.Column(spacing=10, controls=[
+                        ft.Row(controls=[invite_email, invite_role], wrap=True),
+                        elevated_btn("Invite Staff", icon=ft.Icons.PERSON_ADD_ALT_1_OUTLINED, style=ft.ButtonStyle(bgcolor=primary_btn, color="#ffffff", shape=ft.RoundedRectangleBorder(radius=12)), on_click=lambda e: page.run_task(handle_invite_staff, invite_email.value, invite_role.value)),
+                    ])),
+                    ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search by name or email...", value=ui["staff_search"], on_change=lambda e: search_list("staff", "staff_search", e.control.value), border_radius=14, bgcolor=input_bg, border_color=input_bg),
+                    ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
+                        chip_button("All Staff", selected == "all", lambda e: filter_list("staff", "staff_filter", "all")),
+                        chip_button("Admins", selected == "admins", lambda e: filter_list("staff", "staff_filter", "admins")),
+                        chip_button("Chefs", selected == "chefs", lambda e: filter_list("staff", "staff_filter", "chefs")),
                     ]),
-                    ft.Row(spacing=4, controls=[
-                        ft.IconButton(icon=ft.Icons.EDIT_OUTLINED, icon_size=16, icon_color=text_muted, on_click=lambda e, staff_item=s: open_staff_edit_dialog(staff_item)),
-                        ft.IconButton(icon=ft.Icons.DELETE_OUTLINE, icon_size=16, icon_color="#c03b2f", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "remove_access")),
+                ],
+                header_height=400 if in_more else 350,
+                row_height=230,
+                empty_text="No staff found.",
+                on_end=lambda: load_more("staff"),
+            )),
+        ]))
+
+    def review_card(r: dict) -> ft.Control:
+        name = r.get("user_name") or "Guest"
+        rid = int(r.get("review_id"))
+        stars = int(r.get("rating") or 0)
+        stars_text = ("*" * stars).ljust(5, "*")
+        return card(ft.Column(spacing=8, controls=[
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.Row(spacing=10, controls=[
+                    _avatar(name),
+                    ft.Column(spacing=1, controls=[
+                        ft.Text(name, size=16, weight=ft.FontWeight.W_600, color=text_dark),
+                        ft.Text(stars_text, color=accent),
                     ]),
                 ]),
-                ft.Row(controls=[status_chip(status_value)]),
-                ft.Divider(height=6, color=line_color),
-                ft.Text(s.get("email") or "", color=text_muted),
+                ft.Text("2h ago", color="#9ca3af", size=11),
+            ]),
+            ft.Text(f'"{r.get("review_text", "")}"', size=13, color=text_muted, italic=True),
+            ft.Divider(height=6, color=line_color),
+            ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+                ft.TextButton("Email Response", icon=ft.Icons.MAIL_OUTLINE, style=ft.ButtonStyle(color=accent), on_click=lambda e, review=r: open_email_dialog(review)),
                 ft.Row(controls=[
-                    ft.OutlinedButton("Make Admin", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "make_admin")),
-                    ft.OutlinedButton("Make Staff", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "make_staff")),
-                    ft.OutlinedButton("Reset Password", on_click=lambda e, id_=sid: page.run_task(handle_staff_action, id_, "reset_password")),
-                ], wrap=True),
-            ])))
-
-        return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
-            header_bar(),
-            ft.Container(expand=True, padding=14, content=ft.Column(scroll=ft.ScrollMode.AUTO, spacing=12, controls=[
-                *([more_tabs_bar()] if in_more else []),
-                section_header("Staff Management", "OPERATIONS", 5),
-                card(ft.Column(spacing=10, controls=[
-                    ft.Row(controls=[invite_email, invite_role], wrap=True),
-                    elevated_btn("Invite Staff", icon=ft.Icons.PERSON_ADD_ALT_1_OUTLINED, style=ft.ButtonStyle(bgcolor=primary_btn, color="#ffffff", shape=ft.RoundedRectangleBorder(radius=12)), on_click=lambda e: page.run_task(handle_invite_staff, invite_email.value, invite_role.value)),
-                ])),
-                ft.TextField(prefix_icon=ft.Icons.SEARCH, hint_text="Search by name or email...", value=ui["staff_search"], on_change=lambda e: _set_ui("staff_search", e.control.value), border_radius=14, bgcolor=input_bg, border_color=input_bg),
-                ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
-                    chip_button("All Staff", selected == "all", lambda e: _set_ui("staff_filter", "all")),
-                    chip_button("Admins", selected == "admins", lambda e: _set_ui("staff_filter", "admins")),
-                    chip_button("Chefs", selected == "chefs", lambda e: _set_ui("staff_filter", "chefs")),
+                    ft.OutlinedButton("Approve", on_click=lambda e, id_=rid: page.run_task(handle_review_action, id_, "verify"), visible=not bool(r.get("is_verified"))),
+                    ft.OutlinedButton("Delete", on_click=lambda e, id_=rid: page.run_task(handle_review_action, id_, "delete")),
                 ]),
-                *(cards if cards else [ft.Text("No staff found.", color=text_muted)]),
-            ])),
+            ]),
         ]))
 
     def build_reviews(in_more: bool = False) -> ft.Control:
         selected = ui["reviews_filter"]
-        reviews = state["reviews"]
-        if selected == "pending":
-            reviews = [r for r in reviews if not bool(r.get("is_verified"))]
-        elif selected == "approved":
-            reviews = [r for r in reviews if bool(r.get("is_verified"))]
 
         stats = state["review_stats"]
         avg = float(stats.get("avg_rating") or 0)
         total_reviews = int(stats.get("total_reviews") or len(state["reviews"]))
 
-        cards: list[ft.Control] = []
-        for r in reviews:
-            name = r.get("user_name") or "Guest"
-            rid = int(r.get("review_id"))
-            stars = int(r.get("rating") or 0)
-            stars_text = ("*" * stars).ljust(5, "*")
-            cards.append(card(ft.Column(spacing=8, controls=[
-                ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
+        return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
+            header_bar(),
+            ft.Container(expand=True, padding=14, content=card_list(
+                "reviews", review_card, lambda r: r.get("review_id"), state["reviews"],
+                header=[
+                    *([more_tabs_bar()] if in_more else []),
                     ft.Row(spacing=10, controls=[
-                        _avatar(name),
-                        ft.Column(spacing=1, controls=[
-                            ft.Text(name, size=16, weight=ft.FontWeight.W_600, color=text_dark),
-                            ft.Text(stars_text, color=accent),
-                        ]),
+                        metric_card("AVERAGE RATING", f"{avg:.1f}", "*****", ft.Icons.STAR_OUTLINE),
+                        metric_card("TOTAL REVIEWS", f"{total_reviews:,}", "", ft.Icons.TRENDING_UP),
                     ]),
-                    ft.Text("2h ago", color="#9ca3af", size=11),
-                ]),
-                ft.Text(f'"{r.get("review_text", "")}"', size=13, color=text_muted, italic=True),
-                ft.Divider(height=6, color=line_color),
-                ft.Row(alignment=ft.MainAxisAlignment.SPACE_BETWEEN, controls=[
-                    ft.TextButton("Email Response", icon=ft.Icons.MAIL_OUTLINE, style=ft.ButtonStyle(color=accent), on_click=lambda e, review=r: open_email_dialog(review)),
-                    ft.Row(controls=[
-                        ft.OutlinedButton("Approve", on_click=lambda e, id_=rid: page.run_task(handle_review_action, id_, "verify"), visible=not bool(r.get("is_verified"))),
-                        ft.OutlinedButton("Delete", on_click=lambda e, id_=rid: page.run_task(handle_review_action, id_, "delete")),
+                    ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
+                        chip_button("All", selected == "all", lambda e: filter_list("reviews", "reviews_filter", "all")),
+                        chip_button("Pending", selected == "pending", lambda e: filter_list("reviews", "reviews_filter", "pending")),
+                        chip_button("Approved", selected == "approved", lambda e: filter_list("reviews", "reviews_filter", "approved")),
                     ]),
-                ]),
-            ])))
-
-        return ft.Container(expand=True, bgcolor=page_bg, content=ft.Column(expand=True, spacing=0, controls=[
-            header_bar(),
-            ft.Container(expand=True, padding=14, content=ft.Column(scroll=ft.ScrollMode.AUTO, spacing=12, controls=[
-                *([more_tabs_bar()] if in_more else []),
-                ft.Row(spacing=10, controls=[
-                    metric_card("AVERAGE RATING", f"{avg:.1f}", "*****", ft.Icons.STAR_OUTLINE),
-                    metric_card("TOTAL REVIEWS", f"{total_reviews:,}", "", ft.Icons.TRENDING_UP),
-                ]),
-                ft.Row(scroll=ft.ScrollMode.AUTO, controls=[
-                    chip_button("All", selected == "all", lambda e: _set_ui("reviews_filter", "all")),
-                    chip_button("Pending", selected == "pending", lambda e: _set_ui("reviews_filter", "pending")),
-                    chip_button("Approved", selected == "approved", lambda e: _set_ui("reviews_filter", "approved")),
-                ]),
-                *(cards if cards else [ft.Text("No reviews found.", color=text_muted)]),
-            ])),
+                ],
+                header_height=220 if in_more else 170,
+                row_height=160,
+                empty_text="No reviews found.",
+                on_end=lambda: load_more("reviews"),
+            )),
         ]))
 
     def _set_ui(key: str, value):
@@ -1652,6 +1858,7 @@ async def main(page: ft.Page):
         render(1)
 
     def render(index: int):
+        shown_list["name"] = None
         if index == 0:
             content.content = build_overview()
         elif index == 1:
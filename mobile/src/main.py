@@ -88,6 +88,21 @@ def main(page: ft.Page):
         except error.URLError as exc:
             raise RuntimeError(f"Cannot reach backend: {exc.reason}") from exc
 
+    def _refresh_token(token: str) -> str | None:
+        """Trade `token` for a fresh one. None if the server refused it, `token` if unreachable."""
+        try:
+            payload = _api_json("POST", "/api/auth/token/refresh/", {"token": token})
+        except RuntimeError as exc:
+            return None if str(exc).startswith("HTTP 401") else token
+        fresh = payload.get("token") if isinstance(payload, dict) else None
+        if not fresh:
+            return token
+        try:
+            page.client_storage.set("auth.token", fresh)
+        except Exception:
+            pass
+        return fresh
+
     def _resolve_account_type(user: dict) -> str:
         account_type = str(user.get("account_type") or "").lower().strip()
         if account_type in {"admin", "staff", "customer"}:
@@ -163,7 +178,20 @@ def main(page: ft.Page):
         await _open_mobile_dashboard(account_type)
 
     async def open_dashboard(e=None) -> None:
-        nonlocal auth_user
+        nonlocal auth_token, auth_user
+        if auth_token:
+            auth_token = await asyncio.to_thread(_refresh_token, auth_token)
+            if not auth_token:
+                # expired or revoked: sign in again instead of opening a dashboard that will 401
+                auth_user = None
+                try:
+                    page.client_storage.remove("auth.token")
+                    page.client_storage.remove("auth.user")
+                except Exception:
+                    pass
+                top_bar_host.content = build_top_bar()
+                open_account_dialog()
+                return
         if auth_token:
             try:
                 refreshed = await asyncio.to_thread(_api_json, "GET", "/api/auth/me/", None, auth_token)
@@ -335,6 +363,17 @@ def main(page: ft.Page):
         except Exception:
             pass
 
+        if restored_token:
+            # tokens expire; a stored one is swapped for a fresh one on every start
+            restored_token = _refresh_token(restored_token)
+            if not restored_token:
+                restored_user = None
+                try:
+                    page.client_storage.remove("auth.token")
+                    page.client_storage.remove("auth.user")
+                except Exception:
+                    pass
+
         if restored_token and not restored_user:
             try:
                 me_payload = _api_json("GET", "/api/auth/me/", None, restored_token)
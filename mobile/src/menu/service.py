@@ -33,6 +33,22 @@ def start_checkout(base_url: str, items: list[dict], order_type: str, address: s
     return parsed
 
 
+def fetch_quote(base_url: str, items: list[dict], order_type: str) -> dict:
+    """Server prices for a cart: {"lines": [...], "subtotal", "fee", "total", "topping_prices"}."""
+    endpoint = urllib.parse.urljoin(base_url, "/menu/mobile/quote/")
+    req = urllib.request.Request(
+        endpoint,
+        data=json.dumps({"items": items, "order_type": order_type}).encode("utf-8"),
+        headers={"Content-Type": "application/json", "User-Agent": "ECAG-Flet-Client"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=10) as response:
+        parsed = json.loads(response.read().decode("utf-8"))
+    if not parsed.get("ok"):
+        raise RuntimeError(parsed.get("error", "Price quote failed"))
+    return parsed
+
+
 def complete_checkout(
     base_url: str,
     order_id: int,
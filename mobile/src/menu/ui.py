@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 from collections.abc import Callable
 import json
 import os
@@ -12,6 +13,7 @@ from .models import EXTRA_TOPPINGS, MEAT_TOPPINGS, TOPPING_PRICES, is_topping_el
 from .service import (
     complete_checkout,
     fetch_menu_data,
+    fetch_quote,
     read_storage_json,
     resolve_image_payload,
     start_checkout,
@@ -199,14 +201,49 @@ def build_menu_page(
         write_storage_json(page, "ecag_mobile_cart", cart_items)
         write_storage_json(page, "ecag_mobile_order_type", order_type_state["value"])
 
+    # Prices come from the server (/menu/mobile/quote/), the same code that prices the order.
+    # Until a quote for the current cart arrives, lines show their last quoted or base price.
+    quote_state = {"seq": 0, "requested": None, "quoted": None, "lines": {}, "fee": None, "topping_prices": {}}
+
+    def line_key(item: dict) -> tuple:
+        return (item.get("item_id"), item.get("meat_topping") or "", tuple(sorted(item.get("extra_toppings", []))))
+
+    def cart_signature() -> tuple:
+        return (order_type_state["value"], tuple((line_key(it), int(it.get("quantity", 1))) for it in cart_items))
+
+    def topping_price(name: str) -> float:
+        return float(quote_state["topping_prices"].get(name, TOPPING_PRICES.get(name, 0)))
+
     def cart_item_unit_price(item: dict) -> float:
-        toppings_total = 0.0
-        meat = item.get("meat_topping")
-        if meat:
-            toppings_total += TOPPING_PRICES.get(meat, 0)
-        for topping in item.get("extra_toppings", []):
-            toppings_total += TOPPING_PRICES.get(topping, 0)
-        return float(item.get("price", 0.0)) + toppings_total
+        quoted = quote_state["lines"].get(line_key(item))
+        return quoted if quoted is not None else float(item.get("price", 0.0))
+
+    def order_fee() -> float:
+        if quote_state["fee"] is not None and quote_state["quoted"] == cart_signature():
+            return quote_state["fee"]
+        return {"delivery": 100.0, "pick_up": 50.0}.get(order_type_state["value"], 0.0)
+
+    async def refresh_quote():
+        quote_state["seq"] += 1
+        seq = quote_state["seq"]
+        signature = cart_signature()
+        try:
+            quoted = await asyncio.to_thread(fetch_quote, base_url, build_checkout_payload(), order_type_state["value"])
+        except Exception:
+            return  # offline: keep the estimate
+        if seq != quote_state["seq"]:
+            return  # the cart changed again; a newer quote is on its way
+        for item, line in zip(cart_items, quoted.get("lines", [])):
+            if line:
+                quote_state["lines"][line_key(item)] = float(line.get("unit_price", 0))
+        quote_state["fee"] = float(quoted.get("fee", 0))
+        quote_state["topping_prices"] = quoted.get("topping_prices") or {}
+        quote_state["quoted"] = signature
+        recalc_totals()
+        render_cart()
+        if checkout_view.visible:
+            render_checkout_items()
+            page.update()
 
     def recalc_totals():
         count = 0
@@ -215,16 +252,12 @@ def build_menu_page(
             qty = int(item.get("quantity", 1))
             count += qty
             subtotal += qty * cart_item_unit_price(item)
-        order_type = order_type_state["value"]
-        if order_type == "delivery":
-            fee = 100.0
-        elif order_type == "pick_up":
-            fee = 50.0
-        else:
-            fee = 0.0
-        total = subtotal + fee
+        total = subtotal + order_fee()
         cart_count.value = f"{count} items"
         cart_total.value = f"Rs {total:.2f}"
+        if cart_items and quote_state["requested"] != cart_signature():
+            quote_state["requested"] = cart_signature()
+            page.run_task(refresh_quote)
 
     def refresh_order_type_buttons():
         for btn, value in order_type_btns:
@@ -329,7 +362,7 @@ def build_menu_page(
                         spacing=6,
                         controls=[
                             ft.ElevatedButton(
-                                content=ft.Text(f"{meat} (+Rs {TOPPING_PRICES[meat]})" if TOPPING_PRICES[meat] else meat),
+                                content=ft.Text(f"{meat} (+Rs {topping_price(meat):g})" if topping_price(meat) else meat),
                                 on_click=lambda e, i=idx, m=meat: set_meat(i, m),
                                 style=ft.ButtonStyle(
                                     bgcolor=ft.Colors.ORANGE_500 if item.get("meat_topping") == meat else ft.Colors.GREY_300,
@@ -348,7 +381,7 @@ def build_menu_page(
                         spacing=6,
                         controls=[
                             ft.ElevatedButton(
-                                content=ft.Text(f"{top} (+Rs {TOPPING_PRICES[top]})"),
+                                content=ft.Text(f"{top} (+Rs {topping_price(top):g})"),
                                 on_click=lambda e, i=idx, t=top: toggle_extra(i, t),
                                 style=ft.ButtonStyle(
                                     bgcolor=ft.Colors.GREEN_500 if top in item.get("extra_toppings", []) else ft.Colors.GREY_300,
@@ -705,7 +738,7 @@ def build_menu_page(
         if not controls:
             controls = [ft.Text("Your cart is empty.", color="#9CA3AF", size=12)]
 
-        fee = 100.0 if order_type_state["value"] == "delivery" else (50.0 if order_type_state["value"] == "pick_up" else 0.0)
+        fee = order_fee()
         total = subtotal + fee
 
         checkout_items_column.controls = controls
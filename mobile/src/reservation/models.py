@@ -67,7 +67,7 @@ class ReservationItem:
             status=str(payload.get("status") or "pending"),
         )
 
-    def overlaps(self, requested_date: date, requested_time: str) -> bool:
+    def overlaps(self, requested_date: date, requested_time: str, dwell_minutes: int = 120) -> bool:
         if self.status == "cancelled" or self.date != requested_date.isoformat():
             return False
         try:
@@ -81,9 +81,10 @@ class ReservationItem:
             )
         except ValueError:
             return False
+        dwell = timedelta(minutes=dwell_minutes)
         return not (
-            requested_start + timedelta(hours=2) <= current_start
-            or requested_start >= current_start + timedelta(hours=2)
+            requested_start + dwell <= current_start
+            or requested_start >= current_start + dwell
         )
 
 
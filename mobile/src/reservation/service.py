@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 import os
 from collections.abc import Callable
-from urllib import error, request
+from urllib import error, parse, request
 
 from .models import ReservationDraft, ReservationItem, TableItem
 
@@ -51,6 +51,18 @@ class ReservationApiClient:
         raw_bookings = payload.get("results", payload) if isinstance(payload, dict) else payload
         return [ReservationItem.from_api(item) for item in raw_bookings or []]
 
+    def suggest_tables(self, day, time_value: str, guests: int) -> list[dict]:
+        """Ranked table options from the server's assignment engine (best first)."""
+        query = parse.urlencode({"date": day.isoformat(), "time": time_value, "guests": guests})
+        payload = self._request_json("GET", f"/api/reservations/bookings/suggest/?{query}")
+        return payload.get("options", []) if isinstance(payload, dict) else []
+
+    def fetch_schedule(self, day) -> dict:
+        """Bookable start times and dwell minutes for one day (empty times = closed)."""
+        query = parse.urlencode({"date": day.isoformat()})
+        payload = self._request_json("GET", f"/api/reservations/bookings/schedule/?{query}")
+        return payload if isinstance(payload, dict) else {}
+
     def create_booking(self, draft: ReservationDraft) -> ReservationItem:
         payload = self._request_json("POST", "/api/reservations/bookings/", body=draft.to_payload())
         return ReservationItem.from_api(payload)
@@ -55,6 +55,8 @@ class ReservationFeature:
         self.bookings: list[ReservationItem] = []
         self.available_table_ids: set[int] = set()
         self.backend_note = ""
+        # opening hours / dwell for the selected date, from the server's capacity model
+        self.day_schedule: dict = {}
 
         self.date_cards = ft.Row(spacing=14, scroll=ft.ScrollMode.AUTO)
         self.guest_text = ft.Text(str(self.guests), size=22, weight=ft.FontWeight.BOLD, color="#34302a")
@@ -88,6 +90,7 @@ class ReservationFeature:
         self.page.overlay.append(self.date_picker)
 
     def build_start_view(self) -> ft.Control:
+        self._load_schedule()
         self._refresh_date_cards()
         return self._screen(
             step=1,
@@ -797,8 +800,28 @@ class ReservationFeature:
     def _select_date(self, value: date) -> None:
         self.selected_date = value
         self.selected_table = None
+        self._load_schedule()
         self._refresh_date_cards()
 
+    def _load_schedule(self) -> None:
+        try:
+            self.day_schedule = self.client.fetch_schedule(self.selected_date)
+        except ApiError:
+            self.day_schedule = {}
+        times = self.day_schedule.get("times") if self.day_schedule else None
+        if times is None:
+            times = reservation_times()
+        self.time_dropdown.options = [ft.DropdownOption(key=t, text=t) for t in times]
+        if times and self.selected_time not in times:
+            self.selected_time = times[0]
+        self.time_dropdown.value = self.selected_time if times else None
+        if self.day_schedule and not self.day_schedule.get("open", True):
+            self._set_feedback(self.day_schedule.get("closed_reason") or "We are closed on this day.", True)
+
+    def _dwell_minutes(self, guests: int) -> int:
+        dwell = (self.day_schedule or {}).get("dwell_minutes") or {}
+        return int(dwell.get(str(guests)) or dwell.get(guests) or 120)
+
     def _date_picked(self, e: ft.ControlEvent) -> None:
         if self.date_picker.value:
             self._select_date(self.date_picker.value)
@@ -871,6 +894,13 @@ class ReservationFeature:
                     "Database save failed: authentication was rejected. Please login again and retry.",
                     is_error=True,
                 )
+            elif exc.status_code == 409:
+                # somebody booked this table first; the table view reloads availability
+                self.confirmed_reservation = None
+                self.selected_table = None
+                self._show_message("Sorry, that table was just booked. Please choose another table or time.", is_error=True)
+                self._navigate("/reservation/tables")
+                return
             else:
                 self._set_feedback(f"Database save failed: {exc}", is_error=True)
             self.confirmed_reservation = None
@@ -900,13 +930,24 @@ class ReservationFeature:
             self.backend_note = str(exc)
 
     def _refresh_availability(self) -> None:
+        # Prefer the server's ranking; the app only picks single tables.
+        try:
+            options = self.client.suggest_tables(self.selected_date, self.selected_time, self.guests)
+            self.available_table_ids = {
+                option["table_id"] for option in options if not option.get("joined_with")
+            }
+            return
+        except (ApiError, KeyError, TypeError):
+            pass
+
         seat_required = 2 if self.guests <= 2 else 4
         available: set[int] = set()
         for table in self.tables:
             if table.seats != seat_required:
                 continue
             conflict = any(
-                booking.table_id == table.table_id and booking.overlaps(self.selected_date, self.selected_time)
+                booking.table_id == table.table_id
+                and booking.overlaps(self.selected_date, self.selected_time, self._dwell_minutes(self.guests))
                 for booking in self.bookings
             )
             if not conflict:
@@ -966,7 +1007,7 @@ class ReservationFeature:
         except ValueError:
             return "https://calendar.google.com/calendar/render"
 
-        end_dt = start_dt + timedelta(hours=2)
+        end_dt = start_dt + timedelta(minutes=self._dwell_minutes(draft.guests))
         confirmation = self.confirmed_reservation_label(draft)
         details = [
             f"Confirmation: {confirmation}",
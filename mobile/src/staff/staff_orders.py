@@ -1,11 +1,17 @@
+import asyncio
+
 import flet as ft
-from utils.dashboard_api import fetch_orders, update_order_status, update_delivery_status, update_takeout_status
+from utils.dashboard_api import (
+    fetch_kitchen_feed, update_order_status, update_delivery_status, update_takeout_status, bulk_update_orders,
+)
 from utils.dashboard_utils import (
     COLORS, FONT_FAMILY, FONT_URL,DINE_IN,  DELIVERY, TAKEOUT,
     build_theme, filter_chip, status_badge, empty_state, loading_spinner,
     secondary_button, get_order_status_colours, order_type_badge,
-    format_order_date, get_item_name, is_today
+    format_order_date, get_item_name, is_today,
+    selectable, bulk_action_bar, summarize_bulk_results,
 )
+from utils.virtual_list import VirtualList
 
 CHIP_FILTERS = {
     "All":      None,
@@ -183,7 +189,12 @@ class StaffOrderCard(ft.Container):
             spread_radius=0, blur_radius=5, offset=ft.Offset(0, 2),
             color=ft.Colors.with_opacity(0.2, COLORS["on_surface"]),
         )
+        self.on_tap = on_tap
+        self.bind(order)
 
+    def bind(self, order: dict):
+        """Show `order` in this card (also how the orders list recycles a card for another order)."""
+        on_tap = self.on_tap
         order_type = order.get("order_type", "")
         status_label, status_bg, status_text = get_order_status_colours(order)
 
@@ -311,23 +322,93 @@ def get_staff_orders_view(page: ft.Page):
     active_filter: list    = [None]
     chip_refs: dict        = {}
 
-    cards_column           = ft.Column(controls=[loading_spinner()], spacing=16)
     summary_container      = ft.Container()
 
+    # multi-select: pick several cards and advance them in one request
+    selection              = {"active": False, "ids": set()}
+    selection_bar          = ft.Container(visible=False)
 
-    def apply_filter():
+    def visible_orders() -> list[dict]:
         fval = active_filter[0]
-        filtered = (
+        return (
             all_orders if fval is None
             else [o for o in all_orders if o.get("order_type", "").lower() == fval]
         )
-        cards_column.controls = (
-            [StaffOrderCard(o, on_tap=open_status_sheet) for o in filtered]
-            if filtered
-            else [empty_state("No orders found for this filter.")]
-        )
+
+    def build_card(order: dict) -> ft.Control:
+        card = StaffOrderCard(order, on_tap=open_status_sheet)
+        if not selection["active"]:
+            return card
+        return selectable(card, order.get("id"), order.get("id") in selection["ids"], on_toggle)
+
+    def rebind_card(card: ft.Control, order: dict):
+        # plain cards are refilled in place; checkbox rows are rebuilt
+        if selection["active"] or not isinstance(card, StaffOrderCard):
+            return None
+        card.bind(order)
+        return card
+
+    def card_key(order: dict):
+        order_id = order.get("id")
+        return order_id, selection["active"], order_id in selection["ids"]
+
+    # only the cards near the viewport exist; the header rows scroll with them
+    orders_list = VirtualList(
+        build_card, key=card_key, bind_row=rebind_card,
+        row_height=190, spacing=16, header_height=300, empty=loading_spinner(),
+    )
+
+    def apply_filter():
+        filtered = visible_orders()
+        # orders that left the list (removed, filtered out) can't stay selected
+        selection["ids"] &= {o.get("id") for o in filtered}
+        orders_list.empty = empty_state("No orders found for this filter.")
+        orders_list.set_items(filtered)
+        render_selection_bar()
+        page.update()
+
+    def render_selection_bar():
+        selection_bar.visible = selection["active"]
+        if selection["active"]:
+            selection_bar.content = bulk_action_bar(
+                len(selection["ids"]),
+                [("Advance to next status", lambda e: page.run_task(advance_selected))],
+                on_select_all=select_all,
+                on_done=toggle_select_mode,
+            )
+
+    def toggle_select_mode(e=None):
+        selection["active"] = not selection["active"]
+        selection["ids"].clear()
+        select_button.content = "Done" if selection["active"] else "Select"
+        apply_filter()
+
+    def on_toggle(e):
+        order_id = e.control.data
+        if e.control.value:
+            selection["ids"].add(order_id)
+        else:
+            selection["ids"].discard(order_id)
+        render_selection_bar()
         page.update()
 
+    def select_all(e=None):
+        selection["ids"] = {o.get("id") for o in visible_orders() if not is_order_done(o)}
+        apply_filter()
+
+    async def advance_selected():
+        ids = sorted(selection["ids"])
+        if not ids:
+            return
+        results = await bulk_update_orders(token, ids, "next")
+        page.snack_bar = ft.SnackBar(content=ft.Text(summarize_bulk_results(results)), open=True)
+        if results is not None:
+            # the new statuses arrive through the kitchen feed
+            selection["ids"].clear()
+        apply_filter()
+
+    select_button = ft.TextButton("Select", on_click=toggle_select_mode)
+
     def on_chip_click(e):
         label = e.control.data
         active_filter[0] = CHIP_FILTERS[label]
@@ -350,7 +431,8 @@ def get_staff_orders_view(page: ft.Page):
 
     def open_status_sheet(e):
         order = e.control.data
-        sheet = build_status_sheet(page, order, on_updated=reload_orders)
+        # no reload: the change comes back through the kitchen feed
+        sheet = build_status_sheet(page, order, on_updated=lambda: None)
         page.overlay.append(sheet)
         sheet.open = True
         page.update()
@@ -396,57 +478,104 @@ def get_staff_orders_view(page: ft.Page):
             ),
         )
 
+    feed = {"seq": None, "following": False}
+
+    def refresh_view():
+        summary_container.content = build_summary_bar()
+        apply_filter()
+
     async def load_orders():
-        data = await fetch_orders(token, staff=True)
+        data = await fetch_kitchen_feed(token)
         if data is None:
-            cards_column.controls = [
-                empty_state("Couldn't reach the server.\nCheck your connection.")
-            ]
+            orders_list.empty = empty_state("Couldn't reach the server.\nCheck your connection.")
+            orders_list.set_items([])
             page.update()
             return
 
+        feed["seq"] = data.get("last_seq", 0)
         all_orders.clear()
-        all_orders.extend(o for o in data if is_today(o.get("order_date", "")))
-
-        summary_container.content = build_summary_bar()
-        apply_filter()
-
-    def reload_orders():
-        page.run_task(load_orders)
+        all_orders.extend(data.get("orders", []))
+        refresh_view()
+
+        if not feed["following"]:
+            feed["following"] = True
+            page.run_task(follow_feed)
+
+    def apply_event(event: dict):
+        order    = event.get("order") or {}
+        order_id = event.get("order_id")
+        index    = next((i for i, o in enumerate(all_orders) if o.get("id") == order_id), None)
+        if event.get("kind") == "removed":
+            if index is not None:
+                all_orders.pop(index)
+        elif index is not None:
+            all_orders[index] = order
+        elif is_today(order.get("order_date", "")):
+            all_orders.insert(0, order)
+
+    def is_mounted() -> bool:
+        try:
+            return view.page is not None
+        except Exception:
+            return False
+
+    async def follow_feed():
+        # long-poll for changes and patch the list; stops once the view is replaced
+        while is_mounted():
+            data = await fetch_kitchen_feed(token, since=feed["seq"], wait=25)
+            if not is_mounted():
+                break
+            if data is None:
+                await asyncio.sleep(5)
+                continue
+            if data.get("reset"):
+                all_orders.clear()
+                all_orders.extend(data.get("orders", []))
+                refresh_view()
+            elif data.get("events"):
+                for event in data["events"]:
+                    apply_event(event)
+                refresh_view()
+            feed["seq"] = data.get("last_seq", feed["seq"])
+        feed["following"] = False
 
     page.run_task(load_orders)
 
-    main_content = ft.Column(
+    orders_list.set_header(
         [
-            ft.Column(
+            ft.Row(
                 [
-                    ft.Text("Orders", size=24, weight=ft.FontWeight.W_800,
-                            color=COLORS["on_surface"]),
-                    ft.Text("Manage today's orders",
-                            size=14, color=COLORS["on_surface_variant"]),
+                    ft.Column(
+                        [
+                            ft.Text("Orders", size=24, weight=ft.FontWeight.W_800,
+                                    color=COLORS["on_surface"]),
+                            ft.Text("Manage today's orders",
+                                    size=14, color=COLORS["on_surface_variant"]),
+                        ],
+                        spacing=4,
+                    ),
+                    select_button,
                 ],
-                spacing=4,
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
             ),
             summary_container,
             render_chips(),
+            selection_bar,
             ft.Divider(height=1, color=ft.Colors.TRANSPARENT),
-            cards_column,
         ],
-        spacing=16,
-        scroll=ft.ScrollMode.AUTO,
     )
 
-    return ft.Column(
+    view = ft.Column(
         [
             ft.Container(
-                content=main_content,
+                content=orders_list.view,
                 padding=ft.Padding.only(left=24, right=24, top=16, bottom=24),
                 expand=True,
             )
         ],
-        scroll=ft.ScrollMode.AUTO,
         expand=True,
     )
+    return view
 
 
 def is_order_done(order: dict) -> bool:
@@ -1,11 +1,22 @@
 import flet as ft
 from datetime import date, datetime, timedelta
-from utils.dashboard_api import fetch_reservations, update_reservation_status
+from utils.dashboard_api import fetch_reservation_day, update_reservation_status, bulk_update_reservations
 from utils.dashboard_utils import (
     COLORS, FONT_FAMILY, FONT_URL,RESERVATION_STATUS,
     build_theme, filter_chip, status_badge, empty_state, loading_spinner,
-    get_res_status_colours, secondary_button, format_res_time, format_res_date, is_today_or_future_date
+    get_res_status_colours, secondary_button, format_res_time, format_res_date,
+    selectable, bulk_action_bar, summarize_bulk_results,
 )
+from utils.virtual_list import VirtualList
+
+# what the multi-select bar offers, in floor order
+BULK_ACTIONS = [
+    ("Confirm",  "confirmed"),
+    ("Seat",     "seated"),
+    ("Complete", "completed"),
+    ("No-show",  "no-show"),
+    ("Cancel",   "cancelled"),
+]
 
 CHIP_FILTERS = {
     "All":       None,
@@ -16,6 +27,76 @@ CHIP_FILTERS = {
     "No-Show":   "no-show",
 }
 
+# day timeline: tables down the side, 15-minute slots across
+TIMELINE_SLOT_WIDTH  = 14
+TIMELINE_ROW_HEIGHT  = 22
+TIMELINE_ROW_SPACING = 4
+TIMELINE_LABEL_WIDTH = 44
+
+# VirtualList header height, timeline not included
+HEADER_HEIGHT = 330
+
+
+def timeline_height(timeline: dict | None) -> float:
+    if not timeline or not timeline.get("slots"):
+        return 0
+    rows = len(timeline["tables"]) + 1
+    return rows * (TIMELINE_ROW_HEIGHT + TIMELINE_ROW_SPACING) + 40
+
+
+def timeline_strip(timeline: dict) -> ft.Control:
+    """The day's tables against its 15-minute slots: one bar per booking, coloured by status."""
+    slots = timeline["slots"]
+
+    def cell(span: int, content=None, bgcolor=None, tooltip=None) -> ft.Container:
+        return ft.Container(
+            content=content,
+            width=span * TIMELINE_SLOT_WIDTH,
+            height=TIMELINE_ROW_HEIGHT,
+            bgcolor=bgcolor,
+            border_radius=4 if bgcolor else 0,
+            padding=ft.Padding.symmetric(horizontal=4),
+            alignment=ft.alignment.Alignment(-1, 0),
+            tooltip=tooltip,
+        )
+
+    # one label per hour (the first one may be a part hour)
+    marks, index = [], 0
+    while index < len(slots):
+        span = next((n for n in range(1, len(slots) - index) if slots[index + n].endswith(":00")), len(slots) - index)
+        marks.append(cell(span, ft.Text(slots[index], size=10, color=COLORS["on_surface_variant"], max_lines=1)))
+        index += span
+
+    rows = [ft.Row([ft.Container(width=TIMELINE_LABEL_WIDTH), *marks], spacing=0)]
+    for table in timeline["tables"]:
+        bars = []
+        for run in table["runs"]:
+            if run["reservation_id"] is None:
+                bars.append(cell(run["span"]))
+                continue
+            bg, fg = get_res_status_colours(run["status"] or "")
+            bars.append(cell(
+                run["span"],
+                ft.Text(f"{run['guests'] or ''} {run['name']}".strip(), size=10, color=fg,
+                        weight=ft.FontWeight.W_600, max_lines=1, overflow=ft.TextOverflow.CLIP),
+                bg,
+                tooltip=f"#RES-{run['reservation_id']} · {format_res_time(run['start'])}",
+            ))
+        rows.append(ft.Row([
+            ft.Text(f"T{table['table_number']}", width=TIMELINE_LABEL_WIDTH, size=11,
+                    weight=ft.FontWeight.W_700, color=COLORS["on_surface"]),
+            *bars,
+        ], spacing=0))
+
+    return ft.Column([
+        ft.Text(
+            f"TABLE TIMELINE · {round(timeline['occupancy'] * 100)}% BOOKED",
+            size=11, weight=ft.FontWeight.W_700, color=COLORS["on_surface_variant"],
+        ),
+        ft.Row([ft.Column(rows, spacing=TIMELINE_ROW_SPACING)], scroll=ft.ScrollMode.AUTO),
+    ], spacing=8)
+
+
 class StaffReservationCard(ft.Container):
     def __init__(self, res: dict, on_tap=None):
         super().__init__()
@@ -28,8 +109,12 @@ class StaffReservationCard(ft.Container):
             offset=ft.Offset(0, 2),
             color=ft.Colors.with_opacity(0.2, COLORS["on_surface"]),
         )
+        self.on_tap = on_tap
+        self.bind(res)
 
-
+    def bind(self, res: dict):
+        """Show `res` in this card (also how the list recycles a card for another booking)."""
+        on_tap = self.on_tap
         res_id      = res.get("reservation_id", "")
         status      = res.get("status", "pending")
         guest_count = res.get("guest_count", 0)
@@ -370,47 +455,111 @@ def get_staff_res_view(page: ft.Page):
 
     # State
     all_reservations: list[dict] = []
+    day_counts: dict = {}
     active_filter: list[str | None] = [None]
     selected_date: list[date] = [None]  # None = show all upcoming by default
 
-    cards_column  = ft.Column(controls=[loading_spinner()], spacing=16)
     chip_refs: dict[str, ft.Container] = {}
 
     count_text = ft.Text("", size=13, color=COLORS["on_surface_variant"], weight=ft.FontWeight.W_600)
 
-    def date_key(r: dict) -> str:
-        return str(r.get("date", ""))
+    # multi-select: e.g. seat every party at 19:00 in one request
+    selection     = {"active": False, "ids": set(), "visible": []}
+    selection_bar = ft.Container(visible=False)
+    timeline_box  = ft.Container(visible=False)
+
+    def build_card(r: dict) -> ft.Control:
+        card = StaffReservationCard(r, on_tap=open_status_sheet)
+        if not selection["active"]:
+            return card
+        res_id = r.get("reservation_id")
+        return selectable(card, res_id, res_id in selection["ids"], on_toggle)
+
+    def rebind_card(card: ft.Control, r: dict):
+        # plain cards are refilled in place; checkbox rows are rebuilt
+        if selection["active"] or not isinstance(card, StaffReservationCard):
+            return None
+        card.bind(r)
+        return card
+
+    def card_key(r: dict):
+        res_id = r.get("reservation_id")
+        return res_id, selection["active"], res_id in selection["ids"]
+
+    # only the cards near the viewport exist; the header rows scroll with them
+    res_list = VirtualList(
+        build_card, key=card_key, bind_row=rebind_card,
+        row_height=200, spacing=16, header_height=HEADER_HEIGHT, empty=loading_spinner(),
+    )
 
-    def apply_filter():
-        filter_val  = active_filter[0]
+    def render_selection_bar():
+        selection_bar.visible = selection["active"]
+        if selection["active"]:
+            selection_bar.content = bulk_action_bar(
+                len(selection["ids"]),
+                [
+                    (label, lambda e, value=value: page.run_task(apply_to_selected, value))
+                    for label, value in BULK_ACTIONS
+                ],
+                on_select_all=select_all,
+                on_done=toggle_select_mode,
+            )
+
+    def toggle_select_mode(e=None):
+        selection["active"] = not selection["active"]
+        selection["ids"].clear()
+        select_button.content = "Done" if selection["active"] else "Select"
+        apply_filter()
 
-        # 1. Filter by date — None means "show all upcoming"
-        if selected_date[0] is None:
-            date_filtered = list(all_reservations)  # already filtered to today+
-            scope_label   = "upcoming"
+    def on_toggle(e):
+        if e.control.value:
+            selection["ids"].add(e.control.data)
         else:
-            date_str      = str(selected_date[0])
-            date_filtered = [r for r in all_reservations if date_key(r) == date_str]
-            scope_label   = "for the day"
+            selection["ids"].discard(e.control.data)
+        render_selection_bar()
+        page.update()
+
+    def select_all(e=None):
+        selection["ids"] = {r.get("reservation_id") for r in selection["visible"]}
+        apply_filter()
 
-        # 2. Filter by status chip
-        filtered = date_filtered if filter_val is None else [
-            r for r in date_filtered if r.get("status", "").lower() == filter_val
+    async def apply_to_selected(new_status: str):
+        ids = sorted(selection["ids"])
+        if not ids:
+            return
+        results = await bulk_update_reservations(token, ids, new_status)
+        page.snack_bar = ft.SnackBar(content=ft.Text(summarize_bulk_results(results)), open=True)
+        if results is None:
+            page.update()
+            return
+        selection["ids"].clear()
+        await load_reservations()
+
+    select_button = ft.TextButton("Select", on_click=toggle_select_mode)
+
+    def apply_filter():
+        filter_val  = active_filter[0]
+        scope_label = "upcoming" if selected_date[0] is None else "for the day"
+
+        # the server sends one day (or every upcoming booking); the chips filter it here
+        filtered = all_reservations if filter_val is None else [
+            r for r in all_reservations if r.get("status", "").lower() == filter_val
         ]
 
         # Update count line
-        total   = len(date_filtered)
+        total   = day_counts.get("total", len(all_reservations))
         showing = len(filtered)
         count_text.value = (
             f"{showing} reservation{'s' if showing != 1 else ''}"
-            + (f" · {total} total {scope_label}" if filter_val else "")
+            + (f" · {total} total {scope_label}" if filter_val else f" · {day_counts.get('guests', 0)} guests")
         )
 
-        cards_column.controls = (
-            [StaffReservationCard(r, on_tap=open_status_sheet) for r in filtered]
-            if filtered
-            else [empty_state("No reservations for this date / filter.", ft.Icons.EVENT_BUSY_OUTLINED)]
-        )
+        selection["visible"] = filtered
+        selection["ids"] &= {r.get("reservation_id") for r in filtered}
+        render_selection_bar()
+
+        res_list.empty = empty_state("No reservations for this date / filter.", ft.Icons.EVENT_BUSY_OUTLINED)
+        res_list.set_items(filtered)
         page.update()
 
     def on_chip_click(e):
@@ -441,24 +590,32 @@ def get_staff_res_view(page: ft.Page):
         page.update()
 
 
+    def render_timeline(timeline: dict | None):
+        height = timeline_height(timeline)
+        timeline_box.visible = bool(height)
+        timeline_box.content = timeline_strip(timeline) if height else None
+        res_list.set_header(res_list.header, HEADER_HEIGHT + height)
+
     async def load_reservations():
-        cards_column.controls = [loading_spinner()]
+        res_list.empty = loading_spinner()
+        res_list.set_items([])
         page.update()
 
-        data = await fetch_reservations(token, True)
+        data = await fetch_reservation_day(token, selected_date[0])
 
         if data is None:
-            cards_column.controls = [
-                empty_state(
-                    "Couldn't reach the server.\nCheck your connection.",
-                    ft.Icons.WIFI_OFF_OUTLINED,
-                )
-            ]
+            res_list.empty = empty_state(
+                "Couldn't reach the server.\nCheck your connection.",
+                ft.Icons.WIFI_OFF_OUTLINED,
+            )
+            res_list.set_items([])
             page.update()
             return
 
-        all_reservations.clear()
-        all_reservations.extend(r for r in data if is_today_or_future_date(r.get("date", "")))
+        all_reservations[:] = data.get("reservations", [])
+        day_counts.clear()
+        day_counts.update(data.get("counts") or {})
+        render_timeline(data.get("timeline"))
         apply_filter()
 
     def reload_reservations():
@@ -467,24 +624,27 @@ def get_staff_res_view(page: ft.Page):
     page.run_task(load_reservations)
 
     def on_date_change():
-        apply_filter()
+        reload_reservations()
 
     date_row = date_picker_row(page, selected_date, on_date_change)
 
     chips_row = render_chips()
 
-    main_content = ft.Column(
+    res_list.set_header(
         [
-            ft.Column([
-                ft.Text(
-                    "Reservations",
-                    size=24, weight=ft.FontWeight.W_800, color=COLORS["on_surface"],
-                ),
-                ft.Text(
-                    "Manage today's and upcoming bookings",
-                    size=14, color=COLORS["on_surface_variant"],
-                ),
-            ], spacing=4),
+            ft.Row([
+                ft.Column([
+                    ft.Text(
+                        "Reservations",
+                        size=24, weight=ft.FontWeight.W_800, color=COLORS["on_surface"],
+                    ),
+                    ft.Text(
+                        "Manage today's and upcoming bookings",
+                        size=14, color=COLORS["on_surface_variant"],
+                    ),
+                ], spacing=4),
+                select_button,
+            ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
 
             ft.Divider(height=1, color=ft.Colors.TRANSPARENT),
 
@@ -496,21 +656,20 @@ def get_staff_res_view(page: ft.Page):
                 ),
                 date_row,
             ], spacing=8),
+            timeline_box,
             chips_row,
+            selection_bar,
             count_text,
-            cards_column,
         ],
-        spacing=16,
-        scroll=ft.ScrollMode.AUTO,
     )
 
     return ft.Column([
         ft.Container(
-            content=main_content,
+            content=res_list.view,
             padding=ft.Padding.only(left=24, right=24, top=16, bottom=24),
             expand=True,
         )
-    ], scroll=ft.ScrollMode.AUTO, expand=True)
+    ], expand=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+"""Render time and memory of a 1,000-row order list: a plain Column vs VirtualList.
+
+Run from mobile/src (no page or server needed, the controls are only built)::
+
+    python -m utils.bench_virtual_list
+    python -m utils.bench_virtual_list --rows 5000 --viewport 900
+
+It reports, for each approach, the time and Python memory (tracemalloc peak)
+of the first render, of scrolling through the whole list, and of a poll that
+changes 10 orders, plus how many controls the list holds.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import flet as ft
+
+from staff.staff_orders import StaffOrderCard
+from utils.virtual_list import VirtualList
+
+ROW_HEIGHT = 190
+SPACING = 16
+
+
+def fake_orders(n: int) -> list[dict]:
+    types = ("dine in", "delivery", "pick up")
+    return [
+        {
+            "id": i,
+            "order_id_str": f"ORD-{i:05d}",
+            "order_type": types[i % 3],
+            "status": "pending",
+            "order_date": "2026-10-19T12:30:00",
+            "total": f"{300 + i % 700}.00",
+            "items": [
+                {"quantity": 1 + q, "item": {"name": f"Item {i % 40 + q}"}, "subtotal": "150.00"}
+                for q in range(1 + i % 3)
+            ],
+            "delivery": {"id": i, "address": f"{i} Lake Road", "delivery_status": "pending"},
+            "takeout": {"id": i, "pickup_status": "pending"},
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def count_controls(control) -> int:
+    total = 1
+    content = getattr(control, "content", None)
+    if isinstance(content, ft.Control):
+        total += count_controls(content)
+    for child in getattr(control, "controls", None) or ():
+        total += count_controls(child)
+    return total
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed * 1000, peak / 1024
+
+
+def build_card(order: dict) -> ft.Control:
+    return StaffOrderCard(order, on_tap=None)
+
+
+def rebind_card(card: ft.Control, order: dict):
+    card.bind(order)
+    return card
+
+
+def changed(orders: list[dict], count: int = 10) -> list[dict]:
+    # a poll: `count` orders move on, every other dict is the same object as before
+    step = max(1, len(orders) // count)
+    updated = list(orders)
+    for index in range(0, len(orders), step)[:count]:
+        updated[index] = {**orders[index], "status": "in_progress"}
+    return updated
+
+
+def bench_column(orders, viewport):
+    column, render_ms, render_kb = measure(
+        lambda: ft.Column([build_card(o) for o in orders], spacing=SPACING, scroll=ft.ScrollMode.AUTO)
+    )
+    controls = count_controls(column)
+    # a plain Column has nothing to do on scroll; a poll rebuilds the list
+    updated = changed(orders)
+    _, update_ms, update_kb = measure(lambda: setattr(column, "controls", [build_card(o) for o in updated]))
+    return {
+        "render_ms": render_ms, "render_kb": render_kb, "controls": controls,
+        "scroll_ms": 0.0, "scroll_kb": 0.0, "update_ms": update_ms, "update_kb": update_kb,
+        "built": len(orders) + len(updated),
+    }
+
+
+def bench_virtual(orders, viewport):
+    vl = VirtualList(
+        build_card, key=lambda o: o["id"], bind_row=rebind_card,
+        row_height=ROW_HEIGHT, spacing=SPACING, viewport_height=viewport,
+    )
+    _, render_ms, render_kb = measure(lambda: vl.set_items(orders))
+    controls = count_controls(vl.view)
+
+    def scroll_through():
+        end = len(orders) * vl.pitch
+        pixels = 0.0
+        while pixels < end:
+            vl._on_scroll(SimpleNamespace(pixels=pixels, viewport_dimension=viewport))
+            pixels += viewport / 2
+        vl._on_scroll(SimpleNamespace(pixels=0.0, viewport_dimension=viewport))
+
+    _, scroll_ms, scroll_kb = measure(scroll_through)
+    _, update_ms, update_kb = measure(lambda: vl.set_items(changed(orders)))
+    return {
+        "render_ms": render_ms, "render_kb": render_kb, "controls": controls,
+        "scroll_ms": scroll_ms, "scroll_kb": scroll_kb, "update_ms": update_ms, "update_kb": update_kb,
+        "built": vl.stats["built"], "rebound": vl.stats["rebound"], "kept": vl.stats["kept"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--viewport", type=float, default=800, help="visible list height in px")
+    args = parser.parse_args()
+
+    orders = fake_orders(args.rows)
+    results = {
+        "Column": bench_column(orders, args.viewport),
+        "VirtualList": bench_virtual(orders, args.viewport),
+    }
+
+    print(f"{args.rows} orders, {args.viewport:.0f}px viewport")
+    print(f"{'':12} {'render ms':>10} {'render KiB':>11} {'controls':>9} {'scroll ms':>10} "
+          f"{'scroll KiB':>11} {'poll ms':>8} {'poll KiB':>9} {'cards built':>12}")
+    for name, r in results.items():
+        print(f"{name:12} {r['render_ms']:10.1f} {r['render_kb']:11.0f} {r['controls']:9d} {r['scroll_ms']:10.1f} "
+              f"{r['scroll_kb']:11.0f} {r['update_ms']:8.1f} {r['update_kb']:9.0f} {r['built']:12d}")
+    v = results["VirtualList"]
+    print(f"VirtualList rows: {v['built']} built, {v['rebound']} recycled, {v['kept']} kept")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import json
 import os
 import urllib.error
 import urllib.request
+from datetime import date
 
 BASE_URL = os.getenv("ECAG_API_BASE_URL", "http://192.168.100.12:8000").rstrip("/")
 TIMEOUT = 5
@@ -10,14 +11,14 @@ TIMEOUT = 5
 def get_headers(token: str) -> dict:
     return {"Authorization": f"Token {token}"}
 
-def _sync_request(method: str, url: str, headers: dict, body: dict | None = None):
+def _sync_request(method: str, url: str, headers: dict, body: dict | None = None, timeout: float = TIMEOUT):
     data = json.dumps(body).encode("utf-8") if body is not None else None
     all_headers = {**headers}
     if data is not None:
         all_headers["Content-Type"] = "application/json"
     req = urllib.request.Request(url, data=data, headers=all_headers, method=method)
     try:
-        with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
             raw = resp.read().decode()
             return resp.status, json.loads(raw) if raw else {}
     except urllib.error.HTTPError as e:
@@ -37,6 +38,39 @@ async def fetch_orders(token: str, staff: bool = False) -> list[dict] | None:
         print(f"fetch_orders error: {e}")
         return None
 
+async def fetch_kitchen_feed(token: str, since: int | None = None, wait: int = 0) -> dict | None:
+    """Kitchen feed: today's orders when `since` is None, else the events after it.
+
+    With `wait` the server holds the request until something changes (long-poll).
+    """
+    try:
+        path = "/api/menu/kitchen/feed/"
+        if since is not None:
+            path += f"?since={since}&wait={wait}"
+        status, data = await asyncio.to_thread(
+            _sync_request, "GET", BASE_URL + path, get_headers(token), None, TIMEOUT + wait,
+        )
+        if status and status < 400:
+            return data
+        print(f"fetch_kitchen_feed HTTP error: {status}")
+        return None
+    except Exception as e:
+        print(f"fetch_kitchen_feed error: {e}")
+        return None
+
+async def fetch_prep_list(token: str, day: date | None = None) -> dict | None:
+    """Prep list: {"date", "hours", "items", "toppings"} for the next service, or all of `day`."""
+    try:
+        path = "/api/menu/prep/" + (f"?date={day.isoformat()}" if day else "")
+        status, data = await asyncio.to_thread(_sync_request, "GET", BASE_URL + path, get_headers(token))
+        if status and status < 400:
+            return data
+        print(f"fetch_prep_list HTTP error: {status}")
+        return None
+    except Exception as e:
+        print(f"fetch_prep_list error: {e}")
+        return None
+
 async def fetch_reservations(token: str, staff: bool = False) -> list[dict] | None:
     try:
         path = "/api/reservations/bookings/" + ("?view=staff" if staff else "")
@@ -49,6 +83,22 @@ async def fetch_reservations(token: str, staff: bool = False) -> list[dict] | No
         print(f"fetch_reservations error: {e}")
         return None
 
+async def fetch_reservation_day(token: str, day: date | None = None) -> dict | None:
+    """Staff day view: {"reservations", "counts", "timeline"} for `day`, or every upcoming booking.
+
+    `timeline` (a table-by-15-minute-slot grid) is only there for a single day.
+    """
+    try:
+        path = "/api/reservations/bookings/day/" + (f"?date={day.isoformat()}" if day else "")
+        status, data = await asyncio.to_thread(_sync_request, "GET", BASE_URL + path, get_headers(token))
+        if status and status < 400:
+            return data
+        print(f"fetch_reservation_day HTTP error: {status}")
+        return None
+    except Exception as e:
+        print(f"fetch_reservation_day error: {e}")
+        return None
+
 async def cancel_reservation(token: str, res_id: int) -> bool:
     try:
         status, _ = await asyncio.to_thread(
@@ -154,3 +204,36 @@ async def update_reservation_status(token: str, reservation_id: int, status_valu
     except Exception as e:
         print(f"update_reservation_status error: {e}")
         return False
+
+
+async def bulk_update_orders(token: str, order_ids: list[int], action: str = "next", status_value: str | None = None) -> list[dict] | None:
+    """Advance (or set) many orders along their delivery/pickup/dine-in track; per-order results."""
+    try:
+        body = {"ids": order_ids, "action": action}
+        if status_value:
+            body["status"] = status_value
+        status, data = await asyncio.to_thread(
+            _sync_request, "POST", f"{BASE_URL}/api/menu/orders/bulk-status/", get_headers(token), body,
+        )
+        if status and status < 400:
+            return data.get("results", [])
+        print(f"bulk_update_orders HTTP error: {status}")
+        return None
+    except Exception as e:
+        print(f"bulk_update_orders error: {e}")
+        return None
+
+
+async def bulk_update_reservations(token: str, reservation_ids: list[int], status_value: str) -> list[dict] | None:
+    try:
+        status, data = await asyncio.to_thread(
+            _sync_request, "POST", f"{BASE_URL}/api/reservations/bookings/bulk-status/",
+            get_headers(token), {"ids": reservation_ids, "status": status_value},
+        )
+        if status and status < 400:
+            return data.get("results", [])
+        print(f"bulk_update_reservations HTTP error: {status}")
+        return None
+    except Exception as e:
+        print(f"bulk_update_reservations error: {e}")
+        return None
@@ -280,3 +280,69 @@ def is_today_or_future_date(date_str: str) -> bool:
         return dt >= date.today()
     except Exception:
         return False
+
+
+def selectable(card: ft.Control, item_id, selected: bool, on_toggle) -> ft.Control:
+    """Wrap a list card with a checkbox for multi-select mode."""
+    return ft.Row(
+        [
+            ft.Checkbox(value=selected, data=item_id, on_change=on_toggle,
+                        fill_color=COLORS["primary"]),
+            ft.Container(content=card, expand=True),
+        ],
+        spacing=6,
+        vertical_alignment=ft.CrossAxisAlignment.CENTER,
+    )
+
+
+def bulk_action_bar(count: int, actions: list[tuple[str, object]], on_select_all, on_done) -> ft.Container:
+    """Bar shown while selecting: "N selected", one button per (label, handler), select all / done."""
+    buttons = [
+        ft.Container(
+            content=ft.Text(label, size=12, weight=ft.FontWeight.BOLD,
+                            color=COLORS["white"] if count else COLORS["on_surface_variant"]),
+            bgcolor=COLORS["primary"] if count else COLORS["surface_container_low"],
+            padding=ft.Padding.symmetric(horizontal=14, vertical=8),
+            border_radius=100,
+            on_click=handler if count else None,
+            ink=bool(count),
+        )
+        for label, handler in actions
+    ]
+    return ft.Container(
+        content=ft.Column(
+            [
+                ft.Row(
+                    [
+                        ft.Text(f"{count} selected", size=13, weight=ft.FontWeight.W_700,
+                                color=COLORS["on_surface"]),
+                        ft.Row(
+                            [
+                                ft.TextButton("Select all", on_click=on_select_all),
+                                ft.TextButton("Done", on_click=on_done),
+                            ],
+                            spacing=0,
+                        ),
+                    ],
+                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                ),
+                ft.Row(buttons, spacing=8, wrap=True),
+            ],
+            spacing=6,
+        ),
+        bgcolor=COLORS["surface_container_lowest"],
+        padding=ft.Padding.symmetric(horizontal=16, vertical=10),
+        border_radius=16,
+        border=ft.Border.all(1, COLORS["card_outline"]),
+    )
+
+
+def summarize_bulk_results(results: list[dict] | None) -> str:
+    if results is None:
+        return "Couldn't reach the server. Nothing was changed."
+    updated = sum(1 for r in results if r.get("ok"))
+    failed = [r for r in results if not r.get("ok")]
+    message = f"{updated} updated"
+    if failed:
+        message += f", {len(failed)} skipped: {failed[0].get('error', 'error')}"
+    return message
@@ -0,0 +1,168 @@
+"""Windowed list for long Flet lists: only the rows near the viewport exist as controls.
+
+`VirtualList` owns an `ft.ListView` laid out as
+
+    [header controls] [spacer for rows above] [window of rows] [spacer for rows below]
+
+and moves the window as the list scrolls, so a 1,000-row list costs a screenful
+of row controls instead of a thousand. Row heights are estimated
+(`row_height`): the spacers stand in for rows that aren't built, and
+`overscan` extra rows on each side absorb the difference between the estimate
+and the real card heights.
+
+Rows are keyed (`key(item)`). `set_items` keeps the control of every row whose
+item is unchanged (the same dict, or an equal one), so the next
+``page.update()`` sends Flet only the rows that really changed. Controls of
+rows that leave the window go to a pool; with a `bind_row(control, item)`
+callback they are refilled for rows scrolling in instead of building new ones
+(`bind_row` returns the control to show, or None to have `build_row` make one).
+State a row shows besides its item (a selection checkbox, say) belongs in its
+key, so changing it rebuilds just that row.
+
+`on_end()` is called when a scroll brings the last row into the window: the
+place to fetch the next page of a paginated list.
+
+Usage::
+
+    orders_list = VirtualList(order_card, key=lambda o: o["id"], row_height=170)
+    orders_list.set_items(orders)           # after a fetch, a filter tap, a poll
+    column.controls.append(orders_list.view)
+    page.update()
+"""
+import math
+
+import flet as ft
+
+
+class VirtualList:
+    def __init__(
+        self,
+        build_row,
+        *,
+        key=lambda item: item["id"],
+        bind_row=None,
+        row_height: float = 120,
+        spacing: float = 12,
+        overscan: int = 4,
+        header: list | None = None,
+        header_height: float = 0,
+        empty: ft.Control | None = None,
+        on_end=None,
+        padding=None,
+        viewport_height: float = 800,
+        scroll_interval: int = 50,
+    ):
+        self.build_row = build_row
+        self.key = key
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.spacing = spacing
+        self.overscan = overscan
+        self.header = list(header or [])
+        self.header_height = header_height
+        self.empty = empty
+        self.on_end = on_end
+        self.viewport = viewport_height
+
+        self.items: list = []
+        self.first = 0
+        self.last = 0
+        self.pixels = 0.0
+        self._rows: dict = {}       # key -> (item, control), the rows in the window
+        self._shown: list = []      # their controls, in order
+        self._pool: list = []       # controls of rows that left the window
+        self._top = ft.Container(height=0, visible=False)
+        self._bottom = ft.Container(height=0, visible=False)
+        self.stats = {"built": 0, "rebound": 0, "kept": 0}
+
+        self.view = ft.ListView(
+            expand=True,
+            spacing=spacing,
+            padding=padding,
+            scroll_interval=scroll_interval,
+            on_scroll=self._on_scroll,
+        )
+
+    @property
+    def pitch(self) -> float:
+        return self.row_height + self.spacing
+
+    def set_header(self, header: list, header_height: float | None = None):
+        self.header = list(header)
+        if header_height is not None:
+            self.header_height = header_height
+        self._layout()
+
+    def set_items(self, items):
+        """Show `items`; only rows whose item changed are rebuilt. Call page.update() after."""
+        self.items = list(items)
+        self.first, self.last = self._window(self.pixels)
+        self._render()
+
+    def rewind(self, items=None):
+        """`set_items` for a view that is being mounted again: Flet shows it from the top."""
+        self.pixels = 0.0
+        self.set_items(self.items if items is None else items)
+
+    def _window(self, pixels: float) -> tuple[int, int]:
+        count = math.ceil(self.viewport / self.pitch) + 2 * self.overscan
+        first = max(0, int((pixels - self.header_height) // self.pitch) - self.overscan)
+        first = min(first, max(0, len(self.items) - count))
+        return first, min(len(self.items), first + count)
+
+    def _on_scroll(self, e):
+        self.viewport = getattr(e, "viewport_dimension", None) or self.viewport
+        self.pixels = getattr(e, "pixels", None) or 0.0
+        window = self._window(self.pixels)
+        if window != (self.first, self.last):
+            self.first, self.last = window
+            self._render()
+            try:
+                self.view.update()
+            except (AssertionError, RuntimeError):     # not on a page (yet)
+                pass
+        if self.on_end is not None and self.items and self.last >= len(self.items):
+            self.on_end()
+
+    def _make(self, item):
+        if self.bind_row is not None and self._pool:
+            control = self.bind_row(self._pool.pop(), item)
+            if control is not None:
+                self.stats["rebound"] += 1
+                return control
+        self.stats["built"] += 1
+        return self.build_row(item)
+
+    def _render(self):
+        old, rows, fresh = self._rows, {}, []
+        for item in self.items[self.first:self.last]:
+            k = self.key(item)
+            cached = old.pop(k, None)
+            if cached is not None and (cached[0] is item or cached[0] == item):
+                rows[k] = (item, cached[1])
+                self.stats["kept"] += 1
+            else:
+                if cached is not None:
+                    self._pool.append(cached[1])
+                rows[k] = None          # keeps the row's place; filled below
+                fresh.append((k, item))
+        self._pool.extend(control for _, control in old.values())
+        for k, item in fresh:
+            rows[k] = (item, self._make(item))
+        self._rows = rows
+        self._shown = [control for _, control in rows.values()]
+        # spares beyond one window's worth would only hold memory
+        del self._pool[max(self.last - self.first, 1):]
+        self._layout()
+
+    def _layout(self):
+        if not self.items:
+            self.view.controls = [*self.header, *([self.empty] if self.empty is not None else [])]
+            return
+        above = self.first
+        below = len(self.items) - self.last
+        self._top.visible = above > 0
+        self._top.height = max(0.0, above * self.pitch - self.spacing)
+        self._bottom.visible = below > 0
+        self._bottom.height = max(0.0, below * self.pitch - self.spacing)
+        self.view.controls = [*self.header, self._top, *self._shown, self._bottom]